@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Arrow ile getirme ölçümü.
+
+Üretilmiş büyük bir SQLite tablosu, mevcut pd.read_sql_query yolu ve
+sütun sütun RecordBatch oluşturan Arrow yolu ile DataFrame'e getirilir.
+En yüksek bellek kullanımı süreç ömrü boyunca tutulduğu için her kip ayrı
+bir alt süreçte çalıştırılır; süre, satır/sn ve en yüksek RSS raporlanır.
+
+Kullanım:
+    python benchmarks/bench_arrow_fetch.py --rows 5000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_export import QUERY, build_fixture
+
+# pandas: read_sql_query, arrow: RecordBatch'ler + to_pandas,
+# arrow-table: DataFrame'e çevirmeden sadece Arrow tablosu (dışa aktarımın kullandığı yol)
+MODES = ["pandas", "arrow", "arrow-table"]
+
+def run_mode(db_path: str, mode: str, batch_size: int) -> dict:
+    """Tek bir kipi bu süreçte çalıştırır ve ölçümleri döndürür."""
+    from sqlalchemy import create_engine, text
+    import pandas as pd
+
+    from oracle_sql_generator import columnar
+    from oracle_sql_generator.export import peak_rss_mb
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        if mode == "pandas":
+            rows = len(pd.read_sql_query(text(QUERY), conn))
+        elif mode == "arrow":
+            rows = len(columnar.fetch_table(conn, QUERY, batch_size).to_pandas())
+        else:
+            rows = columnar.fetch_table(conn, QUERY, batch_size).num_rows
+    seconds = time.perf_counter() - start
+    return {
+        'mode': mode,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds,
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000000, help="Üretilecek satır sayısı")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Arrow partisi başına satır")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--db", help="Mevcut bir fixture veritabanı (verilmezse üretilir)")
+    parser.add_argument("--single", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_mode(args.db, args.single, args.batch_size)))
+        return
+
+    tmp_dir = None
+    db_path = args.db
+    if db_path is None:
+        tmp_dir = tempfile.mkdtemp(prefix="bench_arrow_db_")
+        db_path = os.path.join(tmp_dir, "big.sqlite")
+        print(f"{args.rows:,} satırlık tablo üretiliyor...")
+        build_fixture(db_path, args.rows)
+
+    print(f"{'kip':<12} {'satır':>10} {'süre (sn)':>10} {'satır/sn':>10} {'başlangıç RSS':>14} "
+          f"{'en yüksek RSS (MB)':>19}")
+    try:
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--single", mode, "--db", db_path,
+                 "--batch-size", str(args.batch_size)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<12} {r['rows']:>10,} {r['seconds']:>10.2f} {r['rows_per_sec']:>10,.0f} "
+                  f"{r['baseline_rss_mb']:>14.0f} {r['peak_rss_mb']:>19.0f}")
+    finally:
+        if tmp_dir is not None:
+            os.remove(db_path)
+            os.rmdir(tmp_dir)
+
+if __name__ == "__main__":
+    main()
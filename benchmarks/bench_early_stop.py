@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Erken durdurma ile kazanılan token ölçümü.
+
+Soru kümesindeki her altın SQL, modellerin tipik çıktı biçimlerine
+(kod bloğu + açıklama, düz SQL + açıklama, <think> bloğu + SQL) sarılır
+ve token token akış yapan sahte bir modelle LLMHandler üzerinden üretilir.
+Erken durdurma açık ve kapalıyken modelin ürettiği token sayıları ile
+elde edilen SQL'in altın SQL ile aynı olup olmadığı raporlanır (erken
+durdurma kapalıyken SQL'den sonra gelen açıklama temizlenemediği için
+tam çıktıdaki eşleşme düşüktür). Ollama gerekmez.
+
+Kullanım:
+    python benchmarks/bench_early_stop.py --explanation-words 60
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from stubs import StubLLM, make_handler
+
+DEFAULT_QUESTIONS = os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json")
+
+EXPLANATION = (
+    "Bu sorgu istenen tablodan ilgili sütunları seçer ve koşula uyan kayıtları "
+    "filtreler. Gerekirse tablolar anahtar sütunlar üzerinden birleştirilir, "
+    "sonuçlar gruplanır ve sıralanır. Sorgu SQLite ile uyumludur ve sonunda "
+    "noktalı virgül kullanılmamıştır."
+)
+
+OUTPUT_STYLES = {
+    "kod_blogu": "```sql\n{sql}\n```\n\nAçıklama: {explanation}",
+    "duz_metin": "{sql}\n\n{explanation}",
+    "dusunme": "<think>\nSoru {tables} tablolarıyla ilgili. {explanation}\n</think>\n\n{sql}\n\nBu sorgu: {explanation}",
+}
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS, help="Soru kümesi (JSON)")
+    parser.add_argument("--explanation-words", type=int, default=60,
+                        help="SQL'den sonra üretilen açıklamanın yaklaşık kelime sayısı")
+    parser.add_argument("--verbose", action="store_true", help="Her soru için ayrıntı yazdır")
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+
+    words = EXPLANATION.split()
+    explanation = " ".join((words * (args.explanation_words // len(words) + 1))[:args.explanation_words])
+
+    model = StubLLM()
+    print(f"{'biçim':<10} {'token (tam)':>12} {'token (erken)':>14} {'kazanç/soru':>12} {'oran':>7} {'doğru (tam/erken)':>18}")
+    for style, template in OUTPUT_STYLES.items():
+        full_counts, early_counts = [], []
+        correct = {False: 0, True: 0}
+        for item in questions:
+            model.default_response = template.format(
+                sql=item["sql"], explanation=explanation, tables=", ".join(item["tables"])
+            )
+            results = {}
+            for early_stop in (False, True):
+                handler = make_handler(model, early_stop)
+                results[early_stop] = (handler.generate_sql(item["question"], ""), model.emitted)
+
+            full_counts.append(results[False][1])
+            early_counts.append(results[True][1])
+            for early_stop, (sql, _) in results.items():
+                if normalize_sql(sql) == normalize_sql(item["sql"]):
+                    correct[early_stop] += 1
+            if args.verbose:
+                print(f"  {item['question']}: {results[False][1]} -> {results[True][1]}")
+
+        saved = [full - early for full, early in zip(full_counts, early_counts)]
+        ratio = sum(saved) / sum(full_counts)
+        print(f"{style:<10} {statistics.mean(full_counts):>12.1f} {statistics.mean(early_counts):>14.1f} "
+              f"{statistics.mean(saved):>12.1f} {ratio:>6.1%} "
+              f"{correct[False]:>9}/{correct[True]}/{len(questions)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Sonuç dışa aktarımı ölçümü.
+
+Üretilmiş büyük bir SQLite tablosu, eski yöntemle (read_sql_query ile
+tüm sonuç + to_csv ile bayt kopyası) ve parça parça yazan export_query
+ile CSV, gzip'li CSV ve Parquet olarak dışa aktarılır. En yüksek bellek
+kullanımı süreç ömrü boyunca tutulduğu için her kip ayrı bir alt süreçte
+çalıştırılır; satır/sn, ilk parçanın diske düştüğü an, dosya boyutu ve
+en yüksek RSS raporlanır.
+
+Kullanım:
+    python benchmarks/bench_export.py --rows 2000000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+MODES = ["pandas", "csv", "csv.gz", "parquet"]
+QUERY = "SELECT * FROM big_orders"
+
+def build_fixture(path: str, rows: int, batch: int = 100000):
+    """Karışık tipli sütunlardan oluşan rows satırlık bir tablo üretir."""
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(
+            "CREATE TABLE big_orders (id INTEGER PRIMARY KEY, customer TEXT, city TEXT, "
+            "order_date TEXT, quantity INTEGER, unit_price REAL, discount REAL, note TEXT)"
+        )
+        cities = ["İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Konya", "Adana", "Şanlıurfa"]
+        for start in range(0, rows, batch):
+            conn.executemany(
+                "INSERT INTO big_orders VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (i, f"Müşteri {i % 9973}", cities[i % len(cities)], f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                     i % 50 + 1, round(1 + (i % 1000) * 0.37, 2), (i % 5) * 0.05,
+                     None if i % 7 else f"not {i}")
+                    for i in range(start, min(start + batch, rows))
+                )
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+def run_mode(db_path: str, mode: str, chunk_size: int) -> dict:
+    """Tek bir kipi bu süreçte çalıştırır ve ölçümleri döndürür."""
+    from sqlalchemy import create_engine, text
+    import pandas as pd
+
+    from oracle_sql_generator.export import EXPORT_FORMATS, export_query, peak_rss_mb
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    baseline = peak_rss_mb()
+    out_dir = tempfile.mkdtemp(prefix="bench_export_")
+
+    if mode == "pandas":
+        # Eski yol: tüm sonuç DataFrame'e, sonra tüm CSV bayt olarak belleğe
+        path = os.path.join(out_dir, "result.csv")
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            df = pd.read_sql_query(text(QUERY), conn)
+        data = df.to_csv(index=False).encode("utf-8-sig")
+        with open(path, "wb") as f:
+            f.write(data)
+        seconds = time.perf_counter() - start
+        result = {'rows': len(df), 'seconds': seconds, 'first_chunk_seconds': seconds}
+    else:
+        path = os.path.join(out_dir, "result" + EXPORT_FORMATS[mode])
+        stats = export_query(QUERY, mode, path=path, engine=engine, chunk_size=chunk_size)
+        result = {'rows': stats.rows, 'seconds': stats.seconds, 'first_chunk_seconds': stats.first_chunk_seconds}
+
+    result.update({
+        'mode': mode,
+        'rows_per_sec': result['rows'] / result['seconds'],
+        'file_size_mb': os.path.getsize(path) / (1024 * 1024),
+        'peak_rss_mb': peak_rss_mb(),
+        'baseline_rss_mb': baseline,
+    })
+    os.remove(path)
+    os.rmdir(out_dir)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000000, help="Üretilecek satır sayısı")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Parça başına satır")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--db", help="Mevcut bir fixture veritabanı (verilmezse üretilir)")
+    parser.add_argument("--single", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_mode(args.db, args.single, args.chunk_size)))
+        return
+
+    tmp_dir = None
+    db_path = args.db
+    if db_path is None:
+        tmp_dir = tempfile.mkdtemp(prefix="bench_export_db_")
+        db_path = os.path.join(tmp_dir, "big.sqlite")
+        print(f"{args.rows:,} satırlık tablo üretiliyor...")
+        build_fixture(db_path, args.rows)
+
+    print(f"{'kip':<8} {'satır':>10} {'süre (sn)':>10} {'satır/sn':>10} {'ilk parça (sn)':>15} "
+          f"{'dosya (MB)':>11} {'başlangıç RSS':>14} {'en yüksek RSS (MB)':>19}")
+    try:
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--single", mode, "--db", db_path,
+                 "--chunk-size", str(args.chunk_size)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<8} {r['rows']:>10,} {r['seconds']:>10.2f} {r['rows_per_sec']:>10,.0f} "
+                  f"{r['first_chunk_seconds']:>15.2f} {r['file_size_mb']:>11.1f} {r['baseline_rss_mb']:>14.0f} "
+                  f"{r['peak_rss_mb']:>19.0f}")
+    finally:
+        if tmp_dir is not None:
+            os.remove(db_path)
+            os.rmdir(tmp_dir)
+
+if __name__ == "__main__":
+    main()
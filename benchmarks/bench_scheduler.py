@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Üretim zamanlayıcısı ölçümü.
+
+Sahte bir Ollama HTTP sunucusu başlatılır ve gerçek OllamaLLM istemcisiyle
+aynı anda gelen N isteklik bir yük, zamanlayıcı kapalıyken ve açıkken
+LLMHandler.generate_sql üzerinden gönderilir. Sorular soru kümesinden
+tekrarlı seçildiği için aynı prompt'lar aynı anda uçuşta olur. Her kip
+için süre, gecikme yüzdelikleri, sunucuya giden istek/token sayısı ve
+zamanlayıcının sıra derinliği/bekleme metrikleri raporlanır.
+
+Kullanım:
+    python benchmarks/bench_scheduler.py --clients 40 --capacity 2
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from langchain_ollama.llms import OllamaLLM
+
+from oracle_sql_generator.scheduler import GenerationScheduler
+from fake_ollama import FakeOllamaServer, fenced_response
+from stubs import make_handler
+
+DEFAULT_QUESTIONS = os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json")
+
+def run_burst(handler, questions, clients: int):
+    """clients kadar isteği aynı anda gönderir; (süre, gecikmeler, sonuçlar) döndürür."""
+    def request(question):
+        start = time.perf_counter()
+        sql = handler.generate_sql(question, "")
+        return time.perf_counter() - start, sql
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(request, questions))
+        elapsed = time.perf_counter() - start
+    return elapsed, sorted(r[0] * 1000 for r in results), [r[1] for r in results]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS, help="Soru kümesi (JSON)")
+    parser.add_argument("--clients", type=int, default=40, help="Aynı anda gelen istek sayısı")
+    parser.add_argument("--distinct", type=int, default=12, help="Yükteki farklı soru sayısı")
+    parser.add_argument("--capacity", type=int, default=2, help="Sahte sunucunun paralel kapasitesi")
+    parser.add_argument("--first-token-latency", type=float, default=0.2, help="İlk token gecikmesi (sn)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Token başına gecikme (sn)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    rng = random.Random(args.seed)
+    pool = rng.sample(items, min(args.distinct, len(items)))
+    questions = [rng.choice(pool)["question"] for _ in range(args.clients)]
+    expected = {item["question"]: item["sql"] for item in pool}
+
+    server = FakeOllamaServer(
+        responses={item["question"]: fenced_response(item["sql"]) for item in pool},
+        first_token_latency=args.first_token_latency,
+        token_latency=args.token_latency,
+        capacity=args.capacity
+    ).start()
+    model = OllamaLLM(model="fake", base_url=server.url)
+
+    print(f"{args.clients} eşzamanlı istek, {len(set(questions))} farklı soru, sunucu kapasitesi {args.capacity}")
+    print(f"{'kip':<22} {'süre (sn)':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'istek':>6} {'token':>6} "
+          f"{'aktif':>6} {'hatalı':>7}")
+    modes = [
+        ("zamanlayıcı yok", None),
+        (f"zamanlayıcı ({args.capacity} slot)", GenerationScheduler(max_concurrency=args.capacity)),
+    ]
+    for label, scheduler in modes:
+        handler = make_handler(model, scheduler=scheduler)
+        server.reset_stats()
+        elapsed, latencies, sqls = run_burst(handler, questions, args.clients)
+        stats = server.stats()
+        wrong = sum(1 for q, sql in zip(questions, sqls) if " ".join(sql.split()) != " ".join(expected[q].split()))
+        p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+        print(f"{label:<22} {elapsed:>9.2f} {statistics.median(latencies):>9.0f} {p95:>9.0f} "
+              f"{stats['requests']:>6} {stats['tokens']:>6} {stats['max_active']:>6} {wrong:>7}")
+        if scheduler is not None:
+            s = scheduler.stats()
+            print(f"  sıra derinliği en fazla {s['max_queue_depth']}, birleştirilen istek {s['coalesced']}, "
+                  f"bekleme ort. {s['wait_avg_s'] * 1000:.0f} ms / en fazla {s['wait_max_s'] * 1000:.0f} ms")
+
+    server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Şema çıkarma performans karşılaştırması.
+
+Tablo başına PRAGMA sorgusu atan eski yol ile pragma tablo değerli
+fonksiyonlarını kullanan toplu yol, üretilmiş bir SQLite veritabanı
+üzerinde karşılaştırılır.
+
+Kullanım:
+    python benchmarks/bench_schema_extraction.py --tables 2000 --repeat 3
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, inspect, text
+
+from oracle_sql_generator.schema import extract_sqlite_schema_bulk
+
+def build_fixture(path: str, table_count: int, column_count: int = 8):
+    """Her tablosu bir öncekine foreign key ile bağlı bir SQLite veritabanı üretir."""
+    conn = sqlite3.connect(path)
+    try:
+        for i in range(table_count):
+            columns = ["id INTEGER PRIMARY KEY"]
+            columns += [f"col_{j} VARCHAR(50) NOT NULL DEFAULT ''" for j in range(column_count - 2)]
+            if i > 0:
+                columns.append(f"parent_id INTEGER REFERENCES table_{i - 1:05d}(id)")
+            else:
+                columns.append("parent_id INTEGER")
+            conn.execute(f"CREATE TABLE table_{i:05d} ({', '.join(columns)})")
+        conn.commit()
+    finally:
+        conn.close()
+
+def extract_per_table(conn) -> dict:
+    """Uygulama betiklerindeki eski yöntem: her tablo için üç ayrı sorgu."""
+    inspector = inspect(conn)
+    schema = {'tables': {}, 'foreign_keys': []}
+
+    for table_name in inspector.get_table_names():
+        columns = []
+        primary_keys = []
+        cursor = conn.execute(text(f'PRAGMA table_info("{table_name}")'))
+        for col in cursor.mappings().all():
+            is_primary = bool(col['pk'])
+            columns.append({
+                'name': col['name'],
+                'type': col['type'],
+                'nullable': not bool(col['notnull']),
+                'default': col['dflt_value'],
+                'primary_key': is_primary
+            })
+            if is_primary:
+                primary_keys.append(col['name'])
+
+        fks = []
+        cursor = conn.execute(text(f'PRAGMA foreign_key_list("{table_name}")'))
+        for fk in cursor.mappings().all():
+            fks.append({
+                'constrained_columns': [fk['from']],
+                'referred_table': fk['table'],
+                'referred_columns': [fk['to']]
+            })
+            schema['foreign_keys'].append({
+                'table': table_name,
+                'columns': [fk['from']],
+                'foreign_table': fk['table'],
+                'foreign_columns': [fk['to']]
+            })
+
+        ddl = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type='table' AND name=:name"),
+            {'name': table_name}
+        ).first()
+
+        schema['tables'][table_name] = {
+            'columns': columns,
+            'primary_key': primary_keys,
+            'foreign_keys': fks,
+            'ddl': ddl[0] if ddl else None
+        }
+
+    return schema
+
+def timed(fn, engine, repeat: int):
+    """Fonksiyonu her seferinde yeni bir bağlantıyla çalıştırıp süreleri döndürür."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        with engine.connect() as conn:
+            start = time.perf_counter()
+            result = fn(conn)
+            timings.append(time.perf_counter() - start)
+    return timings, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tables", type=int, default=2000, help="Üretilecek tablo sayısı")
+    parser.add_argument("--columns", type=int, default=8, help="Tablo başına sütun sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="Tekrar sayısı")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench_schema.sqlite")
+        print(f"{args.tables} tablolu test veritabanı oluşturuluyor...")
+        build_fixture(db_path, args.tables, args.columns)
+        engine = create_engine(f"sqlite:///{db_path}")
+
+        per_table_times, per_table = timed(extract_per_table, engine, args.repeat)
+        bulk_times, bulk = timed(extract_sqlite_schema_bulk, engine, args.repeat)
+        engine.dispose()
+
+    # İki yol da aynı şema yapısını üretmeli
+    assert per_table == bulk, "Toplu çıkarma sonucu tablo bazlı sonuçtan farklı"
+
+    per_table_median = statistics.median(per_table_times)
+    bulk_median = statistics.median(bulk_times)
+    print(f"Tablo sayısı        : {len(bulk['tables'])}")
+    print(f"Tablo bazlı (medyan): {per_table_median * 1000:.1f} ms")
+    print(f"Toplu (medyan)      : {bulk_median * 1000:.1f} ms")
+    print(f"Hızlanma            : {per_table_median / bulk_median:.1f}x")
+
+if __name__ == "__main__":
+    main()
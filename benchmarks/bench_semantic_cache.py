@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Anlamsal önbellek arama gecikmesi ölçümü.
+
+VectorIndex'e rastgele birim vektörler doldurulur ve farklı kayıt
+sayılarında tam (exact) kNN aramasının gecikmesi ölçülür. Önce, anlamı
+ters olduğu halde sözcüksel olarak çok benzeyen soru çiftlerinin
+birbirinin SQL'ini almadığı (ıska olduğu) kontrol edilir.
+
+Kullanım:
+    python benchmarks/bench_semantic_cache.py --sizes 10000 100000 1000000 --dim 384
+    python benchmarks/bench_semantic_cache.py --polarity-only
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from oracle_sql_generator.semantic_cache import LexicalEmbedder, SemanticCache, VectorIndex
+
+# Önbellekte ilki varken ikincisi sorulduğunda ıska olması gereken çiftler
+MUST_MISS = [
+    ("Stokta olmayan ürünleri listele", "Stokta olan ürünleri listele"),
+    ("Faksı olmayan müşterileri göster", "Faksı olan müşterileri göster"),
+    ("Almanya hariç müşterileri listele", "Almanya'daki müşterileri listele"),
+    ("Kategorisiz ürünleri getir", "Kategorili ürünleri getir"),
+    ("Gönderilmemiş siparişleri listele", "Gönderilmiş siparişleri listele"),
+    ("Ürünleri fiyata göre artan sırala", "Ürünleri fiyata göre azalan sırala"),
+    ("En yüksek fiyatlı 5 ürünü listele", "En düşük fiyatlı 5 ürünü listele"),
+    ("En çok satan ürünleri getir", "En az satan ürünleri getir"),
+    ("1997'den önceki siparişler", "1997'den sonraki siparişler"),
+    ("Ürünleri fiyata göre büyükten küçüğe sırala", "Ürünleri fiyata göre küçükten büyüğe sırala"),
+]
+
+def check_polarity(threshold: float) -> int:
+    """MUST_MISS çiftlerini dener; yanlışlıkla isabet eden çift sayısını döndürür."""
+    embedder = LexicalEmbedder()
+    failures = 0
+    print(f"{'benzerlik':>10}  sonuç  çift")
+    for cached, asked in MUST_MISS:
+        cache = SemanticCache(embedder, threshold=threshold)
+        cache.add(cached, "SELECT 1", "kapsam")
+        hit = cache.lookup(asked, "kapsam") is not None
+        failures += hit
+        similarity = float(embedder.embed(cached) @ embedder.embed(asked))
+        print(f"{similarity:>10.3f}  {'HATA ' if hit else 'ıska '}  {cached} / {asked}")
+    print(f"{len(MUST_MISS)} çiftten {failures} tanesi yanlışlıkla isabet etti.\n")
+    return failures
+
+def random_unit_vectors(count: int, dim: int, rng) -> np.ndarray:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def fill_index(size: int, dim: int, dtype: str, rng) -> VectorIndex:
+    """İndeksi parça parça üretilen vektörlerle doldurur (bellek tepe noktasını sınırlar)."""
+    index = VectorIndex(dim, max_entries=size, dtype=dtype, initial_capacity=size)
+    chunk = 50000
+    for start in range(0, size, chunk):
+        count = min(chunk, size - start)
+        # Doğrudan matrise yaz; add() döngüsü ölçülen şey değil
+        index._matrix[start:start + count] = random_unit_vectors(count, dim, rng)
+        index._payloads.extend(range(start, start + count))
+    index._size = size
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384, help="Vektör boyutu")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--queries", type=int, default=200, help="Ölçülen arama sayısı")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threshold", type=float, default=0.92, help="Anlamsal önbellek eşiği")
+    parser.add_argument("--polarity-only", action="store_true", help="Sadece ıska olması gereken çiftleri dene")
+    args = parser.parse_args()
+
+    failures = check_polarity(args.threshold)
+    if args.polarity_only:
+        sys.exit(1 if failures else 0)
+
+    rng = np.random.default_rng(args.seed)
+    queries = random_unit_vectors(args.queries, args.dim, rng)
+
+    print(f"{'kayıt':>10} {'bellek (MB)':>12} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10}")
+    for size in args.sizes:
+        index = fill_index(size, args.dim, args.dtype, rng)
+        index.search(queries[0])  # Isınma
+
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, k=1)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+
+        memory_mb = index._matrix.nbytes / (1024 * 1024)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        print(f"{size:>10} {memory_mb:>12.1f} {statistics.median(timings):>10.3f} {p95:>10.3f} {p99:>10.3f}")
+        del index
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Açılışta ilk sayfanın gelme süresi: gecikmeli (arka planda hazırlık) ve eski
+(her şeyi açılışta bekleyen) başlatma karşılaştırması.
+
+Her ölçümde uygulama ayrı bir süreçte başlatılır; süreç başlangıcından
+GET / isteğinin ilk kez 200 döndürmesine kadar geçen süre (ilk sayfa) ve
+/health/ready'nin 200 döndürmesine kadar geçen süre (tam hazır) ölçülür.
+Model olarak ilk istekte belleğe yüklenme süresi --load-latency olan sahte
+Ollama sunucusu, veritabanı olarak bağlantı kurma süresi --connect-latency
+ile uzatılan Northwind SQLite dosyası kullanılır. Eski başlatma, kurucuda
+modele "test" üretimi gönderip şemayı eşzamanlı çıkaran davranıştır.
+
+Kullanım:
+    python benchmarks/bench_startup.py --load-latency 3 --connect-latency 0.5 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from fake_ollama import FakeOllamaServer
+
+DEFAULT_DB = os.path.join(ROOT_DIR, "Northwind_small.sqlite")
+
+def serve(mode: str, ollama_url: str, db_path: str, connect_latency: float, port: int):
+    """Alt süreç: uygulamayı verilen kipte kurar ve sunar."""
+    import uvicorn
+    from langchain_ollama.llms import OllamaLLM
+    from sqlalchemy import create_engine, event
+
+    from oracle_sql_generator.app import OracleSQLApp
+    from oracle_sql_generator.config import STARTUP_CONFIG
+    from oracle_sql_generator.startup import create_server
+    from stubs import make_handler
+
+    lazy = mode == "lazy"
+    STARTUP_CONFIG["lazy"] = lazy
+    engine = create_engine(f"sqlite:///{db_path}")
+    event.listen(engine, "connect", lambda *args: time.sleep(connect_latency))
+
+    model = OllamaLLM(model="fake", base_url=ollama_url)
+    if not lazy:
+        # Eski LLMHandler.__init__ davranışı: bağlantı testi için bir üretim
+        model.invoke("test")
+    app = OracleSQLApp(engine=engine, llm_handler=make_handler(model), lazy=lazy)
+    try:
+        demo = app.create_ui()
+    except TypeError as e:
+        # Kurulu Gradio sürümü arayüzün bazı parametrelerini tanımıyorsa
+        # durum satırı ve soru kutusundan oluşan sade bir sayfa sunulur
+        print(f"create_ui kullanılamadı ({e}); sade sayfa sunuluyor", file=sys.stderr)
+        import gradio as gr
+        from oracle_sql_generator.startup import READINESS
+        with gr.Blocks() as demo:
+            status = gr.Markdown()
+            query = gr.Textbox(label="Sorunuz")
+            output = gr.Markdown()
+            query.submit(lambda q: app.generate_sql(q, False)[2], inputs=[query], outputs=[output])
+            demo.load(READINESS.summary, outputs=[status])
+    uvicorn.run(create_server(demo), host="127.0.0.1", port=port, log_level="error")
+
+def wait_for(url: str, deadline: float) -> float:
+    """url 200 döndürene kadar yoklar; döndüğü anı (perf_counter) verir."""
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(url)
+
+def measure(mode: str, args, port: int):
+    ollama = FakeOllamaServer(load_latency=args.load_latency).start()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", mode, "--ollama-url", ollama.url,
+         "--db", args.db, "--connect-latency", str(args.connect_latency), "--port", str(port)],
+        cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + args.timeout
+        first_page = wait_for(f"http://127.0.0.1:{port}/", deadline) - start
+        ready = wait_for(f"http://127.0.0.1:{port}/health/ready", deadline) - start
+        return first_page, ready, ollama.stats()
+    finally:
+        process.terminate()
+        process.wait()
+        ollama.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite veritabanı dosyası")
+    parser.add_argument("--load-latency", type=float, default=3.0, help="Modelin belleğe yüklenme süresi (sn)")
+    parser.add_argument("--connect-latency", type=float, default=0.5,
+                        help="Veritabanı bağlantısının kurulma süresi (sn)")
+    parser.add_argument("--repeat", type=int, default=3, help="Her kip için ölçüm sayısı")
+    parser.add_argument("--port", type=int, default=7871, help="Uygulamanın dinleyeceği port")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Ölçüm başına süre sınırı (sn)")
+    parser.add_argument("--serve", choices=["lazy", "eager"], help=argparse.SUPPRESS)
+    parser.add_argument("--ollama-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.ollama_url, args.db, args.connect_latency, args.port)
+        return
+
+    print(f"model yükleme {args.load_latency:g} sn, bağlantı kurma {args.connect_latency:g} sn, "
+          f"kip başına {args.repeat} ölçüm")
+    print(f"{'kip':<22} {'ilk sayfa (sn)':>15} {'tam hazır (sn)':>15} {'üretim':>8} {'ısındırma':>10}")
+    results = {}
+    for mode, label in [("eager", "eski (açılışta bekler)"), ("lazy", "gecikmeli")]:
+        runs = [measure(mode, args, args.port) for _ in range(args.repeat)]
+        first_page = statistics.median(run[0] for run in runs)
+        ready = statistics.median(run[1] for run in runs)
+        stats = runs[-1][2]
+        results[mode] = first_page
+        print(f"{label:<22} {first_page:>15.2f} {ready:>15.2f} "
+              f"{stats['requests']:>8} {stats['warmups']:>10}")
+    print(f"İlk sayfa {results['eager'] / results['lazy']:.1f} kat daha erken geliyor "
+          f"({results['eager'] - results['lazy']:.2f} sn)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Yerel SQL doğrulamasının gecikmesi ve veritabanı gidiş-dönüşüyle karşılaştırması.
+
+Soru kümesindeki her SQL önce önbelleksiz (ayrıştırma + şema denetimi),
+sonra önbellekten doğrulanır ve aynı SQL'in SQLite'ta çalıştırılma süresiyle
+karşılaştırılır. Ayrıca hatalı model çıktılarından oluşan bir küme
+(bilinmeyen tablo/sütun, birden fazla ifade, DML, bozuk sözdizimi) için
+hangi hatanın veritabanına gitmeden yakalandığı raporlanır. SQLite süreç içinde
+çalıştığı için ağ gidiş-dönüşü yoktur; uzak bir Oracle sunucusuyla
+karşılaştırma için --round-trip-ms ile tek bir gidiş-dönüşün süresi verilir
+(hatalı SQL'in sunucuda ayrıştırılıp reddedilmesi en az bir gidiş-dönüştür).
+
+Kullanım:
+    python benchmarks/bench_validation.py --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine, text
+
+from oracle_sql_generator.schema import extract_sqlite_schema_bulk
+from oracle_sql_generator.validation import VALIDATION_CACHE, sqlglot, validate_sql
+
+DEFAULT_QUESTIONS = os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json")
+DEFAULT_DB = os.path.join(ROOT_DIR, "Northwind_small.sqlite")
+
+# Modellerin sık ürettiği hatalı çıktılar
+BAD_OUTPUTS = [
+    "SELECT * FROM Customers",
+    "SELECT CustomerName FROM Customer",
+    "SELECT c.CompanyName FROM Customer c JOIN \"Order\" o ON o.CustomerID = c.Id WHERE o.Total > 100",
+    "SELECT * FROM Product; DELETE FROM Product",
+    "DELETE FROM \"Order\" WHERE OrderDate < '2013-01-01'",
+    "SELECT ProductName FROM Product WHERE",
+    "SELECT ProductName, FROM Product",
+]
+
+def percentile(values, ratio: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+def measure(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite veritabanı dosyası")
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS, help="Soru kümesi (JSON)")
+    parser.add_argument("--repeat", type=int, default=20, help="Her SQL için ölçüm sayısı")
+    parser.add_argument("--round-trip-ms", type=float, default=1.0,
+                        help="Karşılaştırılacak Oracle gidiş-dönüş süresi (ms)")
+    args = parser.parse_args()
+
+    if sqlglot is None:
+        sys.exit("sqlglot kurulu değil: pip install sqlglot")
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    engine = create_engine(f"sqlite:///{args.db}")
+    with engine.connect() as conn:
+        schema = extract_sqlite_schema_bulk(conn)
+
+    def cold(sql):
+        VALIDATION_CACHE.clear()
+        return validate_sql(sql, schema, "sqlite")
+
+    cold_timings, warm_timings, db_timings = [], [], []
+    rejected = []
+    with engine.connect() as conn:
+        for item in items:
+            sql = item["sql"]
+            if not cold(sql).ok:
+                rejected.append(sql)
+            cold_timings += measure(lambda: cold(sql), args.repeat)
+            warm_timings += measure(lambda: validate_sql(sql, schema, "sqlite"), args.repeat)
+            db_timings += measure(lambda: conn.execute(text(sql)).fetchall(), args.repeat)
+
+    print(f"{len(items)} geçerli sorgu, her biri {args.repeat} kez; yanlış red: {len(rejected)}")
+    print(f"{'adım':<26} {'p50 (ms)':>10} {'p95 (ms)':>10} {'ort. (ms)':>10}")
+    for label, timings in [("doğrulama (önbelleksiz)", cold_timings),
+                           ("doğrulama (önbellekten)", warm_timings),
+                           ("SQLite'ta çalıştırma", db_timings)]:
+        print(f"{label:<26} {percentile(timings, 0.5) * 1000:>10.3f} "
+              f"{percentile(timings, 0.95) * 1000:>10.3f} {statistics.fmean(timings) * 1000:>10.3f}")
+    cold_mean = statistics.fmean(cold_timings) * 1000
+    print(f"Önbelleksiz doğrulama / SQLite'ta çalıştırma: {cold_mean / (statistics.fmean(db_timings) * 1000):.2f}")
+    print(f"Önbelleksiz doğrulama / {args.round_trip_ms:g} ms Oracle gidiş-dönüşü: "
+          f"{cold_mean / args.round_trip_ms:.2f}")
+    for sql in rejected:
+        print(f"  yanlış red: {sql}")
+
+    print(f"\n{len(BAD_OUTPUTS)} hatalı çıktı:")
+    for sql in BAD_OUTPUTS:
+        result = cold(sql)
+        verdict = "; ".join(result.errors) if not result.ok else "GEÇTİ (veritabanında hata verecek)"
+        print(f"  {result.seconds * 1000:6.3f} ms  {sql[:60]:<60}  {verdict}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Model ayarlarının doğruluk ve gecikme değerlendirmesi.
+
+Soru kümesindeki (Türkçe soru, doğru SQL) çiftleri her model yapılandırması
+için paralel olarak LLMHandler.generate_sql'den geçirilir. Üretilen SQL ile
+doğru SQL aynı veritabanında salt okunur olarak çalıştırılır ve metinleri
+değil sonuçları karşılaştırılır: sütun adları yok sayılır, satırlar doğru
+SQL'de ORDER BY yoksa sırasız karşılaştırılır, ondalıklar yuvarlanır.
+
+Her yapılandırma için çalıştırma doğruluğu, generate_sql süresinin p50/p95
+değerleri ve üretim hızı (token/sn, Ollama'nın eval_count'u ile) raporlanır;
+doğruluk eşiğini geçen en hızlı yapılandırma önerilir. Paralel isteklerin
+Ollama'da kuyruğa girip girmediği OLLAMA_NUM_PARALLEL'e bağlıdır; gecikme
+bu bekleme süresini de içerir.
+
+Kullanım:
+    python benchmarks/eval_accuracy.py --config model=gemma3:4b \\
+        --config model=gemma3:4b,num_ctx=4096,temperature=0 \\
+        --config model=qwen2.5-coder:7b --workers 2 --min-accuracy 0.8
+    python benchmarks/eval_accuracy.py --fake  # Ollama olmadan hattı denemek için
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from langchain_ollama import OllamaLLM
+from sqlalchemy import create_engine
+
+from fake_ollama import FakeOllamaServer, fenced_response
+from oracle_sql_generator.config import MODEL_CONFIG, RESULT_CACHE_CONFIG, SCHEMA_CACHE_CONFIG
+from oracle_sql_generator.llm import build_model as build_ollama_model
+from oracle_sql_generator.pipeline import SQLPipeline
+from oracle_sql_generator.telemetry import LLM_TOKENS, METRICS, SPAN_SECONDS
+from stubs import make_handler
+
+DEFAULT_QUESTIONS = os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json")
+DEFAULT_DB = os.path.join(ROOT_DIR, "Northwind_small.sqlite")
+ORDER_BY = re.compile(r"\border\s+by\b", re.IGNORECASE)
+
+def parse_config(text: str) -> Dict[str, Any]:
+    """"model=gemma3:4b,num_ctx=4096" biçimindeki ayarları sözlüğe çevirir; değerler JSON olarak okunur."""
+    config = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        key, _, value = part.partition("=")
+        try:
+            config[key.strip()] = json.loads(value)
+        except ValueError:
+            config[key.strip()] = value.strip()
+    return config
+
+def config_label(overrides: Dict[str, Any]) -> str:
+    return ",".join(f"{key}={value}" for key, value in overrides.items()) or "varsayılan"
+
+def build_model(overrides: Dict[str, Any], base_url: Optional[str] = None) -> OllamaLLM:
+    """MODEL_CONFIG üzerine verilen ayarları uygulayarak Ollama modelini oluşturur."""
+    config = dict(MODEL_CONFIG)
+    if "model" in overrides:
+        config.pop("model_name", None)
+    config.update(overrides)
+    if base_url:
+        config["base_url"] = base_url
+    return build_ollama_model(config)
+
+def fetch_rows(engine, sql: str, max_rows: int) -> List[Tuple]:
+    """Sorguyu çalıştırıp en fazla max_rows + 1 satır döndürür."""
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.exec_driver_sql(sql).fetchmany(max_rows + 1)]
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+def results_match(gold: List[Tuple], predicted: List[Tuple], ordered: bool) -> bool:
+    """İki sonucu sütun adlarından bağımsız, ordered değilse sırasız karşılaştırır."""
+    if len(gold) != len(predicted):
+        return False
+    gold = [tuple(_normalize(v) for v in row) for row in gold]
+    predicted = [tuple(_normalize(v) for v in row) for row in predicted]
+    if gold and len(gold[0]) != len(predicted[0]):
+        return False
+    if not ordered:
+        gold, predicted = sorted(gold, key=repr), sorted(predicted, key=repr)
+    return gold == predicted
+
+def evaluate_config(pipeline: SQLPipeline, engine, items: List[Dict[str, Any]], overrides: Dict[str, Any],
+                    args) -> Dict[str, Any]:
+    """Bir model yapılandırmasını tüm sorularda paralel çalıştırır."""
+    handler = make_handler(build_model(overrides, args.base_url), early_stop=not args.no_early_stop)
+    handler.use_dialect(pipeline.dialect)
+    # Modelin belleğe yüklenmesi gecikmeye katılmasın
+    load_seconds = handler.warm_up()
+    METRICS.reset()
+
+    def run(item):
+        start = time.perf_counter()
+        try:
+            sql = handler.generate_sql(item["question"], item["prompt_schema"], use_cache=False)
+        except Exception as e:
+            return {'question': item["question"], 'sql': "", 'seconds': time.perf_counter() - start,
+                    'correct': False, 'error': f"üretim: {e}"}
+        seconds = time.perf_counter() - start
+        result = {'question': item["question"], 'sql': sql, 'seconds': seconds, 'correct': False, 'error': None}
+        try:
+            predicted = fetch_rows(engine, sql, args.max_rows)
+            result['correct'] = results_match(item["gold_rows"], predicted, item["ordered"])
+        except Exception as e:
+            result['error'] = f"çalıştırma: {e}"
+        return result
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(run, items))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(r['seconds'] for r in results)
+    completion_tokens = LLM_TOKENS.snapshot(kind="completion")['sum']
+    generation_seconds = SPAN_SECONDS.snapshot(span="llm.generate")['sum']
+    return {
+        'config': overrides,
+        'label': config_label(overrides),
+        'questions': len(results),
+        'correct': sum(r['correct'] for r in results),
+        'accuracy': sum(r['correct'] for r in results) / len(results),
+        'errors': sum(1 for r in results if r['error']),
+        'p50_seconds': statistics.median(latencies),
+        'p95_seconds': latencies[max(int(round(len(latencies) * 0.95)) - 1, 0)],
+        'tokens_per_sec': completion_tokens / generation_seconds if generation_seconds else None,
+        'completion_tokens': int(completion_tokens),
+        'wall_seconds': elapsed,
+        'load_seconds': load_seconds,
+        'results': results,
+    }
+
+def print_report(reports: List[Dict[str, Any]], min_accuracy: float, verbose: bool):
+    width = max(len("yapılandırma"), *(len(r['label']) for r in reports))
+    print(f"\n{'yapılandırma':<{width}} {'doğruluk':>10} {'hata':>5} {'p50':>9} {'p95':>9} {'token/sn':>9}")
+    for report in sorted(reports, key=lambda r: r['p50_seconds']):
+        tps = f"{report['tokens_per_sec']:.1f}" if report['tokens_per_sec'] else "-"
+        print(f"{report['label']:<{width}} {report['correct']:>4}/{report['questions']:<3} "
+              f"{report['accuracy']:>4.0%} {report['errors']:>5} {report['p50_seconds'] * 1000:>7.0f}ms "
+              f"{report['p95_seconds'] * 1000:>7.0f}ms {tps:>9}")
+        if verbose:
+            for result in report['results']:
+                if not result['correct']:
+                    print(f"    ✗ {result['question']}\n      {result['sql'] or '-'}"
+                          + (f"\n      {result['error']}" if result['error'] else ""))
+
+    eligible = [r for r in reports if r['accuracy'] >= min_accuracy]
+    if eligible:
+        best = min(eligible, key=lambda r: r['p50_seconds'])
+        print(f"\nDoğruluğu %{min_accuracy * 100:.0f} ve üzeri olan en hızlı yapılandırma: {best['label']}")
+    else:
+        print(f"\nHiçbir yapılandırma %{min_accuracy * 100:.0f} doğruluğa ulaşamadı.")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite veritabanı dosyası")
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS, help="Soru kümesi (JSON: question, sql)")
+    parser.add_argument("--config", action="append", default=[],
+                        help="MODEL_CONFIG üzerine uygulanacak ayarlar, ör. model=gemma3:4b,num_ctx=4096 "
+                             "(birden fazla verilebilir; verilmezse MODEL_CONFIG)")
+    parser.add_argument("--configs", help="Yapılandırma listesi içeren JSON dosyası")
+    parser.add_argument("--workers", type=int, default=4, help="Aynı anda gönderilen soru sayısı")
+    parser.add_argument("--limit", type=int, help="Sadece ilk N soruyu kullan")
+    parser.add_argument("--max-rows", type=int, default=100_000, help="Karşılaştırılacak en fazla satır")
+    parser.add_argument("--min-accuracy", type=float, default=0.8, help="Önerilecek yapılandırmanın doğruluk eşiği")
+    parser.add_argument("--base-url", help="Ollama adresi (varsayılan: MODEL_CONFIG)")
+    parser.add_argument("--no-early-stop", action="store_true", help="Erken durdurmayı kapat")
+    parser.add_argument("--fake", action="store_true",
+                        help="Doğru SQL'i döndüren sahte Ollama sunucusuyla çalış (ölçüm hattını denemek için)")
+    parser.add_argument("--output", help="Soru bazında ayrıntıları JSON olarak kaydet")
+    parser.add_argument("--verbose", action="store_true", help="Yanlış yanıtları yazdır")
+    args = parser.parse_args()
+
+    RESULT_CACHE_CONFIG["enabled"] = False
+    SCHEMA_CACHE_CONFIG["enabled"] = False
+
+    configs = [parse_config(text) for text in args.config]
+    if args.configs:
+        with open(args.configs, "r", encoding="utf-8") as f:
+            configs += json.load(f)
+    configs = configs or [{}]
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)[:args.limit]
+
+    server = None
+    if args.fake:
+        server = FakeOllamaServer(
+            responses={q["question"]: fenced_response(q["sql"]) for q in questions},
+            first_token_latency=0.05, token_latency=0.005, capacity=args.workers
+        ).start()
+        args.base_url = server.url
+
+    # Salt okunur bağlantı: üretilen SQL veritabanını değiştiremez
+    engine = create_engine(f"sqlite:///file:{os.path.abspath(args.db)}?mode=ro&uri=true")
+    try:
+        pipeline = SQLPipeline(engine, make_handler(build_model(configs[0], args.base_url)), lazy=False)
+        items = []
+        for question in questions:
+            items.append({
+                'question': question["question"],
+                'prompt_schema': pipeline.prepare(question["question"]),
+                'gold_rows': fetch_rows(engine, question["sql"], args.max_rows),
+                'ordered': bool(ORDER_BY.search(question["sql"])),
+            })
+        print(f"{len(items)} soru, {len(configs)} yapılandırma, {args.workers} paralel istek")
+
+        reports = []
+        for overrides in configs:
+            report = evaluate_config(pipeline, engine, items, overrides, args)
+            print(f"  {report['label']}: %{report['accuracy'] * 100:.0f} doğru, {report['wall_seconds']:.1f} sn")
+            reports.append(report)
+    finally:
+        engine.dispose()
+        if server is not None:
+            server.stop()
+
+    print_report(reports, args.min_accuracy, args.verbose)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"Ayrıntılar kaydedildi: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+İmleç parti boyu (arraysize/prefetchrows) değerlendirmesi.
+
+Soru kümesindeki her SQL için üç getirme senaryosunda (arayüz sayfası,
+satır sınırlı sorgu, tüm sonucun dışa aktarımı) sürücü varsayılanları
+(arraysize=100, prefetchrows=2) ile otomatik seçilen ayarların gereken
+ağ gidiş-dönüş sayıları ve bir partinin tahmini tampon boyu raporlanır.
+Satır sayıları SQLite'taki gerçek sonuçların --scale katıdır. Tamamen
+çevrimdışı çalışır; canlı bir Oracle'da gerçek sayılar için
+ORACLE_CONFIG["measure_round_trips"] açılıp db.get_fetch_stats() okunabilir.
+
+Kullanım:
+    python benchmarks/eval_fetch_tuning.py --scale 1000
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine, text
+
+from oracle_sql_generator.config import PAGINATION_CONFIG
+from oracle_sql_generator.fetch_tuning import FetchPlan, plan_fetch
+from oracle_sql_generator.schema import extract_sqlite_schema_bulk
+
+DEFAULT_QUESTIONS = os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json")
+DEFAULT_DB = os.path.join(ROOT_DIR, "Northwind_small.sqlite")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite veritabanı dosyası")
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS, help="Soru kümesi (JSON)")
+    parser.add_argument("--scale", type=int, default=1000, help="Sonuç satır sayılarının çarpanı")
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    engine = create_engine(f"sqlite:///{args.db}")
+    with engine.connect() as conn:
+        schema = extract_sqlite_schema_bulk(conn)
+        counts = [
+            conn.execute(text(f"SELECT COUNT(*) FROM ({item['sql']})")).scalar() * args.scale
+            for item in items
+        ]
+
+    page_rows = PAGINATION_CONFIG.get("page_size", 100) + 1
+    max_rows = PAGINATION_CONFIG.get("max_rows", 10000) + 1
+    scenarios = [
+        ("sayfa", lambda n: (page_rows, min(n, page_rows))),
+        ("sınırlı", lambda n: (max_rows, min(n, max_rows))),
+        ("dışa aktarım", lambda n: (None, n)),
+    ]
+    default = FetchPlan(arraysize=100, prefetchrows=2, row_width=0)
+
+    print(f"{len(items)} sorgu, satır sayıları x{args.scale}; gidiş-dönüşler plandan tahmindir, ölçülmemiştir")
+    print(f"{'senaryo':<14} {'satır':>12} {'varsayılan':>11} {'ayarlı':>9} {'azalma':>8} "
+          f"{'ort. arraysize':>15} {'en büyük tampon (KB)':>21}")
+    for label, rows_for in scenarios:
+        total_rows = default_trips = tuned_trips = 0
+        arraysizes, buffers = [], []
+        for item, count in zip(items, counts):
+            expected, rows = rows_for(count)
+            plan = plan_fetch(item['sql'], schema, expected_rows=expected)
+            total_rows += rows
+            default_trips += default.round_trips(rows)
+            tuned_trips += plan.round_trips(rows)
+            arraysizes.append(plan.arraysize)
+            buffers.append(max(plan.arraysize, plan.prefetchrows) * plan.row_width)
+        reduction = 1 - tuned_trips / default_trips if default_trips else 0.0
+        print(f"{label:<14} {total_rows:>12,} {default_trips:>11,} {tuned_trips:>9,} {reduction:>8.0%} "
+              f"{sum(arraysizes) / len(arraysizes):>15,.0f} {max(buffers) / 1024:>21,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Şema biçimlerinin (markdown, compact, ddl) boyut raporu.
+
+Her biçim için tüm şemanın ve soru kümesindeki her soruda seçilen alt
+şemanın karakter ve token sayıları, num_ctx'in ne kadarını kapladığı ile
+metnin önbelleksiz/önbellekli oluşturulma süresi raporlanır. Token sayısı
+--tokenizer verilirse gerçek bir tokenizer ile, verilmezse
+estimate_tokens() tahminiyle hesaplanır:
+
+    --tokenizer tokenizer.json          tokenizers paketiyle yerel dosya
+    --tokenizer google/gemma-3-4b-it    tokenizers paketiyle Hugging Face'ten
+    --tokenizer tiktoken:cl100k_base    tiktoken kodlaması
+
+Kullanım:
+    python benchmarks/eval_schema_formats.py --db Northwind_small.sqlite --tokenizer tokenizer.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine
+
+from oracle_sql_generator.config import MODEL_CONFIG
+from oracle_sql_generator.retrieval import SchemaRetriever
+from oracle_sql_generator.schema import (
+    SCHEMA_FORMATS, extract_sqlite_schema_bulk, format_schema_for_prompt, serialize_schema
+)
+from oracle_sql_generator.utils import estimate_tokens
+
+DEFAULT_QUESTIONS = os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json")
+DEFAULT_DB = os.path.join(ROOT_DIR, "Northwind_small.sqlite")
+
+def load_tokenizer(spec: str) -> Callable[[str], int]:
+    """Metnin token sayısını döndüren fonksiyon; tokenizer yüklenemezse tahmine düşer."""
+    if not spec:
+        return estimate_tokens
+    try:
+        if spec.startswith("tiktoken:"):
+            import tiktoken
+            encoding = tiktoken.get_encoding(spec.split(":", 1)[1])
+            return lambda text: len(encoding.encode(text))
+        from tokenizers import Tokenizer
+        tokenizer = Tokenizer.from_file(spec) if os.path.exists(spec) else Tokenizer.from_pretrained(spec)
+        return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+    except ImportError as e:
+        print(f"Tokenizer paketi yüklü değil ({e}); estimate_tokens() tahmini kullanılıyor.")
+    except Exception as e:
+        print(f"Tokenizer yüklenemedi ({e}); estimate_tokens() tahmini kullanılıyor.")
+    return estimate_tokens
+
+def best_of(fn, repeat: int = 5) -> float:
+    """fn'in repeat çalıştırmadaki en kısa süresi (sn)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite veritabanı dosyası")
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS, help="Soru kümesi (JSON)")
+    parser.add_argument("--tokenizer", help="tokenizer.json yolu, Hugging Face model adı veya tiktoken:<kodlama>")
+    parser.add_argument("--num-ctx", type=int, default=MODEL_CONFIG.get("num_ctx", 2048),
+                        help="Bağlam penceresi (token)")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    with engine.connect() as conn:
+        schema = extract_sqlite_schema_bulk(conn)
+    engine.dispose()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    retriever = SchemaRetriever(schema)
+    selections = [retriever.select_tables(item["question"]) for item in questions]
+    count_tokens = load_tokenizer(args.tokenizer)
+    tokenizer_name = args.tokenizer or "tahmin (karakter/3.5)"
+
+    print(f"Şema: {len(schema['tables'])} tablo, {sum(len(t['columns']) for t in schema['tables'].values())} sütun")
+    print(f"Token sayımı: {tokenizer_name}, num_ctx={args.num_ctx}\n")
+    print(f"{'biçim':<10} {'karakter':>9} {'token':>7} {'num_ctx':>8} {'seçilmiş ort.':>14} "
+          f"{'en fazla':>9} {'oluşturma':>10} {'önbellekten':>12}")
+
+    baseline = None
+    for fmt in SCHEMA_FORMATS:
+        full_text = serialize_schema(schema, fmt)
+        full_tokens = count_tokens(full_text)
+        pruned_tokens = [count_tokens(format_schema_for_prompt(schema, tables, fmt)) for tables in selections]
+        build = best_of(lambda: serialize_schema(schema, fmt))
+        cached = best_of(lambda: format_schema_for_prompt(schema, fmt=fmt))
+        baseline = baseline or full_tokens
+        print(f"{fmt:<10} {len(full_text):>9,} {full_tokens:>7,} {full_tokens / args.num_ctx:>7.0%} "
+              f"{statistics.mean(pruned_tokens):>14.0f} {max(pruned_tokens):>9,} "
+              f"{build * 1000:>8.2f}ms {cached * 1e6:>10.1f}µs"
+              + (f"  ({full_tokens / baseline - 1:+.0%})" if fmt != "markdown" else ""))
+
+if __name__ == "__main__":
+    main()
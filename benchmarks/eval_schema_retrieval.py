@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Şema seçimi (retrieval) değerlendirmesi.
+
+Soru kümesindeki her soru için tüm şemayla ve sadece seçilen tablolarla
+oluşan prompt'ların yaklaşık token sayıları ile sorgunun gerçekten
+kullandığı tabloların ne kadarının seçildiği (recall) raporlanır.
+Model çağrısı yapılmaz; tamamen çevrimdışı çalışır.
+
+Kullanım:
+    python benchmarks/eval_schema_retrieval.py --db Northwind_small.sqlite
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine
+
+from oracle_sql_generator.config import SQL_PROMPT_TEMPLATE
+from oracle_sql_generator.retrieval import SchemaRetriever
+from oracle_sql_generator.schema import extract_sqlite_schema_bulk, format_schema_for_prompt
+from oracle_sql_generator.utils import estimate_tokens
+
+DEFAULT_QUESTIONS = os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json")
+DEFAULT_DB = os.path.join(ROOT_DIR, "Northwind_small.sqlite")
+
+def prompt_tokens(schema_text: str, question: str) -> int:
+    """Şablonla birleştirilmiş prompt'un yaklaşık token sayısı."""
+    return estimate_tokens(SQL_PROMPT_TEMPLATE.format(schema=schema_text, query=question))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite veritabanı dosyası")
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS, help="Soru kümesi (JSON)")
+    parser.add_argument("--top-k", type=int, help="Seçilecek en fazla tablo sayısı")
+    parser.add_argument("--budget", type=int, help="Şema metni için token bütçesi")
+    parser.add_argument("--verbose", action="store_true", help="Her soru için ayrıntı yazdır")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    with engine.connect() as conn:
+        schema = extract_sqlite_schema_bulk(conn)
+    engine.dispose()
+
+    config = {}
+    if args.top_k is not None:
+        config["top_k"] = args.top_k
+    if args.budget is not None:
+        config["token_budget"] = args.budget
+    retriever = SchemaRetriever(schema, config)
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+
+    full_schema_text = format_schema_for_prompt(schema)
+    full_tokens, pruned_tokens, recalls, table_counts = [], [], [], []
+    misses = []
+
+    for item in questions:
+        question = item["question"]
+        gold = set(item["tables"])
+        pruned = retriever.retrieve(question)
+        selected = set(pruned["tables"])
+
+        full_tokens.append(prompt_tokens(full_schema_text, question))
+        pruned_tokens.append(prompt_tokens(format_schema_for_prompt(pruned), question))
+        recalls.append(len(gold & selected) / len(gold))
+        table_counts.append(len(selected))
+        if not gold <= selected:
+            misses.append((question, sorted(gold - selected)))
+
+        if args.verbose:
+            print(f"- {question}")
+            print(f"  seçilen: {', '.join(pruned['tables'])}")
+            print(f"  token  : {full_tokens[-1]} -> {pruned_tokens[-1]}")
+
+    print(f"Soru sayısı             : {len(questions)}")
+    print(f"Şemadaki tablo sayısı   : {len(schema['tables'])}")
+    print(f"Seçilen tablo (ortalama): {statistics.mean(table_counts):.1f}")
+    print(f"Prompt token (tüm şema) : ort. {statistics.mean(full_tokens):.0f}, en fazla {max(full_tokens)}")
+    print(f"Prompt token (seçilmiş) : ort. {statistics.mean(pruned_tokens):.0f}, en fazla {max(pruned_tokens)}")
+    print(f"Token azalması          : %{100 * (1 - sum(pruned_tokens) / sum(full_tokens)):.1f}")
+    print(f"Tablo recall (ortalama) : {statistics.mean(recalls):.3f}")
+    print(f"Tam recall oranı        : {sum(r == 1.0 for r in recalls) / len(recalls):.3f}")
+    for question, missing in misses:
+        print(f"  eksik: {question} -> {', '.join(missing)}")
+
+if __name__ == "__main__":
+    main()
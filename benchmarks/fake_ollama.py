@@ -0,0 +1,198 @@
+"""
+Ölçüm betikleri için sahte Ollama HTTP sunucusu.
+
+/api/generate uç noktasını Ollama ile aynı NDJSON akış biçiminde sunar;
+böylece gerçek OllamaLLM istemcisi (HTTP bağlantısı, akış, bağlantının
+kapatılması dahil) değiştirilmeden ölçülebilir. Sunucunun kapasitesi
+sınırlıdır: aynı anda capacity'den fazla istek işlenirken her token'ın
+süresi aktif istek sayısıyla orantılı uzar (CPU paylaşımı) ve aşırı
+yüklemenin ek bir maliyeti vardır. load_latency verilirse model ilk istekte
+bir kez belleğe yüklenir; prompt'suz istek (Ollama'daki gibi) yalnızca modeli
+yükler ve token üretmez.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from stubs import tokenize
+
+class FakeOllamaServer:
+    """Arka planda çalışan sahte Ollama sunucusu.
+
+    responses sözlüğünde prompt içinde geçen ilk anahtarın yanıtı akıtılır.
+    """
+
+    def __init__(self, responses: Optional[Dict[str, str]] = None,
+                 default_response: str = "SELECT 1 FROM DUAL",
+                 first_token_latency: float = 0.2, token_latency: float = 0.02,
+                 capacity: int = 2, oversubscription_penalty: float = 0.15,
+                 load_latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.responses = responses or {}
+        self.default_response = default_response
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.capacity = capacity
+        self.oversubscription_penalty = oversubscription_penalty
+        self.load_latency = load_latency
+
+        self._lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.requests = 0
+        self.tokens = 0
+        self.disconnects = 0
+        self.warmups = 0
+        self._load_lock = threading.Lock()
+        self._loaded = load_latency <= 0
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _slowdown(self) -> float:
+        """Aktif istek sayısına göre token süresinin çarpanı."""
+        ratio = max(1.0, self.active / self.capacity)
+        return ratio * (1 + self.oversubscription_penalty * (ratio - 1))
+
+    def _load_model(self):
+        """Model bellekte değilse yükler; eşzamanlı istekler aynı yüklemeyi bekler."""
+        with self._load_lock:
+            if not self._loaded:
+                time.sleep(self.load_latency)
+                self._loaded = True
+
+    def _response_for(self, prompt: str) -> str:
+        for key, response in self.responses.items():
+            if key in prompt:
+                return response
+        return self.default_response
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _part(self, model: str, text: str, done: bool, **extra) -> bytes:
+                part = {
+                    "model": model,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "response": text,
+                    "done": done,
+                }
+                part.update(extra)
+                return (json.dumps(part) + "\n").encode("utf-8")
+
+            def do_GET(self):
+                body = json.dumps({"models": [{"name": "fake", "model": "fake"}]}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.startswith("/api/generate"):
+                    self.send_error(404)
+                    return
+
+                model = request.get("model", "fake")
+                prompt = request.get("prompt", "")
+                server._load_model()
+                if not prompt:
+                    # Yalnızca yükleme (keep-alive) isteği: token üretilmez
+                    with server._lock:
+                        server.warmups += 1
+                    body = self._part(model, "", True, done_reason="load")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                tokens = tokenize(server._response_for(prompt))
+                stops = request.get("options", {}).get("stop") or []
+
+                with server._lock:
+                    server.requests += 1
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                start = time.perf_counter()
+                emitted = 0
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    time.sleep(server.first_token_latency * server._slowdown())
+                    text = ""
+                    stream = request.get("stream", True)
+                    for i, token in enumerate(tokens):
+                        if i:
+                            time.sleep(server.token_latency * server._slowdown())
+                        text += token
+                        emitted += 1
+                        if any(stop in text for stop in stops):
+                            break
+                        if stream:
+                            self.wfile.write(self._part(model, token, False))
+                            self.wfile.flush()
+                    final = {
+                        "done_reason": "stop",
+                        "total_duration": int((time.perf_counter() - start) * 1e9),
+                        "prompt_eval_count": len(tokenize(prompt)),
+                        "eval_count": emitted,
+                    }
+                    self.wfile.write(self._part(model, "" if stream else text, True, **final))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # İstemci akışı kapattı (ör. erken durdurma); üretim burada biter
+                    with server._lock:
+                        server.disconnects += 1
+                finally:
+                    with server._lock:
+                        server.active -= 1
+                        server.tokens += emitted
+
+        return Handler
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.max_active = 0
+            self.requests = 0
+            self.tokens = 0
+            self.disconnects = 0
+            self.warmups = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'tokens': self.tokens,
+                'max_active': self.max_active,
+                'disconnects': self.disconnects,
+                'warmups': self.warmups,
+            }
+
+def fenced_response(sql: str) -> str:
+    """Modellerin tipik çıktısı: kod bloğunda SQL ve ardından kısa bir açıklama."""
+    return f"```sql\n{sql}\n```\n\nAçıklama: Bu sorgu istenen kayıtları ilgili tablolardan getirir."
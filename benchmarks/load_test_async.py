@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Eşzamanlı kullanıcı yük testi.
+
+N sanal kullanıcı, OracleSQLApp'in akışlı işleyicisine arka arkaya soru
+gönderir. Model olarak gecikmesi ayarlanabilen StubLLM, veritabanı olarak
+Northwind SQLite dosyası kullanılır. Senkron işleyici, Gradio'nun iş
+parçacığı havuzunu taklit eden sınırlı bir havuzda; asenkron işleyici tek
+bir olay döngüsünde çalıştırılır. Her kip için toplam süre, istek/sn ve
+istek gecikmesi yüzdelikleri raporlanır. Ollama gerekmez.
+
+Kullanım:
+    python benchmarks/load_test_async.py --users 50 --requests 4 --sync-workers 1 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import create_engine
+
+from oracle_sql_generator.app import OracleSQLApp
+from oracle_sql_generator.db import dispose_async_engines, get_pool_stats
+from oracle_sql_generator.pipeline import PIPELINE_STATS, STAGE_LABELS, STAGES, SQLPipeline
+from oracle_sql_generator.scheduler import GenerationScheduler
+from oracle_sql_generator.telemetry import METRICS, describe_latency
+from stubs import StubLLM, make_handler
+
+DEFAULT_QUESTIONS = os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json")
+DEFAULT_DB = os.path.join(ROOT_DIR, "Northwind_small.sqlite")
+
+def build_app(db_path: str, questions, first_token_latency: float, token_latency: float,
+              llm_slots: int = 0) -> OracleSQLApp:
+    """Oracle ve Ollama yerine SQLite ve StubLLM kullanan bir uygulama nesnesi kurar."""
+    engine = create_engine(f"sqlite:///{db_path}")
+
+    model = StubLLM(
+        responses={item["question"]: f"```sql\n{item['sql']}\n```\n\nAçıklama: ..." for item in questions},
+        first_token_latency=first_token_latency,
+        token_latency=token_latency
+    )
+
+    scheduler = GenerationScheduler(max_concurrency=llm_slots) if llm_slots else None
+    pipeline = SQLPipeline(engine, make_handler(model, scheduler=scheduler), lazy=False)
+    return OracleSQLApp(pipeline=pipeline)
+
+def check_result(outputs) -> bool:
+    """Son çıktıda sonuç tablosu varsa isteği başarılı sayar."""
+    final = outputs[-1]
+    # Plan denetimi uyarısı durum mesajının sonuna eklenir
+    return final[5].startswith("SQL sorgusu başarıyla oluşturuldu.") and not isinstance(final[2], str)
+
+def user_plan(questions, users: int, requests: int, seed: int):
+    rng = random.Random(seed)
+    return [[rng.choice(questions)["question"] for _ in range(requests)] for _ in range(users)]
+
+def run_sync(app: OracleSQLApp, plan, workers: int):
+    """Her isteği workers boyutlu bir iş parçacığı havuzunda senkron işleyiciyle çalıştırır."""
+    def handle(question):
+        return check_result(list(app.execute_and_display_stream(question, False)))
+
+    def user(questions):
+        # Her kullanıcı bir önceki yanıtı aldıktan sonra yeni soru sorar;
+        # gecikmeye havuzda sıra beklenen süre de dahildir
+        results = []
+        for question in questions:
+            start = time.perf_counter()
+            ok = pool.submit(handle, question).result()
+            results.append((time.perf_counter() - start, ok))
+        return results
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, \
+         ThreadPoolExecutor(max_workers=len(plan)) as users:
+        start = time.perf_counter()
+        results = [r for rs in users.map(user, plan) for r in rs]
+        return time.perf_counter() - start, results
+
+async def run_async(app: OracleSQLApp, plan, concurrency: int):
+    """Tüm kullanıcıları tek bir olay döngüsünde asenkron işleyiciyle çalıştırır."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def handle(question):
+        start = time.perf_counter()
+        async with limit:
+            outputs = [out async for out in app.execute_and_display_async(question, False)]
+        return time.perf_counter() - start, check_result(outputs)
+
+    async def user(questions):
+        return [await handle(q) for q in questions]
+
+    start = time.perf_counter()
+    per_user = await asyncio.gather(*(user(qs) for qs in plan))
+    elapsed = time.perf_counter() - start
+    pool_stats = get_pool_stats()
+    await dispose_async_engines()
+    return elapsed, [r for rs in per_user for r in rs], pool_stats
+
+def report(label: str, elapsed: float, results):
+    latencies = sorted(r[0] * 1000 for r in results)
+    failures = sum(1 for r in results if not r[1])
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(f"{label:<18} {elapsed:>9.2f} {len(results) / elapsed:>9.1f} "
+          f"{statistics.median(latencies):>10.0f} {p95:>10.0f} {failures:>7}")
+    # Aşama başına ortalama süreler (şema → ... → gösterim)
+    stats = PIPELINE_STATS.as_dict()
+    PIPELINE_STATS.reset()
+    print(" " * 19 + "  ".join(f"{STAGE_LABELS[stage]} {stats[stage]['mean_ms']:.1f}" for stage in STAGES) + " (ort. ms)")
+    # Kova sınırlarından tahmin edilen p99 (aşamalar ve veritabanı/model span'leri)
+    print(" " * 19 + describe_latency(0.99))
+    METRICS.reset()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite veritabanı dosyası")
+    parser.add_argument("--questions", default=DEFAULT_QUESTIONS, help="Soru kümesi (JSON)")
+    parser.add_argument("--users", type=int, default=50, help="Eşzamanlı sanal kullanıcı sayısı")
+    parser.add_argument("--requests", type=int, default=4, help="Kullanıcı başına istek sayısı")
+    parser.add_argument("--first-token-latency", type=float, default=0.3, help="İlk token gecikmesi (sn)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="Token başına gecikme (sn)")
+    parser.add_argument("--sync-workers", type=int, nargs="*", default=[1, 8],
+                        help="Senkron kip için denenecek işçi sayıları (Gradio varsayılanı 1)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Asenkron kipte eşzamanlılık sınırı")
+    parser.add_argument("--llm-slots", type=int, default=0,
+                        help="Zamanlayıcının model eşzamanlılık sınırı (0: zamanlayıcı yok)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with open(args.questions, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    app = build_app(args.db, questions, args.first_token_latency, args.token_latency, args.llm_slots)
+    plan = user_plan(questions, args.users, args.requests, args.seed)
+
+    print(f"{args.users} kullanıcı x {args.requests} istek, ilk token {args.first_token_latency * 1000:.0f} ms, "
+          f"token başına {args.token_latency * 1000:.0f} ms")
+    print(f"{'kip':<18} {'süre (sn)':>9} {'istek/sn':>9} {'p50 (ms)':>10} {'p95 (ms)':>10} {'hatalı':>7}")
+    for workers in args.sync_workers:
+        elapsed, results = run_sync(app, plan, workers)
+        report(f"senkron ({workers} işçi)", elapsed, results)
+
+    elapsed, results, pool_stats = asyncio.run(run_async(app, plan, args.concurrency))
+    report(f"asenkron ({args.concurrency})", elapsed, results)
+
+    for url, info in pool_stats.items():
+        print(f"havuz {url}: bekleme ort. {info['wait_avg_s'] * 1000:.2f} ms, en fazla {info['wait_max_s'] * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
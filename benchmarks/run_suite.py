@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Çevrimdışı ölçüm paketi.
+
+Ağ ve Ollama gerekmeden, soruya karşılık önceden verilen SQL'i ayarlanabilir
+gecikmeyle akıtan StubLLM ve synthetic_db'nin ürettiği SQLite veritabanları
+(Northwind_small.sqlite'tan 10 milyon satır / 5 bin tabloya kadar) üzerinde
+şu senaryolar ölçülür:
+
+    cold_start         Yeni bir süreçte içe aktarma, şema çıkarma ve ilk yanıt
+    schema_extraction  extract_schema (snapshot'sız ve snapshot'tan)
+    prompt_build       Şema metni, şema seçici kurulumu ve soru başına prompt
+    execution          Soruların SQL'lerinin ilk sayfası ve sınırlı tüm sonucu
+    export             Satış tablosunun (Northwind'de Order) CSV'ye aktarımı
+    concurrent_users   N kullanıcının aynı anda uçtan uca soru sorması
+
+Sonuç ve şema önbellekleri ölçümü bozmaması için kapatılır (snapshot
+ölçümü hariç). Sonuçlar commit, Python ve paket sürümleri ve parametrelerle
+birlikte JSON'a yazılır; --compare iki çalıştırmayı metrik metrik
+karşılaştırır.
+
+Kullanım:
+    python benchmarks/run_suite.py --scales northwind s m --output sonuc.json
+    python benchmarks/run_suite.py --scales l --scenarios schema_extraction prompt_build
+    python benchmarks/run_suite.py --compare eski.json yeni.json --threshold 0.1
+"""
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+from typing import Any, Callable, Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import synthetic_db
+
+SUITE_VERSION = 1
+SCENARIOS = ["cold_start", "schema_extraction", "prompt_build", "execution", "export", "concurrent_users"]
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+def configure_offline(cache_dir: str):
+    """Önbellekleri kapatır; snapshot ölçümü için şema önbelleğini geçici klasöre yönlendirir."""
+    from oracle_sql_generator.config import RESULT_CACHE_CONFIG, SCHEMA_CACHE_CONFIG, STARTUP_CONFIG
+
+    RESULT_CACHE_CONFIG["enabled"] = False
+    SCHEMA_CACHE_CONFIG["enabled"] = False
+    SCHEMA_CACHE_CONFIG["path"] = os.path.join(cache_dir, "schema_cache")
+    STARTUP_CONFIG["warm_up_model"] = False
+
+def build_pipeline(db_path: str, questions, first_token_latency: float, token_latency: float):
+    """Ollama yerine StubLLM kullanan, şeması yüklenmiş bir SQLPipeline kurar."""
+    from oracle_sql_generator.db import get_db_engine
+    from oracle_sql_generator.pipeline import SQLPipeline
+    from stubs import StubLLM, make_handler
+
+    model = StubLLM(
+        responses={item["question"]: f"```sql\n{item['sql']}\n```" for item in questions},
+        first_token_latency=first_token_latency,
+        token_latency=token_latency
+    )
+    return SQLPipeline(get_db_engine(f"sqlite:///{db_path}"), make_handler(model), lazy=False)
+
+# Ölçüm yardımcıları
+
+def summarize(samples: List[float], unit: str = "s", better: str = "lower") -> Dict[str, Any]:
+    """Örneklerin özeti; better karşılaştırmada hangi yönün iyi olduğunu belirtir."""
+    ordered = sorted(samples)
+    return {
+        'unit': unit,
+        'better': better,
+        'n': len(ordered),
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'min': ordered[0],
+        'max': ordered[-1],
+        'p95': ordered[max(int(round(len(ordered) * 0.95)) - 1, 0)],
+    }
+
+def timed(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> List[float]:
+    """fn'i warmup kez ısındırıp repeat kez çalıştırır; süreleri (sn) döndürür."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+# Senaryolar
+
+def cold_start_child(args) -> Dict[str, float]:
+    """Alt süreç: içe aktarma, şema yükleme ve ilk yanıtın sürelerini ölçer."""
+    start = time.perf_counter()
+    # Paketin ve sahte modelin yüklenme süresi ayrı ölçülür
+    for module in ("oracle_sql_generator.pipeline", "stubs"):
+        importlib.import_module(module)
+    imported = time.perf_counter()
+    configure_offline(tempfile.gettempdir())
+    questions = synthetic_db.questions_for(args.scale)
+    pipeline = build_pipeline(args.db, questions, args.first_token_latency, args.token_latency)
+    ready = time.perf_counter()
+    outcome = pipeline.run(questions[0]["question"])
+    done = time.perf_counter()
+    return {
+        'import_seconds': imported - start,
+        'schema_seconds': ready - imported,
+        'first_answer_seconds': done - ready,
+        'ok': outcome.ok,
+    }
+
+def scenario_cold_start(ctx) -> Dict[str, Any]:
+    args = ctx['args']
+    samples: Dict[str, List[float]] = {'process_seconds': [], 'import_seconds': [],
+                                       'schema_seconds': [], 'first_answer_seconds': []}
+    for _ in range(args.cold_repeat):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "cold_start", "--scale", ctx['scale'],
+             "--db", ctx['db_path'], "--first-token-latency", str(args.first_token_latency),
+             "--token-latency", str(args.token_latency)],
+            check=True, capture_output=True, text=True, cwd=ROOT_DIR
+        ).stdout
+        samples['process_seconds'].append(time.perf_counter() - start)
+        child = json.loads(output.strip().splitlines()[-1])
+        for key in ('import_seconds', 'schema_seconds', 'first_answer_seconds'):
+            samples[key].append(child[key])
+    return {key: summarize(values) for key, values in samples.items()}
+
+def scenario_schema_extraction(ctx) -> Dict[str, Any]:
+    from oracle_sql_generator.config import SCHEMA_CACHE_CONFIG
+    from oracle_sql_generator.schema import extract_schema
+
+    engine, repeat = ctx['pipeline'].engine, ctx['args'].repeat
+    result = {'extract_seconds': summarize(timed(lambda: extract_schema(use_cache=False, engine=engine), repeat))}
+    # Parmak izi aynıysa şema diskteki snapshot'tan yüklenir
+    SCHEMA_CACHE_CONFIG["enabled"] = True
+    try:
+        result['snapshot_seconds'] = summarize(timed(lambda: extract_schema(engine=engine), repeat))
+    finally:
+        SCHEMA_CACHE_CONFIG["enabled"] = False
+    result['tables'] = len(ctx['pipeline'].schema['tables'])
+    return result
+
+def scenario_prompt_build(ctx) -> Dict[str, Any]:
+    from langchain_core.prompts import ChatPromptTemplate
+    from oracle_sql_generator.retrieval import SchemaRetriever
+    from oracle_sql_generator.schema import serialize_schema
+
+    pipeline, repeat = ctx['pipeline'], ctx['args'].repeat
+    schema = pipeline.schema
+    template = ChatPromptTemplate.from_template(pipeline.dialect.prompt_template)
+    prepare, render, chars = [], [], []
+    for item in ctx['questions']:
+        prepare += timed(lambda: pipeline.prepare(item["question"]), repeat)
+        prompt_schema = pipeline.prepare(item["question"])
+        render += timed(lambda: template.format(query=item["question"], schema=prompt_schema), repeat)
+        chars.append(len(template.format(query=item["question"], schema=prompt_schema)))
+    return {
+        'format_schema_seconds': summarize(timed(lambda: serialize_schema(schema), repeat)),
+        'retriever_build_seconds': summarize(timed(lambda: SchemaRetriever(schema), repeat)),
+        'prepare_seconds': summarize(prepare),
+        'render_seconds': summarize(render),
+        'prompt_chars': summarize(chars, unit="chars"),
+        'full_schema_chars': len(pipeline.schema_text),
+    }
+
+def scenario_execution(ctx) -> Dict[str, Any]:
+    from oracle_sql_generator.db import execute_query, execute_query_page
+
+    engine, repeat = ctx['pipeline'].engine, ctx['args'].repeat
+    first_page, capped, by_query = [], [], {}
+    for item in ctx['questions']:
+        sql = item["sql"]
+        page_samples = timed(lambda: execute_query_page(sql, engine=engine, use_cache=False), repeat)
+        capped += timed(lambda: execute_query(sql, engine, use_cache=False), repeat)
+        first_page += page_samples
+        by_query[item["question"]] = statistics.median(page_samples)
+    return {
+        'first_page_seconds': summarize(first_page),
+        'capped_result_seconds': summarize(capped),
+        'first_page_by_query': by_query,
+    }
+
+def scenario_export(ctx) -> Dict[str, Any]:
+    from oracle_sql_generator.export import export_query
+
+    args = ctx['args']
+    sql = synthetic_db.export_sql_for(ctx['scale'])
+    out_dir = tempfile.mkdtemp(prefix="sqlchat_suite_export_")
+    seconds, rows_per_sec, first_chunk = [], [], []
+    try:
+        for i in range(args.export_repeat):
+            stats = export_query(sql, "csv", path=os.path.join(out_dir, f"sonuc_{i}.csv"),
+                                 engine=ctx['pipeline'].engine, schema=ctx['pipeline'].schema)
+            seconds.append(stats.seconds)
+            rows_per_sec.append(stats.rows_per_sec)
+            first_chunk.append(stats.first_chunk_seconds)
+            rows = stats.rows
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return {
+        'seconds': summarize(seconds),
+        'rows_per_sec': summarize(rows_per_sec, unit="rows/s", better="higher"),
+        'first_chunk_seconds': summarize(first_chunk),
+        'rows': rows,
+    }
+
+def scenario_concurrent_users(ctx) -> Dict[str, Any]:
+    from oracle_sql_generator.pipeline import STAGES, StageTimer
+
+    args, pipeline, questions = ctx['args'], ctx['pipeline'], ctx['questions']
+    plan = [[questions[(u + r) % len(questions)]["question"] for r in range(args.requests)]
+            for u in range(args.users)]
+    stage_totals = {stage: [] for stage in STAGES}
+
+    def user(user_questions):
+        results = []
+        for question in user_questions:
+            timer = StageTimer()
+            start = time.perf_counter()
+            outcome = pipeline.run(question, timer=timer)
+            timer.finish()
+            results.append((time.perf_counter() - start, outcome.ok, timer.as_dict()))
+        return results
+
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        start = time.perf_counter()
+        results = [r for rs in pool.map(user, plan) for r in rs]
+        elapsed = time.perf_counter() - start
+    for _, _, timings in results:
+        for stage in STAGES:
+            stage_totals[stage].append(timings[stage])
+    return {
+        'latency_seconds': summarize([r[0] for r in results]),
+        'throughput_rps': summarize([len(results) / elapsed], unit="req/s", better="higher"),
+        'errors': sum(1 for r in results if not r[1]),
+        'stage_mean_seconds': {stage: statistics.fmean(values) for stage, values in stage_totals.items()},
+        'users': args.users,
+        'requests_per_user': args.requests,
+    }
+
+SCENARIO_FUNCTIONS = {
+    "cold_start": scenario_cold_start,
+    "schema_extraction": scenario_schema_extraction,
+    "prompt_build": scenario_prompt_build,
+    "execution": scenario_execution,
+    "export": scenario_export,
+    "concurrent_users": scenario_concurrent_users,
+}
+
+# Çalıştırma ve raporlama
+
+def git_info() -> Dict[str, Any]:
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {'commit': git("rev-parse", "HEAD"), 'dirty': bool(status) if status is not None else None}
+
+def environment() -> Dict[str, Any]:
+    packages = {}
+    for name in ("sqlalchemy", "pandas", "pyarrow", "sqlglot", "langchain-core", "oracledb"):
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages,
+    }
+
+def run_suite(args) -> Dict[str, Any]:
+    configure_offline(args.cache_dir)
+    report = {
+        'suite_version': SUITE_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        'git': git_info(),
+        'environment': environment(),
+        'parameters': {
+            'scales': args.scales, 'scenarios': args.scenarios, 'repeat': args.repeat,
+            'cold_repeat': args.cold_repeat, 'export_repeat': args.export_repeat,
+            'users': args.users, 'requests': args.requests,
+            'first_token_latency': args.first_token_latency, 'token_latency': args.token_latency,
+        },
+        'results': {},
+    }
+    for scale in args.scales:
+        db_path = synthetic_db.build_database(scale, args.cache_dir)
+        questions = synthetic_db.questions_for(scale)
+        pipeline = build_pipeline(db_path, questions, args.first_token_latency, args.token_latency)
+        ctx = {'args': args, 'scale': scale, 'db_path': db_path, 'questions': questions, 'pipeline': pipeline}
+        report['results'][scale] = {}
+        for name in args.scenarios:
+            start = time.perf_counter()
+            result = SCENARIO_FUNCTIONS[name](ctx)
+            report['results'][scale][name] = result
+            print(f"[{scale}] {name:<18} {time.perf_counter() - start:6.1f} sn  {headline(result)}")
+    return report
+
+def headline(result: Dict[str, Any]) -> str:
+    """Senaryonun ilk birkaç metriğinin medyanları."""
+    parts = []
+    for key, value in result.items():
+        if isinstance(value, dict) and 'median' in value:
+            scale = 1000 if value['unit'] == "s" else 1
+            unit = "ms" if value['unit'] == "s" else value['unit']
+            parts.append(f"{key}={value['median'] * scale:,.1f} {unit}")
+    return "  ".join(parts[:3])
+
+def flatten(report: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """{"ölçek/senaryo/metrik": özet} biçiminde düz sözlük."""
+    flat = {}
+    for scale, scenarios in report['results'].items():
+        for scenario, metrics in scenarios.items():
+            for metric, value in metrics.items():
+                if isinstance(value, dict) and 'median' in value:
+                    flat[f"{scale}/{scenario}/{metric}"] = value
+    return flat
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """İki çalıştırmayı medyanlara göre karşılaştırır; eşikten fazla kötüleşen metrik sayısını döndürür."""
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    base_flat, new_flat = flatten(base), flatten(new)
+    print(f"eski: {base['git'].get('commit') or '?'} ({base['created']})")
+    print(f"yeni: {new['git'].get('commit') or '?'} ({new['created']})")
+    print(f"{'metrik':<52} {'eski':>12} {'yeni':>12} {'değişim':>9}")
+    regressions = 0
+    for key in sorted(set(base_flat) & set(new_flat)):
+        old, cur = base_flat[key], new_flat[key]
+        if not old['median']:
+            continue
+        change = (cur['median'] - old['median']) / old['median']
+        worse = change > threshold if old['better'] == "lower" else change < -threshold
+        better = change < -threshold if old['better'] == "lower" else change > threshold
+        mark = "  ▲ kötüleşti" if worse else ("  ▼ iyileşti" if better else "")
+        regressions += worse
+        print(f"{key:<52} {old['median']:>12.4g} {cur['median']:>12.4g} {change:>+8.1%}{mark}")
+    missing = sorted(set(base_flat) ^ set(new_flat))
+    if missing:
+        print(f"Yalnızca bir çalıştırmada olan {len(missing)} metrik atlandı.")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", nargs="+", default=["northwind", "s"], choices=list(synthetic_db.SCALES))
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--repeat", type=int, default=5, help="Senaryo başına tekrar")
+    parser.add_argument("--cold-repeat", type=int, default=3, help="Soğuk açılış için başlatılan süreç sayısı")
+    parser.add_argument("--export-repeat", type=int, default=2, help="Dışa aktarım tekrarı")
+    parser.add_argument("--users", type=int, default=8, help="Eşzamanlı kullanıcı sayısı")
+    parser.add_argument("--requests", type=int, default=4, help="Kullanıcı başına istek")
+    parser.add_argument("--first-token-latency", type=float, default=0.0, help="Sahte modelin ilk token gecikmesi (sn)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Sahte modelin token başına gecikmesi (sn)")
+    parser.add_argument("--cache-dir", default=synthetic_db.DEFAULT_CACHE_DIR,
+                        help="Üretilen veritabanlarının tutulduğu klasör")
+    parser.add_argument("--output", help="JSON çıktı dosyası (varsayılan: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("ESKI", "YENI"), help="İki çalıştırmayı karşılaştır")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Karşılaştırmada kötüleşme sayılan göreli değişim")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Kötüleşen metrik varsa 1 ile çık")
+    parser.add_argument("--child", choices=["cold_start"], help=argparse.SUPPRESS)
+    parser.add_argument("--scale", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(cold_start_child(args)))
+        return
+
+    if args.compare:
+        regressions = compare(*args.compare, args.threshold)
+        sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+    report = run_suite(args)
+    output = args.output
+    if output is None:
+        commit = (report['git'].get('commit') or "nogit")[:10]
+        suffix = "-dirty" if report['git'].get('dirty') else ""
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"{commit}{suffix}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Sonuçlar yazıldı: {output}")
+
+if __name__ == "__main__":
+    main()
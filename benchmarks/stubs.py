@@ -0,0 +1,91 @@
+"""
+Ölçüm betikleri için Ollama yerine geçen sahte model ve yardımcılar.
+
+StubLLM, soruya göre önceden verilen yanıtı token token akıtır; ilk token
+ve sonraki her token için gecikme eklenebilir. Senkron (stream/invoke) ve
+asyncio (astream/ainvoke) yolları aynı gecikmeyi uygular; senkron yol
+iş parçacığını, asyncio yolu sadece görevi bekletir.
+"""
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from oracle_sql_generator.cache import ResponseCache
+from oracle_sql_generator.llm import LLMHandler
+from oracle_sql_generator.scheduler import GenerationScheduler
+from oracle_sql_generator.semantic_cache import LexicalEmbedder, SemanticCache
+
+def tokenize(text: str) -> List[str]:
+    """Metni kelime ve boşluk parçalarına böler (Ollama akışındaki token'lara yakın)."""
+    return re.findall(r'\s*\S+|\s+', text)
+
+class StubLLM(LLM):
+    """Önceden verilen yanıtları gecikmeli akıtan ve üretilen token'ları sayan sahte model.
+
+    responses sözlüğünde prompt içinde geçen ilk anahtarın yanıtı, hiçbiri
+    geçmiyorsa default_response döndürülür.
+    """
+
+    responses: Dict[str, str] = {}
+    default_response: str = "SELECT 1 FROM DUAL"
+    first_token_latency: float = 0.0
+    token_latency: float = 0.0
+    emitted: int = 0
+    requests: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _response_for(self, prompt: str) -> str:
+        for key, response in self.responses.items():
+            if key in prompt:
+                return response
+        return self.default_response
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, **kwargs: Any) -> str:
+        return "".join(chunk.text for chunk in self._stream(prompt, stop, **kwargs))
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        self.requests += 1
+        self.emitted = 0
+        time.sleep(self.first_token_latency)
+        for i, token in enumerate(tokenize(self._response_for(prompt))):
+            if i:
+                time.sleep(self.token_latency)
+            self.emitted += 1
+            yield GenerationChunk(text=token)
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        self.requests += 1
+        self.emitted = 0
+        await asyncio.sleep(self.first_token_latency)
+        for i, token in enumerate(tokenize(self._response_for(prompt))):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            self.emitted += 1
+            yield GenerationChunk(text=token)
+
+def make_handler(model: LLM, early_stop: bool = True,
+                 scheduler: Optional[GenerationScheduler] = None) -> LLMHandler:
+    """Verilen modeli kullanan, önbelleksiz bir LLMHandler oluşturur.
+
+    scheduler verilmezse istekler zamanlayıcıdan geçmez.
+    """
+    handler = LLMHandler(
+        cache=ResponseCache([]),
+        semantic_cache=SemanticCache(LexicalEmbedder()),
+        model=model,
+        scheduler=scheduler or GenerationScheduler()
+    )
+    handler.cache = None
+    handler.semantic_cache = None
+    handler.scheduler = scheduler
+    handler.early_stop = early_stop
+    return handler
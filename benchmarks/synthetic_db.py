@@ -0,0 +1,181 @@
+"""
+Ölçüm paketi için belirlenimci (deterministic) SQLite veritabanları.
+
+Her ölçek, satış tablosunun satır sayısı ve toplam tablo sayısıyla
+tanımlanır. Satış, müşteri, ürün ve bölge tabloları gerçekçi sorgular için,
+geri kalan tablolar (aux_*) şema çıkarma ve prompt oluşturma maliyetini
+büyütmek için üretilir; her biri bir öncekine foreign key ile bağlıdır.
+Değerler satır numarasından hesaplanır, rastgelelik yoktur: aynı ölçek her
+makinede aynı dosyayı üretir. Üretilen dosyalar önbellek klasöründe tutulur
+ve üretici sürümü (PRAGMA user_version) değişmedikçe yeniden kullanılır.
+
+"northwind" ölçeği depodaki Northwind_small.sqlite dosyasıdır.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NORTHWIND_DB = os.path.join(ROOT_DIR, "Northwind_small.sqlite")
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "sqlchat_bench")
+
+# Üretilen şema veya değerler değişirse artırılır; eski dosyalar yeniden üretilir
+GENERATOR_VERSION = 1
+
+SCALES = {
+    "northwind": {"tables": None, "rows": None},
+    "s": {"tables": 50, "rows": 100_000},
+    "m": {"tables": 500, "rows": 1_000_000},
+    "l": {"tables": 5_000, "rows": 10_000_000},
+}
+
+# Sentetik veritabanlarında sorulan sorular ve modelin "üreteceği" SQL
+SYNTHETIC_QUESTIONS = [
+    {
+        "question": "Bölgelere göre toplam satış tutarı",
+        "sql": "SELECT r.name, SUM(s.amount) AS toplam FROM sales s JOIN customer c ON c.id = s.customer_id "
+               "JOIN region r ON r.id = c.region_id GROUP BY r.name",
+        "tables": ["sales", "customer", "region"],
+    },
+    {
+        "question": "En çok satan 10 ürün",
+        "sql": "SELECT p.name, SUM(s.quantity) AS adet FROM sales s JOIN product p ON p.id = s.product_id "
+               "GROUP BY p.name ORDER BY adet DESC LIMIT 10",
+        "tables": ["sales", "product"],
+    },
+    {
+        "question": "Son 100 satışı göster",
+        "sql": "SELECT * FROM sales ORDER BY id DESC LIMIT 100",
+        "tables": ["sales"],
+    },
+    {
+        "question": "İstanbul'daki müşterileri listele",
+        "sql": "SELECT id, name, city FROM customer WHERE city = 'İstanbul'",
+        "tables": ["customer"],
+    },
+    {
+        "question": "Tüm satışları listele",
+        "sql": "SELECT * FROM sales",
+        "tables": ["sales"],
+    },
+]
+
+# Dışa aktarım senaryosunda çalıştırılan, satış tablosunun tamamını okuyan sorgu
+EXPORT_SQL = "SELECT * FROM sales"
+NORTHWIND_EXPORT_SQL = 'SELECT * FROM "Order"'
+
+_CITIES = ["İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Konya", "Adana", "Şanlıurfa"]
+_CATEGORIES = ["İçecek", "Çeşni", "Şekerleme", "Süt ürünü", "Tahıl", "Et", "Sebze", "Deniz ürünü"]
+
+def _core_tables(conn: sqlite3.Connection, rows: int, batch: int = 200_000):
+    """Bölge, müşteri, ürün ve satış tablolarını üretir."""
+    customers = max(100, rows // 100)
+    products = 1000
+    conn.execute("CREATE TABLE region (id INTEGER PRIMARY KEY, name VARCHAR(40) NOT NULL)")
+    conn.execute(
+        "CREATE TABLE customer (id INTEGER PRIMARY KEY, name VARCHAR(80) NOT NULL, city VARCHAR(40), "
+        "region_id INTEGER REFERENCES region(id))"
+    )
+    conn.execute(
+        "CREATE TABLE product (id INTEGER PRIMARY KEY, name VARCHAR(80) NOT NULL, category VARCHAR(40), "
+        "unit_price REAL NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE sales (id INTEGER PRIMARY KEY, customer_id INTEGER NOT NULL REFERENCES customer(id), "
+        "product_id INTEGER NOT NULL REFERENCES product(id), sale_date VARCHAR(10) NOT NULL, "
+        "quantity INTEGER NOT NULL, amount REAL NOT NULL, note TEXT)"
+    )
+    conn.executemany("INSERT INTO region VALUES (?, ?)", ((i, f"Bölge {i}") for i in range(1, 21)))
+    conn.executemany(
+        "INSERT INTO customer VALUES (?, ?, ?, ?)",
+        ((i, f"Müşteri {i}", _CITIES[i % len(_CITIES)], i % 20 + 1) for i in range(1, customers + 1))
+    )
+    conn.executemany(
+        "INSERT INTO product VALUES (?, ?, ?, ?)",
+        ((i, f"Ürün {i}", _CATEGORIES[i % len(_CATEGORIES)], round(1 + (i % 500) * 0.73, 2))
+         for i in range(1, products + 1))
+    )
+    for start in range(1, rows + 1, batch):
+        conn.executemany(
+            "INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (i, i % customers + 1, (i * 7) % products + 1, f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                 i % 20 + 1, round((i % 20 + 1) * (1 + (i % 500) * 0.73), 2),
+                 None if i % 9 else f"not {i}")
+                for i in range(start, min(start + batch, rows + 1))
+            )
+        )
+    conn.execute("CREATE INDEX ix_sales_customer ON sales (customer_id)")
+    conn.execute("CREATE INDEX ix_sales_product ON sales (product_id)")
+
+def _aux_tables(conn: sqlite3.Connection, count: int, column_count: int = 8):
+    """Her biri bir öncekine bağlı, birkaç satırlık yardımcı tablolar üretir."""
+    for i in range(count):
+        columns = ["id INTEGER PRIMARY KEY"]
+        columns += [f"attr_{j} VARCHAR(50) NOT NULL DEFAULT ''" for j in range(column_count - 2)]
+        parent = f"REFERENCES aux_{i - 1:05d}(id)" if i else "REFERENCES customer(id)"
+        columns.append(f"parent_id INTEGER {parent}")
+        conn.execute(f"CREATE TABLE aux_{i:05d} ({', '.join(columns)})")
+        conn.executemany(
+            f"INSERT INTO aux_{i:05d} (id, attr_0, parent_id) VALUES (?, ?, ?)",
+            ((r, f"değer {i}-{r}", r) for r in range(1, 4))
+        )
+
+def database_path(scale: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Ölçeğin veritabanı dosyasının yolu (üretilmemiş olabilir)."""
+    if scale == "northwind":
+        return NORTHWIND_DB
+    spec = SCALES[scale]
+    return os.path.join(cache_dir, f"sqlchat_{scale}_{spec['tables']}t_{spec['rows']}r.sqlite")
+
+def _is_current(path: str) -> bool:
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] == GENERATOR_VERSION
+    finally:
+        conn.close()
+
+def build_database(scale: str, cache_dir: str = DEFAULT_CACHE_DIR, verbose: bool = True) -> str:
+    """Ölçeğin veritabanını (gerekirse üreterek) döndürür.
+
+    Returns:
+        SQLite dosyasının yolu
+    """
+    path = database_path(scale, cache_dir)
+    if scale == "northwind" or _is_current(path):
+        return path
+
+    spec = SCALES[scale]
+    os.makedirs(cache_dir, exist_ok=True)
+    if verbose:
+        print(f"'{scale}' ölçeği üretiliyor: {spec['tables']:,} tablo, {spec['rows']:,} satış satırı...")
+    part = path + ".part"
+    if os.path.exists(part):
+        os.remove(part)
+    conn = sqlite3.connect(part)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        _core_tables(conn, spec['rows'])
+        _aux_tables(conn, max(0, spec['tables'] - 4))
+        conn.execute(f"PRAGMA user_version = {GENERATOR_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+    shutil.move(part, path)
+    return path
+
+def questions_for(scale: str) -> List[Dict[str, object]]:
+    """Ölçekte sorulacak soru/SQL çiftleri."""
+    if scale == "northwind":
+        with open(os.path.join(ROOT_DIR, "benchmarks", "data", "northwind_questions.json"), encoding="utf-8") as f:
+            return json.load(f)
+    return SYNTHETIC_QUESTIONS
+
+def export_sql_for(scale: str) -> str:
+    return NORTHWIND_EXPORT_SQL if scale == "northwind" else EXPORT_SQL
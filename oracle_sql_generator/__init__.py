@@ -1,27 +1,115 @@
 """
 Oracle SQL Oluşturucu Uygulaması
 
-Bu modül, doğal dildeki soruları Oracle SQL sorgularına dönüştüren bir araç sağlar.
+Bu modül, doğal dildeki soruları Oracle SQL sorgularına (SQLite ve PostgreSQL
+veritabanları için de) dönüştüren bir araç sağlar.
 Kullanıcılar basit Türkçe cümlelerle veritabanı sorguları oluşturabilir.
 """
 
 __version__ = "0.1.0"
 
-from .app import OracleSQLApp, main
-from .db import get_db_engine, execute_query, test_connection
-from .schema import extract_schema, format_schema_for_prompt
-from .llm import LLMHandler
-from .utils import save_temp_csv, clear_temp_files
+import importlib
+
+# Dışa açılan isimler ve tanımlandıkları alt modüller. Alt modüller ilk
+# kullanımda yüklenir: ör. "from oracle_sql_generator.schema import ..."
+# Gradio'yu ve Oracle sürücüsünü içe aktarmaz, açılış süresi kısalır.
+_EXPORTS = {
+    'OracleSQLApp': 'app',
+    'main': 'app',
+    'get_db_engine': 'db',
+    'execute_query': 'db',
+    'execute_query_async': 'db',
+    'execute_query_page': 'db',
+    'execute_query_page_async': 'db',
+    'execute_query_arrow': 'db',
+    'test_connection': 'db',
+    'get_pool_stats': 'db',
+    'get_fetch_stats': 'db',
+    'get_result_cache_stats': 'db',
+    'check_query_cost': 'db',
+    'validate_query': 'db',
+    'dispose_engines': 'db',
+    'PlanCheck': 'cost_gate',
+    'QueryRefusedError': 'cost_gate',
+    'ValidationResult': 'validation',
+    'get_validation_stats': 'validation',
+    'get_repair_stats': 'repair',
+    'READINESS': 'startup',
+    'SQLPipeline': 'pipeline',
+    'PipelineResult': 'pipeline',
+    'StageTimer': 'pipeline',
+    'get_pipeline_stats': 'pipeline',
+    'span': 'telemetry',
+    'render_metrics': 'telemetry',
+    'describe_latency': 'telemetry',
+    'get_dialect': 'dialects',
+    'register_dialect': 'dialects',
+    'CancelToken': 'cancellation',
+    'QueryCancelledError': 'cancellation',
+    'ResultPage': 'pagination',
+    'export_query': 'export',
+    'extract_schema': 'schema',
+    'format_schema_for_prompt': 'schema',
+    'serialize_schema': 'schema',
+    'LLMHandler': 'llm',
+    'SchemaRetriever': 'retrieval',
+    'GenerationScheduler': 'scheduler',
+    'save_temp_csv': 'utils',
+    'clear_temp_files': 'utils',
+}
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
 
 __all__ = [
     'OracleSQLApp',
     'main',
     'get_db_engine',
     'execute_query',
+    'execute_query_async',
+    'execute_query_page',
+    'execute_query_page_async',
+    'execute_query_arrow',
+    'ResultPage',
+    'validate_query',
+    'ValidationResult',
+    'get_validation_stats',
+    'get_repair_stats',
+    'READINESS',
+    'SQLPipeline',
+    'PipelineResult',
+    'StageTimer',
+    'get_pipeline_stats',
+    'span',
+    'render_metrics',
+    'describe_latency',
+    'get_dialect',
+    'register_dialect',
+    'check_query_cost',
+    'PlanCheck',
+    'QueryRefusedError',
+    'CancelToken',
+    'QueryCancelledError',
+    'export_query',
     'test_connection',
+    'get_pool_stats',
+    'get_fetch_stats',
+    'get_result_cache_stats',
+    'dispose_engines',
     'extract_schema',
     'format_schema_for_prompt',
+    'serialize_schema',
     'LLMHandler',
+    'SchemaRetriever',
+    'GenerationScheduler',
     'save_temp_csv',
     'clear_temp_files'
 ]
@@ -1,37 +1,52 @@
 """
 Ana uygulama modülü - Gradio arayüzü.
 """
+import asyncio
+from functools import partial
 import gradio as gr
 from typing import Tuple, Optional
 import pandas as pd
+import uvicorn
+from sqlalchemy.engine import Engine
 
-from .db import execute_query, test_connection
-from .schema import extract_schema, format_schema_for_prompt
+from .db import test_connection
+from .cancellation import CANCEL_REGISTRY, CancelToken, QueryCancelledError
+from .export import EXPORT_FORMATS, export_query
 from .llm import LLMHandler
-from .utils import save_temp_csv, clear_temp_files
+from .pagination import ResultPage
+from .pipeline import PipelineResult, SQLPipeline, StageTimer
+from .startup import READINESS, create_server
+from .validation import SQLValidationError
+from .config import ASYNC_CONFIG, EXPORT_CONFIG, PIPELINE_CONFIG, STARTUP_CONFIG
+from .utils import SESSION_FILES, save_temp_csv, clear_temp_files
 
 class OracleSQLApp:
     """Oracle SQL oluşturucu uygulama sınıfı."""
     
-    def __init__(self):
-        """Uygulamayı başlat."""
-        self.llm_handler = LLMHandler()
-        self.schema = None
-        self.schema_text = ""
+    def __init__(self, engine: Optional[Engine] = None, llm_handler: Optional[LLMHandler] = None,
+                 lazy: Optional[bool] = None, pipeline: Optional[SQLPipeline] = None):
+        """Uygulamayı başlat.
         
-        # Uygulama başlatıldığında şemayı yükle
-        self.load_schema()
+        Args:
+            engine: Kullanılacak engine (varsayılan: get_db_engine())
+            llm_handler: Hazır bir LLMHandler (varsayılan: MODEL_CONFIG ile oluşturulan)
+            lazy: True ise şema ve model arka planda hazırlanır, kurucu beklemez
+                (varsayılan: STARTUP_CONFIG)
+            pipeline: Hazır bir SQLPipeline (verilirse diğer parametreler kullanılmaz)
+        """
+        self.pipeline = pipeline if pipeline is not None else SQLPipeline(engine, llm_handler, lazy)
     
-    def load_schema(self):
-        """Veritabanı şemasını yükler."""
-        try:
-            self.schema = extract_schema()
-            self.schema_text = format_schema_for_prompt(self.schema)
-            print("Veritabanı şeması başarıyla yüklendi.")
-        except Exception as e:
-            print(f"Şema yüklenirken hata oluştu: {e}")
-            self.schema = None
-            self.schema_text = "Şema yüklenemedi."
+    @property
+    def llm_handler(self) -> LLMHandler:
+        return self.pipeline.llm_handler
+    
+    @property
+    def engine(self) -> Engine:
+        return self.pipeline.engine
+    
+    @property
+    def schema_text(self) -> str:
+        return self.pipeline.schema_text
     
     def generate_sql(self, query: str, show_schema: bool) -> Tuple[str, str, str]:
         """Kullanıcı sorusundan SQL oluşturur.
@@ -47,8 +62,8 @@ class OracleSQLApp:
             return "", self.schema_text if show_schema else "Şema gösterilmiyor.", ""
         
         try:
-            # SQL oluştur
-            sql_query = self.llm_handler.generate_sql(query, self.schema_text)
+            # SQL oluştur (prompt'a sadece soruyla ilgili tablolar eklenir)
+            sql_query = self.pipeline.generate(query)
             
             # Şema metnini hazırla
             schema_display = self.schema_text if show_schema else "Şema gösterilmiyor."
@@ -57,33 +72,268 @@ class OracleSQLApp:
         except Exception as e:
             return "", "", f"Hata oluştu: {str(e)}"
     
-    def execute_and_display(self, query: str, show_schema: bool):
+    def execute_and_display(self, query: str, show_schema: bool, request: gr.Request = None):
         """SQL oluştur, çalıştır ve sonuçları göster."""
         if not query.strip():
             return "", "", "", None, False, ""
         
-        try:
-            # SQL oluştur
-            sql, schema_text, status_msg = self.generate_sql(query, show_schema)
-            
-            if not sql:
-                return "", schema_text, "", None, False, status_msg
-            
-            # Sorguyu çalıştır
-            result = execute_query(sql)
-            
-            # Sonuçları işle
+        # Hata veren SQL, hata mesajıyla birlikte modele geri gönderilip düzelttirilir
+        outcome = self.pipeline.run(query, paged=False)
+        schema_text = self.schema_text if show_schema else "Şema gösterilmiyor."
+        
+        if not outcome.ok:
+            result = "" if isinstance(outcome.error, SQLValidationError) or outcome.refused else \
+                f"Sorgu çalıştırılırken hata: {str(outcome.error)}"
+            return outcome.sql, schema_text, result, None, False, self._with_timings(outcome.status(), outcome.timer)
+        
+        # Sonuçları işle
+        with outcome.timer.stage("render"):
             download_file = None
             show_download = False
             
-            if isinstance(result, pd.DataFrame) and not result.empty:
-                download_file = save_temp_csv(result)
+            if isinstance(outcome.result, pd.DataFrame) and not outcome.result.empty:
+                download_file = save_temp_csv(outcome.result, self._session_key(request))
                 show_download = True
-            
-            return sql, schema_text, result, download_file, show_download, status_msg
-            
+        
+        status_msg = self._with_timings(outcome.status(), outcome.timer)
+        return outcome.sql, schema_text, outcome.result, download_file, show_download, status_msg
+    
+    @staticmethod
+    def _with_timings(status_msg: str, timer: StageTimer) -> str:
+        """İsteği bitirir; açıksa aşama sürelerini durum mesajına ekler."""
+        timings = timer.finish()
+        if not PIPELINE_CONFIG.get("timings", True):
+            return status_msg
+        return f"{status_msg}\n{timings}" if status_msg else timings
+    
+    def _failure_outputs(self, outcome: PipelineResult, schema_display: str):
+        """Çalıştırılamayan (iptal edilen, plan eşiğini aşan, onarılamayan) sorgu için arayüz çıktıları."""
+        sql, timer = outcome.sql, outcome.timer
+        if isinstance(outcome.error, QueryCancelledError):
+            return sql, schema_display, "", None, False, str(outcome.error), None, "", ""
+        if outcome.refused:
+            return (sql, schema_display, "", None, False, self._with_timings(outcome.status(), timer), None, "",
+                    outcome.check.describe())
+        if isinstance(outcome.error, SQLValidationError):
+            return (sql, schema_display, "", None, False, self._with_timings(outcome.status(), timer),
+                    None, "", "")
+        status_msg = " ".join(part for part in ("SQL sorgusu başarıyla oluşturuldu.", outcome.repair) if part)
+        return (sql, schema_display, f"Sorgu çalıştırılırken hata: {str(outcome.error)}", None, False,
+                self._with_timings(status_msg, timer), None, "", "")
+    
+    def _query_outputs(self, result, session: Optional[str] = None):
+        """Sorgu sonucundan (sonuç, indirme dosyası, indirme görünür mü, sayfa durumu, sayfa bilgisi) üretir."""
+        if isinstance(result, ResultPage):
+            download_file = save_temp_csv(result.df, session)
+            return result.df, download_file, download_file is not None, result.state(), result.describe()
+        download_file = None
+        show_download = False
+        if isinstance(result, pd.DataFrame) and not result.empty:
+            download_file = save_temp_csv(result, session)
+            show_download = True
+        return result, download_file, show_download, None, ""
+    
+    @staticmethod
+    def _session_key(request: Optional[gr.Request]) -> Optional[str]:
+        """İptal jetonlarının ve geçici dosyaların kaydedileceği oturum anahtarı."""
+        return getattr(request, "session_hash", None)
+    
+    def release_session(self, request: gr.Request = None):
+        """Kapanan oturumun süren isteklerini iptal eder ve geçici dosyalarını siler."""
+        key = self._session_key(request)
+        CANCEL_REGISTRY.cancel(key)
+        SESSION_FILES.release(key)
+    
+    def cancel_request(self, request: gr.Request = None) -> str:
+        """Oturumda süren SQL üretimini, sorguyu ve dışa aktarımı iptal eder."""
+        if CANCEL_REGISTRY.cancel(self._session_key(request)):
+            return "İstek iptal edildi."
+        return "İptal edilecek bir istek yok."
+    
+    def execute_and_display_stream(self, query: str, show_schema: bool, request: gr.Request = None):
+        """execute_and_display'in akışlı sürümü.
+        
+        SQL, model ürettikçe parça parça gösterilir; üretim bitince sorgu
+        çalıştırılır ve sonucun ilk sayfası gösterilir. İstek, İptal
+        butonuyla herhangi bir aşamada durdurulabilir.
+        """
+        key, cancel = CANCEL_REGISTRY.register(self._session_key(request))
+        try:
+            yield from self._execute_stream(query, show_schema, cancel, self._session_key(request))
+        finally:
+            # İşleyici yarıda bırakıldıysa (ör. Gradio olayı iptal edildi) süren sorgu da kesilir
+            cancel.cancel()
+            CANCEL_REGISTRY.release(key, cancel)
+    
+    def _execute_stream(self, query: str, show_schema: bool, cancel: CancelToken, session: Optional[str] = None):
+        """execute_and_display_stream'in gövdesi."""
+        if not query.strip():
+            yield "", "", "", None, False, "", None, "", ""
+            return
+        
+        pipeline = self.pipeline
+        timer = StageTimer()
+        if pipeline.schema_pending():
+            yield "", "", "", None, False, READINESS.summary(), None, "", ""
+        
+        prompt_schema = pipeline.prepare(query, timer)
+        schema_display = self.schema_text if show_schema else "Şema gösterilmiyor."
+        sql = ""
+        try:
+            for sql in pipeline.generate_stream(query, prompt_schema, timer, cancel):
+                yield sql, schema_display, gr.update(), gr.update(), False, "SQL sorgusu oluşturuluyor...", None, "", ""
+        except QueryCancelledError as e:
+            yield sql, schema_display, "", None, False, str(e), None, "", ""
+            return
         except Exception as e:
-            return sql, schema_text, f"Sorgu çalıştırılırken hata: {str(e)}", None, False, status_msg
+            yield "", "", "", None, False, f"Hata oluştu: {str(e)}", None, "", ""
+            return
+        
+        if not sql:
+            yield "", schema_display, "", None, False, "SQL sorgusu oluşturulamadı.", None, "", ""
+            return
+        
+        outcome = None
+        try:
+            for step in pipeline.execute_steps(query, sql, prompt_schema, timer, cancel):
+                if isinstance(step, PipelineResult):
+                    outcome = step
+                else:
+                    sql, message = step
+                    yield sql, schema_display, gr.update(), gr.update(), False, message, None, "", ""
+            if not outcome.ok:
+                yield self._failure_outputs(outcome, schema_display)
+                return
+            with timer.stage("render"):
+                result, download_file, show_download, page_state, page_info = self._query_outputs(
+                    outcome.result, session
+                )
+            yield (outcome.sql, schema_display, result, download_file, show_download,
+                   self._with_timings(outcome.status(), timer), page_state, page_info, outcome.check.describe())
+        except Exception as e:
+            yield (sql, schema_display, f"Sorgu çalıştırılırken hata: {str(e)}", None, False,
+                   "SQL sorgusu başarıyla oluşturuldu.", None, "", "")
+    
+    async def execute_and_display_async(self, query: str, show_schema: bool, request: gr.Request = None):
+        """execute_and_display_stream'in asyncio sürümü.
+        
+        Model çağrısı ve veritabanı sorgusu beklenirken Gradio işçisi
+        bloklanmaz; aynı süreçte çok sayıda oturum eşzamanlı ilerler.
+        """
+        key, cancel = CANCEL_REGISTRY.register(self._session_key(request))
+        try:
+            async for outputs in self._execute_async(query, show_schema, cancel, self._session_key(request)):
+                yield outputs
+        finally:
+            cancel.cancel()
+            CANCEL_REGISTRY.release(key, cancel)
+    
+    async def _execute_async(self, query: str, show_schema: bool, cancel: CancelToken,
+                             session: Optional[str] = None):
+        """execute_and_display_async'in gövdesi."""
+        if not query.strip():
+            yield "", "", "", None, False, "", None, "", ""
+            return
+        
+        pipeline = self.pipeline
+        timer = StageTimer()
+        if pipeline.schema_pending():
+            yield "", "", "", None, False, READINESS.summary(), None, "", ""
+        
+        # Şemayı bekleme ve şema seçimi olay döngüsünü bloklamasın
+        prompt_schema = await asyncio.to_thread(pipeline.prepare, query, timer)
+        schema_display = self.schema_text if show_schema else "Şema gösterilmiyor."
+        sql = ""
+        try:
+            async for sql in pipeline.agenerate_stream(query, prompt_schema, timer, cancel):
+                yield sql, schema_display, gr.update(), gr.update(), False, "SQL sorgusu oluşturuluyor...", None, "", ""
+        except QueryCancelledError as e:
+            yield sql, schema_display, "", None, False, str(e), None, "", ""
+            return
+        except Exception as e:
+            yield "", "", "", None, False, f"Hata oluştu: {str(e)}", None, "", ""
+            return
+        
+        if not sql:
+            yield "", schema_display, "", None, False, "SQL sorgusu oluşturulamadı.", None, "", ""
+            return
+        
+        outcome = None
+        try:
+            async for step in pipeline.aexecute_steps(query, sql, prompt_schema, timer, cancel):
+                if isinstance(step, PipelineResult):
+                    outcome = step
+                else:
+                    sql, message = step
+                    yield sql, schema_display, gr.update(), gr.update(), False, message, None, "", ""
+            if not outcome.ok:
+                yield self._failure_outputs(outcome, schema_display)
+                return
+            with timer.stage("render"):
+                result, download_file, show_download, page_state, page_info = await asyncio.to_thread(
+                    self._query_outputs, outcome.result, session
+                )
+            yield (outcome.sql, schema_display, result, download_file, show_download,
+                   self._with_timings(outcome.status(), timer), page_state, page_info, outcome.check.describe())
+        except Exception as e:
+            yield (sql, schema_display, f"Sorgu çalıştırılırken hata: {str(e)}", None, False,
+                   "SQL sorgusu başarıyla oluşturuldu.", None, "", "")
+    
+    def change_page(self, page_state: Optional[dict], step: int, request: gr.Request = None):
+        """Sonucun bir sonraki (step=1) veya önceki (step=-1) sayfasını getirir.
+        
+        Returns:
+            (sonuç, indirme dosyası, sayfa durumu, sayfa bilgisi)
+        """
+        if not page_state:
+            return gr.update(), gr.update(), page_state, ""
+        page = page_state['page'] + step
+        if page < 0 or (step > 0 and not page_state['has_more']):
+            return gr.update(), gr.update(), page_state, gr.update()
+        try:
+            result = self.pipeline.fetch_page(page_state['sql'], page, page_state['page_size'])
+        except Exception as e:
+            return f"Sorgu çalıştırılırken hata: {str(e)}", None, page_state, ""
+        return result.df, save_temp_csv(result.df, self._session_key(request)), result.state(), result.describe()
+    
+    async def change_page_async(self, page_state: Optional[dict], step: int, request: gr.Request = None):
+        """change_page'in asyncio sürümü."""
+        if not page_state:
+            return gr.update(), gr.update(), page_state, ""
+        page = page_state['page'] + step
+        if page < 0 or (step > 0 and not page_state['has_more']):
+            return gr.update(), gr.update(), page_state, gr.update()
+        try:
+            result = await self.pipeline.afetch_page(page_state['sql'], page, page_state['page_size'])
+        except Exception as e:
+            return f"Sorgu çalıştırılırken hata: {str(e)}", None, page_state, ""
+        download_file = await asyncio.to_thread(save_temp_csv, result.df, self._session_key(request))
+        return result.df, download_file, result.state(), result.describe()
+    
+    def export_results(self, page_state: Optional[dict], fmt: str, request: gr.Request = None):
+        """Son sorgunun tüm sonucunu parça parça dosyaya aktarır.
+        
+        Returns:
+            (dışa aktarılan dosya, durum mesajı)
+        """
+        if not page_state:
+            return None, "Dışa aktarılacak bir SELECT sonucu yok."
+        key, cancel = CANCEL_REGISTRY.register(self._session_key(request))
+        try:
+            stats = export_query(page_state['sql'], fmt, engine=self.engine, cancel=cancel,
+                                 schema=self.pipeline.schema)
+        except QueryCancelledError as e:
+            return None, f"Dışa aktarım durduruldu: {str(e)}"
+        except Exception as e:
+            return None, f"Dışa aktarım sırasında hata: {str(e)}"
+        finally:
+            CANCEL_REGISTRY.release(key, cancel)
+        SESSION_FILES.register(self._session_key(request), stats.path, "export")
+        return stats.path, stats.describe()
+    
+    async def export_results_async(self, page_state: Optional[dict], fmt: str, request: gr.Request = None):
+        """export_results'ın asyncio sürümü; dışa aktarım ayrı bir iş parçacığında çalışır."""
+        return await asyncio.to_thread(self.export_results, page_state, fmt, request)
     
     def create_ui(self):
         """Gradio kullanıcı arayüzünü oluşturur."""
@@ -100,6 +350,7 @@ class OracleSQLApp:
                     
                     with gr.Row():
                         submit_btn = gr.Button("Sorguyu Oluştur", variant="primary")
+                        cancel_btn = gr.Button("İptal", variant="stop")
                         clear_btn = gr.Button("Temizle")
                     
                     sql_output = gr.Code(
@@ -109,6 +360,9 @@ class OracleSQLApp:
                         lines=5
                     )
                     
+                    # Çalıştırmadan önce alınan yürütme planı ve maliyet tahmini
+                    plan_output = gr.Textbox(label="Yürütme Planı", lines=8, interactive=False)
+                    
                     status = gr.Textbox(label="Durum", interactive=False)
                 
                 with gr.Column(scale=1):
@@ -130,24 +384,75 @@ class OracleSQLApp:
                     wrap=True
                 )
             
+            # Sayfalama: sonuçların ilk sayfası hemen gösterilir, diğer
+            # sayfalar istendiğinde veritabanından getirilir
+            page_state = gr.State(None)
+            with gr.Row():
+                prev_btn = gr.Button("◀ Önceki Sayfa")
+                page_info = gr.Markdown("")
+                next_btn = gr.Button("Sonraki Sayfa ▶")
+            
             # Dosya indirme bağlantısı
             download_btn = gr.File(label="Sonuçları İndir", visible=False)
             
+            # Tüm sonucun dışa aktarımı: satırlar parça parça çekilip dosyaya
+            # yazılır, sonuç hiçbir zaman tek parça belleğe alınmaz
+            with gr.Row():
+                export_format = gr.Dropdown(
+                    label="Dışa Aktarım Biçimi",
+                    choices=list(EXPORT_FORMATS),
+                    value=EXPORT_CONFIG.get("format", "csv")
+                )
+                export_btn = gr.Button("Tüm Sonucu Dışa Aktar")
+            export_file = gr.File(label="Dışa Aktarılan Dosya")
+            
             # Buton tıklandığında
+            # SQL, model ürettikçe akış halinde gösterilir. Asenkron işleyici
+            # beklerken işçi tutmadığı için birden çok istek aynı anda işlenir.
+            if ASYNC_CONFIG.get("enabled", True):
+                submit_fn = self.execute_and_display_async
+            else:
+                submit_fn = self.execute_and_display_stream
             submit_event = submit_btn.click(
-                fn=self.execute_and_display,
+                fn=submit_fn,
+                concurrency_limit=ASYNC_CONFIG.get("concurrency_limit", 32),
                 inputs=[query, show_schema],
-                outputs=[sql_output, schema_output, results, download_btn, gr.update(visible=True), status]
+                outputs=[sql_output, schema_output, results, download_btn, gr.update(visible=True), status,
+                         page_state, page_info, plan_output]
             )
             
-            # Temizle butonu
-            def clear_all():
-                clear_temp_files()
-                return "", "", "", None, False, ""
+            # Sayfa değiştirme butonları
+            change_page = self.change_page_async if ASYNC_CONFIG.get("enabled", True) else self.change_page
+            for button, step in ((prev_btn, -1), (next_btn, 1)):
+                button.click(
+                    fn=partial(change_page, step=step),
+                    inputs=[page_state],
+                    outputs=[results, download_btn, page_state, page_info]
+                )
+            
+            export_event = export_btn.click(
+                fn=self.export_results_async if ASYNC_CONFIG.get("enabled", True) else self.export_results,
+                inputs=[page_state, export_format],
+                outputs=[export_file, status]
+            )
+            
+            # İptal butonu: süren üretimi ve sorguyu sürücü tarafında keser,
+            # Gradio olayını da iptal eder; bağlantı havuza geri döner
+            cancel_btn.click(
+                fn=self.cancel_request,
+                outputs=[status],
+                cancels=[submit_event, export_event]
+            )
+            
+            # Temizle butonu: sadece bu oturumun dosyaları silinir
+            def clear_all(request: gr.Request):
+                SESSION_FILES.release(self._session_key(request))
+                return "", "", "", None, False, "", None, "", ""
             
             clear_btn.click(
                 fn=clear_all,
-                outputs=[query, sql_output, results, download_btn, gr.update(visible=False), status]
+                outputs=[query, sql_output, results, download_btn, gr.update(visible=False), status,
+                         page_state, page_info, plan_output]
             )
             
             # Şema göster/gizle değiştiğinde
@@ -158,29 +463,38 @@ class OracleSQLApp:
             )
             
             # Sayfa yüklendiğinde şemayı göster
+            # Açılış sürüyorsa durum satırında hazırlık durumu gösterilir
             demo.load(
-                fn=lambda: (self.schema_text, ""),
+                fn=lambda: (self.schema_text, "" if READINESS.is_ready() else READINESS.summary()),
                 outputs=[schema_output, status]
             )
             
+            # Oturum kapanınca (sekme kapatıldı) oturumun geçici dosyaları silinir
+            demo.unload(self.release_session)
+            
         return demo
 
 def main():
     """Uygulamayı başlat."""
-    # Oracle bağlantısını test et
-    if not test_connection():
-        print("Oracle veritabanına bağlanılamadı. Lütfen bağlantı ayarlarını kontrol edin.")
+    lazy = STARTUP_CONFIG.get("lazy", True)
+    # Gecikmeli açılışta bağlantı, arka plandaki şema yüklemesinde denenir
+    # ve sonucu /health uç noktasından izlenir
+    if not lazy and not test_connection():
+        print("Veritabanına bağlanılamadı. Lütfen bağlantı ayarlarını kontrol edin.")
         return
     
     try:
         # Uygulamayı başlat
-        app = OracleSQLApp()
+        app = OracleSQLApp(lazy=lazy)
         demo = app.create_ui()
         
+        host = STARTUP_CONFIG.get("server_name", "127.0.0.1")
+        port = STARTUP_CONFIG.get("server_port", 7860)
         print("Uygulama başlatılıyor...")
-        print("Tarayıcıda http://localhost:7860 adresini açabilirsiniz.")
+        print(f"Tarayıcıda http://localhost:{port} adresini açabilirsiniz (durum: /health).")
         
-        demo.launch()
+        demo.queue(default_concurrency_limit=ASYNC_CONFIG.get("concurrency_limit", 32))
+        uvicorn.run(create_server(demo), host=host, port=port, log_level="warning")
     except Exception as e:
         print(f"Uygulama başlatılırken hata oluştu: {e}")
     finally:
@@ -0,0 +1,337 @@
+"""
+LLM yanıtları için önbellek modülü.
+
+Aynı soru, aynı şema ve aynı model ayarlarıyla tekrar sorulduğunda modeli
+yeniden çalıştırmak yerine daha önce üretilen SQL döndürülür. Önbellek
+katmanlıdır: süreç içi bir LRU katmanı ve süreçler arasında paylaşılan,
+yeniden başlatmalarda korunan bir SQLite dosyası katmanı.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from .config import RESPONSE_CACHE_CONFIG
+
+# Türkçe büyük/küçük harf dönüşümü: "I" -> "ı", "İ" -> "i"
+_TR_LOWER = str.maketrans({'I': 'ı', 'İ': 'i'})
+
+# Önbellek anahtarına giren model parametreleri
+_MODEL_KEY_FIELDS = ('model', 'temperature', 'top_p', 'top_k', 'num_ctx', 'num_predict', 'stop', 'seed')
+
+def normalize_question(question: str) -> str:
+    """Soruyu önbellek anahtarı için normalleştirir.
+
+    Türkçe kurallarıyla küçültür, boşlukları teke indirir ve sondaki
+    noktalama işaretlerini atar.
+    """
+    question = question.translate(_TR_LOWER).lower()
+    question = " ".join(question.split())
+    return re.sub(r'[\s?.!]+$', '', question)
+
+def describe_model(model) -> Dict[str, Any]:
+    """Yanıtı etkileyen model ayarlarını sözlük olarak döndürür."""
+    if isinstance(model, dict):
+        source = dict(model)
+        if 'model' not in source and 'model_name' in source:
+            source['model'] = source['model_name']
+        return {field: source.get(field) for field in _MODEL_KEY_FIELDS}
+    return {field: getattr(model, field, None) for field in _MODEL_KEY_FIELDS}
+
+def make_cache_key(question: str, schema_text: str, model_config: Dict[str, Any],
+                   template: str = "") -> str:
+    """Normalleştirilmiş soru, şema parmak izi ve model ayarlarından anahtar üretir."""
+    payload = {
+        'question': normalize_question(question),
+        'schema': hashlib.sha256(schema_text.encode('utf-8')).hexdigest(),
+        'template': hashlib.sha256(template.encode('utf-8')).hexdigest(),
+        'model': model_config
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class CacheBackend:
+    """Önbellek katmanları için temel sınıf."""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """Kaydı (değer, oluşturulma zamanı) olarak döndürür; yoksa veya süresi dolduysa None."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, created_at: Optional[float] = None):
+        """Kaydı yazar; created_at verilirse (ör. üst katmana taşınan kayıt) süresi o andan sayılır."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """Süreç içi, kayıt sayısı ve süre sınırlı LRU önbellek."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, created_at = item
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item
+
+    def set(self, key: str, value: str, created_at: Optional[float] = None):
+        with self._lock:
+            self._data[key] = (value, created_at if created_at is not None else time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache(CacheBackend):
+    """SQLite dosyasında tutulan kalıcı önbellek.
+
+    WAL kipinde açıldığı için aynı dosyayı kullanan birden çok işçi süreci
+    önbelleği paylaşabilir. Kayıt sayısı sınırı aşıldığında en uzun süredir
+    kullanılmayan kayıtlar silinir.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_last_access "
+            "ON response_cache (last_access)"
+        )
+        self._conn.commit()
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return value, created_at
+
+    def set(self, key: str, value: str, created_at: Optional[float] = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, created_at if created_at is not None else now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Süresi dolmuş ve sınırı aşan kayıtları siler."""
+        if self.ttl is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+        count = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                " SELECT key FROM response_cache ORDER BY last_access LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """Katmanlı LLM yanıt önbelleği.
+
+    Katmanlar sırayla sorgulanır; alt katmanda bulunan bir kayıt üst
+    katmanlara da, süresi yeniden başlamasın diye ilk oluşturulma zamanıyla
+    yazılır. Yeni kayıtlar tüm katmanlara yazılır.
+    """
+
+    def __init__(self, tiers: List[CacheBackend]):
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.tier_hits = {tier.name: 0 for tier in tiers}
+
+    def get(self, key: str) -> Optional[str]:
+        for index, tier in enumerate(self.tiers):
+            try:
+                entry = tier.get_entry(key)
+            except Exception as e:
+                print(f"Önbellek okunurken hata ({tier.name}): {e}")
+                continue
+            if entry is not None:
+                value, created_at = entry
+                for upper in self.tiers[:index]:
+                    upper.set(key, value, created_at=created_at)
+                with self._lock:
+                    self.hits += 1
+                    self.tier_hits[tier.name] += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        for tier in self.tiers:
+            try:
+                tier.set(key, value)
+            except Exception as e:
+                print(f"Önbelleğe yazılırken hata ({tier.name}): {e}")
+
+    def record_bypass(self):
+        """Önbelleğin bilerek atlandığı bir isteği sayar."""
+        with self._lock:
+            self.bypassed += 1
+
+    def get_or_generate(self, key: str, generate: Callable[[], str], bypass: bool = False) -> str:
+        """Kayıt varsa döndürür, yoksa generate() ile üretip önbelleğe yazar.
+
+        Args:
+            key: make_cache_key() ile üretilen anahtar
+            generate: Önbellekte kayıt yoksa çağrılacak fonksiyon
+            bypass: True ise önbellek okunmaz, üretilen sonuç yine de yazılır
+        """
+        if bypass:
+            self.record_bypass()
+        else:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+        value = generate()
+        if value:
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """İsabet/ıska sayaçlarını ve katman doluluklarını döndürür."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'tier_hits': dict(self.tier_hits),
+                'entries': {tier.name: len(tier) for tier in self.tiers},
+                'evictions': {tier.name: getattr(tier, 'evictions', 0) for tier in self.tiers}
+            }
+
+
+def build_response_cache(config: Optional[Dict[str, Any]] = None) -> Optional[ResponseCache]:
+    """RESPONSE_CACHE_CONFIG ayarlarına göre önbellek oluşturur.
+
+    Returns:
+        ResponseCache nesnesi veya önbellek kapalıysa None
+    """
+    config = config or RESPONSE_CACHE_CONFIG
+    if not config.get("enabled", True):
+        return None
+
+    ttl = config.get("ttl")
+    tiers: List[CacheBackend] = [MemoryCache(config.get("memory_max_entries", 256), ttl)]
+    if config.get("sqlite_enabled", True):
+        try:
+            tiers.append(SQLiteCache(
+                config["sqlite_path"],
+                config.get("sqlite_max_entries", 10000),
+                ttl
+            ))
+        except (sqlite3.Error, OSError) as e:
+            print(f"Kalıcı önbellek açılamadı, sadece bellek içi önbellek kullanılacak: {e}")
+    return ResponseCache(tiers)
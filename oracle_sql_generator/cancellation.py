@@ -0,0 +1,270 @@
+"""
+İstek başına süre sınırı ve arayüzden iptal için modül.
+
+Her istek için bir CancelToken oluşturulur; SQL üretimi ve veritabanı
+sorgusu bu jetonu izler. Jeton iptal edildiğinde veya süre dolduğunda:
+
+- Model akışı bir sonraki parçada kapatılır (Ollama'ya giden HTTP isteği
+  de kesilir).
+- Oracle'da connection.call_timeout her gidiş-dönüşü kalan süreyle sınırlar,
+  connection.cancel() süren çağrıyı sunucu tarafında yarıda keser.
+- SQLite'ta progress handler belirli sayıda sanal makine adımında bir
+  jetonu kontrol eder ve sorguyu kesintiye uğratır.
+
+Kesilen bağlantı normal yoldan havuza geri bırakılır; açık işlem geri
+alınır, kullanılamaz hale gelen Oracle bağlantıları geçersiz kılınır.
+"""
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, List, Optional, Set
+
+from .config import TIMEOUT_CONFIG
+
+# Bağlantının kullanılamaz hale geldiğini gösteren sürücü hataları
+_BROKEN_CONNECTION = re.compile(r'DPI-1080|DPY-4011|DPY-1001')
+
+class QueryCancelledError(Exception):
+    """İstek kullanıcı tarafından iptal edildi veya süre sınırını aştı."""
+
+class CancelToken:
+    """Bir isteğin iptal durumunu ve (varsa) son teslim zamanını tutar.
+
+    İş parçacıkları arasında güvenle paylaşılabilir; cancel() başka bir
+    iş parçacığından (ör. arayüzün İptal butonu) çağrılabilir.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason = ""
+
+    def cancel(self, reason: str = "İstek iptal edildi."):
+        """İsteği iptal eder ve kayıtlı sürücü iptallerini çağırır."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"İptal sırasında hata: {e}")
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """Son teslim zamanına kalan süre (saniye); süre sınırı yoksa None."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        """İstek iptal edildiyse veya süresi dolduysa QueryCancelledError yükseltir."""
+        if self.cancelled:
+            raise QueryCancelledError(self.reason)
+        if self.expired:
+            raise QueryCancelledError("İstek süre sınırını aştı.")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """İptal edildiğinde çağrılacak fonksiyonu kaydeder.
+
+        Returns:
+            Kaydı silen fonksiyon
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+class CancelRegistry:
+    """Oturum anahtarına göre süren isteklerin jetonlarını tutar.
+
+    Arayüzdeki İptal butonu isteği başlatan işleyiciden ayrı çalıştığı
+    için jetona oturum anahtarıyla (ör. Gradio session_hash) ulaşılır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, Set[CancelToken]] = {}
+
+    def register(self, key: Optional[str] = None, timeout: Optional[float] = None):
+        """Yeni bir jeton oluşturup kaydeder.
+
+        Returns:
+            (anahtar, jeton); anahtar verilmediyse rastgele üretilir
+        """
+        key = key or uuid.uuid4().hex
+        token = CancelToken(timeout)
+        with self._lock:
+            self._tokens.setdefault(key, set()).add(token)
+        return key, token
+
+    def release(self, key: str, token: CancelToken):
+        """Tamamlanan isteğin jetonunu kayıttan siler."""
+        with self._lock:
+            tokens = self._tokens.get(key)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens[key]
+
+    def cancel(self, key: Optional[str], reason: str = "İstek iptal edildi.") -> int:
+        """Anahtara ait tüm süren istekleri iptal eder.
+
+        Returns:
+            İptal edilen istek sayısı
+        """
+        with self._lock:
+            tokens = list(self._tokens.get(key, ()))
+        for token in tokens:
+            token.cancel(reason)
+        return len(tokens)
+
+# Süreç genelinde paylaşılan jeton kayıt defteri
+CANCEL_REGISTRY = CancelRegistry()
+
+def resolve_timeout(timeout: Optional[float], key: str = "statement_timeout") -> Optional[float]:
+    """Verilen süre sınırını, yoksa TIMEOUT_CONFIG'teki değeri döndürür (0: sınırsız)."""
+    if timeout is None:
+        timeout = TIMEOUT_CONFIG.get(key)
+    return timeout or None
+
+def _remaining(timeout: Optional[float], cancel: Optional[CancelToken]) -> Optional[float]:
+    """İfade için kalan süre: kendi sınırı ile jetonun son teslim zamanından küçük olanı."""
+    limits = [t for t in (timeout, cancel.remaining() if cancel is not None else None) if t is not None]
+    return min(limits) if limits else None
+
+def _driver_setup(conn_name: str, driver, remaining: Optional[float],
+                  cancel: Optional[CancelToken], deadline: Optional[float], defer=None):
+    """Sürücüye süre sınırını ve iptal fonksiyonunu uygular.
+
+    Returns:
+        Ayarları geri alan fonksiyonların listesi ve (SQLite için) progress handler
+    """
+    undo = []
+    if conn_name == "oracle" and hasattr(driver, "call_timeout"):
+        previous = driver.call_timeout
+        if remaining is not None:
+            # call_timeout tek bir gidiş-dönüşü sınırlar; toplam süre zamanlayıcıyla kesilir
+            driver.call_timeout = max(1, int(remaining * 1000))
+            undo.append(lambda: setattr(driver, "call_timeout", previous))
+        interrupt = driver.cancel if defer is None else lambda: defer(driver.cancel)
+        if cancel is not None:
+            undo.append(cancel.on_cancel(interrupt))
+        if remaining is not None:
+            timer = threading.Timer(remaining, interrupt)
+            timer.daemon = True
+            timer.start()
+            undo.append(timer.cancel)
+    elif conn_name == "sqlite":
+        def handler():
+            # Sıfırdan farklı dönüş değeri sorguyu "interrupted" hatasıyla keser
+            if cancel is not None and cancel.cancelled:
+                return 1
+            return 1 if deadline is not None and time.monotonic() >= deadline else 0
+        return undo, handler
+    return undo, None
+
+def _cancelled_error(e: Exception, timeout: Optional[float], cancel: Optional[CancelToken],
+                     deadline: Optional[float]) -> Optional[QueryCancelledError]:
+    """Sürücü hatası iptal veya süre aşımından kaynaklanıyorsa karşılığını döndürür."""
+    if cancel is not None and cancel.cancelled:
+        return QueryCancelledError(cancel.reason)
+    # Sürücünün zamanlayıcısı son teslim zamanından hemen önce tetiklenebilir
+    if deadline is not None and time.monotonic() >= deadline - 0.05:
+        return QueryCancelledError(f"Sorgu {timeout:g} sn içinde tamamlanamadı ve durduruldu.")
+    return None
+
+@contextmanager
+def statement_deadline(conn, timeout: Optional[float] = None, cancel: Optional[CancelToken] = None):
+    """Bağlantıdaki ifadeleri süre sınırına ve iptal jetonuna bağlar.
+
+    Args:
+        conn: SQLAlchemy bağlantısı
+        timeout: Saniye cinsinden süre sınırı (None: sınırsız)
+        cancel: İsteğin iptal jetonu
+    """
+    if cancel is not None:
+        cancel.check()
+    remaining = _remaining(timeout, cancel)
+    if remaining is None and cancel is None:
+        yield
+        return
+    deadline = time.monotonic() + remaining if remaining is not None else None
+    driver = conn.connection.driver_connection
+    undo, handler = _driver_setup(conn.dialect.name, driver, remaining, cancel, deadline)
+    if handler is not None and isinstance(driver, sqlite3.Connection):
+        steps = TIMEOUT_CONFIG.get("sqlite_progress_steps", 1000)
+        driver.set_progress_handler(handler, steps)
+        undo.append(lambda: driver.set_progress_handler(None, steps))
+    try:
+        yield
+    except Exception as e:
+        error = _cancelled_error(e, remaining, cancel, deadline)
+        if error is None:
+            raise
+        if _BROKEN_CONNECTION.search(str(e)) and not conn.invalidated:
+            conn.invalidate()
+        raise error from e
+    finally:
+        for step in reversed(undo):
+            step()
+
+@asynccontextmanager
+async def statement_deadline_async(conn, timeout: Optional[float] = None,
+                                   cancel: Optional[CancelToken] = None):
+    """statement_deadline'ın AsyncConnection karşılığı (oracledb_async, aiosqlite)."""
+    if cancel is not None:
+        cancel.check()
+    remaining = _remaining(timeout, cancel)
+    if remaining is None and cancel is None:
+        yield
+        return
+    deadline = time.monotonic() + remaining if remaining is not None else None
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+    # AsyncConnection.cancel olay döngüsünün iş parçacığında çağrılmalı
+    loop = asyncio.get_running_loop()
+    undo, handler = _driver_setup(conn.dialect.name, driver, remaining, cancel, deadline,
+                                  defer=loop.call_soon_threadsafe)
+    reset_handler = None
+    if handler is not None and hasattr(driver, "set_progress_handler"):
+        steps = TIMEOUT_CONFIG.get("sqlite_progress_steps", 1000)
+        await driver.set_progress_handler(handler, steps)
+        reset_handler = lambda: driver.set_progress_handler(None, steps)
+    try:
+        yield
+    except Exception as e:
+        error = _cancelled_error(e, remaining, cancel, deadline)
+        if error is None:
+            raise
+        if _BROKEN_CONNECTION.search(str(e)) and not conn.invalidated:
+            await conn.invalidate()
+        raise error from e
+    finally:
+        for step in reversed(undo):
+            step()
+        if reset_handler is not None:
+            await reset_handler()
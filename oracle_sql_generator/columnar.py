@@ -0,0 +1,144 @@
+"""
+Sorgu sonuçlarını Apache Arrow biçiminde, sütun sütun getirmek için modül.
+
+pd.read_sql_query satırları Python demetleri olarak alır, önce bir nesne
+dizisine, sonra sütun sütun numpy dizilerine çevirir; geniş sonuçlarda
+CPU'nun büyük kısmı bu dönüşümde harcanır. Burada:
+
+- python-oracledb'nin DataFrame desteği (fetch_df_batches) varsa satırlar
+  sürücü içinde doğrudan Arrow sütunlarına yazılır, Python nesnesi hiç
+  oluşmaz.
+- Diğer sürücülerde imleçten fetchmany ile gelen her parti sütunlara
+  ayrılıp pyarrow.RecordBatch'e çevrilir; sonucun tamamı hiçbir zaman
+  satır listesi olarak tutulmaz.
+
+pyarrow kurulu değilse available() False döner ve çağıranlar pandas
+yoluna düşer.
+"""
+from typing import Iterator, List, Optional
+
+import oracledb
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from .config import FETCH_CONFIG
+from .fetch_tuning import FetchPlan, apply_plan
+from .telemetry import span
+
+def available() -> bool:
+    """Arrow ile getirme yolunun kullanılıp kullanılamayacağını döndürür."""
+    return pa is not None and FETCH_CONFIG.get("mode", "arrow") == "arrow"
+
+def _oracle_connection(conn):
+    """SQLAlchemy bağlantısının altındaki senkron python-oracledb bağlantısını döndürür."""
+    if conn.dialect.name != "oracle":
+        return None
+    driver_conn = conn.connection.driver_connection
+    # AsyncConnection'ın fetch_df_batches'ı bir eşyordam; run_sync içinden çağrılamaz
+    if not isinstance(driver_conn, oracledb.Connection) or not hasattr(driver_conn, "fetch_df_batches"):
+        return None
+    return driver_conn
+
+def _column_array(values, type_=None):
+    """Bir sütunun değerlerini Arrow dizisine çevirir."""
+    if type_ is not None and not pa.types.is_null(type_):
+        try:
+            return pa.array(values, type=type_)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            pass
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        # SQLite'ta aynı sütunda farklı tipte değerler olabilir
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+def _cursor_batches(conn, sql: str, batch_size: int,
+                    plan: Optional[FetchPlan]) -> Iterator["pa.RecordBatch"]:
+    """DBAPI imlecinden fetchmany ile gelen partileri RecordBatch'e çevirir."""
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.arraysize = batch_size
+        apply_plan(cursor, plan)
+        # Ham DBAPI imleci SQLAlchemy olaylarından geçmediği için ayrıca ölçülür
+        with span("db.execute", dialect=conn.dialect.name):
+            cursor.execute(sql)
+        names = [d[0] for d in cursor.description]
+        types: List[Optional["pa.DataType"]] = [None] * len(names)
+        empty = True
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            empty = False
+            columns = zip(*rows)
+            arrays = [_column_array(list(values), types[i]) for i, values in enumerate(columns)]
+            # Sonraki partilerde tip çıkarımı tekrarlanmasın
+            types = [a.type for a in arrays]
+            yield pa.RecordBatch.from_arrays(arrays, names=names)
+        if empty:
+            # Boş sonuçta da sütun adları korunsun
+            yield pa.RecordBatch.from_arrays([pa.array([], pa.null()) for _ in names], names=names)
+    finally:
+        cursor.close()
+
+def _oracle_batches(driver_conn, sql: str, batch_size: int) -> Iterator["pa.RecordBatch"]:
+    """python-oracledb'nin Arrow destekli DataFrame partilerini RecordBatch olarak verir."""
+    for frame in driver_conn.fetch_df_batches(statement=sql, size=batch_size):
+        yield from pa.table(frame).to_batches()
+
+def iter_record_batches(conn, sql: str, batch_size: Optional[int] = None,
+                        plan: Optional[FetchPlan] = None) -> Iterator["pa.RecordBatch"]:
+    """SELECT sonucunu en fazla batch_size satırlık RecordBatch'ler halinde getirir.
+
+    Args:
+        conn: SQLAlchemy bağlantısı
+        sql: Çalıştırılacak SELECT (bağlama parametresi olmadan)
+        batch_size: Parti başına satır (varsayılan: FETCH_CONFIG)
+        plan: İmlecin arraysize/prefetchrows ayarları (fetch_tuning.plan_fetch)
+    """
+    batch_size = batch_size or FETCH_CONFIG.get("batch_size", 50000)
+    driver_conn = _oracle_connection(conn)
+    if driver_conn is not None:
+        # fetch_df_batches parti boyunu arraysize olarak da kullanır
+        return _oracle_batches(driver_conn, sql, plan.arraysize if plan else batch_size)
+    return _cursor_batches(conn, sql, batch_size, plan)
+
+def concat_batches(batches: List["pa.RecordBatch"]) -> "pa.Table":
+    """Partileri tek bir tabloda birleştirir; partiler arası tip farklarını giderir.
+
+    İlk partide tamamen boş olan (null tipli) veya tamsayıyken sonra ondalık
+    gelen sütunlar genişletilir; uzlaşmayan tipler metne çevrilir.
+    """
+    if not batches:
+        return pa.table({})
+    schema = batches[0].schema
+    if all(b.schema.equals(schema) for b in batches[1:]):
+        return pa.Table.from_batches(batches)
+
+    # JOIN sonuçlarında aynı adlı sütunlar olabilir; şema birleştirme
+    # benzersiz ad istediği için geçici olarak sıra numarası kullanılır
+    names = schema.names
+    temp_names = [f"c{i}" for i in range(len(names))]
+    tables = [pa.Table.from_batches([b]).rename_columns(temp_names) for b in batches]
+    try:
+        table = pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        conflicting = [
+            i for i in range(len(names))
+            if len({t.schema.types[i] for t in tables if not pa.types.is_null(t.schema.types[i])}) > 1
+        ]
+        fixed = []
+        for t in tables:
+            for i in conflicting:
+                t = t.set_column(i, pa.field(temp_names[i], pa.string()), t.column(i).cast(pa.string()))
+            fixed.append(t)
+        table = pa.concat_tables(fixed, promote_options="permissive")
+    return table.rename_columns(names)
+
+def fetch_table(conn, sql: str, batch_size: Optional[int] = None,
+                plan: Optional[FetchPlan] = None) -> "pa.Table":
+    """SELECT sonucunu tek bir Arrow tablosu olarak getirir."""
+    return concat_batches(list(iter_record_batches(conn, sql, batch_size, plan)))
@@ -1,6 +1,7 @@
 """
 Oracle veritabanı bağlantı ayarları ve yapılandırma.
 """
+import os
 
 # Oracle bağlantı bilgileri
 ORACLE_CONFIG = {
@@ -8,7 +9,130 @@ ORACLE_CONFIG = {
     "password": "sifre",
     "host": "localhost",
     "port": "1521",
-    "service_name": "ORCL"
+    "service_name": "ORCL",
+    # Bağlantı havuzu ayarları (QueuePool)
+    "pool_size": 5,          # Havuzda sürekli açık tutulan bağlantı sayısı
+    "max_overflow": 10,      # Yoğunlukta açılabilecek ek bağlantı sayısı
+    "pool_timeout": 30,      # Boş bağlantı için en fazla bekleme süresi (saniye)
+    "pool_pre_ping": True,   # Kullanmadan önce bağlantının canlı olduğunu doğrula
+    "pool_recycle": 1800,    # Bu süreden (saniye) eski bağlantıları yenile
+    # İmleç getirme ayarları: None ise sorgu başına otomatik seçilir
+    "arraysize": None,       # Bir gidiş-dönüşte getirilen satır sayısı
+    "prefetchrows": None,    # execute ile birlikte getirilen satır sayısı
+    "fetch_autotune": True,  # arraysize'ı tahmini satır genişliğine göre seç
+    "fetch_buffer_bytes": 8 * 1024 * 1024,  # Bir partinin tamponu için üst sınır (bayt)
+    "min_arraysize": 100,
+    "max_arraysize": 10000,
+    "measure_round_trips": False  # Gidiş-dönüşleri V$MYSTAT'tan ölç (yetki gerekir)
+}
+
+# Sorgu sonuçlarının sayfalama ayarları
+PAGINATION_CONFIG = {
+    "page_size": 100,    # Arayüzde bir sayfada gösterilen satır sayısı
+    "max_rows": 10000    # Sayfalamasız çalıştırılan SELECT'lerin dönebileceği en fazla satır
+}
+
+# Sorgu sonuçlarının getirilme biçimi
+FETCH_CONFIG = {
+    # "arrow": sonuçlar sütun sütun pyarrow RecordBatch'lerine alınır
+    # (pyarrow gerekir); "pandas": pd.read_sql_query ile satır satır
+    "mode": "arrow",
+    "batch_size": 50000    # Sürücüden bir seferde çekilen satır sayısı
+}
+
+# Üretilen SQL'in veritabanına gitmeden yerelde doğrulanması (sqlglot gerekir)
+VALIDATION_CONFIG = {
+    "enabled": True,
+    "read_only": True,           # Yalnızca SELECT/WITH sorgularına izin ver
+    "check_columns": True,       # Tabloların yanında sütunları da şemada ara
+    "source_dialect": None,      # Modelin yazdığı lehçe ("oracle", "sqlite"); veritabanınınkinden
+                                 # farklıysa SQL çalıştırmadan önce çevrilir, None: çevirme
+    "cache_size": 1024           # Önbellekteki en fazla doğrulama sonucu
+}
+
+# Hata veren SQL'in modele geri gönderilip düzelttirilmesi
+REPAIR_CONFIG = {
+    "enabled": True,
+    "max_attempts": 2,        # Bir istek için en fazla düzeltme denemesi
+    "latency_budget": 30      # İlk hatadan sonra düzeltmeye ayrılan toplam süre (saniye), None: sınırsız
+}
+
+# Çalıştırmadan önce yürütme planı denetimi (Oracle: EXPLAIN PLAN, SQLite: EXPLAIN QUERY PLAN)
+COST_GATE_CONFIG = {
+    "enabled": True,
+    "warn_cost": 10000,          # Bu maliyetin üstünde uyar
+    "refuse_cost": 1000000,      # Bu maliyetin üstünde çalıştırma
+    "limit_rows": 100000,        # Tahmini satır bundan fazlaysa sorguya satır sınırı ekle
+    "refuse_rows": None,         # Tahmini satır bundan fazlaysa çalıştırma, None: kapalı
+    "warn_full_scans": False,    # Her tam tablo taramasında uyar (SQLite maliyet vermez)
+    "warn_full_scan_tables": [],     # Tam taranınca uyarılacak tablolar
+    "refuse_full_scan_tables": [],   # Tam taranınca reddedilecek büyük tablolar
+    "cache_size": 512,           # Önbellekteki en fazla plan
+    "cache_ttl": 3600            # Planların geçerlilik süresi (saniye); istatistikler değişebilir
+}
+
+# İstek başına süre sınırları (saniye, None veya 0: sınırsız); arayüzdeki İptal butonu da bunlara bağlıdır
+TIMEOUT_CONFIG = {
+    "statement_timeout": 60,       # Bir sorgunun (plan denetimi, sayfa, sonuç) en fazla süresi
+    "export_timeout": None,        # Tüm sonucun dışa aktarımının en fazla süresi
+    "generation_timeout": 120,     # SQL üretiminin en fazla süresi (sırada bekleme hariç)
+    "sqlite_progress_steps": 1000  # SQLite'ta iptalin kaç sanal makine adımında bir kontrol edileceği
+}
+
+# Sorgu sonucu önbelleği: aynı SELECT tekrar geldiğinde veritabanına gidilmez
+RESULT_CACHE_CONFIG = {
+    "enabled": True,
+    "ttl": 300,                            # Kayıtların geçerlilik süresi (saniye), None: süresiz
+    "memory_max_bytes": 256 * 1024 * 1024, # Süreç içi LRU katmanının bayt bütçesi
+    "disk_enabled": True,                  # Arrow IPC dosyalarında süreçler arası katman
+    "path": os.path.join(os.path.expanduser("~"), ".oracle_sql_generator", "result_cache"),
+    "disk_max_bytes": 2 * 1024 ** 3,       # Disk katmanının bayt bütçesi
+    "compression": "zstd",                 # Arrow IPC sıkıştırması ("zstd", "lz4" veya None)
+    "max_result_bytes": 64 * 1024 * 1024   # Bundan büyük sonuçlar önbelleğe alınmaz
+}
+
+# Sonuçların dosyaya aktarılması (parça parça, tüm sonuç belleğe alınmadan)
+EXPORT_CONFIG = {
+    "format": "csv",       # "csv", "csv.gz" veya "parquet" (pyarrow gerekir)
+    "chunk_size": 50000,   # Veritabanından bir seferde çekilip yazılan satır sayısı
+    "dir": None,           # Dosyaların yazılacağı klasör, None: sistemin geçici klasörü
+    # Streamlit'in indirme butonu dosyayı belleğe alır; bundan büyük dosyalar
+    # (MB) indirme butonuyla sunulmaz, sadece diskte bırakılır. None: sınırsız
+    "download_max_mb": 200
+}
+
+# Şema çıkarma ayarları
+SCHEMA_CONFIG = {
+    # "bulk": katalog görünümlerinden birkaç toplu sorguyla,
+    # "inspector": SQLAlchemy inspector ile tablo tablo
+    "extraction_mode": "bulk"
+}
+
+# Şema önbelleği ayarları
+SCHEMA_CACHE_CONFIG = {
+    "enabled": True,
+    # Şema anlık görüntülerinin (snapshot) saklanacağı klasör
+    "path": os.path.join(os.path.expanduser("~"), ".oracle_sql_generator", "schema_cache")
+}
+
+# Şemanın prompt'a yazılış biçimi
+SCHEMA_FORMAT_CONFIG = {
+    # "markdown": tablo başlığı ve sütun başına bir satır,
+    # "compact": Tablo(sütun:tip*, ...) satırları ve tek bir ilişki listesi,
+    # "ddl": CREATE TABLE ifadeleri (SQLite'ta veritabanındaki özgün DDL)
+    "format": "markdown",
+    "abbreviate_types": True,    # compact biçimde VARCHAR2(40) → text gibi kısa tipler
+    "cache_size": 512            # Parmak izi ve tablo seçimine göre saklanan şema metni sayısı
+}
+
+# Soruyla ilgili şema seçimi (prompt'a sadece ilgili tablolar eklenir)
+RETRIEVAL_CONFIG = {
+    "enabled": True,
+    "top_k": 6,                  # Soruyla en çok örtüşen en fazla kaç tablo seçilsin
+    "min_score_ratio": 0.35,     # En iyi puanın bu oranından düşük tabloları eleme
+    "include_fk_neighbours": True,  # Seçilen tabloların foreign key komşularını ekle
+    "infer_fk_from_names": True, # "CustomerId" gibi sütunlardan ilişki çıkar
+    "token_budget": 1200         # Prompt'taki şema metni için yaklaşık token sınırı
 }
 
 # Model ayarları
@@ -20,7 +144,67 @@ MODEL_CONFIG = {
     "top_k": 40,
     "num_ctx": 2048,
     "num_thread": 4,
-    "request_timeout": 30.0
+    "request_timeout": 30.0,
+    # SQL'den sonra gelen açıklamaları Ollama tarafında kesen durdurma dizileri.
+    # Boş satır gibi genel diziler kullanılmaz: SQL'den önceki düşünme veya
+    # giriş metninde tetiklenip boş SQL döndürebilir; SQL bitince akışı
+    # SQLStopDetector keser
+    "stop": ["\nAçıklama:", "\nExplanation:"]
+}
+
+# Uygulamanın açılış ayarları
+STARTUP_CONFIG = {
+    # True: arayüz hemen açılır, model ve şema arka planda hazırlanır;
+    # False: her şey hazır olduktan sonra arayüz açılır
+    "lazy": True,
+    "warm_up_model": True,       # Modeli açılışta Ollama'da belleğe yükle (üretim yapılmaz)
+    "keep_alive": "30m",         # Modelin Ollama'da bellekte kalacağı süre
+    "warm_up_timeout": 300,      # Model yüklemesinin en fazla süresi (saniye)
+    "ready_timeout": 120,        # Bir isteğin şemayı en fazla bekleyeceği süre (saniye)
+    "server_name": "127.0.0.1",
+    "server_port": 7860
+}
+
+# Gradio arayüzünün eşzamanlılık ayarları
+ASYNC_CONFIG = {
+    "enabled": True,            # Asenkron (asyncio) işleyicileri kullan
+    "concurrency_limit": 32     # Aynı anda işlenen en fazla istek (Gradio varsayılanı 1)
+}
+
+# Ollama'ya giden istekler için zamanlayıcı ayarları
+SCHEDULER_CONFIG = {
+    "enabled": True,
+    "max_concurrency": 2,       # Sunucudaki OLLAMA_NUM_PARALLEL ile aynı tutun
+    "queue_timeout": 120        # Sırada beklenecek en uzun süre (saniye), None: sınırsız
+}
+
+# Üretim ayarları
+GENERATION_CONFIG = {
+    # Tam bir SQL ifadesi üretildiği anda model akışını kapat
+    "early_stop": True
+}
+
+# LLM yanıt önbelleği ayarları
+RESPONSE_CACHE_CONFIG = {
+    "enabled": True,
+    "memory_max_entries": 256,   # Süreç içi LRU katmanındaki en fazla kayıt
+    "sqlite_enabled": True,      # Süreçler arasında paylaşılan kalıcı katman
+    "sqlite_path": os.path.join(os.path.expanduser("~"), ".oracle_sql_generator", "response_cache.sqlite"),
+    "sqlite_max_entries": 10000,
+    "ttl": 7 * 24 * 3600         # Kayıtların geçerlilik süresi (saniye), None: süresiz
+}
+
+# Anlamsal (benzer soru) önbellek ayarları
+SEMANTIC_CACHE_CONFIG = {
+    "enabled": True,
+    # "lexical": paket içi, bağımlılıksız gömme; "ollama": Ollama embedding modeli
+    "embedder": "lexical",
+    "embedding_model": "nomic-embed-text",
+    "threshold": 0.92,           # Bu kosinüs benzerliğinin üstündeki sorular aynı kabul edilir
+    "max_entries": 10000,        # Şema/model başına en fazla kayıt
+    "dtype": "float32",          # Vektör matrisi tipi ("float16" belleği yarıya indirir)
+    "path": os.path.join(os.path.expanduser("~"), ".oracle_sql_generator", "semantic_cache.npz"),
+    "save_every": 20             # Kaç yeni kayıtta bir diske yazılsın
 }
 
 # Prompt şablonu
@@ -43,3 +227,153 @@ Kullanici sorusu: {query}
 
 SQL Sorgusu:
 """
+
+# Hata veren SQL'i düzelttirmek için kullanılan prompt şablonu
+SQL_REPAIR_PROMPT_TEMPLATE = """
+Sen bir Oracle SQL sorgu oluşturucususun. Aşağıdaki SQL sorgusu hata verdi. Hata mesajını ve veritabanı şemasını kullanarak sorguyu düzelt.
+SADECE düzeltilmiş SQL ifadesini döndür, başka hiçbir şey yazma. Açıklama gerekmez.
+
+VERİTABANI ŞEMASI (ilgili tablolar):
+{schema}
+
+ÖNEMLİ NOTLAR:
+1. Sadece şemada bulunan tablo ve sütun isimlerini kullanın.
+2. Sorgunun sonunda noktalı virgül (;) kullanmayın.
+3. Oracle SQL sözdizimine uygun yazın.
+
+Kullanici sorusu: {query}
+
+Hatalı SQL:
+{sql}
+
+Hata mesajı:
+{error}
+
+Düzeltilmiş SQL Sorgusu:
+"""
+
+# SQLite için prompt şablonları
+SQLITE_PROMPT_TEMPLATE = """
+Sen bir SQL sorgu oluşturucususun. Veritabanı şeması ve kullanıcının Türkçe sorusu verildiğinde, SQLite uyumlu bir SQL sorgusu oluştur. 
+SADECE SQL ifadesini döndür, başka hiçbir şey yazma. Açıklama gerekmez.
+
+VERİTABANI ŞEMASI:
+{schema}
+
+ÖNEMLİ NOTLAR:
+1. Tablo isimlerini doğru yazmaya dikkat edin (büyük/küçük harf duyarlı olabilir).
+2. Alan isimlerini tam olarak verildiği gibi kullanın.
+3. Tablolar arası ilişkileri doğru kurun (foreign key'leri kullanın).
+4. Sorgunun sonunda noktalı virgül (;) kullanmayın.
+5. SQLite sözdizimine uygun yazın.
+6. Sütun isimlerinde boşluk veya özel karakter varsa köşeli parantez içinde yazın (örneğin: [Unit Price]).
+
+Kullanici sorusu: {query}
+
+SQL Sorgusu:
+"""
+
+SQLITE_REPAIR_PROMPT_TEMPLATE = """
+Sen bir SQL sorgu oluşturucususun. Aşağıdaki SQLite sorgusu hata verdi. Hata mesajını ve veritabanı şemasını kullanarak sorguyu düzelt.
+SADECE düzeltilmiş SQL ifadesini döndür, başka hiçbir şey yazma. Açıklama gerekmez.
+
+VERİTABANI ŞEMASI (ilgili tablolar):
+{schema}
+
+Kullanici sorusu: {query}
+
+Hatalı SQL:
+{sql}
+
+Hata mesajı:
+{error}
+
+Düzeltilmiş SQL Sorgusu:
+"""
+
+# PostgreSQL için prompt şablonları
+POSTGRESQL_PROMPT_TEMPLATE = """
+Sen bir SQL sorgu oluşturucususun. Veritabanı şeması ve kullanıcının Türkçe sorusu verildiğinde, PostgreSQL uyumlu bir SQL sorgusu oluştur. 
+SADECE SQL ifadesini döndür, başka hiçbir şey yazma. Açıklama gerekmez.
+
+VERİTABANI ŞEMASI:
+{schema}
+
+ÖNEMLİ NOTLAR:
+1. Tablo ve alan isimlerini tam olarak verildiği gibi kullanın; büyük harf içerenleri çift tırnak içinde yazın.
+2. Tablolar arası ilişkileri doğru kurun (foreign key'leri kullanın).
+3. Sorgunun sonunda noktalı virgül (;) kullanmayın.
+4. PostgreSQL sözdizimine uygun yazın (satır sınırı için LIMIT kullanın).
+
+Kullanici sorusu: {query}
+
+SQL Sorgusu:
+"""
+
+POSTGRESQL_REPAIR_PROMPT_TEMPLATE = """
+Sen bir SQL sorgu oluşturucususun. Aşağıdaki PostgreSQL sorgusu hata verdi. Hata mesajını ve veritabanı şemasını kullanarak sorguyu düzelt.
+SADECE düzeltilmiş SQL ifadesini döndür, başka hiçbir şey yazma. Açıklama gerekmez.
+
+VERİTABANI ŞEMASI (ilgili tablolar):
+{schema}
+
+Kullanici sorusu: {query}
+
+Hatalı SQL:
+{sql}
+
+Hata mesajı:
+{error}
+
+Düzeltilmiş SQL Sorgusu:
+"""
+
+# Veritabanı türlerine (SQLAlchemy dialect adı) özgü ayarlar
+DIALECT_CONFIG = {
+    "oracle": {
+        "label": "Oracle",
+        "sqlglot": "oracle",                  # Yerel doğrulamada kullanılan sqlglot lehçesi
+        "prompt_template": SQL_PROMPT_TEMPLATE,
+        "repair_template": SQL_REPAIR_PROMPT_TEMPLATE,
+        "probe_sql": "SELECT 1 FROM DUAL",    # Bağlantı testi
+        "owner": ORACLE_CONFIG["username"].upper(),  # Şemanın okunacağı sahip
+        "bulk_schema": True                   # Katalogdan toplu şema çıkarma destekleniyor mu
+    },
+    "sqlite": {
+        "label": "SQLite",
+        "sqlglot": "sqlite",
+        "prompt_template": SQLITE_PROMPT_TEMPLATE,
+        "repair_template": SQLITE_REPAIR_PROMPT_TEMPLATE,
+        "probe_sql": "SELECT 1",
+        "owner": None,
+        "bulk_schema": True
+    },
+    "postgresql": {
+        "label": "PostgreSQL",
+        "sqlglot": "postgres",
+        "prompt_template": POSTGRESQL_PROMPT_TEMPLATE,
+        "repair_template": POSTGRESQL_REPAIR_PROMPT_TEMPLATE,
+        "probe_sql": "SELECT 1",
+        "owner": "public",
+        "bulk_schema": False                  # Şema SQLAlchemy inspector ile çıkarılır
+    }
+}
+
+# Arayüzlerin ortak kullandığı soru → SQL → sonuç hattı
+PIPELINE_CONFIG = {
+    "database_url": None,     # None: ORACLE_CONFIG; ör. "sqlite:///Northwind_small.sqlite"
+    "timings": True,          # Aşama sürelerini (şema → ... → gösterim) durum satırında göster
+    "stats_window": 1000      # Aşama istatistikleri için saklanan en fazla istek
+}
+
+# Ölçümler (/metrics) ve izleme (OpenTelemetry)
+TELEMETRY_CONFIG = {
+    "enabled": True,          # Aşama, model ve veritabanı ölçümlerini topla
+    "otel": False,            # opentelemetry-api kuruluysa span'leri OpenTelemetry'ye de gönder
+    "service_name": "sqlchat",
+    "prefix": "sqlchat",      # Prometheus metrik adlarının öneki
+    # Süre histogramlarının kova sınırları (saniye)
+    "duration_buckets": (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    # Token sayısı histogramlarının kova sınırları
+    "token_buckets": (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+}
@@ -0,0 +1,288 @@
+"""
+Üretilen SQL'i çalıştırmadan önce yürütme planına göre denetleyen modül.
+
+Modelin ürettiği hatalı bir JOIN üretim veritabanında saatlerce çalışabilir.
+Sorgu çalıştırılmadan önce Oracle'da EXPLAIN PLAN FOR, SQLite'ta EXPLAIN
+QUERY PLAN ile planı alınır; tahmini maliyet, satır sayısı ve tam tablo
+taramaları COST_GATE_CONFIG eşikleriyle karşılaştırılarak sorgu reddedilir,
+uyarıyla çalıştırılır veya satır sınırı eklenerek çalıştırılır. Planlar
+normalleştirilmiş SQL metnine göre önbelleğe alınır.
+"""
+import itertools
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .config import COST_GATE_CONFIG
+from .pagination import has_row_limit, is_select, limit_sql
+
+ALLOW = "allow"
+WARN = "warn"
+LIMIT = "limit"
+REFUSE = "refuse"
+
+class QueryRefusedError(Exception):
+    """Sorgu, yürütme planı eşikleri aştığı için çalıştırılmadı."""
+
+    def __init__(self, check: "PlanCheck"):
+        super().__init__("Sorgu çalıştırılmadı: " + "; ".join(check.reasons))
+        self.check = check
+
+class PlanCheck:
+    """Bir sorgunun plan denetiminin sonucu."""
+
+    def __init__(self, sql: str, action: str = ALLOW, cost: Optional[float] = None,
+                 cardinality: Optional[float] = None, full_scans: Optional[List[str]] = None,
+                 plan_text: str = "", reasons: Optional[List[str]] = None,
+                 rewritten_sql: Optional[str] = None, seconds: float = 0.0):
+        self.sql = sql
+        self.action = action
+        self.cost = cost
+        self.cardinality = cardinality
+        self.full_scans = full_scans or []
+        self.plan_text = plan_text
+        self.reasons = reasons or []
+        self.rewritten_sql = rewritten_sql  # LIMIT kararında çalıştırılacak SQL
+        self.seconds = seconds
+
+    @property
+    def refused(self) -> bool:
+        return self.action == REFUSE
+
+    @property
+    def sql_to_run(self) -> str:
+        return self.rewritten_sql or self.sql
+
+    def summary(self) -> str:
+        """Durum satırında gösterilecek kısa açıklama."""
+        if self.action == ALLOW:
+            return ""
+        labels = {WARN: "⚠ Uyarı", LIMIT: "⚠ Satır sınırı eklendi", REFUSE: "⛔ Reddedildi"}
+        return f"{labels[self.action]}: " + "; ".join(self.reasons)
+
+    def describe(self) -> str:
+        """Arayüzde SQL'in yanında gösterilecek plan metni."""
+        header = []
+        if self.cost is not None:
+            header.append(f"Tahmini maliyet: {self.cost:,.0f}")
+        if self.cardinality is not None:
+            header.append(f"Tahmini satır: {self.cardinality:,.0f}")
+        if self.full_scans:
+            header.append("Tam tarama: " + ", ".join(self.full_scans))
+        lines = [" | ".join(header)] if header else []
+        if self.summary():
+            lines.append(self.summary())
+        if self.plan_text:
+            lines.append(self.plan_text)
+        return "\n".join(lines)
+
+def normalize_sql(sql: str) -> str:
+    """Önbellek anahtarı için boşlukları ve sondaki noktalı virgülü normalleştirir."""
+    return " ".join(sql.split()).rstrip(";").rstrip()
+
+_statement_ids = itertools.count(1)
+
+def _explain_oracle(conn, sql: str) -> Tuple[Optional[float], Optional[float], List[str], str]:
+    """EXPLAIN PLAN FOR ile planı PLAN_TABLE'a yazar ve okur."""
+    statement_id = f"SQLGEN_{next(_statement_ids)}"
+    try:
+        conn.execute(text(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}"))
+        rows = conn.execute(text(
+            "SELECT id, depth, operation, options, object_name, cost, cardinality "
+            "FROM plan_table WHERE statement_id = :sid ORDER BY id"
+        ), {"sid": statement_id}).mappings().all()
+    finally:
+        # PLAN_TABLE'a eklenen satırlar işlemle birlikte geri alınır
+        conn.rollback()
+
+    cost = cardinality = None
+    full_scans = []
+    lines = []
+    for row in rows:
+        if row['id'] == 0:
+            cost, cardinality = row['cost'], row['cardinality']
+        operation = " ".join(p for p in (row['operation'], row['options']) if p)
+        if row['operation'] == 'TABLE ACCESS' and row['options'] == 'FULL' and row['object_name']:
+            full_scans.append(row['object_name'])
+        detail = f"{'  ' * (row['depth'] or 0)}{operation}"
+        if row['object_name']:
+            detail += f" {row['object_name']}"
+        metrics = []
+        if row['cardinality'] is not None:
+            metrics.append(f"satır={row['cardinality']:,}")
+        if row['cost'] is not None:
+            metrics.append(f"maliyet={row['cost']:,}")
+        if metrics:
+            detail += f"  ({', '.join(metrics)})"
+        lines.append(detail)
+    return cost, cardinality, full_scans, "\n".join(lines)
+
+_ALIAS_PATTERN = re.compile(
+    r'\b(?:FROM|JOIN)\s+("[^"]+"|[\w.$#]+)(?:\s+(?:AS\s+)?(?!(?:ON|USING|WHERE|JOIN|INNER|LEFT|RIGHT|'
+    r'FULL|CROSS|NATURAL|GROUP|ORDER|HAVING|LIMIT|UNION)\b)(\w+))?',
+    re.IGNORECASE
+)
+
+def _table_aliases(sql: str) -> Dict[str, str]:
+    """FROM/JOIN ifadelerindeki takma adları tablo adlarına eşler."""
+    aliases = {}
+    for table, alias in _ALIAS_PATTERN.findall(sql):
+        if alias:
+            aliases[alias.upper()] = table.strip('"')
+    return aliases
+
+def _explain_sqlite(conn, sql: str) -> Tuple[Optional[float], Optional[float], List[str], str]:
+    """EXPLAIN QUERY PLAN çıktısından tam tarama yapılan tabloları bulur.
+
+    SQLite maliyet veya satır tahmini vermez; sadece SCAN (tam tarama) ve
+    SEARCH (indeksle erişim) işaretleri kullanılır. Yeni SQLite sürümleri
+    planda tablo yerine takma adı yazdığı için takma adlar SQL'den çözülür.
+    """
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    aliases = _table_aliases(sql)
+    depths: Dict[int, int] = {}
+    full_scans = []
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth = depths.get(parent, -1) + 1
+        depths[node_id] = depth
+        lines.append(f"{'  ' * depth}{detail}")
+        match = re.match(r'SCAN (?:TABLE )?(\S+)', detail)
+        # "SCAN t USING COVERING INDEX" tabloyu değil indeksi tarar
+        if match and "INDEX" not in detail:
+            name = match.group(1)
+            full_scans.append(aliases.get(name.upper(), name))
+    return None, None, full_scans, "\n".join(lines)
+
+def _matching_tables(tables: List[str], names: Optional[List[str]]) -> List[str]:
+    """tables içinden names listesinde bulunanları (büyük/küçük harf duyarsız) döndürür."""
+    wanted = {n.upper() for n in names or []}
+    return [t for t in tables if t.upper() in wanted]
+
+def _decide(check: PlanCheck, dialect, config: Dict[str, Any]) -> PlanCheck:
+    """Plan metriklerini eşiklerle karşılaştırıp kararı verir."""
+    cost, rows = check.cost, check.cardinality
+    refuse_cost, refuse_rows = config.get("refuse_cost"), config.get("refuse_rows")
+    limit_rows, warn_cost = config.get("limit_rows"), config.get("warn_cost")
+
+    if refuse_cost is not None and cost is not None and cost > refuse_cost:
+        check.action = REFUSE
+        check.reasons.append(f"tahmini maliyet {cost:,.0f} > {refuse_cost:,}")
+    if refuse_rows is not None and rows is not None and rows > refuse_rows:
+        check.action = REFUSE
+        check.reasons.append(f"tahmini {rows:,.0f} satır > {refuse_rows:,}")
+    scanned = _matching_tables(check.full_scans, config.get("refuse_full_scan_tables"))
+    if scanned:
+        check.action = REFUSE
+        check.reasons.append("büyük tabloda tam tarama: " + ", ".join(scanned))
+    if check.refused:
+        return check
+
+    if limit_rows is not None and rows is not None and rows > limit_rows and not has_row_limit(check.sql):
+        check.action = LIMIT
+        version = getattr(dialect, "server_version_info", None) if dialect.name == "oracle" else None
+        check.rewritten_sql = limit_sql(check.sql, dialect.name, limit_rows, server_version=version)
+        check.reasons.append(f"tahmini {rows:,.0f} satır; ilk {limit_rows:,} satırla sınırlandı")
+        return check
+
+    if warn_cost is not None and cost is not None and cost > warn_cost:
+        check.action = WARN
+        check.reasons.append(f"tahmini maliyet yüksek ({cost:,.0f})")
+    scanned = check.full_scans if config.get("warn_full_scans", False) else \
+        _matching_tables(check.full_scans, config.get("warn_full_scan_tables"))
+    if scanned:
+        check.action = WARN
+        check.reasons.append("tam tablo taraması: " + ", ".join(scanned))
+    return check
+
+class PlanCache:
+    """Normalleştirilmiş SQL'e göre plan denetimlerini tutan LRU önbellek."""
+
+    def __init__(self, max_entries: int = 512, ttl: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, PlanCheck]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[PlanCheck]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.time() - entry[0] > self.ttl):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple[str, str], check: PlanCheck):
+        with self._lock:
+            self._entries[key] = (time.time(), check)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Süreç genelinde paylaşılan plan önbelleği
+PLAN_CACHE = PlanCache(COST_GATE_CONFIG.get("cache_size", 512), COST_GATE_CONFIG.get("cache_ttl", 3600))
+
+def check_plan(conn, sql: str, config: Optional[Dict[str, Any]] = None) -> PlanCheck:
+    """SQL'in yürütme planını alır ve eşiklere göre karar verir.
+
+    Plan alınamazsa (ör. PLAN_TABLE yetkisi yok) sorgu engellenmez; hata
+    sorgu çalıştırıldığında raporlanır.
+
+    Args:
+        conn: SQLAlchemy bağlantısı
+        sql: Denetlenecek SQL
+        config: Eşikler (varsayılan: COST_GATE_CONFIG)
+
+    Returns:
+        PlanCheck nesnesi
+    """
+    config = config or COST_GATE_CONFIG
+    if not config.get("enabled", True) or not is_select(sql):
+        return PlanCheck(sql)
+
+    sql = sql.strip().rstrip(";").rstrip()
+    key = (conn.engine.url.render_as_string(hide_password=True), normalize_sql(sql))
+    cached = PLAN_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    start = time.perf_counter()
+    dialect_name = conn.dialect.name
+    try:
+        if dialect_name == "oracle":
+            cost, cardinality, full_scans, plan_text = _explain_oracle(conn, sql)
+        elif dialect_name == "sqlite":
+            cost, cardinality, full_scans, plan_text = _explain_sqlite(conn, sql)
+        else:
+            return PlanCheck(sql)
+    except Exception as e:
+        return PlanCheck(sql, plan_text=f"Plan alınamadı: {e}")
+
+    check = PlanCheck(sql, cost=cost, cardinality=cardinality, full_scans=full_scans,
+                      plan_text=plan_text, seconds=time.perf_counter() - start)
+    check = _decide(check, conn.dialect, config)
+    PLAN_CACHE.put(key, check)
+    return check
+
+def gate_sql(conn, sql: str) -> str:
+    """Sorguyu denetler; reddedilirse QueryRefusedError yükseltir.
+
+    Returns:
+        Çalıştırılacak SQL (LIMIT kararında satır sınırı eklenmiş hali)
+    """
+    check = check_plan(conn, sql)
+    if check.refused:
+        raise QueryRefusedError(check)
+    return check.sql_to_run
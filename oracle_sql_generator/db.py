@@ -1,14 +1,30 @@
 """
 Veritabanı bağlantı ve işlemleri için modül.
 """
+import asyncio
 import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
 import oracledb
-from sqlalchemy import create_engine, text, inspect
-from sqlalchemy.engine import URL
-from typing import Dict, Any, List, Optional
+from sqlalchemy import create_engine, event, text, inspect
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool
+from typing import Dict, Any, List, Optional, Union
 import pandas as pd
 
-from .config import ORACLE_CONFIG
+from . import columnar
+from .cancellation import CancelToken, resolve_timeout, statement_deadline, statement_deadline_async
+from .config import ORACLE_CONFIG, PAGINATION_CONFIG, PIPELINE_CONFIG
+from .cost_gate import PlanCheck, check_plan, gate_sql
+from .dialects import get_dialect
+from .fetch_tuning import FETCH_STATS, before_cursor_execute
+from .pagination import ResultPage, fetch_page, is_select, read_capped
+from .result_cache import ResultCache, get_result_cache, make_result_key
+from .telemetry import instrument_engine, observe
+from .validation import ValidationResult, validate_sql
 
 # Oracle Instant Client yolunu ayarla
 ORACLE_CLIENT_DIR = r"C:\oracle\instantclient_19_19"  # Kendi kurulum yolunuza göre güncelleyin
@@ -21,6 +37,71 @@ except Exception as e:
     print(f"Oracle Client başlatılırken hata: {e}")
     print("Oracle Instant Client kurulu değil veya yolu yanlış olabilir.")
 
+
+class PoolStats:
+    """Bağlantı havuzu kullanım istatistiklerini tutar.
+
+    Havuzun boyutunu gerçek trafiğe göre ayarlayabilmek için bağlantı
+    alma/bırakma sayıları ve bağlantı beklerken geçen süreler toplanır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Tüm sayaçları sıfırlar."""
+        with self._lock:
+            self.connects = 0        # Açılan fiziksel bağlantı sayısı
+            self.checkouts = 0       # Havuzdan alınan bağlantı sayısı
+            self.checkins = 0        # Havuza geri bırakılan bağlantı sayısı
+            self.timeouts = 0        # pool_timeout süresinde bağlantı alınamayan istekler
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        """Bir bağlantı için havuzda beklenen süreyi kaydeder."""
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+        observe("db.pool_wait", seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'timeouts': self.timeouts,
+                'wait_count': self.wait_count,
+                'wait_total_s': self.wait_total,
+                'wait_avg_s': self.wait_total / self.wait_count if self.wait_count else 0.0,
+                'wait_max_s': self.wait_max,
+            }
+
+
+# Süreç genelinde paylaşılan engine kayıt defteri (URL -> engine)
+_ENGINES: Dict[str, Engine] = {}
+_ASYNC_ENGINES: Dict[str, AsyncEngine] = {}
+_POOL_STATS: Dict[str, PoolStats] = {}
+_ENGINE_LOCK = threading.Lock()
+
 def get_oracle_url() -> URL:
     """Oracle veritabanı için bağlantı URL'si oluşturur."""
     return URL.create(
@@ -32,51 +113,510 @@ def get_oracle_url() -> URL:
         service_name=ORACLE_CONFIG["service_name"]
     )
 
-def get_db_engine():
-    """Veritabanı bağlantısı için SQLAlchemy engine'ini döndürür."""
-    return create_engine(
-        get_oracle_url(),
-        thick_mode={
-            'lib_dir': ORACLE_CLIENT_DIR
-        },
-        max_identifier_length=128  # Oracle'ın maksimum tanımlayıcı uzunluğu
-    )
+def _attach_pool_listeners(engine: Engine, stats: PoolStats):
+    """Havuz olaylarını istatistik nesnesine bağlar."""
+    event.listen(engine, "connect", lambda *args: stats.record_connect())
+    event.listen(engine, "checkout", lambda *args: stats.record_checkout())
+    event.listen(engine, "checkin", lambda *args: stats.record_checkin())
+    # Sorgu başına seçilen arraysize/prefetchrows ayarlarını imlece uygula
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    # İfadelerin çalıştırılma süresi "db.execute" span'i olarak ölçülür
+    instrument_engine(engine)
+
+def get_db_engine(url: Union[str, URL, None] = None) -> Engine:
+    """Veritabanı bağlantısı için paylaşılan SQLAlchemy engine'ini döndürür.
+
+    Engine URL başına, süreçte bir kez oluşturulur; böylece her sorguda
+    yeni bir bağlantı kurulmaz. Oracle engine'i ORACLE_CONFIG'teki havuz
+    ayarlarıyla yapılandırılmış bir QueuePool kullanır.
+
+    Args:
+        url: Bağlanılacak veritabanı (ör. "sqlite:///Northwind_small.sqlite");
+            None ise PIPELINE_CONFIG["database_url"], o da yoksa ORACLE_CONFIG
+    """
+    url = url or PIPELINE_CONFIG.get("database_url") or get_oracle_url()
+    if isinstance(url, str):
+        url = make_url(url)
+    key = url.render_as_string(hide_password=False)
+
+    engine = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+
+    with _ENGINE_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            if url.get_backend_name() == "oracle":
+                engine = create_engine(
+                    url,
+                    thick_mode={
+                        'lib_dir': ORACLE_CLIENT_DIR
+                    },
+                    max_identifier_length=128,  # Oracle'ın maksimum tanımlayıcı uzunluğu
+                    arraysize=ORACLE_CONFIG.get("arraysize"),  # None: sürücü varsayılanı veya sorgu başına plan
+                    poolclass=QueuePool,
+                    pool_size=ORACLE_CONFIG.get("pool_size", 5),
+                    max_overflow=ORACLE_CONFIG.get("max_overflow", 10),
+                    pool_timeout=ORACLE_CONFIG.get("pool_timeout", 30),
+                    pool_pre_ping=ORACLE_CONFIG.get("pool_pre_ping", True),
+                    pool_recycle=ORACLE_CONFIG.get("pool_recycle", 1800)
+                )
+            else:
+                engine = create_engine(url)
+            stats = PoolStats()
+            _attach_pool_listeners(engine, stats)
+            _ENGINES[key] = engine
+            _POOL_STATS[key] = stats
+    return engine
+
+def _get_stats(engine: Engine) -> Optional[PoolStats]:
+    return _POOL_STATS.get(engine.url.render_as_string(hide_password=False))
+
+@contextmanager
+def connect(engine: Optional[Engine] = None, timeout: Optional[float] = None,
+            cancel: Optional[CancelToken] = None):
+    """Havuzdan bir bağlantı alır ve bekleme süresini kaydeder.
+
+    Args:
+        engine: Kullanılacak engine (varsayılan: paylaşılan Oracle engine'i)
+        timeout: Bağlantıdaki ifadelerin saniye cinsinden süre sınırı (None: sınırsız)
+        cancel: İsteğin iptal jetonu; iptal edilince süren ifade kesilir
+    """
+    engine = engine or get_db_engine()
+    stats = _get_stats(engine)
+
+    start = time.perf_counter()
+    try:
+        conn = engine.connect()
+    except sa_exc.TimeoutError:
+        if stats is not None:
+            stats.record_wait(time.perf_counter() - start, timed_out=True)
+        raise
+    if stats is not None:
+        stats.record_wait(time.perf_counter() - start)
+
+    try:
+        with statement_deadline(conn, timeout, cancel):
+            yield conn
+    finally:
+        conn.close()
+
+def _async_url(url: URL) -> Optional[URL]:
+    """Senkron URL'nin asyncio sürücülü karşılığını döndürür.
+    
+    python-oracledb'nin asyncio desteği sadece thin modda çalışır; Instant
+    Client ile thick mod başlatıldıysa veya aiosqlite kurulu değilse None
+    döndürülür.
+    """
+    if url.drivername == "oracle+oracledb":
+        if not oracledb.is_thin_mode():
+            return None
+        return url.set(drivername="oracle+oracledb_async")
+    if url.get_backend_name() == "sqlite":
+        try:
+            import aiosqlite  # noqa: F401
+        except ImportError:
+            return None
+        return url.set(drivername="sqlite+aiosqlite")
+    return None
+
+def get_async_engine(engine: Optional[Engine] = None) -> Optional[AsyncEngine]:
+    """Verilen engine ile aynı veritabanına bağlanan paylaşılan AsyncEngine'i döndürür.
+    
+    Args:
+        engine: Karşılığı istenen senkron engine (varsayılan: paylaşılan Oracle engine'i)
+        
+    Returns:
+        AsyncEngine veya sürücü asyncio desteklemiyorsa None
+    """
+    engine = engine or get_db_engine()
+    url = _async_url(engine.url)
+    if url is None:
+        return None
+    key = url.render_as_string(hide_password=False)
+    
+    async_engine = _ASYNC_ENGINES.get(key)
+    if async_engine is not None:
+        return async_engine
+    
+    with _ENGINE_LOCK:
+        async_engine = _ASYNC_ENGINES.get(key)
+        if async_engine is None:
+            if url.get_backend_name() == "oracle":
+                async_engine = create_async_engine(
+                    url,
+                    max_identifier_length=128,
+                    pool_size=ORACLE_CONFIG.get("pool_size", 5),
+                    max_overflow=ORACLE_CONFIG.get("max_overflow", 10),
+                    pool_timeout=ORACLE_CONFIG.get("pool_timeout", 30),
+                    pool_pre_ping=ORACLE_CONFIG.get("pool_pre_ping", True),
+                    pool_recycle=ORACLE_CONFIG.get("pool_recycle", 1800)
+                )
+            else:
+                async_engine = create_async_engine(url)
+            stats = PoolStats()
+            _attach_pool_listeners(async_engine.sync_engine, stats)
+            _ASYNC_ENGINES[key] = async_engine
+            _POOL_STATS[key] = stats
+    return async_engine
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Kayıtlı tüm engine'ler için havuz istatistiklerini döndürür.
+
+    Returns:
+        Parolası gizlenmiş URL'yi anahtar, havuz durumu ve sayaçları değer
+        olarak içeren sözlük
+    """
+    result = {}
+    engines = list(_ENGINES.items())
+    engines += [(key, engine.sync_engine) for key, engine in list(_ASYNC_ENGINES.items())]
+    for key, engine in engines:
+        pool = engine.pool
+        info = {
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+        }
+        info.update(_POOL_STATS[key].as_dict())
+        result[engine.url.render_as_string(hide_password=True)] = info
+    return result
+
+def get_fetch_stats() -> Dict[str, Any]:
+    """Oracle sorgularında getirilen satır ve ağ gidiş-dönüş sayılarını döndürür.
+    
+    Plandan tahmin edilen gidiş-dönüşler 'estimated_round_trips' alanlarında
+    bulunur; 'round_trips' sadece ORACLE_CONFIG["measure_round_trips"]
+    açıkken V$MYSTAT'tan ölçülen sorguları ('measured_queries') kapsar.
+    
+    Returns:
+        Toplam sorgu/satır/gidiş-dönüş sayıları ve son sorguların listesi
+        ('recent'); her kayıtta kullanılan arraysize ve prefetchrows bulunur
+    """
+    return FETCH_STATS.as_dict()
+
+def dispose_engines():
+    """Kayıtlı tüm engine'leri kapatır ve kayıt defterini temizler."""
+    with _ENGINE_LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+        for key in list(_POOL_STATS):
+            if key not in _ASYNC_ENGINES:
+                del _POOL_STATS[key]
+
+async def dispose_async_engines():
+    """Kayıtlı tüm AsyncEngine'leri kapatır."""
+    with _ENGINE_LOCK:
+        engines = list(_ASYNC_ENGINES.items())
+        _ASYNC_ENGINES.clear()
+        for key, _ in engines:
+            _POOL_STATS.pop(key, None)
+    for _, engine in engines:
+        await engine.dispose()
+
+def _result_cache_key(engine: Engine, sql: str, variant: str):
+    """Sonuç önbelleğini ve sorgunun anahtarını döndürür; önbellek kapalıysa (None, None)."""
+    cache = get_result_cache()
+    if cache is None:
+        return None, None
+    return cache, make_result_key(engine.url.render_as_string(hide_password=True), sql, variant)
+
+def _capped_variant() -> str:
+    return f"capped:{PAGINATION_CONFIG.get('max_rows', 10000)}"
+
+def _page_variant(page: int, page_size: Optional[int]) -> str:
+    return f"page:{max(0, int(page))}:{page_size or PAGINATION_CONFIG.get('page_size', 100)}"
+
+def _lookup_capped(cache: ResultCache, key: str) -> Optional[pd.DataFrame]:
+    """Önbellekteki satır sınırlı sonucu truncated bilgisiyle birlikte döndürür."""
+    hit = cache.lookup_frame(key)
+    if hit is None:
+        return None
+    df, meta = hit
+    df.attrs['truncated'] = meta.get('truncated', False)
+    return df
 
-def execute_query(sql: str):
+def _store_capped(cache: ResultCache, key: str, sql: str, df: pd.DataFrame):
+    cache.store_frame(key, sql, df, truncated=bool(df.attrs.get('truncated', False)))
+
+def _lookup_page(cache: ResultCache, key: str, sql: str, page: int,
+                 page_size: Optional[int]) -> Optional[ResultPage]:
+    hit = cache.lookup_frame(key)
+    if hit is None:
+        return None
+    df, meta = hit
+    return ResultPage(sql, df, max(0, int(page)), page_size or PAGINATION_CONFIG.get("page_size", 100),
+                      meta.get('has_more', False))
+
+def _store_page(cache: ResultCache, key: str, result: ResultPage):
+    cache.store_frame(key, result.sql, result.df, has_more=result.has_more)
+
+def _invalidate_results(sql: str):
+    """DML ifadesinin değiştirdiği tablolara dayanan önbellekteki sonuçları siler."""
+    cache = get_result_cache()
+    if cache is not None:
+        cache.invalidate_for(sql)
+
+def get_result_cache_stats() -> Dict[str, Any]:
+    """Sorgu sonucu önbelleğinin isabet/ıska sayaçlarını ve doluluğunu döndürür."""
+    cache = get_result_cache()
+    return cache.stats() if cache is not None else {}
+
+def execute_query(sql: str, engine: Optional[Engine] = None, timeout: Optional[float] = None,
+                  cancel: Optional[CancelToken] = None, use_cache: bool = True,
+                  schema: Optional[Dict[str, Any]] = None):
     """SQL sorgusunu çalıştır ve sonuçları döndür.
     
+    SELECT sorguları veritabanı tarafında PAGINATION_CONFIG["max_rows"]
+    satırla sınırlanır; sınıra ulaşıldıysa DataFrame'in attrs['truncated']
+    değeri True olur. SELECT sonuçları normalleştirilmiş SQL'e göre
+    önbelleğe alınır; DML ifadeleri değiştirdikleri tablolara dayanan
+    kayıtları siler.
+    
+    Args:
+        sql: Çalıştırılacak SQL sorgusu
+        engine: Kullanılacak engine (varsayılan: paylaşılan Oracle engine'i)
+        timeout: Saniye cinsinden süre sınırı (varsayılan: TIMEOUT_CONFIG)
+        cancel: İptal jetonu; iptal edilir veya süre dolarsa QueryCancelledError yükseltilir
+        use_cache: False ise sonuç önbellekten okunmaz (yeni sonuç yine de yazılır)
+        schema: İmleç parti boyu tahmini için engine'in şeması (yoksa None)
+        
+    Returns:
+        SELECT sorguları için DataFrame, diğerleri için etkilenen satır sayısı
+    """
+    engine = engine or get_db_engine()
+    if is_select(sql):
+        cache, key = _result_cache_key(engine, sql, _capped_variant())
+        if cache is not None and use_cache:
+            df = _lookup_capped(cache, key)
+            if df is not None:
+                return df
+        with connect(engine, resolve_timeout(timeout), cancel) as conn:
+            df = read_capped(conn, gate_sql(conn, sql), schema=schema)
+        if cache is not None:
+            _store_capped(cache, key, sql, df)
+        return df
+    
+    # DML işlemleri için
+    with connect(engine, resolve_timeout(timeout), cancel) as conn:
+        result = conn.execute(text(sql))
+        conn.commit()
+    _invalidate_results(sql)
+    return f"İşlem başarılı. Etkilenen satır sayısı: {result.rowcount}"
+
+def execute_query_page(sql: str, page: int = 0, page_size: Optional[int] = None,
+                       engine: Optional[Engine] = None, timeout: Optional[float] = None,
+                       cancel: Optional[CancelToken] = None, use_cache: bool = True,
+                       schema: Optional[Dict[str, Any]] = None) -> ResultPage:
+    """SELECT sorgusunun istenen sayfasını getirir.
+    
+    Args:
+        sql: Çalıştırılacak SELECT
+        page: 0'dan başlayan sayfa numarası
+        page_size: Sayfa başına satır (varsayılan: PAGINATION_CONFIG)
+        engine: Kullanılacak engine (varsayılan: paylaşılan Oracle engine'i)
+        timeout: Saniye cinsinden süre sınırı (varsayılan: TIMEOUT_CONFIG)
+        cancel: İptal jetonu
+        use_cache: False ise sayfa önbellekten okunmaz
+        schema: İmleç parti boyu tahmini için engine'in şeması (yoksa None)
+        
+    Returns:
+        ResultPage nesnesi
+    """
+    engine = engine or get_db_engine()
+    cache, key = _result_cache_key(engine, sql, _page_variant(page, page_size))
+    if cache is not None and use_cache:
+        result = _lookup_page(cache, key, sql, page, page_size)
+        if result is not None:
+            return result
+    with connect(engine, resolve_timeout(timeout), cancel) as conn:
+        result = fetch_page(conn, gate_sql(conn, sql), page, page_size, schema)
+    # Satır sınırı eklenmiş olsa da arayüz sonraki sayfaları asıl SQL ile ister
+    result.sql = sql
+    if cache is not None:
+        _store_page(cache, key, result)
+    return result
+
+def execute_query_arrow(sql: str, engine: Optional[Engine] = None, timeout: Optional[float] = None,
+                        cancel: Optional[CancelToken] = None):
+    """SELECT sonucunu satır satır Python nesnesine çevirmeden pyarrow.Table olarak getirir.
+    
+    Satır sınırı uygulanmaz; büyük sonuçlar için limit_sql ile
+    sınırlanmış bir sorgu veya export_query kullanın.
+    
+    Args:
+        sql: Çalıştırılacak SELECT
+        engine: Kullanılacak engine (varsayılan: paylaşılan Oracle engine'i)
+        timeout: Saniye cinsinden süre sınırı (varsayılan: TIMEOUT_CONFIG)
+        cancel: İptal jetonu
+        
+    Returns:
+        pyarrow.Table
+    """
+    if columnar.pa is None:
+        raise ImportError("Arrow ile getirme için pyarrow gerekli: pip install pyarrow")
+    with connect(engine, resolve_timeout(timeout), cancel) as conn:
+        return columnar.fetch_table(conn, gate_sql(conn, sql))
+
+@asynccontextmanager
+async def _connect_async(async_engine: AsyncEngine, timeout: Optional[float] = None,
+                         cancel: Optional[CancelToken] = None):
+    """connect()'in AsyncEngine karşılığı; bekleme süresini kaydeder."""
+    stats = _POOL_STATS.get(async_engine.url.render_as_string(hide_password=False))
+    start = time.perf_counter()
+    try:
+        conn = await async_engine.connect()
+    except sa_exc.TimeoutError:
+        if stats is not None:
+            stats.record_wait(time.perf_counter() - start, timed_out=True)
+        raise
+    if stats is not None:
+        stats.record_wait(time.perf_counter() - start)
+    
+    try:
+        async with statement_deadline_async(conn, timeout, cancel):
+            yield conn
+    finally:
+        await conn.close()
+
+async def execute_query_async(sql: str, engine: Optional[Engine] = None, timeout: Optional[float] = None,
+                              cancel: Optional[CancelToken] = None, use_cache: bool = True,
+                              schema: Optional[Dict[str, Any]] = None):
+    """execute_query'nin asyncio sürümü.
+    
+    Sürücü asyncio destekliyorsa sorgu AsyncEngine üzerinden çalıştırılır ve
+    beklerken olay döngüsü serbest kalır. Desteklemiyorsa (ör. thick mod)
+    senkron sorgu ayrı bir iş parçacığında çalıştırılır.
+    
     Args:
         sql: Çalıştırılacak SQL sorgusu
+        engine: Kullanılacak senkron engine (varsayılan: paylaşılan Oracle engine'i)
+        timeout: Saniye cinsinden süre sınırı (varsayılan: TIMEOUT_CONFIG)
+        cancel: İptal jetonu
+        use_cache: False ise sonuç önbellekten okunmaz
+        schema: İmleç parti boyu tahmini için engine'in şeması (yoksa None)
         
     Returns:
         SELECT sorguları için DataFrame, diğerleri için etkilenen satır sayısı
     """
-    engine = get_db_engine()
-    with engine.connect() as conn:
-        # Sadece SELECT sorguları için pandas kullan
-        if sql.strip().upper().startswith('SELECT'):
-            return pd.read_sql_query(text(sql), conn)
-        else:
-            # DML işlemleri için
-            result = conn.execute(text(sql))
-            conn.commit()
-            return f"İşlem başarılı. Etkilenen satır sayısı: {result.rowcount}"
-
-def test_connection() -> bool:
-    """Veritabanı bağlantısını test eder."""
+    engine = engine or get_db_engine()
+    async_engine = get_async_engine(engine)
+    if async_engine is None:
+        return await asyncio.to_thread(execute_query, sql, engine, timeout, cancel, use_cache, schema)
+    
+    if is_select(sql):
+        # Önbellek disk katmanı dosya okuduğu için olay döngüsü dışında çalışır
+        cache, key = _result_cache_key(engine, sql, _capped_variant())
+        if cache is not None and use_cache:
+            df = await asyncio.to_thread(_lookup_capped, cache, key)
+            if df is not None:
+                return df
+        async with _connect_async(async_engine, resolve_timeout(timeout), cancel) as conn:
+            df = await conn.run_sync(
+                lambda sync_conn: read_capped(sync_conn, gate_sql(sync_conn, sql), schema=schema)
+            )
+        if cache is not None:
+            await asyncio.to_thread(_store_capped, cache, key, sql, df)
+        return df
+    
+    async with _connect_async(async_engine, resolve_timeout(timeout), cancel) as conn:
+        result = await conn.execute(text(sql))
+        await conn.commit()
+    await asyncio.to_thread(_invalidate_results, sql)
+    return f"İşlem başarılı. Etkilenen satır sayısı: {result.rowcount}"
+
+async def execute_query_page_async(sql: str, page: int = 0, page_size: Optional[int] = None,
+                                   engine: Optional[Engine] = None, timeout: Optional[float] = None,
+                                   cancel: Optional[CancelToken] = None, use_cache: bool = True,
+                                   schema: Optional[Dict[str, Any]] = None) -> ResultPage:
+    """execute_query_page'in asyncio sürümü."""
+    engine = engine or get_db_engine()
+    async_engine = get_async_engine(engine)
+    if async_engine is None:
+        return await asyncio.to_thread(execute_query_page, sql, page, page_size, engine, timeout, cancel,
+                                       use_cache, schema)
+    
+    cache, key = _result_cache_key(engine, sql, _page_variant(page, page_size))
+    if cache is not None and use_cache:
+        result = await asyncio.to_thread(_lookup_page, cache, key, sql, page, page_size)
+        if result is not None:
+            return result
+    async with _connect_async(async_engine, resolve_timeout(timeout), cancel) as conn:
+        result = await conn.run_sync(
+            lambda sync_conn: fetch_page(sync_conn, gate_sql(sync_conn, sql), page, page_size, schema)
+        )
+    result.sql = sql
+    if cache is not None:
+        await asyncio.to_thread(_store_page, cache, key, result)
+    return result
+
+def check_query_cost(sql: str, engine: Optional[Engine] = None, timeout: Optional[float] = None,
+                     cancel: Optional[CancelToken] = None) -> PlanCheck:
+    """SQL'in yürütme planını alıp COST_GATE_CONFIG eşiklerine göre değerlendirir.
+    
+    Sonuç normalleştirilmiş SQL'e göre önbelleğe alınır; aynı sorgu
+    çalıştırılırken plan tekrar alınmaz.
+    
+    Args:
+        sql: Denetlenecek SQL
+        engine: Kullanılacak engine (varsayılan: paylaşılan Oracle engine'i)
+        timeout: Saniye cinsinden süre sınırı (varsayılan: TIMEOUT_CONFIG)
+        cancel: İptal jetonu
+        
+    Returns:
+        PlanCheck nesnesi (karar, maliyet, tahmini satır, plan metni)
+    """
+    with connect(engine, resolve_timeout(timeout), cancel) as conn:
+        return check_plan(conn, sql)
+
+async def check_query_cost_async(sql: str, engine: Optional[Engine] = None, timeout: Optional[float] = None,
+                                 cancel: Optional[CancelToken] = None) -> PlanCheck:
+    """check_query_cost'un asyncio sürümü."""
+    async_engine = get_async_engine(engine)
+    if async_engine is None:
+        return await asyncio.to_thread(check_query_cost, sql, engine, timeout, cancel)
+    
+    async with _connect_async(async_engine, resolve_timeout(timeout), cancel) as conn:
+        return await conn.run_sync(lambda sync_conn: check_plan(sync_conn, sql))
+
+def validate_query(sql: str, schema: Optional[Dict[str, Any]] = None,
+                   engine: Optional[Engine] = None) -> ValidationResult:
+    """SQL'i veritabanına gitmeden engine'in lehçesinde ayrıştırıp şemaya göre denetler.
+    
+    Args:
+        sql: Doğrulanacak SQL
+        schema: extract_schema() ile alınan şema sözlüğü (None: tablo/sütun denetimi yok)
+        engine: Kullanılacak engine (varsayılan: paylaşılan Oracle engine'i)
+        
+    Returns:
+        ValidationResult nesnesi; geçerliyse çalıştırılacak SQL sql_to_run'dadır
+    """
+    engine = engine or get_db_engine()
+    return validate_sql(sql, schema, get_dialect(engine).sqlglot)
+
+def test_connection(engine: Optional[Engine] = None) -> bool:
+    """Veritabanı bağlantısını test eder.
+    
+    Args:
+        engine: Kullanılacak engine (varsayılan: paylaşılan engine)
+    """
+    engine = engine or get_db_engine()
+    dialect = get_dialect(engine)
     try:
-        engine = get_db_engine()
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT 1 FROM DUAL")).scalar()
+        with connect(engine) as conn:
+            result = conn.execute(text(dialect.probe_sql)).scalar()
             if result == 1:
-                print("Oracle veritabanına başarıyla bağlanıldı.")
+                print(f"{dialect.label} veritabanına başarıyla bağlanıldı.")
                 return True
             return False
     except Exception as e:
         print(f"Veritabanı bağlantı hatası: {e}")
         print("Lütfen aşağıdakileri kontrol edin:")
-        print(f"1. Oracle Instant Client yolu doğru mu? ({ORACLE_CLIENT_DIR})")
-        print("2. Veritabanı bilgileri doğru mu?")
-        print("3. Ağ bağlantısı var mı?")
+        checks = ["Veritabanı bilgileri doğru mu?", "Ağ bağlantısı var mı?"]
+        if dialect.name == "oracle":
+            checks.insert(0, f"Oracle Instant Client yolu doğru mu? ({ORACLE_CLIENT_DIR})")
+        for i, check in enumerate(checks, 1):
+            print(f"{i}. {check}")
         print(f"Hata detayı: {str(e)}")
         return False
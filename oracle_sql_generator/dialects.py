@@ -0,0 +1,61 @@
+"""
+Veritabanı türlerine (lehçelere) özgü ayarlar.
+
+Prompt şablonları, yerel doğrulamanın sqlglot lehçesi, bağlantı testi
+sorgusu ve şemanın okunacağı sahip DIALECT_CONFIG'te tutulur. Engine'in
+SQLAlchemy dialect adından ilgili ayarlar get_dialect() ile alınır; yeni bir
+veritabanı türü DIALECT_CONFIG'e bir kayıt ya da register_dialect() ile
+eklenir.
+"""
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy.engine import Engine
+
+from .config import DIALECT_CONFIG
+
+class Dialect:
+    """Bir veritabanı türünün hat (pipeline) tarafından kullanılan ayarları."""
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.label = config.get("label", name)
+        self.sqlglot = config.get("sqlglot", name)
+        self.prompt_template = config["prompt_template"]
+        self.repair_template = config["repair_template"]
+        self.probe_sql = config.get("probe_sql", "SELECT 1")
+        self.owner = config.get("owner")
+        self.bulk_schema = config.get("bulk_schema", False)
+
+    def __repr__(self) -> str:
+        return f"Dialect({self.name!r})"
+
+def register_dialect(name: str, config: Dict[str, Any]):
+    """Yeni bir veritabanı türünü (SQLAlchemy dialect adıyla) kaydeder.
+
+    Args:
+        name: SQLAlchemy dialect adı (ör. "mysql")
+        config: DIALECT_CONFIG kayıtlarıyla aynı anahtarları taşıyan sözlük
+    """
+    DIALECT_CONFIG[name] = config
+
+def get_dialect(source: Union[str, Engine, None] = None) -> Dialect:
+    """Engine'e veya dialect adına göre lehçe ayarlarını döndürür.
+
+    Args:
+        source: Engine, bağlantı ya da SQLAlchemy dialect adı (None: "oracle")
+
+    Raises:
+        ValueError: Lehçe DIALECT_CONFIG'te kayıtlı değilse
+    """
+    if source is None:
+        name = "oracle"
+    elif isinstance(source, str):
+        name = source
+    else:
+        name = source.dialect.name
+    config: Optional[Dict[str, Any]] = DIALECT_CONFIG.get(name)
+    if config is None:
+        raise ValueError(
+            f"Desteklenmeyen veritabanı türü: {name} (desteklenenler: {', '.join(DIALECT_CONFIG)})"
+        )
+    return Dialect(name, config)
@@ -0,0 +1,274 @@
+"""
+Sorgu sonuçlarını parça parça dosyaya aktarmak için modül.
+
+save_temp_csv tüm sonucu önce bir DataFrame'e, sonra bir kez de bayt
+olarak belleğe alır; on milyonlarca satırlık bir dışa aktarımda bu iki
+kopya belleği tüketir. Burada sonuç sunucu tarafı imleçle chunk_size
+satırlık parçalar halinde çekilir ve her parça gelir gelmez CSV, gzip'li
+CSV veya Parquet dosyasına yazılır; bellekte aynı anda tek bir parça
+bulunur. Arrow ile getirme açıksa parçalar pyarrow.RecordBatch olarak
+gelir ve DataFrame'e çevrilmeden yazılır.
+"""
+import codecs
+import gzip
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from . import columnar
+from .cancellation import CancelToken, resolve_timeout
+from .config import EXPORT_CONFIG
+from .cost_gate import LIMIT, QueryRefusedError, check_plan
+from .db import connect
+from .fetch_tuning import FetchPlan, FetchTracker, plan_fetch
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Desteklenen biçimler ve dosya uzantıları
+EXPORT_FORMATS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "parquet": ".parquet",
+}
+
+def peak_rss_mb() -> Optional[float]:
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımını (MB) döndürür."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS bayt cinsinden döndürür
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class ExportStats:
+    """Bir dışa aktarımın satır sayısı, süresi ve bellek kullanımı."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.format = fmt
+        self.rows = 0
+        self.chunks = 0
+        self.seconds = 0.0
+        self.first_chunk_seconds = None  # İlk parçanın dosyaya yazıldığı an
+        self.peak_rss_mb = None
+        self.estimated_rows = None  # Yürütme planının satır tahmini
+        # Plan denetimi ekrandaki sonuca satır sınırı ekleyecek kadar büyük bir
+        # sonuç öngördü; dışa aktarım bu sınırı uygulamaz, tüm satırları yazar
+        self.row_limit_skipped = False
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def file_size_mb(self) -> float:
+        return os.path.getsize(self.path) / (1024 * 1024) if os.path.exists(self.path) else 0.0
+
+    def describe(self) -> str:
+        """Arayüzde gösterilecek kısa özet."""
+        summary = (f"{self.rows:,} satır {self.seconds:.1f} sn'de dışa aktarıldı "
+                   f"({self.rows_per_sec:,.0f} satır/sn, {self.file_size_mb:.1f} MB)")
+        if self.peak_rss_mb is not None:
+            summary += f", en yüksek bellek {self.peak_rss_mb:.0f} MB"
+        if self.row_limit_skipped:
+            summary += "; ekrandaki sonuç satır sınırlıydı, dosyada tüm satırlar var"
+        return summary
+
+    def as_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'format': self.format,
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'seconds': self.seconds,
+            'first_chunk_seconds': self.first_chunk_seconds,
+            'rows_per_sec': self.rows_per_sec,
+            'file_size_mb': self.file_size_mb,
+            'peak_rss_mb': self.peak_rss_mb,
+            'estimated_rows': self.estimated_rows,
+            'row_limit_skipped': self.row_limit_skipped,
+        }
+
+class _CSVWriter:
+    """Parçaları düz veya gzip'li CSV dosyasına ekler; başlık bir kez yazılır.
+
+    RecordBatch parçaları pyarrow'un CSV yazıcısıyla, DataFrame parçaları
+    pandas ile yazılır.
+    """
+
+    def __init__(self, path: str, compress: bool):
+        if compress:
+            self._file = gzip.open(path, "wb", compresslevel=6)
+        else:
+            self._file = open(path, "wb")
+        # Excel'in Türkçe karakterleri doğru açması için UTF-8 BOM
+        self._file.write(codecs.BOM_UTF8)
+        self._header = True
+
+    def write(self, chunk):
+        if isinstance(chunk, pd.DataFrame):
+            chunk.to_csv(self._file, index=False, header=self._header, encoding="utf-8")
+        else:
+            from pyarrow import csv as pa_csv
+            pa_csv.write_csv(chunk, self._file, write_options=pa_csv.WriteOptions(include_header=self._header))
+        self._header = False
+
+    def close(self):
+        self._file.close()
+
+class _ParquetWriter:
+    """Her parçayı Parquet dosyasına ayrı bir satır grubu olarak yazar."""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet dışa aktarımı için pyarrow gerekli: pip install pyarrow")
+        self._pa = pa
+        self._pq = pq
+        self._path = path
+        self._writer = None
+
+    def _first_schema(self, table):
+        # İlk parçada tamamen boş olan sütunlar null tipinde gelir; sonraki
+        # parçalarda değer çıkınca şema uyuşmasın diye metin kabul edilir
+        pa = self._pa
+        fields = [
+            pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+            for f in table.schema
+        ]
+        return pa.schema(fields)
+
+    def write(self, chunk):
+        pa = self._pa
+        if isinstance(chunk, pd.DataFrame):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+        else:
+            table = pa.Table.from_batches([chunk])
+        if self._writer is None:
+            schema = self._first_schema(table)
+            self._writer = self._pq.ParquetWriter(self._path, schema, compression="snappy")
+        table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is None:
+            # Sonuç boşsa da geçerli bir dosya oluştur
+            self._pq.write_table(self._pa.table({}), self._path)
+        else:
+            self._writer.close()
+
+def _open_writer(path: str, fmt: str):
+    if fmt == "csv":
+        return _CSVWriter(path, compress=False)
+    if fmt == "csv.gz":
+        return _CSVWriter(path, compress=True)
+    if fmt == "parquet":
+        return _ParquetWriter(path)
+    raise ValueError(f"Desteklenmeyen dışa aktarım biçimi: {fmt} (desteklenenler: {', '.join(EXPORT_FORMATS)})")
+
+def iter_chunks(conn, sql: str, chunk_size: int, plan: Optional[FetchPlan] = None) -> Iterator:
+    """SELECT sonucunu chunk_size satırlık parçalar halinde getirir.
+
+    Arrow ile getirme açıksa parçalar RecordBatch, değilse DataFrame olur.
+    pandas yolunda stream_results ile sunucu tarafı imleç kullanılır;
+    sürücü satırları fetchmany ile arraysize kadar getirir ve sonucun
+    tamamını önceden belleğe almaz.
+    """
+    if columnar.available():
+        yield from columnar.iter_record_batches(conn, sql, chunk_size, plan)
+        return
+    conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size, fetch_plan=plan)
+    yield from pd.read_sql_query(text(sql), conn, chunksize=chunk_size)
+
+def export_query(sql: str, fmt: Optional[str] = None, path: Optional[str] = None,
+                 engine: Optional[Engine] = None, chunk_size: Optional[int] = None,
+                 progress: Optional[Callable[[ExportStats], None]] = None,
+                 timeout: Optional[float] = None, cancel: Optional[CancelToken] = None,
+                 schema: Optional[Dict[str, Any]] = None) -> ExportStats:
+    """SELECT sonucunu parça parça dosyaya yazar.
+
+    Sorgu önce plan denetiminden geçer ve eşikleri aşıyorsa QueryRefusedError
+    yükseltilir; ekrandaki sonuca eklenen satır sınırı burada uygulanmaz.
+    Dosya sorgu hâlâ veri çekerken oluşmaya başlar. Yazım '.part' uzantılı
+    bir dosyaya yapılır ve sadece başarıyla biterse asıl adına taşınır;
+    yarıda kalan bir dışa aktarım indirilebilir görünmez.
+
+    Args:
+        sql: Çalıştırılacak SELECT
+        fmt: "csv", "csv.gz" veya "parquet" (varsayılan: EXPORT_CONFIG)
+        path: Hedef dosya (varsayılan: geçici klasörde yeni bir dosya)
+        engine: Kullanılacak engine (varsayılan: paylaşılan Oracle engine'i)
+        chunk_size: Parça başına satır (varsayılan: EXPORT_CONFIG)
+        progress: Her parçadan sonra güncel istatistikle çağrılır
+        timeout: Saniye cinsinden süre sınırı (varsayılan: TIMEOUT_CONFIG["export_timeout"])
+        cancel: İptal jetonu; iptal edilirse QueryCancelledError yükseltilir
+        schema: İmleç parti boyu tahmini için engine'in şeması (yoksa None)
+
+    Returns:
+        ExportStats nesnesi
+    """
+    fmt = fmt or EXPORT_CONFIG.get("format", "csv")
+    chunk_size = chunk_size or EXPORT_CONFIG.get("chunk_size", 50000)
+    created = path is None
+    if created:
+        fd, path = tempfile.mkstemp(prefix="oracle_query_result_", suffix=EXPORT_FORMATS.get(fmt, ""),
+                                    dir=EXPORT_CONFIG.get("dir"))
+        os.close(fd)
+
+    stats = ExportStats(path, fmt)
+    part_path = path + ".part"
+    try:
+        writer = _open_writer(part_path, fmt)
+    except Exception:
+        if created:
+            os.remove(path)
+        raise
+    # Satır sayısı bilinmediği için parti boyu sadece satır genişliğinden seçilir
+    plan = plan_fetch(sql, schema)
+    start = time.perf_counter()
+    try:
+        with connect(engine, resolve_timeout(timeout, "export_timeout"), cancel) as conn, \
+                FetchTracker(conn, sql, plan) as tracker:
+            # Plan eşiklerini aşan sorgu reddedilir; LIMIT kararı sadece ekranda
+            # gösterilen sonuç içindir, dışa aktarım sonucun tamamını yazar
+            check = check_plan(conn, sql)
+            if check.refused:
+                raise QueryRefusedError(check)
+            stats.estimated_rows = check.cardinality
+            stats.row_limit_skipped = check.action == LIMIT
+            for chunk in iter_chunks(conn, sql, chunk_size, plan):
+                if cancel is not None:
+                    cancel.check()
+                writer.write(chunk)
+                stats.rows += chunk.num_rows if hasattr(chunk, "num_rows") else len(chunk)
+                stats.chunks += 1
+                stats.seconds = time.perf_counter() - start
+                if stats.first_chunk_seconds is None:
+                    stats.first_chunk_seconds = stats.seconds
+                if progress is not None:
+                    progress(stats)
+            tracker.rows = stats.rows
+        writer.close()
+        writer = None
+        os.replace(part_path, path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(part_path):
+            os.remove(part_path)
+            if created and os.path.exists(path):
+                os.remove(path)
+
+    stats.seconds = time.perf_counter() - start
+    stats.peak_rss_mb = peak_rss_mb()
+    return stats
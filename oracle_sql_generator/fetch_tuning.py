@@ -0,0 +1,295 @@
+"""
+Oracle imleçlerinin arraysize/prefetchrows ayarları için modül.
+
+python-oracledb varsayılan olarak her ağ gidiş-dönüşünde (round-trip) 100
+satır getirir; 100.000 satırlık bir sonuç 1000 gidiş-dönüş demektir.
+Parti büyüdükçe gidiş-dönüş azalır ama sürücü her sütun için beyan edilen
+genişlik x arraysize kadar tampon ayırır. Burada parti boyu, çağıranın
+verdiği şemadaki sütun tiplerinden tahmin edilen satır genişliğine ve
+beklenen satır sayısına göre seçilir. Her sorgunun gidiş-dönüş sayısı
+plandan tahmin edilerek kaydedilir; measure_round_trips açıksa ölçülen
+değer ayrıca kaydedilir.
+"""
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .config import ORACLE_CONFIG
+from .utils import sql_skeleton
+
+# Tipi bilinmeyen sütun/ifade için varsayılan genişlik (bayt); NUMBER ile aynı
+_DEFAULT_WIDTH = 22
+# Beyan edilen uzunluk bundan büyükse tampon hesabında bu kadar sayılır
+_MAX_COLUMN_WIDTH = 4000
+
+# Sabit genişlikli tiplerin sürücü tamponundaki yaklaşık boyutu (bayt)
+_TYPE_WIDTHS = {
+    'NUMBER': 22, 'INTEGER': 22, 'INT': 8, 'SMALLINT': 8, 'BIGINT': 8,
+    'FLOAT': 22, 'REAL': 8, 'DOUBLE': 8, 'BINARY_FLOAT': 4, 'BINARY_DOUBLE': 8,
+    'NUMERIC': 22, 'DECIMAL': 22, 'BOOLEAN': 1,
+    'DATE': 7, 'DATETIME': 7, 'TIMESTAMP': 11,
+    'CLOB': _MAX_COLUMN_WIDTH, 'NCLOB': _MAX_COLUMN_WIDTH, 'BLOB': _MAX_COLUMN_WIDTH,
+    'LONG': _MAX_COLUMN_WIDTH, 'TEXT': 256, 'ROWID': 18,
+}
+
+def column_width(type_name: str) -> int:
+    """Sütun tipinden bir değerin sürücü tamponundaki yaklaşık boyutunu döndürür."""
+    type_name = (type_name or "").upper()
+    # VARCHAR2(50 CHAR), CHAR(10), RAW(16) gibi uzunluk beyan eden tipler
+    match = re.match(r'N?(VAR)?CHAR2?\s*\(\s*(\d+)|N?VARCHAR\s*\(\s*(\d+)|RAW\s*\(\s*(\d+)', type_name)
+    if match:
+        length = int(next(g for g in match.groups()[1:] if g))
+        if " CHAR" in type_name or type_name.startswith("N"):
+            length *= 4  # Karakter başına en fazla 4 bayt (AL32UTF8)
+        return min(length, _MAX_COLUMN_WIDTH)
+    base = re.match(r'[A-Z_]+', type_name)
+    if base is None:
+        return _DEFAULT_WIDTH
+    return _TYPE_WIDTHS.get(base.group(0), _DEFAULT_WIDTH)
+
+def _referenced_tables(sql: str, schema: Dict[str, Any]) -> List[str]:
+    """SQL'de geçen ve şemada bulunan tablo adlarını döndürür."""
+    identifiers = {w.upper() for w in re.findall(r'[A-Za-z_][A-Za-z0-9_$#]*', sql)}
+    return [name for name in schema.get('tables', {}) if name.upper() in identifiers]
+
+def estimate_row_width(sql: str, schema: Optional[Dict[str, Any]] = None) -> int:
+    """Sorgunun döndüreceği bir satırın yaklaşık genişliğini (bayt) tahmin eder.
+
+    SELECT listesinde * varsa sorguda geçen tabloların tüm sütunları, yoksa
+    listede adı geçen sütunlar toplanır. Şema yoksa veya eşleşme
+    bulunamazsa sütun başına varsayılan genişlik kullanılır.
+    """
+    skeleton = sql_skeleton(sql)
+    match = re.search(r'\bSELECT\b(.*?)\bFROM\b', skeleton, re.IGNORECASE | re.DOTALL)
+    select_list = match.group(1) if match else skeleton
+    item_count = max(1, select_list.count(",") + 1)
+    if not schema:
+        return item_count * _DEFAULT_WIDTH
+
+    tables = _referenced_tables(sql, schema)
+    columns = {}
+    for name in tables:
+        for col in schema['tables'][name]['columns']:
+            columns.setdefault(col['name'].upper(), column_width(col['type']))
+
+    if '*' in select_list.replace('(*)', ''):
+        return max(_DEFAULT_WIDTH, sum(
+            column_width(col['type']) for name in tables for col in schema['tables'][name]['columns']
+        ))
+
+    width = 0
+    for item in select_list.split(","):
+        # "t.AD AS MUSTERI" gibi ifadelerde ilk eşleşen sütun adı sayılır
+        words = [w.upper() for w in re.findall(r'[A-Za-z_][A-Za-z0-9_$#]*', item)]
+        width += next((columns[w] for w in words if w in columns), _DEFAULT_WIDTH)
+    return max(width, _DEFAULT_WIDTH)
+
+class FetchPlan:
+    """Bir sorgu için seçilen imleç ayarları."""
+
+    def __init__(self, arraysize: int, prefetchrows: int, row_width: int,
+                 expected_rows: Optional[int] = None):
+        self.arraysize = arraysize
+        self.prefetchrows = prefetchrows
+        self.row_width = row_width
+        self.expected_rows = expected_rows
+
+    def round_trips(self, rows: int) -> int:
+        """rows satır getirmek için gereken yaklaşık gidiş-dönüş sayısı.
+
+        execute ilk prefetchrows satırı tek gidiş-dönüşte getirir; sonrası
+        arraysize'lık partiler halinde gelir. Son parti tam doluysa sonucun
+        bittiğini anlamak için bir gidiş-dönüş daha gerekir.
+        """
+        remaining = rows - self.prefetchrows
+        if remaining < 0:
+            return 1
+        return 1 + remaining // self.arraysize + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'arraysize': self.arraysize,
+            'prefetchrows': self.prefetchrows,
+            'row_width': self.row_width,
+            'expected_rows': self.expected_rows,
+        }
+
+def plan_fetch(sql: str, schema: Optional[Dict[str, Any]],
+               expected_rows: Optional[int] = None,
+               config: Optional[Dict[str, Any]] = None) -> FetchPlan:
+    """Sorgu için arraysize ve prefetchrows değerlerini seçer.
+
+    ORACLE_CONFIG'te sabit değer verildiyse o kullanılır. Aksi halde:
+
+    - Beklenen sonucun tamamı (ör. bir sayfa) fetch_buffer_bytes'a sığıyorsa
+      arraysize beklenen satır sayısına, prefetchrows bir fazlasına
+      ayarlanır; sonuç execute ile tek gidiş-dönüşte gelir.
+    - Sığmıyorsa veya satır sayısı bilinmiyorsa parti boyu, bir partinin
+      tamponu fetch_buffer_bytes'ı aşmayacak şekilde satır genişliğinden
+      hesaplanır.
+
+    Args:
+        sql: Çalıştırılacak SELECT
+        schema: Satır genişliği için sorgunun çalışacağı veritabanının şeması
+            (yoksa None; sütun başına varsayılan genişlik kullanılır)
+        expected_rows: Dönmesi beklenen en fazla satır (bilinmiyorsa None)
+        config: Ayarlar (varsayılan: ORACLE_CONFIG)
+    """
+    config = config or ORACLE_CONFIG
+    row_width = estimate_row_width(sql, schema)
+    minimum = config.get("min_arraysize", 100)
+    maximum = config.get("max_arraysize", 10000)
+
+    budget = config.get("fetch_buffer_bytes", 8 * 1024 * 1024)
+    single_round_trip = (
+        config.get("fetch_autotune", True) and expected_rows is not None
+        and expected_rows * row_width <= budget
+    )
+
+    arraysize = config.get("arraysize")
+    if arraysize is None:
+        if single_round_trip:
+            arraysize = max(1, min(expected_rows, maximum))
+        elif config.get("fetch_autotune", True):
+            arraysize = max(minimum, min(maximum, budget // row_width))
+        else:
+            arraysize = minimum
+
+    prefetchrows = config.get("prefetchrows")
+    if prefetchrows is None:
+        # Sonucun bittiğini aynı gidiş-dönüşte görmek için bir satır fazlası
+        prefetchrows = expected_rows + 1 if single_round_trip else arraysize
+    return FetchPlan(int(arraysize), int(prefetchrows), row_width, expected_rows)
+
+def apply_plan(cursor, plan: Optional[FetchPlan]):
+    """Planı DBAPI imlecine uygular; execute'tan önce çağrılmalıdır."""
+    if plan is None:
+        return
+    cursor.arraysize = plan.arraysize
+    if hasattr(cursor, "prefetchrows"):
+        cursor.prefetchrows = plan.prefetchrows
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """execution_options(fetch_plan=...) ile verilen planı imlece uygulayan olay dinleyicisi."""
+    if context is not None and not executemany:
+        apply_plan(cursor, context.execution_options.get("fetch_plan"))
+
+_ROUND_TRIP_SQL = (
+    "SELECT s.value FROM v$mystat s JOIN v$statname n ON n.statistic# = s.statistic# "
+    "WHERE n.name = 'SQL*Net roundtrips to/from client'"
+)
+
+def read_round_trip_counter(conn) -> Optional[int]:
+    """Oturumun şimdiye kadarki gidiş-dönüş sayacını okur (V$MYSTAT yetkisi gerekir)."""
+    if conn.dialect.name != "oracle":
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(_ROUND_TRIP_SQL)
+        row = cursor.fetchone()
+        return int(row[0]) if row else None
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+
+class FetchStats:
+    """Sorgu başına getirilen satır ve gidiş-dönüş sayılarını tutar.
+
+    Plandan tahmin edilen gidiş-dönüşler estimated_* alanlarında, V$MYSTAT'tan
+    ölçülenler round_trips alanlarında ayrı ayrı toplanır; ölçüm kapalıyken
+    round_trips 0 kalır.
+    """
+
+    def __init__(self, max_entries: int = 200):
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=max_entries)
+        self.queries = 0
+        self.rows = 0
+        self.estimated_round_trips = 0
+        self.measured_queries = 0
+        self.measured_rows = 0
+        self.round_trips = 0
+
+    def record(self, sql: str, plan: FetchPlan, rows: int, seconds: float,
+               measured_round_trips: Optional[int] = None):
+        """Bir sorgunun sonucunu kaydeder; ölçülen değer yoksa round_trips None olur."""
+        estimated = plan.round_trips(rows)
+        entry = {
+            'sql': " ".join(sql.split())[:200],
+            'rows': rows,
+            'seconds': seconds,
+            'estimated_round_trips': estimated,
+            'round_trips': measured_round_trips,
+            'time': time.time(),
+        }
+        entry.update(plan.as_dict())
+        with self._lock:
+            self.recent.append(entry)
+            self.queries += 1
+            self.rows += rows
+            self.estimated_round_trips += estimated
+            if measured_round_trips is not None:
+                self.measured_queries += 1
+                self.measured_rows += rows
+                self.round_trips += measured_round_trips
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'queries': self.queries,
+                'rows': self.rows,
+                'estimated_round_trips': self.estimated_round_trips,
+                'estimated_rows_per_round_trip': (
+                    self.rows / self.estimated_round_trips if self.estimated_round_trips else 0.0
+                ),
+                'measured_queries': self.measured_queries,
+                'round_trips': self.round_trips,
+                'rows_per_round_trip': self.measured_rows / self.round_trips if self.round_trips else 0.0,
+                'recent': list(self.recent),
+            }
+
+# Süreç genelinde paylaşılan istatistikler
+FETCH_STATS = FetchStats()
+
+class FetchTracker:
+    """Bir Oracle sorgusunun gidiş-dönüşlerini kaydeden bağlam yöneticisi.
+
+    Gidiş-dönüş sayısı her zaman plandan tahmin edilir; measure_round_trips
+    açıksa sayaç sorgudan önce ve sonra V$MYSTAT'tan okunup ölçülen değer de
+    kaydedilir. Oracle dışı veritabanlarında bir şey kaydedilmez.
+
+    Kullanım:
+        with FetchTracker(conn, sql, plan) as tracker:
+            ...
+            tracker.rows = len(df)
+    """
+
+    def __init__(self, conn, sql: str, plan: FetchPlan):
+        self.conn = conn
+        self.sql = sql
+        self.plan = plan
+        self.rows = 0
+        self._enabled = conn.dialect.name == "oracle"
+        self._measure = self._enabled and ORACLE_CONFIG.get("measure_round_trips", False)
+        self._before = None
+
+    def __enter__(self) -> "FetchTracker":
+        if self._measure:
+            self._before = read_round_trip_counter(self.conn)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._enabled or exc_type is not None:
+            return
+        seconds = time.perf_counter() - self._start
+        measured = None
+        if self._before is not None:
+            after = read_round_trip_counter(self.conn)
+            if after is not None:
+                # Sayacı okuyan ilk sorgunun kendi gidiş-dönüşü düşülür
+                measured = max(0, after - self._before - 1)
+        FETCH_STATS.record(self.sql, self.plan, self.rows, seconds, measured)
@@ -1,26 +1,333 @@
 """
 Dil modeli işlemleri için modül.
 """
+import asyncio
 import re
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple, Union
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_ollama.llms import OllamaLLM
 
-from .config import MODEL_CONFIG, SQL_PROMPT_TEMPLATE
+from .cancellation import CancelToken, QueryCancelledError
+from .config import GENERATION_CONFIG, MODEL_CONFIG, STARTUP_CONFIG, TIMEOUT_CONFIG
+from .dialects import Dialect, get_dialect
+from .cache import ResponseCache, build_response_cache, describe_model, make_cache_key
+from .semantic_cache import SemanticCache, build_semantic_cache
+from .scheduler import GenerationScheduler, build_scheduler
+from .startup import warm_up_ollama
+from .telemetry import record_generation, start_span
+from .utils import sql_skeleton
+
+# SQL ifadesinin başladığını gösteren anahtar kelimeler; WITH, açıklamadaki
+# "with" ile karışmasın diye CTE başlığıyla ("WITH ad [(sütunlar)] AS (") aranır
+_SQL_START = re.compile(
+    r'\b(?:SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|TRUNCATE)\b'
+    r'|\bWITH\s+(?:RECURSIVE\s+)?(?:"[^"]+"|\w+)\s*(?:\([^)]*\)\s*)?AS\s*\(',
+    re.IGNORECASE
+)
+
+# Kod bloğu dışındaki çıktıda satır başında başlayan SQL ifadesi
+_SQL_LINE_START = re.compile(
+    r'^[ \t]*(SELECT|WITH|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|TRUNCATE)\b',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# SQL'den sonra açıklama başladığını gösteren satır başları
+_PROSE_LINE = re.compile(
+    r'(?:\*\*|#+\s|[-*]\s|(?:Bu|Bunun|Burada|İşte|This|Here|Açıklama|Explanation|Not|Note)[\s:,])'
+)
+
+# Bu kelimelerle veya işaretlerle biten bir ifade henüz tamamlanmamıştır
+_CONTINUATION_WORDS = {
+    'SELECT', 'DISTINCT', 'FROM', 'WHERE', 'AND', 'OR', 'NOT', 'ON', 'USING',
+    'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'NATURAL',
+    'GROUP', 'ORDER', 'BY', 'HAVING', 'AS', 'IN', 'LIKE', 'BETWEEN', 'IS',
+    'UNION', 'ALL', 'INTERSECT', 'EXCEPT', 'MINUS', 'CASE', 'WHEN', 'THEN',
+    'ELSE', 'WITH', 'SET', 'VALUES', 'INTO', 'LIMIT', 'OFFSET', 'FETCH',
+    'FIRST', 'NEXT', 'ESCAPE', 'UPDATE', 'DELETE', 'INSERT'
+}
+_CONTINUATION_CHARS = ',=<>+-*/|(.'
+
+def clean_sql_text(text: str) -> str:
+    """Model çıktısından SQL ifadesini temizler.
+    
+    Markdown kod blokları ve <think> blokları atılır, ilk SQL anahtar
+    kelimesinden önceki açıklamalar kesilir.
+    """
+    # Markdown kod bloklarını temizle
+    text = re.sub(r'```(?:sql)?\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s*```$', '', text, flags=re.IGNORECASE)
+    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    text = text.strip()
+    
+    # Eğer hala SQL ifadesi içeriyorsa sadece SQL kısmını al
+    sql_match = _SQL_START.search(text)
+    if sql_match:
+        text = text[sql_match.start():]
+    
+    return text.strip()
+
+class StreamingSQLCleaner:
+    """Akış halinde gelen model çıktısını parça parça temizler.
+    
+    Kapanmamış bir <think> bloğu veya yarım kalmış bir etiket/kod bloğu
+    işareti görünür metne hiç yansımaz; böylece kullanıcı sadece SQL'in
+    kendisini, üretildikçe görür.
+    """
+    
+    def __init__(self):
+        self._text = ""
+    
+    @property
+    def raw(self) -> str:
+        """Şu ana kadar gelen ham model çıktısı."""
+        return self._text
+    
+    def feed(self, chunk: str) -> str:
+        """Yeni parçayı ekler ve o ana kadar görünür olan SQL'i döndürür."""
+        self._text += chunk
+        text = re.sub(r"<think>.*?</think>", "", self._text, flags=re.DOTALL)
+        
+        # Kapanmamış düşünme bloğu: sonuna kadar gizle
+        open_think = text.find("<think>")
+        if open_think != -1:
+            text = text[:open_think]
+        
+        # Sonda yarım kalmış "<thi" veya "``" gibi işaretleri gösterme
+        text = re.sub(r'<[/a-z]*$', '', text)
+        text = text.rstrip('`')
+        text = re.sub(r'```(?:sql)?\s*', '', text, flags=re.IGNORECASE)
+        
+        match = _SQL_START.search(text)
+        if not match:
+            return ""
+        return text[match.start():].rstrip()
+    
+    def finish(self) -> str:
+        """Akış bittiğinde kesin temizlenmiş SQL'i döndürür."""
+        return clean_sql_text(self._text)
+
+def is_complete_statement(sql: str) -> bool:
+    """Parantezleri ve tırnakları dengeli bir ifadenin tamamlanmış olup olmadığını tahmin eder.
+    
+    SELECT için dış seviyede FROM, WITH için ayrıca dış seviyede SELECT
+    bulunmalı; ifade AND, JOIN, virgül gibi devam bekleyen bir kelime veya
+    işaretle bitmemelidir.
+    """
+    sql = sql.strip()
+    if not sql or sql[-1] in _CONTINUATION_CHARS:
+        return False
+    last_word = re.split(r'\s+', sql)[-1].upper()
+    if last_word in _CONTINUATION_WORDS:
+        return False
+    
+    skeleton = sql_skeleton(sql).upper()
+    first_word = skeleton.split(None, 1)[0]
+    if first_word == 'WITH':
+        return re.search(r'\bSELECT\b', skeleton) is not None and re.search(r'\bFROM\b', skeleton) is not None
+    if first_word == 'SELECT':
+        return re.search(r'\bFROM\b', skeleton) is not None
+    return True
+
+def _find_statement_end(sql: str, stop_on_blank_line: bool) -> Optional[int]:
+    """İfadenin bittiği konumu bulur; henüz bitmediyse None döndürür.
+    
+    Dış seviyedeki noktalı virgül her zaman ifadeyi bitirir. stop_on_blank_line
+    True ise tamamlanmış bir ifadeden sonra gelen boş satır veya açıklama
+    satırı da ifadenin sonu sayılır.
+    """
+    depth = 0
+    quote = None
+    i = 0
+    while i < len(sql):
+        ch = sql[i]
+        if quote is not None:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"'):
+            quote = ch
+        elif sql.startswith('--', i):
+            newline = sql.find('\n', i)
+            if newline == -1:
+                return None
+            i = newline
+            continue
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif depth == 0 and ch == ';':
+            return i
+        elif depth == 0 and ch == '\n' and stop_on_blank_line:
+            rest = sql[i + 1:]
+            ends = rest.startswith('\n') or _PROSE_LINE.match(rest)
+            if ends and is_complete_statement(sql[:i]):
+                return i
+        i += 1
+    return None
+
+class SQLStopDetector:
+    """Akış halindeki model çıktısında tamamlanmış bir SQL ifadesini tanır.
+    
+    Kod bloğu içindeki SQL, blok kapandığında veya dış seviyede bir noktalı
+    virgül geldiğinde; kod bloğu dışındaki SQL ayrıca tamamlanmış bir
+    ifadeden sonra boş satır veya açıklama satırı geldiğinde biter.
+    Kapanmamış <think> bloğu varken hiçbir zaman durdurma kararı verilmez.
+    """
+    
+    def check(self, raw: str) -> Optional[str]:
+        """Ham çıktıda tam bir ifade varsa temizlenmiş halini, yoksa None döndürür."""
+        text = re.sub(r"<think>.*?</think>", "", raw, flags=re.DOTALL)
+        if "<think>" in text:
+            return None
+        
+        fences = [m.end() for m in re.finditer(r'```', text)]
+        if fences:
+            if len(fences) >= 2:
+                sql = clean_sql_text(text[:fences[1]])
+                return sql if _SQL_START.match(sql) else None
+            body = re.sub(r'^(?:sql)?[ \t]*\n?', '', text[fences[0]:], flags=re.IGNORECASE)
+            stop_on_blank_line = False
+        else:
+            body = text
+            stop_on_blank_line = True
+        match = _SQL_LINE_START.search(body)
+        if not match:
+            return None
+        
+        sql = body[match.start():]
+        end = _find_statement_end(sql, stop_on_blank_line)
+        if end is None:
+            return None
+        return sql[:end].strip()
+
+def _stage(timer, name: str):
+    """timer verildiyse aşamanın süresini ölçen bağlam yöneticisi (bkz. pipeline.StageTimer)."""
+    return timer.stage(name) if timer is not None else nullcontext()
+
+class _UsageCallback(BaseCallbackHandler):
+    """Ollama'nın son yanıt parçasındaki token sayılarını yakalar.
+    
+    prompt_eval_count ve eval_count yalnızca akış sonuna kadar okunursa
+    gelir; erken durdurulan akışta yanıt token'ı parça sayısından alınır.
+    """
+    
+    # Asenkron akışta da olay döngüsünde, iş parçacığına geçmeden çağrılsın
+    run_inline = True
+    
+    def __init__(self):
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens: Optional[int] = None
+    
+    def on_llm_end(self, response, **kwargs: Any):
+        for generations in response.generations:
+            for generation in generations:
+                info = generation.generation_info or {}
+                if info.get("prompt_eval_count") is not None:
+                    self.prompt_tokens = int(info["prompt_eval_count"])
+                if info.get("eval_count") is not None:
+                    self.completion_tokens = int(info["eval_count"])
+
+class _GenerationTrace:
+    """Bir model üretiminin span'i ("llm.generate" / "llm.repair"), ilk token süresi ve token sayıları."""
+    
+    def __init__(self, kind: str):
+        self.usage = _UsageCallback()
+        self.span = start_span(f"llm.{kind}")
+        self.first_token: Optional[float] = None
+        self.chunks = 0
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        return {"max_tokens": 500, "callbacks": [self.usage]}
+    
+    def on_chunk(self):
+        self.chunks += 1
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.span.started
+    
+    def end(self, error: Optional[BaseException] = None, early_stop: bool = False):
+        completion = self.usage.completion_tokens
+        if completion is None and self.chunks:
+            # Ollama akışta her parçada bir token gönderir
+            completion = self.chunks
+        record_generation(self.first_token, self.usage.prompt_tokens, completion)
+        for key, value in (("first_token_ms", self.first_token * 1000 if self.first_token is not None else None),
+                           ("prompt_tokens", self.usage.prompt_tokens),
+                           ("completion_tokens", completion), ("early_stop", early_stop)):
+            if value is not None:
+                self.span.set(key, value)
+        self.span.end(error)
+
+def build_model(config: Optional[Dict[str, Any]] = None) -> OllamaLLM:
+    """MODEL_CONFIG ayarlarıyla (durdurma dizileri dahil) Ollama modelini oluşturur.
+
+    Modele bağlanılmaz; ilk istekte veya warm_up() ile belleğe yüklenir.
+    """
+    params = dict(config or MODEL_CONFIG)
+    # OllamaLLM model adını "model" alanında bekler
+    model_name = params.pop("model_name", None)
+    if model_name:
+        params.setdefault("model", model_name)
+    return OllamaLLM(**params)
 
 class LLMHandler:
     """Dil modeli işlemlerini yöneten sınıf."""
     
-    def __init__(self):
-        """Modeli başlat."""
+    def __init__(self, cache: Optional[ResponseCache] = None,
+                 semantic_cache: Optional[SemanticCache] = None, model=None,
+                 scheduler: Optional[GenerationScheduler] = None,
+                 dialect: Union[str, Dialect, None] = None):
+        """Modeli başlat.
+        
+        Args:
+            cache: Yanıt önbelleği (varsayılan: RESPONSE_CACHE_CONFIG ile oluşturulan)
+            semantic_cache: Benzer soru önbelleği (varsayılan: SEMANTIC_CACHE_CONFIG ile oluşturulan)
+            model: Hazır bir LangChain dil modeli (verilirse Ollama'ya bağlanılmaz)
+            scheduler: Model isteklerinin zamanlayıcısı (varsayılan: SCHEDULER_CONFIG ile oluşturulan)
+            dialect: Prompt şablonlarının seçileceği veritabanı türü (varsayılan: Oracle)
+        """
+        self.use_dialect(dialect)
+        self.cache = cache if cache is not None else build_response_cache()
+        self.semantic_cache = semantic_cache if semantic_cache is not None else build_semantic_cache()
+        self.scheduler = scheduler if scheduler is not None else build_scheduler()
+        self.early_stop = GENERATION_CONFIG.get("early_stop", True)
+        self._stats_lock = threading.Lock()
+        self.generation_stats = {'generations': 0, 'early_stops': 0, 'chunks': 0}
+        if model is not None:
+            self.model = model
+            return
         try:
-            self.model = OllamaLLM(**MODEL_CONFIG)
-            # Bağlantı testi
-            self.model.invoke("test")
+            self.model = build_model()
+            # Gecikmeli açılışta model arka planda warm_up() ile yüklenir
+            if not STARTUP_CONFIG.get("lazy", True):
+                self.model.invoke("test")
         except Exception as e:
             print(f"Ollama bağlantı hatası: {e}")
             print("Lütfen Ollama'nın çalıştığından emin olun: 'ollama serve'")
             raise
     
+    def use_dialect(self, dialect: Union[str, Dialect, None]):
+        """Üretim ve düzeltme prompt'larını verilen veritabanı türünün şablonlarına geçirir."""
+        dialect = dialect if isinstance(dialect, Dialect) else get_dialect(dialect)
+        self.prompt_template = dialect.prompt_template
+        self.repair_template = dialect.repair_template
+    
+    def warm_up(self) -> float:
+        """Modeli Ollama sunucusunda belleğe yükler; token üretilmez.
+        
+        Ollama dışı (ör. ölçümlerdeki sahte) modellerde bir şey yapılmaz.
+        
+        Returns:
+            Yüklemenin sürdüğü süre (saniye)
+        """
+        if not isinstance(self.model, OllamaLLM):
+            return 0.0
+        return warm_up_ollama(self.model.base_url or MODEL_CONFIG["base_url"], self.model.model)
+    
     def clean_sql_output(self, text: str) -> str:
         """Model çıktısından SQL ifadesini temizler.
         
@@ -30,41 +337,409 @@ class LLMHandler:
         Returns:
             Temizlenmiş SQL ifadesi
         """
-        # Markdown kod bloklarını temizle
-        text = re.sub(r'```(?:sql)?\s*', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\s*```$', '', text, flags=re.IGNORECASE)
-        text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
-        text = text.strip()
-        
-        # Eğer hala SQL ifadesi içeriyorsa sadece SQL kısmını al
-        sql_match = re.search(
-            r'(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|TRUNCATE).*', 
-            text, re.DOTALL | re.IGNORECASE
-        )
-        if sql_match:
-            text = sql_match.group(0)
-        
-        return text.strip()
+        return clean_sql_text(text)
     
-    def generate_sql(self, query: str, schema_text: str) -> str:
+    def generate_sql(self, query: str, schema_text: str, use_cache: bool = True,
+                     cancel: Optional[CancelToken] = None, timer=None) -> str:
         """Doğal dil sorusundan SQL sorgusu oluşturur.
         
+        Aynı soru, şema ve model ayarlarıyla daha önce üretilmiş bir yanıt
+        varsa model çağrılmadan önbellekten döndürülür. Birebir eşleşme
+        yoksa anlamsal önbellekte benzer bir soru aranır.
+        
         Args:
             query: Kullanıcının doğal dil sorusu
             schema_text: Veritabanı şema metni
+            use_cache: False ise önbellek okunmaz (yeni yanıt yine de yazılır)
+            cancel: İptal jetonu; iptal edilirse QueryCancelledError yükseltilir
+            timer: Temizleme süresinin ayrıca yazılacağı StageTimer
             
         Returns:
             Oluşturulan SQL sorgusu
         """
+        if use_cache:
+            cached = self.lookup_cache(query, schema_text)
+            if cached is not None:
+                return cached
+        elif self.cache is not None:
+            self.cache.record_bypass()
+        
+        def generate():
+            sql = self._generate(query, schema_text, cancel, timer)
+            self.store_cache(query, schema_text, sql)
+            return sql
+        
+        if self.scheduler is None:
+            return generate()
+        return self.scheduler.run(self._flight_key(query, schema_text), generate, cancel)
+    
+    def generate_sql_stream(self, query: str, schema_text: str, use_cache: bool = True,
+                            cancel: Optional[CancelToken] = None, timer=None) -> Iterator[str]:
+        """SQL sorgusunu model ürettikçe parça parça döndürür.
+        
+        Her adımda o ana kadar görünür olan SQL metni (düşünme blokları ve
+        kod blokları ayıklanmış hali) döndürülür. Son değer generate_sql()
+        ile aynı temizlenmiş SQL'dir. Önbellekte kayıt varsa tek seferde
+        döndürülür.
+        
+        Args:
+            query: Kullanıcının doğal dil sorusu
+            schema_text: Veritabanı şema metni
+            use_cache: False ise önbellek okunmaz
+            cancel: İptal jetonu; iptal edilirse akış kapatılır ve
+                QueryCancelledError yükseltilir
+            timer: Temizleme süresinin ayrıca yazılacağı StageTimer
+            
+        Yields:
+            O ana kadar oluşan SQL metni
+        """
+        if use_cache:
+            cached = self.lookup_cache(query, schema_text)
+            if cached is not None:
+                yield cached
+                return
+        elif self.cache is not None:
+            self.cache.record_bypass()
+        
+        visible = ""
+        for sql in self._scheduled_stream(query, schema_text, cancel, timer):
+            if sql != visible:
+                visible = sql
+                yield visible
+    
+    async def agenerate_sql(self, query: str, schema_text: str, use_cache: bool = True,
+                            cancel: Optional[CancelToken] = None, timer=None) -> str:
+        """generate_sql'in asyncio sürümü.
+        
+        Model yanıtı beklenirken olay döngüsü serbest kalır; böylece tek bir
+        süreç aynı anda çok sayıda kullanıcıya hizmet verebilir.
+        """
+        sql = ""
+        async for sql in self.agenerate_sql_stream(query, schema_text, use_cache, cancel, timer):
+            pass
+        return sql
+    
+    async def agenerate_sql_stream(self, query: str, schema_text: str, use_cache: bool = True,
+                                   cancel: Optional[CancelToken] = None, timer=None) -> AsyncIterator[str]:
+        """generate_sql_stream'in asyncio sürümü."""
+        if use_cache:
+            # Önbellek SQLite dosyasına ve gömme modeline gidebilir
+            cached = await asyncio.to_thread(self.lookup_cache, query, schema_text)
+            if cached is not None:
+                yield cached
+                return
+        elif self.cache is not None:
+            self.cache.record_bypass()
+        
+        visible = ""
+        async for sql in self._ascheduled_stream(query, schema_text, cancel, timer):
+            if sql != visible:
+                visible = sql
+                yield visible
+    
+    def _flight_key(self, query: str, schema_text: str) -> str:
+        """Aynı prompt'u üreten istekleri birleştirmek için kullanılan anahtar."""
+        return make_cache_key(query, schema_text, describe_model(self.model), self.prompt_template)
+    
+    def _scheduled_stream(self, query: str, schema_text: str,
+                          cancel: Optional[CancelToken] = None, timer=None) -> Iterator[str]:
+        """_stream_sql'i zamanlayıcı üzerinden çalıştırır ve sonucu önbelleğe yazar.
+        
+        Aynı prompt için süren bir üretim varsa model yeniden çağrılmaz,
+        o üretimin sonucu tek seferde döndürülür; beklerken bu isteğin iptal
+        jetonu kontrol edilir. Üretimi yapan istek iptal edilirse bekleyenler
+        hata almaz, içlerinden biri üretimi yeniden başlatır. Sonuç, son değer
+        döndürülmeden önce bekleyenlere iletilir; böylece akışı sonuna
+        kadar okumayan bir çağıran diğerlerini bekletmez.
+        """
+        if self.scheduler is None:
+            for sql, done in self._stream_sql(query, schema_text, cancel, timer=timer):
+                if done:
+                    self.store_cache(query, schema_text, sql)
+                yield sql
+            return
+        
+        key = self._flight_key(query, schema_text)
+        future, result = self.scheduler.lead_or_wait(key, cancel)
+        if future is None:
+            yield result
+            return
+        
+        try:
+            with self.scheduler.slot() as slot:
+                for sql, done in self._stream_sql(query, schema_text, cancel, timer=timer):
+                    if done:
+                        slot.release()
+                        self.store_cache(query, schema_text, sql)
+                        self.scheduler.finish(key, future, sql)
+                    yield sql
+        except Exception as e:
+            self.scheduler.finish(key, future, error=e)
+            raise
+        finally:
+            if not future.done():
+                # Akış sonuna kadar okunmadı; bekleyenlerden biri üretimi yeniden başlatır
+                self.scheduler.abandon(key, future)
+    
+    async def _ascheduled_stream(self, query: str, schema_text: str,
+                                 cancel: Optional[CancelToken] = None, timer=None) -> AsyncIterator[str]:
+        """_scheduled_stream'in asyncio sürümü."""
+        if self.scheduler is None:
+            async for sql, done in self._astream_sql(query, schema_text, cancel, timer=timer):
+                if done:
+                    await asyncio.to_thread(self.store_cache, query, schema_text, sql)
+                yield sql
+            return
+        
+        key = self._flight_key(query, schema_text)
+        future, result = await self.scheduler.alead_or_wait(key, cancel)
+        if future is None:
+            yield result
+            return
+        
+        try:
+            async with await self.scheduler.aslot() as slot:
+                async for sql, done in self._astream_sql(query, schema_text, cancel, timer=timer):
+                    if done:
+                        slot.release()
+                        await asyncio.to_thread(self.store_cache, query, schema_text, sql)
+                        self.scheduler.finish(key, future, sql)
+                    yield sql
+        except Exception as e:
+            self.scheduler.finish(key, future, error=e)
+            raise
+        finally:
+            if not future.done():
+                # Akış sonuna kadar okunmadı; bekleyenlerden biri üretimi yeniden başlatır
+                self.scheduler.abandon(key, future)
+    
+    def repair_sql(self, query: str, schema_text: str, sql: str, error: str,
+                   cancel: Optional[CancelToken] = None, timer=None) -> str:
+        """Hata veren SQL'i, hata mesajı ve ilgili şemayla modele düzelttirir.
+        
+        Düzeltmeler önbelleğe alınmaz ve aynı istekler birleştirilmez; model
+        çağrısı yine zamanlayıcıdaki sırayı bekler.
+        
+        Args:
+            query: Kullanıcının doğal dil sorusu
+            schema_text: Hatalı SQL'in ve sorunun ilgili olduğu tabloların şema metni
+            sql: Hata veren SQL
+            error: Hata mesajı
+            cancel: İptal jetonu
+            timer: Temizleme süresinin ayrıca yazılacağı StageTimer
+            
+        Returns:
+            Düzeltilmiş SQL
+        """
+        variables = {"sql": sql, "error": error}
+        
+        def generate():
+            repaired = ""
+            for repaired, _ in self._stream_sql(query, schema_text, cancel, self.repair_template, variables, timer):
+                pass
+            return repaired
+        
+        if self.scheduler is None:
+            return generate()
+        with self.scheduler.slot():
+            return generate()
+    
+    async def arepair_sql(self, query: str, schema_text: str, sql: str, error: str,
+                          cancel: Optional[CancelToken] = None, timer=None) -> str:
+        """repair_sql'in asyncio sürümü."""
+        variables = {"sql": sql, "error": error}
+        
+        async def generate():
+            repaired = ""
+            async for repaired, _ in self._astream_sql(query, schema_text, cancel,
+                                                       self.repair_template, variables, timer):
+                pass
+            return repaired
+        
+        if self.scheduler is None:
+            return await generate()
+        async with await self.scheduler.aslot():
+            return await generate()
+    
+    def _cache_scope(self, schema_text: str) -> str:
+        """Şema ve model ayarlarına özgü (sorudan bağımsız) kapsam anahtarı."""
+        return make_cache_key("", schema_text, describe_model(self.model), self.prompt_template)
+    
+    def lookup_cache(self, query: str, schema_text: str) -> Optional[str]:
+        """Önce birebir, sonra anlamsal önbellekte kayıt arar."""
+        key = None
+        if self.cache is not None:
+            key = make_cache_key(query, schema_text, describe_model(self.model), self.prompt_template)
+            sql = self.cache.get(key)
+            if sql is not None:
+                return sql
+        
+        if self.semantic_cache is not None:
+            sql = self.semantic_cache.lookup(query, self._cache_scope(schema_text))
+            if sql is not None:
+                # Aynı soru tekrar sorulursa birebir katmandan dönsün
+                if key is not None:
+                    self.cache.set(key, sql)
+                return sql
+        return None
+    
+    def store_cache(self, query: str, schema_text: str, sql: str):
+        """Üretilen SQL'i birebir ve anlamsal önbelleklere yazar."""
+        if not sql:
+            return
+        if self.cache is not None:
+            key = make_cache_key(query, schema_text, describe_model(self.model), self.prompt_template)
+            self.cache.set(key, sql)
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(query, sql, self._cache_scope(schema_text))
+    
+    def _stream_sql(self, query: str, schema_text: str, cancel: Optional[CancelToken] = None,
+                    template: Optional[str] = None, variables: Optional[Dict[str, str]] = None,
+                    timer=None) -> Iterator[Tuple[str, bool]]:
+        """Modeli akış kipinde çalıştırır.
+        
+        Erken durdurma açıksa tam bir SQL ifadesi görüldüğü anda akış
+        kapatılır; bu Ollama'ya giden HTTP isteğini de keser, model kalan
+        açıklamayı üretmez. İptal jetonu ve TIMEOUT_CONFIG["generation_timeout"]
+        her parçada kontrol edilir; aşılırsa akış aynı şekilde kapatılır.
+        
+        Args:
+            template: Prompt şablonu (varsayılan: self.prompt_template)
+            variables: Şablondaki query ve schema dışındaki değişkenler
+            timer: Çıktının temizlenme süresinin yazılacağı StageTimer ("clean" aşaması)
+        
+        Yields:
+            (o ana kadar görünür SQL, son değer mi) çiftleri
+        """
+        prompt = ChatPromptTemplate.from_template(template or self.prompt_template)
+        chain = prompt | self.model
+        
+        cleaner = StreamingSQLCleaner()
+        detector = SQLStopDetector() if self.early_stop else None
+        sql = None
+        chunks = 0
+        timeout = TIMEOUT_CONFIG.get("generation_timeout")
+        deadline = time.monotonic() + timeout if timeout else None
+        trace = _GenerationTrace("repair" if template else "generate")
+        error = None
+        stream = chain.stream(
+            {"query": query, "schema": schema_text, **(variables or {})},
+            config=trace.config
+        )
+        try:
+            for chunk in stream:
+                trace.on_chunk()
+                self._check_cancel(cancel, deadline)
+                chunks += 1
+                with _stage(timer, "clean"):
+                    partial = cleaner.feed(chunk)
+                    if detector is not None:
+                        sql = detector.check(cleaner.raw)
+                if sql is not None:
+                    break
+                yield partial, False
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            stream.close()
+            trace.end(error, early_stop=sql is not None)
+        
+        with self._stats_lock:
+            self.generation_stats['generations'] += 1
+            self.generation_stats['chunks'] += chunks
+            if sql is not None:
+                self.generation_stats['early_stops'] += 1
+        
+        if sql is None:
+            with _stage(timer, "clean"):
+                sql = cleaner.finish()
+        yield sql, True
+    
+    async def _astream_sql(self, query: str, schema_text: str, cancel: Optional[CancelToken] = None,
+                           template: Optional[str] = None, variables: Optional[Dict[str, str]] = None,
+                           timer=None) -> AsyncIterator[Tuple[str, bool]]:
+        """_stream_sql'in asyncio sürümü (ChatPromptTemplate | model astream)."""
+        prompt = ChatPromptTemplate.from_template(template or self.prompt_template)
+        chain = prompt | self.model
+        
+        cleaner = StreamingSQLCleaner()
+        detector = SQLStopDetector() if self.early_stop else None
+        sql = None
+        chunks = 0
+        timeout = TIMEOUT_CONFIG.get("generation_timeout")
+        deadline = time.monotonic() + timeout if timeout else None
+        trace = _GenerationTrace("repair" if template else "generate")
+        error = None
+        stream = chain.astream(
+            {"query": query, "schema": schema_text, **(variables or {})},
+            config=trace.config
+        )
+        try:
+            async for chunk in stream:
+                trace.on_chunk()
+                self._check_cancel(cancel, deadline)
+                chunks += 1
+                with _stage(timer, "clean"):
+                    partial = cleaner.feed(chunk)
+                    if detector is not None:
+                        sql = detector.check(cleaner.raw)
+                if sql is not None:
+                    break
+                yield partial, False
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            await stream.aclose()
+            trace.end(error, early_stop=sql is not None)
+        
+        with self._stats_lock:
+            self.generation_stats['generations'] += 1
+            self.generation_stats['chunks'] += chunks
+            if sql is not None:
+                self.generation_stats['early_stops'] += 1
+        
+        if sql is None:
+            with _stage(timer, "clean"):
+                sql = cleaner.finish()
+        yield sql, True
+    
+    def _check_cancel(self, cancel: Optional[CancelToken], deadline: Optional[float]):
+        """Üretim iptal edildiyse veya süre sınırını aştıysa QueryCancelledError yükseltir."""
+        if cancel is not None:
+            cancel.check()
+        if deadline is not None and time.monotonic() > deadline:
+            raise QueryCancelledError(
+                f"SQL üretimi {TIMEOUT_CONFIG.get('generation_timeout'):g} sn içinde tamamlanamadı."
+            )
+    
+    def _generate(self, query: str, schema_text: str, cancel: Optional[CancelToken] = None,
+                  timer=None) -> str:
+        """Modeli çalıştırıp temizlenmiş SQL'i döndürür."""
+        # İptal ve süre sınırı sadece akış kipinde parça parça kontrol edilebilir
+        if self.early_stop or cancel is not None:
+            sql = ""
+            for sql, _ in self._stream_sql(query, schema_text, cancel, timer=timer):
+                pass
+            return sql
+        
         # Prompt'u oluştur
-        prompt = ChatPromptTemplate.from_template(SQL_PROMPT_TEMPLATE)
+        prompt = ChatPromptTemplate.from_template(self.prompt_template)
         chain = prompt | self.model
         
         # Sorguyu çalıştır
-        response = chain.invoke(
-            {"query": query, "schema": schema_text},
-            config={"max_tokens": 500}
-        )
+        trace = _GenerationTrace("generate")
+        try:
+            response = chain.invoke(
+                {"query": query, "schema": schema_text},
+                config=trace.config
+            )
+        except Exception as e:
+            trace.end(e)
+            raise
+        trace.end()
         
         # Çıktıyı temizle ve döndür
-        return self.clean_sql_output(response)
+        with _stage(timer, "clean"):
+            return self.clean_sql_output(response)
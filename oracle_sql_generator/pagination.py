@@ -0,0 +1,163 @@
+"""
+Sorgu sonuçlarını sayfa sayfa getirmek için modül.
+
+Modelin ürettiği SELECT olduğu gibi çalıştırılırsa sınırsız bir
+"SELECT * FROM buyuk_tablo" milyonlarca satırı tek bir DataFrame'e çeker.
+Burada SELECT'ler veritabanı tarafında satır sınırı uygulanacak şekilde
+sarılır (Oracle için OFFSET/FETCH, SQLite için LIMIT/OFFSET) ve sonuçlar
+ofset imleciyle sayfa sayfa getirilir.
+"""
+import re
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from . import columnar
+from .config import PAGINATION_CONFIG
+from .fetch_tuning import FetchTracker, plan_fetch
+from .telemetry import span
+from .utils import sql_skeleton
+
+# Oracle 12c öncesinde satır sınırlama için eklenen yardımcı sütun
+_ROWNUM_COLUMN = "RN__"
+
+def is_select(sql: str) -> bool:
+    """İfadenin satır döndüren bir sorgu (SELECT veya WITH ... SELECT) olup olmadığını döndürür."""
+    return re.match(r'\s*(SELECT|WITH)\b', sql, re.IGNORECASE) is not None
+
+def has_row_limit(sql: str) -> bool:
+    """Sorgunun dış seviyesinde zaten bir satır sınırı olup olmadığını döndürür."""
+    skeleton = sql_skeleton(sql).upper()
+    return re.search(r'\bLIMIT\b|\bOFFSET\b|\bFETCH\s+(FIRST|NEXT)\b', skeleton) is not None
+
+def limit_sql(sql: str, dialect_name: str, limit: int, offset: int = 0,
+              server_version: Optional[tuple] = None) -> str:
+    """SELECT'i veritabanı tarafında satır sınırı uygulanacak şekilde yeniden yazar.
+
+    Sorgunun kendi satır sınırı yoksa sınır sona eklenir; böylece JOIN'lerde
+    aynı adlı sütunlar (Oracle'da ORA-00918) sorun çıkarmaz. Varsa sorgu
+    bir alt sorguya sarılır.
+
+    Args:
+        sql: Çalıştırılacak SELECT
+        dialect_name: SQLAlchemy dialect adı ('oracle', 'sqlite', ...)
+        limit: Getirilecek en fazla satır
+        offset: Atlanacak satır sayısı
+        server_version: Oracle sunucu sürümü; 12'den eskiyse ROWNUM kullanılır
+
+    Returns:
+        Satır sınırlı SQL
+    """
+    sql = sql.strip().rstrip(';').rstrip()
+    limit, offset = int(limit), int(offset)
+
+    if dialect_name == "oracle":
+        if server_version is not None and server_version[0] < 12:
+            # OFFSET/FETCH desteklemeyen sürümler için klasik ROWNUM kalıbı
+            return (
+                f"SELECT * FROM (SELECT q__.*, ROWNUM AS {_ROWNUM_COLUMN} FROM ({sql}) q__ "
+                f"WHERE ROWNUM <= {offset + limit}) WHERE {_ROWNUM_COLUMN} > {offset}"
+            )
+        if has_row_limit(sql):
+            sql = f"SELECT * FROM ({sql})"
+        if offset:
+            return f"{sql}\nOFFSET {offset} ROWS FETCH NEXT {limit} ROWS ONLY"
+        return f"{sql}\nFETCH FIRST {limit} ROWS ONLY"
+
+    # SQLite, PostgreSQL ve MySQL LIMIT/OFFSET kullanır
+    if has_row_limit(sql):
+        sql = f"SELECT * FROM ({sql}) AS q__"
+    if offset:
+        return f"{sql}\nLIMIT {limit} OFFSET {offset}"
+    return f"{sql}\nLIMIT {limit}"
+
+def _read_limited(conn, sql: str, limit: int, offset: int = 0,
+                  schema: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """Satır sınırlı sorguyu çalıştırıp DataFrame döndürür."""
+    dialect = conn.dialect
+    version = getattr(dialect, "server_version_info", None) if dialect.name == "oracle" else None
+    limited = limit_sql(sql, dialect.name, limit, offset, version)
+    # En fazla limit satır döneceği bilindiği için imleç buna göre ayarlanır
+    plan = plan_fetch(sql, schema, expected_rows=limit)
+    # "db.fetch" satırların getirilip DataFrame'e çevrilme süresidir; içindeki
+    # "db.execute" (ifadenin çalıştırılması) bundan düşülür
+    with span("db.fetch", exclusive=True, dialect=dialect.name) as fetch_span, \
+            FetchTracker(conn, limited, plan) as tracker:
+        if columnar.available():
+            df = columnar.fetch_table(conn, limited, plan=plan).to_pandas()
+        else:
+            df = pd.read_sql_query(text(limited), conn.execution_options(fetch_plan=plan))
+        tracker.rows = len(df)
+        fetch_span.set("rows", len(df))
+    # ROWNUM kalıbının eklediği yardımcı sütunu at
+    return df.drop(columns=[c for c in df.columns if str(c).upper() == _ROWNUM_COLUMN])
+
+class ResultPage:
+    """Bir sorgu sonucunun tek bir sayfası."""
+
+    def __init__(self, sql: str, df: pd.DataFrame, page: int, page_size: int, has_more: bool):
+        self.sql = sql
+        self.df = df
+        self.page = page
+        self.page_size = page_size
+        self.has_more = has_more
+
+    @property
+    def first_row(self) -> int:
+        return self.page * self.page_size + 1
+
+    @property
+    def last_row(self) -> int:
+        return self.page * self.page_size + len(self.df)
+
+    def describe(self) -> str:
+        """Arayüzde gösterilecek "Sayfa 2 (101-200. satırlar)" gibi bir açıklama."""
+        if self.df.empty:
+            return f"Sayfa {self.page + 1} (kayıt yok)"
+        more = ", devamı var" if self.has_more else ""
+        return f"Sayfa {self.page + 1} ({self.first_row}-{self.last_row}. satırlar{more})"
+
+    def state(self) -> dict:
+        """Arayüzün sonraki/önceki sayfa isteği için saklayacağı durum."""
+        return {'sql': self.sql, 'page': self.page, 'page_size': self.page_size, 'has_more': self.has_more}
+
+def fetch_page(conn, sql: str, page: int = 0, page_size: Optional[int] = None,
+               schema: Optional[Dict[str, Any]] = None) -> ResultPage:
+    """SELECT sonucunun istenen sayfasını getirir.
+
+    Sonraki sayfa olup olmadığını ayrı bir COUNT sorgusu çalıştırmadan
+    anlamak için sayfa boyutundan bir fazla satır istenir.
+
+    Args:
+        conn: SQLAlchemy bağlantısı
+        sql: Çalıştırılacak SELECT
+        page: 0'dan başlayan sayfa numarası
+        page_size: Sayfa başına satır (varsayılan: PAGINATION_CONFIG)
+        schema: İmleç parti boyu tahmini için veritabanı şeması (yoksa None)
+
+    Returns:
+        ResultPage nesnesi
+    """
+    page_size = page_size or PAGINATION_CONFIG.get("page_size", 100)
+    page = max(0, int(page))
+    df = _read_limited(conn, sql, page_size + 1, page * page_size, schema)
+    has_more = len(df) > page_size
+    return ResultPage(sql, df.iloc[:page_size].reset_index(drop=True), page, page_size, has_more)
+
+def read_capped(conn, sql: str, max_rows: Optional[int] = None,
+                schema: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """SELECT'i en fazla max_rows satırla sınırlayarak çalıştırır.
+
+    schema verilirse imleç parti boyu sütun tiplerinden tahmin edilir.
+
+    Returns:
+        DataFrame; satır sınırına ulaşıldıysa attrs['truncated'] True olur
+    """
+    max_rows = max_rows or PAGINATION_CONFIG.get("max_rows", 10000)
+    df = _read_limited(conn, sql, max_rows + 1, schema=schema)
+    truncated = len(df) > max_rows
+    if truncated:
+        df = df.iloc[:max_rows]
+    df.attrs['truncated'] = truncated
+    return df
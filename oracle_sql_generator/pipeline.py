@@ -0,0 +1,606 @@
+"""
+Arayüzlerin ortak kullandığı soru → SQL → sonuç hattı.
+
+Gradio uygulaması (app.py), Streamlit ve tek dosyalık Gradio betikleri
+aynı SQLPipeline'ı kullanır; böylece paylaşılan bağlantı havuzu, yanıt ve
+sonuç önbellekleri, soruyla ilgili şema seçimi, yerel doğrulama, plan
+denetimi, onarım döngüsü ve imleç ayarları her arayüzde aynı şekilde
+uygulanır. Veritabanı türüne özgü ayrıntılar (prompt şablonları, doğrulama
+lehçesi, şema sahibi) dialects modülündedir; hat engine'in türüne göre
+ayarlanır.
+
+Her isteğin aşama süreleri (şema → prompt → model → temizleme → çalıştırma →
+gösterim) bir StageTimer'da toplanır. Arayüzler aynı özet satırını gösterir;
+süreç genelindeki dağılım get_pipeline_stats() ile, histogramlar /metrics
+uç noktasından (telemetry modülü) okunur.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy.engine import Engine
+
+from .cancellation import CancelToken, QueryCancelledError
+from .config import PIPELINE_CONFIG, RETRIEVAL_CONFIG, STARTUP_CONFIG
+from .cost_gate import PlanCheck
+from .db import (
+    check_query_cost, check_query_cost_async, execute_query, execute_query_async,
+    execute_query_page, execute_query_page_async, get_db_engine, validate_query
+)
+from .dialects import get_dialect
+from .llm import LLMHandler
+from .pagination import ResultPage, is_select
+from .repair import RepairSession, describe_error, schema_slice
+from .retrieval import SchemaRetriever
+from .schema import extract_schema, format_schema_for_prompt
+from .startup import LOADING, READINESS, STARTING, run_in_background
+from .telemetry import record_request, span
+from .validation import SQLValidationError
+
+# Aşamalar ve özet satırındaki adları
+STAGES = ("schema", "prompt", "llm", "clean", "execute", "render")
+STAGE_LABELS = {
+    "schema": "şema",
+    "prompt": "prompt",
+    "llm": "model",
+    "clean": "temizleme",
+    "execute": "çalıştırma",
+    "render": "gösterim",
+}
+
+# execute_steps'in ilerleme mesajları
+EXECUTING_MESSAGE = "Sorgu çalıştırılıyor..."
+
+def _repairing_message(session: RepairSession) -> str:
+    return f"Hata modele geri gönderildi, SQL düzeltiliyor ({session.attempts + 1}/{session.max_attempts})..."
+
+def _format_ms(seconds: float) -> str:
+    ms = seconds * 1000
+    return f"{ms:.1f} ms" if ms < 10 else f"{ms:.0f} ms"
+
+class StageTimer:
+    """Bir isteğin aşama sürelerini tutar.
+
+    İç içe ölçülen aşamaların süresi dıştaki aşamadan düşülür; örneğin
+    model akışı sırasında yapılan temizleme "llm" yerine "clean" aşamasına
+    yazılır. Böylece aşamaların toplamı isteğin süresini aşmaz.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stack: List[List[float]] = []
+        self.timings: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Bloğun süresini name aşamasına ekler."""
+        frame = [time.perf_counter(), 0.0]
+        with self._lock:
+            self._stack.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[0]
+            with self._lock:
+                for i in range(len(self._stack) - 1, -1, -1):
+                    if self._stack[i] is frame:
+                        del self._stack[i]
+                        break
+                if self._stack:
+                    self._stack[-1][1] += elapsed
+                self.timings[name] = self.timings.get(name, 0.0) + elapsed - frame[1]
+
+    @property
+    def total(self) -> float:
+        """İsteğin başından bitişine (bitmediyse şu ana) kadar geçen süre."""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def as_dict(self) -> Dict[str, float]:
+        """Aşama süreleri ve toplam (saniye)."""
+        with self._lock:
+            timings = dict(self.timings)
+        timings['total'] = self.total
+        return timings
+
+    def describe(self) -> str:
+        """Arayüzlerin gösterdiği tek satırlık aşama özeti."""
+        timings = self.as_dict()
+        parts = [f"{STAGE_LABELS[stage]} {_format_ms(timings[stage])}" for stage in STAGES]
+        return "⏱ " + " · ".join(parts) + f" · toplam {_format_ms(timings['total'])}"
+
+    def finish(self) -> str:
+        """İsteği bitirir, sürelerini süreç istatistiklerine ekler ve özeti döndürür."""
+        if self.finished is None:
+            self.finished = time.perf_counter()
+            timings = self.as_dict()
+            PIPELINE_STATS.record(timings)
+            record_request(timings)
+        return self.describe()
+
+def _stage(timer: Optional[StageTimer], name: str):
+    return timer.stage(name) if timer is not None else nullcontext()
+
+class PipelineStats:
+    """Son isteklerin aşama sürelerini tutar."""
+
+    def __init__(self, max_entries: int = 1000):
+        self._lock = threading.Lock()
+        self.entries = deque(maxlen=max_entries)
+        self.requests = 0
+
+    def record(self, timings: Dict[str, float]):
+        with self._lock:
+            self.requests += 1
+            self.entries.append(timings)
+
+    def reset(self):
+        with self._lock:
+            self.entries.clear()
+            self.requests = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self.entries)
+            requests = self.requests
+        stats: Dict[str, Any] = {'requests': requests, 'window': len(entries)}
+        for stage in STAGES + ('total',):
+            values = sorted(entry.get(stage, 0.0) for entry in entries)
+            if not values:
+                stats[stage] = {'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0}
+                continue
+            stats[stage] = {
+                'mean_ms': sum(values) / len(values) * 1000,
+                'p50_ms': values[len(values) // 2] * 1000,
+                'p95_ms': values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+            }
+        return stats
+
+PIPELINE_STATS = PipelineStats(PIPELINE_CONFIG.get("stats_window", 1000))
+
+class PipelineResult:
+    """Bir sorunun hattan geçişinin sonucu.
+
+    Attributes:
+        query: Kullanıcı sorusu
+        sql: Çalıştırılan (onarıldıysa düzeltilmiş) SQL; üretilemediyse boş
+        result: ResultPage (SELECT), DataFrame veya None
+        check: Yürütme planı denetimi (PlanCheck)
+        error: Onarılamayan hata; başarılıysa None
+        repair: Onarım özeti (onarım yapılmadıysa boş)
+        timer: Aşama süreleri
+    """
+
+    def __init__(self, query: str, sql: str = "", result: Any = None, check: Optional[PlanCheck] = None,
+                 error: Optional[Exception] = None, repair: str = "", timer: Optional[StageTimer] = None):
+        self.query = query
+        self.sql = sql
+        self.result = result
+        self.check = check
+        self.error = error
+        self.repair = repair
+        self.timer = timer or StageTimer()
+
+    @property
+    def refused(self) -> bool:
+        """Sorgu plan eşiklerini aştığı için çalıştırılmadı mı."""
+        return self.check is not None and self.check.refused
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.refused
+
+    def status(self) -> str:
+        """Arayüzlerde gösterilen durum mesajı."""
+        if self.error is not None:
+            if isinstance(self.error, SQLValidationError):
+                return self.error.result.summary()
+            if isinstance(self.error, QueryCancelledError):
+                return str(self.error)
+            if not self.sql:
+                return f"SQL sorgusu oluşturulamadı: {str(self.error)}"
+            return f"Sorgu çalıştırılırken hata: {str(self.error)}"
+        if self.refused:
+            return self.check.summary()
+        parts = ["SQL sorgusu başarıyla oluşturuldu.", self.repair]
+        if self.check is not None:
+            parts.append(self.check.summary())
+        return " ".join(part for part in parts if part)
+
+class SQLPipeline:
+    """Soru → şema seçimi → prompt → model → temizleme → doğrulama/çalıştırma hattı.
+
+    Kullanım:
+        pipeline = SQLPipeline(get_db_engine("sqlite:///Northwind_small.sqlite"))
+        result = pipeline.run("En pahalı 5 ürün")
+        with result.timer.stage("render"):
+            ...  # sonucu arayüzde göster
+        print(result.status(), result.timer.finish())
+    """
+
+    def __init__(self, engine: Optional[Engine] = None, llm_handler: Optional[LLMHandler] = None,
+                 lazy: Optional[bool] = None):
+        """Hattı kurar.
+
+        Args:
+            engine: Kullanılacak engine (varsayılan: get_db_engine())
+            llm_handler: Hazır bir LLMHandler; prompt şablonları engine'in türüne göre ayarlanır
+                (varsayılan: MODEL_CONFIG ile oluşturulan)
+            lazy: True ise şema ve model arka planda hazırlanır, kurucu beklemez
+                (varsayılan: STARTUP_CONFIG)
+        """
+        if lazy is None:
+            lazy = STARTUP_CONFIG.get("lazy", True)
+        self.engine = engine or get_db_engine()
+        self.dialect = get_dialect(self.engine)
+        if llm_handler is None:
+            llm_handler = LLMHandler(dialect=self.dialect)
+        else:
+            llm_handler.use_dialect(self.dialect)
+        self.llm_handler = llm_handler
+        self.schema = None
+        self.schema_text = "Şema yükleniyor..." if lazy else ""
+        self.schema_error = ""
+        self.retriever = None
+
+        if lazy:
+            # İstekler şema hazır olana kadar bekler
+            self.start_background_init()
+        else:
+            self.load_schema()
+
+    # Şema
+
+    def start_background_init(self):
+        """Şema çıkarmayı ve model ısındırmayı arka plan iş parçacıklarında başlatır."""
+        def load():
+            if not self.load_schema():
+                raise RuntimeError(self.schema_error)
+
+        run_in_background("schema", load)
+        if STARTUP_CONFIG.get("warm_up_model", True):
+            run_in_background("model", self.llm_handler.warm_up)
+
+    def load_schema(self, force_refresh: bool = False) -> bool:
+        """Veritabanı şemasını yükler.
+
+        Args:
+            force_refresh: True ise diskteki şema önbelleği yok sayılır
+
+        Returns:
+            Şema yüklendiyse True
+        """
+        try:
+            with span("schema.load", dialect=self.dialect.name) as load_span:
+                schema = extract_schema(use_cache=not force_refresh, engine=self.engine)
+                self.schema_text = format_schema_for_prompt(schema)
+                self.retriever = SchemaRetriever(schema)
+                load_span.set("tables", len(schema['tables']))
+            self.schema = schema
+            print(f"Veritabanı şeması başarıyla yüklendi ({self.dialect.label}, {len(schema['tables'])} tablo).")
+            return True
+        except Exception as e:
+            print(f"Şema yüklenirken hata oluştu: {e}")
+            self.schema = None
+            self.schema_error = str(e)
+            self.schema_text = "Şema yüklenemedi."
+            self.retriever = None
+            return False
+
+    @staticmethod
+    def schema_pending() -> bool:
+        """Şema arka planda hâlâ yükleniyor mu."""
+        return READINESS.state("schema") in (STARTING, LOADING)
+
+    @staticmethod
+    def wait_for_schema() -> bool:
+        """Arka planda yüklenen şema hazır olana kadar (en fazla ready_timeout) bekler."""
+        return READINESS.wait("schema", STARTUP_CONFIG.get("ready_timeout"))
+
+    def prepare(self, query: str, timer: Optional[StageTimer] = None) -> str:
+        """Prompt'a eklenecek, soruyla ilgili şema metnini döndürür ("schema" ve "prompt" aşamaları).
+
+        Şema seçimi kapalıysa veya şema yüklenemediyse tüm şema metni kullanılır.
+        """
+        with _stage(timer, "schema"):
+            self.wait_for_schema()
+            selected = None
+            if self.retriever is not None and RETRIEVAL_CONFIG.get("enabled", True):
+                selected = self.retriever.select_tables(query)
+        with _stage(timer, "prompt"):
+            # Aynı tablo seçimi için metin önbellekten gelir
+            return format_schema_for_prompt(self.schema, selected) if selected is not None else self.schema_text
+
+    def get_repair_schema(self, query: str, sql: str) -> str:
+        """Düzeltme prompt'una eklenecek şema: hatalı SQL'de geçen ve soruyla ilgili tablolar."""
+        if self.schema is None:
+            return self.schema_text
+        extra = self.retriever.select_tables(query) if self.retriever is not None else []
+        sliced = schema_slice(self.schema, sql, extra)
+        return format_schema_for_prompt(self.schema, sliced['tables']) if sliced['tables'] else self.schema_text
+
+    # SQL üretimi
+
+    def generate(self, query: str, prompt_schema: Optional[str] = None, timer: Optional[StageTimer] = None,
+                 cancel: Optional[CancelToken] = None, use_cache: bool = True) -> str:
+        """Sorudan SQL üretir.
+
+        Args:
+            query: Kullanıcı sorusu
+            prompt_schema: prepare() ile hazırlanmış şema metni (None: burada hazırlanır)
+            timer: Aşama sürelerinin yazılacağı StageTimer
+            cancel: İptal jetonu
+            use_cache: False ise yanıt önbelleği okunmaz
+
+        Returns:
+            Temizlenmiş SQL
+        """
+        if prompt_schema is None:
+            prompt_schema = self.prepare(query, timer)
+        with _stage(timer, "llm"):
+            return self.llm_handler.generate_sql(query, prompt_schema, use_cache, cancel, timer)
+
+    def generate_stream(self, query: str, prompt_schema: str, timer: Optional[StageTimer] = None,
+                        cancel: Optional[CancelToken] = None) -> Iterator[str]:
+        """SQL'i model ürettikçe parça parça döndürür (son değer temizlenmiş SQL'dir)."""
+        with _stage(timer, "llm"):
+            yield from self.llm_handler.generate_sql_stream(query, prompt_schema, cancel=cancel, timer=timer)
+
+    async def agenerate_stream(self, query: str, prompt_schema: str, timer: Optional[StageTimer] = None,
+                               cancel: Optional[CancelToken] = None) -> AsyncIterator[str]:
+        """generate_stream'in asyncio sürümü."""
+        with _stage(timer, "llm"):
+            async for sql in self.llm_handler.agenerate_sql_stream(query, prompt_schema, cancel=cancel,
+                                                                   timer=timer):
+                yield sql
+
+    def remember(self, query: str, prompt_schema: str, sql: str):
+        """Onarılmış SQL'i, önbellekteki hatalı SQL'in yerine yazar."""
+        self.llm_handler.store_cache(query, prompt_schema, sql)
+
+    # Doğrulama ve çalıştırma
+
+    def validate(self, sql: str) -> str:
+        """SQL'i veritabanına gitmeden doğrular.
+
+        Returns:
+            Çalıştırılacak SQL
+
+        Raises:
+            SQLValidationError: SQL doğrulamadan geçemezse
+        """
+        validation = validate_query(sql, self.schema, self.engine)
+        if not validation.ok:
+            raise SQLValidationError(validation)
+        return validation.sql_to_run
+
+    def run_checked(self, sql: str, cancel: Optional[CancelToken] = None, timer: Optional[StageTimer] = None,
+                    paged: bool = True) -> Tuple[str, PlanCheck, Any]:
+        """SQL'i doğrular, yürütme planını denetler ve çalıştırır ("execute" aşaması).
+
+        Returns:
+            (çalıştırılan SQL, PlanCheck, sonuç); plan eşikleri aşıldıysa sonuç None
+
+        Raises:
+            SQLValidationError: SQL doğrulamadan geçemezse (veritabanına gidilmez)
+        """
+        with _stage(timer, "execute"):
+            sql = self.validate(sql)
+            # Yürütme planı eşikleri aşan sorgu hiç çalıştırılmaz
+            check = check_query_cost(sql, self.engine, cancel=cancel)
+            if check.refused:
+                return sql, check, None
+            return sql, check, self.run_query(sql, cancel, paged)
+
+    async def arun_checked(self, sql: str, cancel: Optional[CancelToken] = None,
+                           timer: Optional[StageTimer] = None,
+                           paged: bool = True) -> Tuple[str, PlanCheck, Any]:
+        """run_checked'in asyncio sürümü."""
+        with _stage(timer, "execute"):
+            sql = self.validate(sql)
+            check = await check_query_cost_async(sql, self.engine, cancel=cancel)
+            if check.refused:
+                return sql, check, None
+            return sql, check, await self.arun_query(sql, cancel, paged)
+
+    def run_query(self, sql: str, cancel: Optional[CancelToken] = None,
+                  paged: bool = True) -> Union[ResultPage, Any]:
+        """SELECT'lerin ilk sayfasını (paged=False ise sınırlı tüm sonucu), diğer ifadelerin sonucunu döndürür."""
+        if paged and is_select(sql):
+            return execute_query_page(sql, engine=self.engine, cancel=cancel, schema=self.schema)
+        return execute_query(sql, self.engine, cancel=cancel, schema=self.schema)
+
+    async def arun_query(self, sql: str, cancel: Optional[CancelToken] = None,
+                         paged: bool = True) -> Union[ResultPage, Any]:
+        """run_query'nin asyncio sürümü."""
+        if paged and is_select(sql):
+            return await execute_query_page_async(sql, engine=self.engine, cancel=cancel, schema=self.schema)
+        return await execute_query_async(sql, self.engine, cancel=cancel, schema=self.schema)
+
+    def fetch_page(self, sql: str, page: int, page_size: Optional[int] = None,
+                   cancel: Optional[CancelToken] = None) -> ResultPage:
+        """Sonucun istenen sayfasını getirir."""
+        return execute_query_page(sql, page, page_size, self.engine, cancel=cancel, schema=self.schema)
+
+    async def afetch_page(self, sql: str, page: int, page_size: Optional[int] = None,
+                          cancel: Optional[CancelToken] = None) -> ResultPage:
+        """fetch_page'in asyncio sürümü."""
+        return await execute_query_page_async(sql, page, page_size, self.engine, cancel=cancel,
+                                              schema=self.schema)
+
+    # Onarım
+
+    def repair(self, session: RepairSession, query: str, sql: str, error: Exception,
+               cancel: Optional[CancelToken] = None, timer: Optional[StageTimer] = None) -> Optional[str]:
+        """Hatalı SQL'i modele düzelttirir; düzeltilemezse None döndürür."""
+        try:
+            with _stage(timer, "llm"):
+                repaired = self.llm_handler.repair_sql(query, self.get_repair_schema(query, sql), sql,
+                                                       describe_error(error), cancel=cancel, timer=timer)
+        except QueryCancelledError:
+            raise
+        except Exception as e:
+            print(f"SQL düzeltilirken hata oluştu: {e}")
+            return None
+        return session.accept(repaired, sql)
+
+    async def arepair(self, session: RepairSession, query: str, sql: str, error: Exception,
+                      cancel: Optional[CancelToken] = None, timer: Optional[StageTimer] = None) -> Optional[str]:
+        """repair'in asyncio sürümü."""
+        try:
+            with _stage(timer, "llm"):
+                repair_schema = await asyncio.to_thread(self.get_repair_schema, query, sql)
+                repaired = await self.llm_handler.arepair_sql(query, repair_schema, sql, describe_error(error),
+                                                              cancel=cancel, timer=timer)
+        except QueryCancelledError:
+            raise
+        except Exception as e:
+            print(f"SQL düzeltilirken hata oluştu: {e}")
+            return None
+        return session.accept(repaired, sql)
+
+    # Uçtan uca
+
+    def execute_steps(self, query: str, sql: str, prompt_schema: Optional[str] = None,
+                      timer: Optional[StageTimer] = None, cancel: Optional[CancelToken] = None,
+                      paged: bool = True) -> Iterator[Union[Tuple[str, str], PipelineResult]]:
+        """Üretilmiş SQL'i çalıştırır; hata verirse REPAIR_CONFIG sınırları içinde modele düzelttirir.
+
+        Her çalıştırma ve düzeltme denemesinden önce (SQL, ilerleme mesajı)
+        çifti, en sonda PipelineResult üretilir. Akışlı arayüzler ara
+        adımlarda ilerlemeyi gösterir; execute() aynı döngüyü kullanır.
+
+        Args:
+            query: Kullanıcı sorusu
+            sql: Üretilen SQL
+            prompt_schema: SQL'in üretildiği şema metni (onarılan SQL önbelleğe bununla yazılır)
+            timer: Aşama sürelerinin yazılacağı StageTimer
+            cancel: İptal jetonu
+            paged: SELECT sonucunun sadece ilk sayfası getirilsin mi
+
+        Yields:
+            (sql, mesaj) ilerleme adımları; son öğe PipelineResult (onarılamayan hata error alanındadır)
+        """
+        timer = timer or StageTimer()
+        session = RepairSession()
+        try:
+            while True:
+                yield sql, EXECUTING_MESSAGE
+                try:
+                    sql, check, result = self.run_checked(sql, cancel, timer, paged)
+                    session.succeeded()
+                    break
+                except QueryCancelledError:
+                    raise
+                except Exception as e:
+                    # Hata veren SQL, hata mesajı ve ilgili şemayla modele geri gönderilir
+                    repaired = None
+                    if session.can_repair(e):
+                        yield sql, _repairing_message(session)
+                        repaired = self.repair(session, query, sql, e, cancel, timer)
+                    if repaired is None:
+                        session.failed()
+                        yield PipelineResult(query, sql, error=e, repair=session.describe(), timer=timer)
+                        return
+                    sql = repaired
+        except QueryCancelledError as e:
+            session.failed()
+            yield PipelineResult(query, sql, error=e, repair=session.describe(), timer=timer)
+            return
+        finally:
+            # Adımlar yarıda bırakıldıysa (ör. arayüz olayı iptal edildi) deneme başarısız sayılır;
+            # sonucu kaydedilmiş oturumda etkisizdir
+            session.failed()
+
+        if session.attempts:
+            # Önbellekteki hatalı SQL'in yerine düzeltilmiş hali yazılır
+            self.remember(query, prompt_schema if prompt_schema is not None else self.prepare(query), sql)
+        yield PipelineResult(query, sql, result, check, repair=session.describe(), timer=timer)
+
+    async def aexecute_steps(self, query: str, sql: str, prompt_schema: Optional[str] = None,
+                             timer: Optional[StageTimer] = None, cancel: Optional[CancelToken] = None,
+                             paged: bool = True) -> AsyncIterator[Union[Tuple[str, str], PipelineResult]]:
+        """execute_steps'in asyncio sürümü."""
+        timer = timer or StageTimer()
+        session = RepairSession()
+        try:
+            while True:
+                yield sql, EXECUTING_MESSAGE
+                try:
+                    sql, check, result = await self.arun_checked(sql, cancel, timer, paged)
+                    session.succeeded()
+                    break
+                except QueryCancelledError:
+                    raise
+                except Exception as e:
+                    repaired = None
+                    if session.can_repair(e):
+                        yield sql, _repairing_message(session)
+                        repaired = await self.arepair(session, query, sql, e, cancel, timer)
+                    if repaired is None:
+                        session.failed()
+                        yield PipelineResult(query, sql, error=e, repair=session.describe(), timer=timer)
+                        return
+                    sql = repaired
+        except QueryCancelledError as e:
+            session.failed()
+            yield PipelineResult(query, sql, error=e, repair=session.describe(), timer=timer)
+            return
+        finally:
+            session.failed()
+
+        if session.attempts:
+            if prompt_schema is None:
+                prompt_schema = await asyncio.to_thread(self.prepare, query)
+            await asyncio.to_thread(self.remember, query, prompt_schema, sql)
+        yield PipelineResult(query, sql, result, check, repair=session.describe(), timer=timer)
+
+    def execute(self, query: str, sql: str, prompt_schema: Optional[str] = None,
+                timer: Optional[StageTimer] = None, cancel: Optional[CancelToken] = None,
+                paged: bool = True, progress: Optional[Callable[[str, str], None]] = None) -> PipelineResult:
+        """execute_steps'i sonuna kadar çalıştırır; ara adımlar varsa progress(sql, mesaj) ile bildirilir.
+
+        Returns:
+            PipelineResult; onarılamayan hata error alanındadır
+        """
+        for step in self.execute_steps(query, sql, prompt_schema, timer, cancel, paged):
+            if isinstance(step, PipelineResult):
+                return step
+            if progress is not None:
+                progress(*step)
+
+    async def aexecute(self, query: str, sql: str, prompt_schema: Optional[str] = None,
+                       timer: Optional[StageTimer] = None, cancel: Optional[CancelToken] = None,
+                       paged: bool = True,
+                       progress: Optional[Callable[[str, str], None]] = None) -> PipelineResult:
+        """execute'un asyncio sürümü."""
+        async for step in self.aexecute_steps(query, sql, prompt_schema, timer, cancel, paged):
+            if isinstance(step, PipelineResult):
+                return step
+            if progress is not None:
+                progress(*step)
+
+    def run(self, query: str, timer: Optional[StageTimer] = None, cancel: Optional[CancelToken] = None,
+            paged: bool = True, use_cache: bool = True) -> PipelineResult:
+        """Soruyu uçtan uca işler: şema seçimi, SQL üretimi, doğrulama, çalıştırma ve onarım.
+
+        Gösterim ("render") aşamasını arayüz ölçer; ardından timer.finish() çağrılır.
+        """
+        timer = timer or StageTimer()
+        try:
+            prompt_schema = self.prepare(query, timer)
+            sql = self.generate(query, prompt_schema, timer, cancel, use_cache)
+        except Exception as e:
+            return PipelineResult(query, error=e, timer=timer)
+        if not sql:
+            return PipelineResult(query, error=ValueError("Model boş yanıt döndürdü."), timer=timer)
+        return self.execute(query, sql, prompt_schema, timer, cancel, paged)
+
+def get_pipeline_stats() -> Dict[str, Any]:
+    """Son isteklerin aşama başına ortalama, p50 ve p95 sürelerini (ms) döndürür."""
+    return PIPELINE_STATS.as_dict()
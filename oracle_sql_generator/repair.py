@@ -0,0 +1,196 @@
+"""
+Hata veren SQL'i modele geri gönderip düzelttiren sınırlı onarım döngüsü.
+
+Üretilen SQL yerel doğrulamadan geçemez veya veritabanında hata verirse
+kullanıcının soruyu tekrar sormasına gerek kalmadan hatalı SQL, hata mesajı
+(ORA- kodları utils.format_error_message ile sadeleştirilerek) ve sadece
+ilgili tablolardan oluşan şema dilimi modele gönderilir. Düzeltme denemeleri
+REPAIR_CONFIG'teki deneme sayısı ve toplam süre bütçesiyle sınırlıdır.
+
+İlk denemede başarılı olan, onarımla başarılı olan ve onarılamayan istek
+sayıları ile onarımın eklediği gecikme get_repair_stats() ile okunabilir.
+"""
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cancellation import QueryCancelledError
+from .config import REPAIR_CONFIG
+from .cost_gate import QueryRefusedError
+from .utils import format_error_message
+from .validation import SQLValidationError
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][\w$#]*')
+
+def is_repairable(error: Exception) -> bool:
+    """Hatanın modele geri gönderilerek düzeltilebilecek türden olup olmadığını söyler.
+
+    İptal, süre aşımı ve plan eşiği reddi SQL'in yanlış olduğunu göstermez.
+    """
+    return not isinstance(error, (QueryCancelledError, QueryRefusedError))
+
+def describe_error(error: Exception) -> str:
+    """Modele gönderilecek kısa hata mesajı.
+
+    SQLAlchemy hatalarının sonuna eklenen SQL metni ve belge bağlantısı
+    atılır; sürücünün özgün mesajı kullanılır.
+    """
+    if isinstance(error, SQLValidationError):
+        return "; ".join(error.result.errors)
+    original = getattr(error, "orig", None)
+    return format_error_message(original if original is not None else error).strip()
+
+def schema_slice(schema: Optional[Dict[str, Any]], sql: str,
+                 extra_tables: Iterable[str] = ()) -> Dict[str, Any]:
+    """Hatalı SQL'de geçen ve verilen ek tablolardan oluşan alt şemayı döndürür.
+
+    Args:
+        schema: extract_schema() ile alınan şema sözlüğü
+        sql: Hatalı SQL; içinde adı geçen tablolar dilime eklenir
+        extra_tables: Ek tablolar (ör. SchemaRetriever'ın soruya göre seçtikleri)
+
+    Returns:
+        extract_schema() ile aynı yapıda sözlük
+    """
+    tables = (schema or {}).get('tables') or {}
+    by_upper = {name.upper(): name for name in tables}
+    selected: List[str] = []
+    candidates = [by_upper.get(word.upper()) for word in _IDENTIFIER.findall(sql)]
+    for name in candidates + [by_upper.get(name.upper()) for name in extra_tables]:
+        if name is not None and name not in selected:
+            selected.append(name)
+    selected_set = set(selected)
+    return {
+        'tables': {name: tables[name] for name in selected},
+        'foreign_keys': [
+            fk for fk in (schema or {}).get('foreign_keys', [])
+            if fk['table'] in selected_set
+        ]
+    }
+
+class RepairStats:
+    """İlk denemede/onarımla başarılı istek sayılarını ve onarım gecikmesini tutar."""
+
+    def __init__(self, max_entries: int = 1000):
+        self._lock = threading.Lock()
+        self.extra_latencies = deque(maxlen=max_entries)
+        self.requests = 0
+        self.first_try = 0
+        self.repaired = 0
+        self.failed = 0
+        self.attempts = 0
+
+    def record(self, success: bool, attempts: int, extra_seconds: float):
+        with self._lock:
+            self.requests += 1
+            self.attempts += attempts
+            if not success:
+                self.failed += 1
+            elif attempts:
+                self.repaired += 1
+            else:
+                self.first_try += 1
+            if attempts:
+                self.extra_latencies.append(extra_seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.extra_latencies)
+            requests = self.requests
+            stats = {
+                'requests': requests,
+                'first_try_success': self.first_try,
+                'repaired_success': self.repaired,
+                'failed': self.failed,
+                'repair_attempts': self.attempts,
+                'first_try_rate': self.first_try / requests if requests else 0.0,
+                'success_rate': (self.first_try + self.repaired) / requests if requests else 0.0,
+                'repair_rate': self.repaired / (requests - self.first_try) if requests > self.first_try else 0.0,
+            }
+        stats['extra_latency_mean_s'] = sum(latencies) / len(latencies) if latencies else 0.0
+        stats['extra_latency_p95_s'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] \
+            if latencies else 0.0
+        return stats
+
+REPAIR_STATS = RepairStats()
+
+class RepairSession:
+    """Bir isteğin onarım denemelerini sınırlar ve sonucunu kaydeder.
+
+    Kullanım:
+        session = RepairSession()
+        while True:
+            try:
+                result = run(sql)
+                session.succeeded()
+                break
+            except Exception as e:
+                if not session.can_repair(e):
+                    session.failed()
+                    raise
+                sql = session.accept(llm.repair_sql(...), sql)
+                if sql is None:
+                    session.failed()
+                    raise
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or REPAIR_CONFIG
+        self.enabled = config.get("enabled", True)
+        self.max_attempts = config.get("max_attempts", 2)
+        self.budget = config.get("latency_budget")
+        self.attempts = 0
+        self.first_failure: Optional[float] = None
+        self._done = False
+
+    @property
+    def elapsed(self) -> float:
+        """İlk hatadan bu yana geçen süre (saniye)."""
+        return time.monotonic() - self.first_failure if self.first_failure is not None else 0.0
+
+    def can_repair(self, error: Exception) -> bool:
+        """Hata için bir düzeltme denemesi daha yapılıp yapılamayacağını söyler."""
+        if self.first_failure is None:
+            self.first_failure = time.monotonic()
+        if not self.enabled or not is_repairable(error):
+            return False
+        if self.attempts >= self.max_attempts:
+            return False
+        return not self.budget or self.elapsed < self.budget
+
+    def accept(self, repaired: str, sql: str) -> Optional[str]:
+        """Modelin düzelttiği SQL'i bir deneme olarak sayar.
+
+        Returns:
+            Çalıştırılacak yeni SQL; model boş veya aynı SQL'i döndürdüyse None
+        """
+        self.attempts += 1
+        if not repaired or _normalize(repaired) == _normalize(sql):
+            return None
+        return repaired
+
+    def succeeded(self):
+        self._finish(True)
+
+    def failed(self):
+        self._finish(False)
+
+    def _finish(self, success: bool):
+        if not self._done:
+            self._done = True
+            REPAIR_STATS.record(success, self.attempts, self.elapsed)
+
+    def describe(self) -> str:
+        """Durum satırına eklenecek kısa açıklama."""
+        if not self.attempts:
+            return ""
+        return f"(hata modele geri gönderildi, {self.attempts} düzeltme denemesi, +{self.elapsed:.1f} sn)"
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split()).rstrip(";").upper()
+
+def get_repair_stats() -> Dict[str, Any]:
+    """İlk denemede ve onarımla başarı oranlarını ve onarımın ek gecikmesini döndürür."""
+    return REPAIR_STATS.as_dict()
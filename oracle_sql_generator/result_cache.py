@@ -0,0 +1,558 @@
+"""
+Sorgu sonuçları için önbellek modülü.
+
+Panolarda aynı SELECT'ler tekrar tekrar çalıştırılır. Sonuçlar
+normalleştirilmiş SQL'e göre anahtarlanıp Arrow tablosu olarak saklanır:
+
+- Süreç içi katman: toplam bayt bütçesiyle sınırlı bir LRU.
+- Disk katmanı: sıkıştırılmış Arrow IPC dosyaları ve hangi kaydın hangi
+  tablolara dayandığını tutan bir SQLite dizini; aynı klasörü kullanan
+  işçi süreçleri önbelleği ve geçersiz kılmaları paylaşır.
+
+execute_query üzerinden çalışan bir DML ifadesi (INSERT, UPDATE, DELETE,
+MERGE, TRUNCATE) değiştirdiği tabloya dayanan kayıtları siler; hedefi
+anlaşılamayan ifadeler (DDL, PL/SQL) tüm önbelleği geçersiz kılar. Diğer
+yollardan yapılan değişiklikler için kayıtlar TTL sonunda düşer.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from .config import RESULT_CACHE_CONFIG
+
+# SQL'i önbellek anahtarı için sözcüklere ayıran desen; "ad", [ad] (SQL Server,
+# SQLite) ve `ad` (MySQL, SQLite) tırnaklı tanımlayıcı sayılır
+_TOKEN = re.compile(r"""
+    (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*"|\[[^\]]*\]|`(?:[^`]|``)*`)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+  | (?P<word>[^\W\d][\w$#]*)
+  | (?P<space>\s+)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Tablo adından sonra gelip takma ad olamayacak anahtar kelimeler
+_CLAUSE_WORDS = {
+    'ON', 'USING', 'WHERE', 'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS',
+    'NATURAL', 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'OFFSET', 'FETCH', 'UNION', 'INTERSECT',
+    'EXCEPT', 'MINUS', 'CONNECT', 'START', 'SET', 'VALUES', 'WINDOW', 'PIVOT', 'UNPIVOT',
+    'SAMPLE', 'PARTITION', 'FOR', 'WHEN', 'SELECT', 'RETURNING', 'LOG'
+}
+
+def _tokens(sql: str) -> List[Tuple[str, str]]:
+    """SQL'i (tür, metin) sözcüklerine ayırır; boşluk ve yorumlar atılır."""
+    tokens = []
+    for match in _TOKEN.finditer(sql):
+        kind = match.lastgroup
+        if kind in ('space', 'comment'):
+            continue
+        value = match.group()
+        if kind == 'word':
+            value = value.upper()
+        elif kind == 'number':
+            try:
+                # 1.50, 1.5 ve 15E-1 aynı değerdir
+                value = format(Decimal(value).normalize(), 'f')
+            except InvalidOperation:
+                pass
+        tokens.append((kind, value))
+    return tokens
+
+def canonicalize_sql(sql: str) -> str:
+    """SQL'i önbellek anahtarı için normalleştirir.
+
+    Boşluklar ve yorumlar atılır, tırnaksız tanımlayıcılar ve anahtar
+    kelimeler büyük harfe çevrilir, sayısal sabitler tek biçime getirilir.
+    Metin sabitleri ve tırnaklı tanımlayıcılar olduğu gibi kalır.
+    """
+    tokens = [value for _, value in _tokens(sql)]
+    while tokens and tokens[-1] == ';':
+        tokens.pop()
+    return " ".join(tokens)
+
+def _table_name(kind: str, value: str) -> str:
+    """Tablo adını karşılaştırma için büyük harfe çevirir (tırnaklar atılır)."""
+    if kind == 'quoted':
+        quote = value[0]
+        value = value[1:-1]
+        if quote in ('"', '`'):
+            value = value.replace(quote * 2, quote)
+    return value.upper()
+
+def _read_table(tokens: List[Tuple[str, str]], i: int) -> Tuple[Optional[str], int]:
+    """i konumundaki (şema önekli olabilen) tablo adını okur."""
+    if i >= len(tokens) or tokens[i][0] not in ('word', 'quoted'):
+        return None, i
+    name = _table_name(*tokens[i])
+    i += 1
+    # SCHEMA.TABLO veya TABLO@DBLINK: son parça tablo adıdır
+    while i + 1 < len(tokens) and tokens[i][1] in ('.', '@') and tokens[i + 1][0] in ('word', 'quoted'):
+        if tokens[i][1] == '.':
+            name = _table_name(*tokens[i + 1])
+        i += 2
+    return name, i
+
+def referenced_tables(sql: str) -> Optional[Set[str]]:
+    """SELECT'in FROM ve JOIN ifadelerinde geçen tabloları döndürür.
+
+    Returns:
+        Tablo adları; FROM/JOIN hedeflerinden biri anlaşılamıyorsa (tablo
+        fonksiyonu, bilinmeyen sözdizimi) None. Bu durumda sonuç, hangi
+        değişiklikte geçersiz kılınacağı bilinmediği için önbelleğe alınmaz.
+    """
+    tokens = _tokens(sql)
+    tables = set()
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == 'word' and value in ('FROM', 'JOIN'):
+            i += 1
+            while True:
+                name, i = _read_table(tokens, i)
+                if name is None:
+                    # Alt sorgunun tabloları kendi FROM'unda okunur
+                    if i < len(tokens) and tokens[i][1] == '(':
+                        break
+                    return None
+                if i < len(tokens) and tokens[i][1] == '(':
+                    # TABLE(...), json_each(...) gibi tablo fonksiyonları
+                    return None
+                tables.add(name)
+                # İsteğe bağlı takma ad
+                if i < len(tokens) and tokens[i][1] == 'AS':
+                    i += 1
+                if i < len(tokens) and tokens[i][0] in ('word', 'quoted') and tokens[i][1] not in _CLAUSE_WORDS:
+                    i += 1
+                # FROM a, b, c
+                if value == 'FROM' and i < len(tokens) and tokens[i][1] == ',':
+                    i += 1
+                    continue
+                break
+            continue
+        i += 1
+    return tables
+
+def modified_tables(sql: str) -> Optional[Set[str]]:
+    """DML ifadesinin değiştirdiği tabloları döndürür.
+
+    Returns:
+        Tablo adları; ifadenin hedefi anlaşılamıyorsa (DDL, PL/SQL) None
+    """
+    tokens = _tokens(sql)
+    words = [value for _, value in tokens[:3]]
+    if not words:
+        return set()
+    first = words[0]
+    if first == 'INSERT' and 'INTO' in words:
+        start = words.index('INTO') + 1
+    elif first == 'UPDATE':
+        start = 1
+    elif first == 'DELETE':
+        start = 2 if len(words) > 1 and words[1] == 'FROM' else 1
+    elif first == 'MERGE' and 'INTO' in words:
+        start = words.index('INTO') + 1
+    elif first in ('TRUNCATE', 'DROP', 'ALTER') and len(words) > 1 and words[1] == 'TABLE':
+        start = 2
+    else:
+        return None
+    name, _ = _read_table(tokens, start)
+    return {name} if name else None
+
+def _dump_tables(tables: Iterable[str]) -> str:
+    """Tablo adlarını dizin için metne çevirir; adlarda boşluk olabileceği için JSON kullanılır."""
+    return json.dumps(sorted(tables), ensure_ascii=False)
+
+def _load_tables(text: str) -> List[str]:
+    """_dump_tables() çıktısını (veya eski, boşlukla ayrılmış biçimi) okur."""
+    return json.loads(text) if text.startswith("[") else text.split()
+
+def make_result_key(engine_url: str, sql: str, variant: str = "") -> str:
+    """Veritabanı, normalleştirilmiş SQL ve sonuç biçiminden (sayfa, satır sınırı) anahtar üretir."""
+    raw = "\x00".join((engine_url, canonicalize_sql(sql), variant))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class CachedResult:
+    """Önbellekteki bir sorgu sonucu."""
+
+    def __init__(self, table: "pa.Table", tables: Iterable[str], meta: Optional[Dict[str, Any]] = None,
+                 created_at: Optional[float] = None):
+        self.table = table
+        self.tables = set(tables)
+        self.meta = meta or {}
+        self.created_at = created_at or time.time()
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def to_pandas(self) -> pd.DataFrame:
+        """Her çağrıda yeni bir DataFrame döndürür; çağıranın değişiklikleri önbelleğe yansımaz."""
+        return self.table.to_pandas()
+
+class MemoryResultCache:
+    """Süreç içi, toplam bayt bütçesiyle sınırlı LRU katmanı."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int, ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.evictions = 0
+        self._data: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if self.ttl is not None and time.time() - item.created_at > self.ttl:
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return item
+
+    def set(self, key: str, item: CachedResult):
+        if item.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._data[key] = item
+            self.bytes += item.nbytes
+            while self.bytes > self.max_bytes:
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def _pop(self, key: str):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.bytes -= item.nbytes
+
+    def invalidate(self, tables: Optional[Set[str]]):
+        """Verilen tablolara dayanan (tables None ise tüm) kayıtları siler."""
+        with self._lock:
+            for key in [k for k, item in self._data.items() if tables is None or item.tables & tables]:
+                self._pop(key)
+
+    def clear(self):
+        self.invalidate(None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+# Arrow dosyasının şema üst verisinde kaydın ek bilgilerinin (ör. truncated) anahtarı
+_META_KEY = b"result_cache.meta"
+
+class DiskResultCache:
+    """Arrow IPC dosyalarında tutulan, süreçler arasında paylaşılan katman.
+
+    Dizin SQLite dosyasında kaydın dayandığı tablolar, boyutu ve son
+    erişim zamanı tutulur; toplam boyut bütçeyi aşınca en uzun süredir
+    kullanılmayan dosyalar silinir. invalidations tablosu diğer süreçlerin
+    bellek katmanındaki eski kayıtları fark etmesini sağlar.
+    """
+
+    name = "disk"
+
+    def __init__(self, path: str, max_bytes: int, ttl: Optional[float] = None,
+                 compression: Optional[str] = "zstd"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compression = compression
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, "index.sqlite"), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            " key TEXT PRIMARY KEY,"
+            " tables TEXT NOT NULL,"
+            " bytes INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS invalidations (table_name TEXT PRIMARY KEY, at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.arrow")
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tables, created_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            tables, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._delete([key])
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE result_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        try:
+            with pa.memory_map(self._file(key), "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid):
+            # Başka bir süreç dosyayı silmiş olabilir
+            self.delete(key)
+            return None
+        meta = json.loads((table.schema.metadata or {}).get(_META_KEY, b"{}"))
+        return CachedResult(table, _load_tables(tables), meta, created_at)
+
+    def set(self, key: str, item: CachedResult):
+        if item.nbytes > self.max_bytes:
+            return
+        tmp_path = f"{self._file(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        metadata = dict(item.table.schema.metadata or {})
+        metadata[_META_KEY] = json.dumps(item.meta).encode()
+        table = item.table.replace_schema_metadata(metadata)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, self._file(key))
+        size = os.path.getsize(self._file(key))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, tables, bytes, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, _dump_tables(item.tables), size, item.created_at, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _delete(self, keys: List[str]):
+        for key in keys:
+            self._conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def _evict(self, now: float):
+        """Süresi dolmuş ve bayt bütçesini aşan kayıtları siler."""
+        expired = []
+        if self.ttl is not None:
+            expired = [r[0] for r in self._conn.execute(
+                "SELECT key FROM result_cache WHERE created_at < ?", (now - self.ttl,)
+            )]
+        total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM result_cache").fetchone()[0]
+        overflow = []
+        if total > self.max_bytes:
+            for key, size in self._conn.execute(
+                "SELECT key, bytes FROM result_cache ORDER BY last_access"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                overflow.append(key)
+                total -= size
+        self._delete(expired + overflow)
+        self.evictions += len(expired) + len(overflow)
+
+    def invalidate(self, tables: Optional[Set[str]]):
+        """Verilen tablolara dayanan (tables None ise tüm) kayıtları siler ve zamanı kaydeder."""
+        now = time.time()
+        names = sorted(tables) if tables is not None else ["*"]
+        with self._lock:
+            rows = self._conn.execute("SELECT key, tables FROM result_cache").fetchall()
+            self._delete([key for key, deps in rows if tables is None or set(_load_tables(deps)) & tables])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO invalidations (table_name, at) VALUES (?, ?)",
+                [(name, now) for name in names]
+            )
+            self._conn.commit()
+
+    def invalidated_since(self, tables: Set[str], created_at: float) -> bool:
+        """Kayıt oluşturulduktan sonra (başka bir süreçte de olsa) tablolarından biri değişti mi?"""
+        names = sorted(tables) + ["*"]
+        with self._lock:
+            at = self._conn.execute(
+                f"SELECT MAX(at) FROM invalidations WHERE table_name IN ({', '.join('?' * len(names))})",
+                names
+            ).fetchone()[0]
+        return at is not None and at >= created_at
+
+    def delete(self, key: str):
+        with self._lock:
+            self._delete([key])
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            keys = [r[0] for r in self._conn.execute("SELECT key FROM result_cache")]
+            self._delete(keys)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+
+class ResultCache:
+    """Katmanlı sorgu sonucu önbelleği."""
+
+    def __init__(self, memory: Optional[MemoryResultCache], disk: Optional[DiskResultCache] = None,
+                 max_result_bytes: Optional[int] = None):
+        self.memory = memory
+        self.disk = disk
+        self.max_result_bytes = max_result_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.tier_hits = {'memory': 0, 'disk': 0}
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        item = self.memory.get(key) if self.memory is not None else None
+        tier = 'memory'
+        if item is not None and self.disk is not None:
+            try:
+                if self.disk.invalidated_since(item.tables, item.created_at):
+                    self.memory.invalidate(item.tables)
+                    item = None
+            except sqlite3.Error as e:
+                print(f"Sonuç önbelleği dizini okunurken hata: {e}")
+        if item is None and self.disk is not None:
+            tier = 'disk'
+            try:
+                item = self.disk.get(key)
+            except sqlite3.Error as e:
+                print(f"Sonuç önbelleği okunurken hata: {e}")
+            if item is not None and self.memory is not None:
+                self.memory.set(key, item)
+        with self._lock:
+            if item is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.tier_hits[tier] += 1
+        return item
+
+    def set(self, key: str, item: CachedResult):
+        if self.max_result_bytes is not None and item.nbytes > self.max_result_bytes:
+            return
+        if self.memory is not None:
+            self.memory.set(key, item)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, item)
+            except (sqlite3.Error, OSError, pa.ArrowException) as e:
+                print(f"Sonuç önbelleğe yazılırken hata: {e}")
+
+    def invalidate(self, tables: Optional[Set[str]]):
+        """Verilen tablolara dayanan kayıtları siler; tables None ise tümünü."""
+        with self._lock:
+            self.invalidations += 1
+        if self.memory is not None:
+            self.memory.invalidate(tables)
+        if self.disk is not None:
+            try:
+                self.disk.invalidate(tables)
+            except sqlite3.Error as e:
+                print(f"Sonuç önbelleği geçersiz kılınırken hata: {e}")
+
+    def invalidate_for(self, sql: str):
+        """Çalıştırılan DML ifadesinin değiştirdiği tablolara dayanan kayıtları siler."""
+        self.invalidate(modified_tables(sql))
+
+    def clear(self):
+        self.invalidate(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """İsabet/ıska sayaçlarını ve katman doluluklarını döndürür."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'tier_hits': dict(self.tier_hits),
+                'invalidations': self.invalidations,
+            }
+        if self.memory is not None:
+            stats['memory'] = {'entries': len(self.memory), 'bytes': self.memory.bytes,
+                               'evictions': self.memory.evictions}
+        if self.disk is not None:
+            stats['disk'] = {'entries': len(self.disk), 'evictions': self.disk.evictions}
+        return stats
+
+    def lookup_frame(self, key: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Kayıt varsa (DataFrame, meta) döndürür."""
+        item = self.get(key)
+        if item is None:
+            return None
+        return item.to_pandas(), item.meta
+
+    def store_frame(self, key: str, sql: str, df: pd.DataFrame, **meta):
+        """DataFrame'i Arrow tablosuna çevirip kaydeder; çevrilemezse önbelleğe almaz."""
+        try:
+            # JOIN sonuçlarında aynı adlı sütunlar olabilir; dönüşüm benzersiz ad
+            # istediği için geçici olarak sıra numarası kullanılır
+            positional = df.set_axis([f"c{i}" for i in range(df.shape[1])], axis=1)
+            table = pa.Table.from_pandas(positional, preserve_index=False)
+            table = table.rename_columns([str(c) for c in df.columns])
+        except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError):
+            # SQLite'ta aynı sütunda farklı tipte değerler olabilir
+            return
+        tables = referenced_tables(sql)
+        if tables is None:
+            return
+        self.set(key, CachedResult(table, tables, meta))
+
+def build_result_cache(config: Optional[Dict[str, Any]] = None) -> Optional[ResultCache]:
+    """RESULT_CACHE_CONFIG ayarlarına göre önbellek oluşturur.
+
+    Returns:
+        ResultCache nesnesi veya önbellek kapalıysa (ya da pyarrow yoksa) None
+    """
+    config = config or RESULT_CACHE_CONFIG
+    if not config.get("enabled", True) or pa is None:
+        return None
+    ttl = config.get("ttl")
+    memory = MemoryResultCache(config.get("memory_max_bytes", 256 * 1024 * 1024), ttl)
+    disk = None
+    if config.get("disk_enabled", True):
+        try:
+            disk = DiskResultCache(config["path"], config.get("disk_max_bytes", 2 * 1024 ** 3), ttl,
+                                   config.get("compression", "zstd"))
+        except (sqlite3.Error, OSError) as e:
+            print(f"Sonuç önbelleği diski açılamadı, sadece bellek içi önbellek kullanılacak: {e}")
+    return ResultCache(memory, disk, config.get("max_result_bytes"))
+
+_RESULT_CACHE: Optional[ResultCache] = None
+_RESULT_CACHE_BUILT = False
+_RESULT_CACHE_LOCK = threading.Lock()
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Süreç genelinde paylaşılan sonuç önbelleğini döndürür (ilk çağrıda oluşturulur)."""
+    global _RESULT_CACHE, _RESULT_CACHE_BUILT
+    if not _RESULT_CACHE_BUILT:
+        with _RESULT_CACHE_LOCK:
+            if not _RESULT_CACHE_BUILT:
+                _RESULT_CACHE = build_result_cache()
+                _RESULT_CACHE_BUILT = True
+    return _RESULT_CACHE
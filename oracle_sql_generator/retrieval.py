@@ -0,0 +1,300 @@
+"""
+Soruyla ilgili şema tablolarını seçmek için modül.
+
+Tüm şemayı prompt'a koymak yerine, kullanıcının sorusuyla sözcüksel olarak
+örtüşen tablolar puanlanır, foreign key komşuları eklenir ve sonuç bir token
+bütçesine sığacak şekilde kırpılır.
+"""
+import math
+import re
+from typing import Dict, Any, List, Optional, Set
+
+from .config import RETRIEVAL_CONFIG
+from .schema import serialize_schema
+from .utils import estimate_tokens
+
+# Türkçe büyük/küçük harf dönüşümü: "I" -> "ı", "İ" -> "i"
+_TR_LOWER = str.maketrans({'I': 'ı', 'İ': 'i'})
+# Eşleştirme için Türkçe karakterleri ASCII karşılıklarına indir
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+
+# Türkçe çekim ekleri (ASCII'ye indirgenmiş, uzundan kısaya)
+_TR_SUFFIXES = sorted([
+    'lerinden', 'larindan', 'lerinin', 'larinin', 'lerinde', 'larinda',
+    'lerini', 'larini', 'lerine', 'larina', 'leriyle', 'lariyla',
+    'leri', 'lari', 'ler', 'lar',
+    'ndaki', 'ndeki', 'daki', 'deki', 'taki', 'teki',
+    'sinin', 'sunun', 'nin', 'nun', 'in', 'un',
+    'ndan', 'nden', 'dan', 'den', 'tan', 'ten',
+    'nda', 'nde', 'da', 'de', 'ta', 'te',
+    'yla', 'yle', 'la', 'le',
+    'si', 'su', 'ni', 'nu', 'yi', 'yu', 'ya', 'ye', 'na', 'ne',
+    'i', 'u', 'a', 'e'
+], key=len, reverse=True)
+
+# Sık kullanılan Türkçe soru kelimeleri; tablo seçiminde anlamsızdır
+_STOPWORDS = {
+    'tum', 'butun', 'her', 'hangi', 'kac', 'tane', 'olan', 'olarak', 've',
+    'ile', 'icin', 'gore', 'bir', 'bu', 'su', 'ne', 'nedir', 'mi', 'en',
+    'getir', 'listele', 'goster', 'bul', 'hesapla', 'ver', 'the', 'of'
+}
+
+# Türkçe alan terimlerinden İngilizce tablo/sütun sözcüklerine eşleme
+TURKISH_SYNONYMS: Dict[str, List[str]] = {
+    'musteri': ['customer'],
+    'siparis': ['order'],
+    'urun': ['product'],
+    'calisan': ['employee'],
+    'personel': ['employee'],
+    'eleman': ['employee'],
+    'kategori': ['category'],
+    'tedarikci': ['supplier'],
+    'nakliye': ['shipper', 'ship'],
+    'nakliyeci': ['shipper'],
+    'kargo': ['shipper', 'ship'],
+    'gonder': ['ship'],
+    'gonderil': ['ship'],
+    'teslim': ['ship'],
+    'bolge': ['region', 'territory'],
+    'ulke': ['country'],
+    'sehir': ['city'],
+    'fiyat': ['price'],
+    'pahali': ['price'],
+    'ucuz': ['price'],
+    'ucret': ['price', 'freight'],
+    'navlun': ['freight'],
+    'miktar': ['quantity'],
+    'adet': ['quantity'],
+    'satis': ['order', 'quantity'],
+    'tutar': ['price', 'quantity'],
+    'indirim': ['discount'],
+    'stok': ['stock'],
+    'tarih': ['date'],
+    'ad': ['name'],
+    'isim': ['name'],
+    'soyad': ['last', 'name'],
+    'adres': ['address'],
+    'telefon': ['phone'],
+    'aciklama': ['description'],
+    'tanim': ['description'],
+    'sirket': ['company'],
+    'firma': ['company'],
+    'unvan': ['title'],
+    'maas': ['salary'],
+    'dogum': ['birth'],
+    'yonetici': ['report'],
+    'durdurul': ['discontinued'],
+    'yas': ['birth'],
+    'posta': ['postal'],
+}
+
+def turkish_casefold(text: str) -> str:
+    """Metni Türkçe kurallarıyla küçültür ve ASCII'ye indirger."""
+    return text.translate(_TR_LOWER).lower().translate(_ASCII_FOLD)
+
+def _strip_suffixes(word: str, min_stem: int = 2) -> List[str]:
+    """Kelimeden art arda ek atarak oluşan tüm gövde adaylarını döndürür."""
+    forms = [word]
+    changed = True
+    while changed:
+        changed = False
+        for suffix in _TR_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+                word = word[:-len(suffix)]
+                forms.append(word)
+                changed = True
+                break
+    return forms
+
+def _english_stem(word: str) -> str:
+    """İngilizce çoğul eklerini kaba bir şekilde atar."""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+def stem_turkish(word: str) -> str:
+    """Türkçe kelimenin gövdesini döndürür (en az 3 harf bırakılır)."""
+    forms = _strip_suffixes(turkish_casefold(word), min_stem=3)
+    return forms[-1]
+
+def _lookup_synonyms(word: str) -> List[str]:
+    """Kelimenin Türkçe terim sözlüğündeki İngilizce karşılıklarını bulur.
+
+    Kısa anahtarlar ("ad") sadece ek atılmış gövdeyle tam eşleşir; uzun
+    anahtarlar kelimenin başıyla eşleşir ("calisanin" -> "calisan").
+    """
+    forms = _strip_suffixes(word)
+    best = None
+    for key in TURKISH_SYNONYMS:
+        if len(key) < 4:
+            matched = key in forms
+        else:
+            matched = word.startswith(key)
+        if matched and (best is None or len(key) > len(best)):
+            best = key
+    return TURKISH_SYNONYMS[best] if best else []
+
+def question_terms(question: str) -> Set[str]:
+    """Sorudan eşleştirmede kullanılacak terimleri çıkarır.
+
+    Kesme işaretinden sonraki ekler atılır ("Almanya'daki" -> "almanya"),
+    kelimeler gövdelerine indirgenir ve Türkçe terimler İngilizce
+    karşılıklarıyla genişletilir.
+    """
+    terms = set()
+    for raw in re.findall(r"[^\W\d_]+(?:'[^\W\d_]+)?", question):
+        word = turkish_casefold(raw.split("'")[0])
+        if len(word) < 2 or word in _STOPWORDS:
+            continue
+
+        synonyms = _lookup_synonyms(word)
+        if synonyms:
+            terms.update(synonyms)
+
+        stem = stem_turkish(word)
+        if stem not in _STOPWORDS:
+            terms.add(_english_stem(stem))
+            terms.add(_english_stem(word))
+    return terms
+
+def identifier_terms(identifier: str) -> List[str]:
+    """Tablo veya sütun adını sözcüklerine ayırır ("UnitsInStock" -> unit, in, stock)."""
+    parts = re.findall(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+', identifier.replace('_', ' '))
+    return [_english_stem(turkish_casefold(p)) for p in parts if len(p) > 1]
+
+class SchemaRetriever:
+    """Soruyla ilgili tabloları seçen sözcüksel şema arayıcısı.
+
+    Şema bir kez indekslenir; her soru için sadece puanlama ve seçim yapılır.
+    """
+
+    def __init__(self, schema: Dict[str, Any], config: Optional[Dict[str, Any]] = None):
+        self.schema = schema
+        self.config = dict(RETRIEVAL_CONFIG)
+        self.config.update(config or {})
+
+        self._terms: Dict[str, Dict[str, float]] = {}
+        self._name_terms: Dict[str, Set[str]] = {}
+        self._table_tokens: Dict[str, int] = {}
+        self._neighbours: Dict[str, Set[str]] = {name: set() for name in schema['tables']}
+        self._build_index()
+
+    def _build_index(self):
+        tables = self.schema['tables']
+        lowered = {name.lower(): name for name in tables}
+        doc_freq: Dict[str, int] = {}
+
+        for table_name, table_info in tables.items():
+            weights: Dict[str, float] = {}
+            # Tablo adındaki kelimeler sütun adlarındakilerden daha önemlidir
+            self._name_terms[table_name] = set(identifier_terms(table_name))
+            for term in self._name_terms[table_name]:
+                weights[term] = max(weights.get(term, 0.0), 3.0)
+            for col in table_info['columns']:
+                for term in identifier_terms(col['name']):
+                    weights[term] = max(weights.get(term, 0.0), 1.0)
+            self._terms[table_name] = weights
+            for term in weights:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+
+            self._table_tokens[table_name] = estimate_tokens(
+                serialize_schema({'tables': {table_name: table_info}})
+            )
+
+            # Tanımlı foreign key'ler her iki yönde komşuluk sayılır
+            for fk in table_info.get('foreign_keys', []):
+                referred = fk['referred_table']
+                if referred in tables and referred != table_name:
+                    self._neighbours[table_name].add(referred)
+                    self._neighbours[referred].add(table_name)
+
+            # "CustomerId" gibi sütun adlarından örtük ilişkileri çıkar
+            if self.config.get("infer_fk_from_names", True):
+                for col in table_info['columns']:
+                    match = re.match(r'(.+?)_?id$', col['name'], re.IGNORECASE)
+                    if not match:
+                        continue
+                    referred = lowered.get(match.group(1).lower())
+                    if referred and referred != table_name:
+                        self._neighbours[table_name].add(referred)
+                        self._neighbours[referred].add(table_name)
+
+        table_count = len(tables)
+        self._idf = {
+            term: math.log(1 + table_count / df) for term, df in doc_freq.items()
+        }
+
+    def score_tables(self, question: str) -> Dict[str, float]:
+        """Her tablo için soruyla örtüşme puanını hesaplar."""
+        terms = question_terms(question)
+        scores = {}
+        for table_name, weights in self._terms.items():
+            score = 0.0
+            for term in terms:
+                if term in weights:
+                    score += weights[term] * self._idf[term]
+                    continue
+                # Kısmi eşleşme ("ship" -> "shipper") yarım puan alır
+                if len(term) >= 4:
+                    partial = [w for t, w in weights.items() if t.startswith(term) or (len(t) >= 4 and term.startswith(t))]
+                    if partial:
+                        score += 0.5 * max(partial) * min(self._idf.values())
+            # Tablo adının tamamı soruda geçiyorsa ("Customer" ama
+            # "CustomerDemographic" değil) ek puan ver
+            name_terms = self._name_terms[table_name]
+            if name_terms and name_terms <= terms:
+                score += 2.0 * max(self._idf[t] for t in name_terms)
+            scores[table_name] = score
+        return scores
+
+    def select_tables(self, question: str) -> List[str]:
+        """Soru için prompt'a eklenecek tabloları sırasıyla döndürür."""
+        scores = self.score_tables(question)
+        top_score = max(scores.values(), default=0.0)
+        # En yüksek puanın belirli bir oranının altında kalan tablolar elenir
+        threshold = top_score * self.config.get("min_score_ratio", 0.0)
+        ranked = [
+            name for name, score in sorted(scores.items(), key=lambda x: -x[1])
+            if score > 0 and score >= threshold
+        ]
+
+        if not ranked:
+            # Hiçbir tablo eşleşmediyse bütçeye sığdığı kadar tüm şemayı kullan
+            candidates = list(self.schema['tables'])
+        else:
+            candidates = ranked[:self.config.get("top_k", 6)]
+            if self.config.get("include_fk_neighbours", True):
+                neighbours = set()
+                for name in candidates:
+                    neighbours.update(self._neighbours[name])
+                neighbours.difference_update(candidates)
+                candidates += sorted(neighbours, key=lambda name: -scores[name])
+
+        budget = self.config.get("token_budget")
+        selected = []
+        used = 0
+        for name in candidates:
+            cost = self._table_tokens[name]
+            if budget and selected and used + cost > budget:
+                continue
+            selected.append(name)
+            used += cost
+        return selected
+
+    def retrieve(self, question: str) -> Dict[str, Any]:
+        """Soruyla ilgili tablolardan oluşan alt şemayı döndürür.
+
+        Returns:
+            extract_schema() ile aynı yapıda, sadece seçilen tabloları içeren sözlük
+        """
+        selected = self.select_tables(question)
+        selected_set = set(selected)
+        return {
+            'tables': {name: self.schema['tables'][name] for name in selected},
+            'foreign_keys': [
+                fk for fk in self.schema.get('foreign_keys', [])
+                if fk['table'] in selected_set
+            ]
+        }
@@ -0,0 +1,362 @@
+"""
+Model sunucusuna giden üretim istekleri için zamanlayıcı.
+
+Ollama aynı anda sadece OLLAMA_NUM_PARALLEL kadar isteği gerçekten paralel
+işler; fazlası sunucuda sıraya girer ve her istek CPU için yarışır. Bu
+modül istekleri süreç içinde sıraya alır, aynı anda çalışan üretim
+sayısını sınırlar ve aynı prompt için süren bir üretim varsa yeni bir
+istek göndermek yerine onun sonucunu bekler (single-flight).
+
+Üretimi yapan istek (lider) iptal edilir, süre sınırını aşar veya sonucu
+okumayı bırakırsa bu hata bekleyenlere iletilmez: bekleyenlerden biri
+üretimi yeniden başlatır, diğerleri onu bekler.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .cancellation import CancelToken, QueryCancelledError
+from .config import SCHEDULER_CONFIG
+
+
+class QueueTimeoutError(TimeoutError):
+    """İstek, queue_timeout süresi içinde çalışmaya başlayamadı."""
+
+
+# Liderin üretimi bıraktığını bekleyenlere bildiren değer
+_HANDOVER = object()
+
+
+def _is_personal(error: BaseException) -> bool:
+    """Hata sadece lideri mi ilgilendiriyor (iptal, süre sınırı, sıra zaman aşımı, akışın bırakılması)."""
+    return isinstance(error, (QueryCancelledError, QueueTimeoutError, asyncio.CancelledError, GeneratorExit))
+
+
+class _Waiter:
+    """Sırada çalışma hakkı bekleyen bir istek."""
+
+    def __init__(self, notify: Callable[[], None]):
+        self.notify = notify
+        self.granted = False
+        self.abandoned = False
+
+
+class _Slot:
+    """Zamanlayıcıdan alınmış bir çalışma hakkı; release() birden çok kez çağrılabilir."""
+
+    def __init__(self, scheduler: "GenerationScheduler", started: float):
+        self._scheduler = scheduler
+        self._started = started
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._scheduler._release(time.perf_counter() - self._started)
+
+    def __enter__(self) -> "_Slot":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    async def __aenter__(self) -> "_Slot":
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+class GenerationScheduler:
+    """Üretim isteklerini sıraya alan ve eşzamanlılığı sınırlayan zamanlayıcı.
+
+    Hem iş parçacıklarından (slot, run) hem de asyncio görevlerinden
+    (aslot, arun) kullanılabilir; iki taraf aynı kapasiteyi paylaşır.
+    """
+
+    # Bekleyenlerin kendi iptal jetonlarını kontrol etme aralığı (saniye)
+    poll_interval = 0.1
+
+    def __init__(self, max_concurrency: int = 2, queue_timeout: Optional[float] = None):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._available = max_concurrency
+        self._waiters: "deque[_Waiter]" = deque()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.coalesced = 0       # Süren aynı üretimin sonucunu bekleyen istekler
+        self.completed = 0
+        self.failed = 0
+        self.handovers = 0       # Lider bırakınca bekleyenlerden birine devredilen üretimler
+        self.timeouts = 0
+        self.running = 0
+        self.queue_depth = 0     # Çalışma hakkı bekleyen istek sayısı
+        self.max_queue_depth = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+
+    def join(self, key: str) -> Tuple[Future, bool]:
+        """Anahtar için süren üretime katılır veya yenisini başlatır.
+
+        Returns:
+            (sonucu taşıyan Future, bu istek üretimi yapacak mı) çifti.
+            İkinci değer True ise çağıran üretimi yapmalı ve finish() ile
+            sonucu bildirmelidir.
+        """
+        with self._lock:
+            self.submitted += 1
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def finish(self, key: str, future: Future, result: Any = None,
+               error: Optional[BaseException] = None):
+        """Üretimin sonucunu bekleyen isteklere iletir.
+
+        Sadece lideri ilgilendiren hatalar (iptal, süre sınırı, sıra zaman
+        aşımı) iletilmez; üretim bekleyenlerden birine devredilir.
+        """
+        handover = error is not None and _is_personal(error)
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+            if handover and not future.done():
+                self.handovers += 1
+        if future.done():
+            return
+        if error is None:
+            future.set_result(result)
+        elif handover:
+            future.set_result(_HANDOVER)
+        else:
+            future.set_exception(error)
+
+    def abandon(self, key: str, future: Future):
+        """Lider sonucu bildirmeden çıktı (ör. akış sonuna kadar okunmadı); üretimi devreder."""
+        self.finish(key, future, error=GeneratorExit())
+
+    def wait(self, future: Future, cancel: Optional[CancelToken] = None) -> Any:
+        """Süren üretimin sonucunu bekler; beklerken isteğin kendi iptal jetonunu kontrol eder."""
+        while True:
+            if cancel is not None:
+                cancel.check()
+            remaining = cancel.remaining() if cancel is not None else None
+            timeout = None if cancel is None else min(self.poll_interval, remaining or self.poll_interval)
+            done, _ = wait([future], timeout)
+            if done:
+                return future.result()
+
+    async def await_result(self, future: Future, cancel: Optional[CancelToken] = None) -> Any:
+        """wait()'in asyncio sürümü; bu isteğin iptali diğer bekleyenlerin sonucunu iptal etmez."""
+        wrapped = asyncio.wrap_future(future)
+        while True:
+            if cancel is not None:
+                cancel.check()
+            done, _ = await asyncio.wait({wrapped}, timeout=None if cancel is None else self.poll_interval)
+            if done:
+                return wrapped.result()
+
+    def lead_or_wait(self, key: str, cancel: Optional[CancelToken] = None) -> Tuple[Optional[Future], Any]:
+        """Süren üretimi bekler veya üretimi yapacak istek (lider) olur.
+
+        Lider üretimi bırakırsa yeniden katılınır; bekleyenlerden ilki yeni lider olur.
+
+        Returns:
+            (Future, None): çağıran lider; üretimi yapıp finish() ile bildirmeli.
+            (None, sonuç): başka bir isteğin ürettiği sonuç.
+        """
+        while True:
+            future, leader = self.join(key)
+            if leader:
+                return future, None
+            result = self.wait(future, cancel)
+            if result is not _HANDOVER:
+                return None, result
+
+    async def alead_or_wait(self, key: str, cancel: Optional[CancelToken] = None) -> Tuple[Optional[Future], Any]:
+        """lead_or_wait()'in asyncio sürümü."""
+        while True:
+            future, leader = self.join(key)
+            if leader:
+                return future, None
+            result = await self.await_result(future, cancel)
+            if result is not _HANDOVER:
+                return None, result
+
+    def _try_acquire(self, waiter: _Waiter) -> bool:
+        """Boş hak varsa ve önde bekleyen yoksa hemen alır; yoksa sıraya ekler."""
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            if self._available > 0 and not self._waiters:
+                self._available -= 1
+                waiter.granted = True
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Zaman aşımı veya iptalde sıradan çıkar; hak bu arada verildiyse True döner."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            waiter.abandoned = True
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            return False
+
+    def _record_wait(self, seconds: float, acquired: bool = True, timed_out: bool = False):
+        with self._lock:
+            self.queue_depth -= 1
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if acquired:
+                self.running += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def _release(self, run_seconds: Optional[float] = None):
+        """Hakkı sıradaki ilk isteğe devreder; bekleyen yoksa havuza geri koyar."""
+        notify = None
+        with self._lock:
+            if run_seconds is not None:
+                self.running -= 1
+                self.run_total += run_seconds
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.abandoned:
+                    waiter.granted = True
+                    notify = waiter.notify
+                    break
+            else:
+                self._available += 1
+        if notify is not None:
+            notify()
+
+    def _timeout_error(self) -> QueueTimeoutError:
+        return QueueTimeoutError(f"Model sırası {self.queue_timeout} saniyede boşalmadı")
+
+    def slot(self) -> _Slot:
+        """Çalışma hakkı alınana kadar sırada bekler (with bloğuyla kullanılır)."""
+        start = time.perf_counter()
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        if not self._try_acquire(waiter):
+            if not event.wait(self.queue_timeout) and not self._abandon(waiter):
+                self._record_wait(time.perf_counter() - start, acquired=False, timed_out=True)
+                raise self._timeout_error()
+        now = time.perf_counter()
+        self._record_wait(now - start)
+        return _Slot(self, now)
+
+    async def aslot(self) -> _Slot:
+        """slot()'un asyncio sürümü; beklerken olay döngüsünü ve iş parçacığı tutmaz."""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+
+        waiter = _Waiter(notify)
+        if not self._try_acquire(waiter):
+            try:
+                await asyncio.wait_for(granted, self.queue_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if self._abandon(waiter):
+                    # Hak tam bu sırada verildi; kullanılmayacağı için devret
+                    self._release()
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                self._record_wait(time.perf_counter() - start, acquired=False, timed_out=timed_out)
+                if timed_out:
+                    raise self._timeout_error() from None
+                raise
+        now = time.perf_counter()
+        self._record_wait(now - start)
+        return _Slot(self, now)
+
+    def run(self, key: str, fn: Callable[[], Any], cancel: Optional[CancelToken] = None) -> Any:
+        """fn()'i sıraya alarak çalıştırır; aynı anahtar için süren çağrı varsa onu bekler.
+
+        Args:
+            cancel: Beklerken kontrol edilen iptal jetonu (fn kendi iptalini ayrıca kontrol eder)
+        """
+        future, result = self.lead_or_wait(key, cancel)
+        if future is None:
+            return result
+        try:
+            with self.slot():
+                result = fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
+
+    async def arun(self, key: str, afn: Callable[[], Awaitable[Any]],
+                   cancel: Optional[CancelToken] = None) -> Any:
+        """run()'ın asyncio sürümü."""
+        future, result = await self.alead_or_wait(key, cancel)
+        if future is None:
+            return result
+        try:
+            async with await self.aslot():
+                result = await afn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Sıra derinliği, bekleme süreleri ve tekilleştirme sayaçlarını döndürür."""
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'running': self.running,
+                'queue_depth': self.queue_depth,
+                'max_queue_depth': self.max_queue_depth,
+                'inflight': len(self._inflight),
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'completed': self.completed,
+                'failed': self.failed,
+                'handovers': self.handovers,
+                'timeouts': self.timeouts,
+                'wait_avg_s': self.wait_total / self.wait_count if self.wait_count else 0.0,
+                'wait_max_s': self.wait_max,
+                'run_avg_s': self.run_total / (self.completed + self.failed) if self.completed + self.failed else 0.0,
+            }
+
+
+def build_scheduler(config: Optional[Dict[str, Any]] = None) -> Optional[GenerationScheduler]:
+    """SCHEDULER_CONFIG ayarlarına göre zamanlayıcı oluşturur.
+
+    Returns:
+        GenerationScheduler nesnesi veya zamanlayıcı kapalıysa None
+    """
+    config = config or SCHEDULER_CONFIG
+    if not config.get("enabled", True):
+        return None
+    return GenerationScheduler(
+        max_concurrency=config.get("max_concurrency", 2),
+        queue_timeout=config.get("queue_timeout")
+    )
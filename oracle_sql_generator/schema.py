@@ -1,30 +1,83 @@
 """
 Veritabanı şema işlemleri için modül.
 """
-from typing import Dict, Any, List
-from sqlalchemy import inspect
-from .db import get_db_engine
-from .config import ORACLE_CONFIG
-
-def extract_schema() -> Dict[str, Any]:
-    """Oracle veritabanı şemasını çıkarır."""
-    engine = get_db_engine()
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from .db import get_db_engine, connect
+from .config import SCHEMA_CONFIG, SCHEMA_CACHE_CONFIG, SCHEMA_FORMAT_CONFIG
+from .dialects import get_dialect
+from .schema_cache import get_schema_fingerprint, load_schema_snapshot, save_schema_snapshot
+
+def extract_schema(use_cache: bool = True, engine: Optional[Engine] = None) -> Dict[str, Any]:
+    """Veritabanı şemasını çıkarır.
+    
+    Şema önbelleği etkinse önce ucuz bir parmak izi sorgusu çalıştırılır;
+    parmak izi diskteki snapshot ile aynıysa şema dosyadan yüklenir.
+    
+    Args:
+        use_cache: False ise snapshot yok sayılır ve şema yeniden çıkarılır
+        engine: Kullanılacak engine (varsayılan: paylaşılan Oracle engine'i)
+        
+    Returns:
+        {'tables': ..., 'foreign_keys': ...} yapısındaki şema sözlüğü
+    """
+    engine = engine or get_db_engine()
+    dialect = get_dialect(engine)
+    owner = dialect.owner
+    
+    fingerprint = None
+    if SCHEMA_CACHE_CONFIG.get("enabled", True):
+        try:
+            with connect(engine) as conn:
+                fingerprint = get_schema_fingerprint(conn, owner)
+        except Exception as e:
+            print(f"Şema parmak izi alınırken hata: {e}")
+        
+        if use_cache and fingerprint is not None:
+            schema = load_schema_snapshot(engine.url, fingerprint, owner)
+            if schema is not None:
+                return schema
+    
+    if SCHEMA_CONFIG.get("extraction_mode", "bulk") == "bulk" and dialect.bulk_schema:
+        with connect(engine) as conn:
+            schema = extract_schema_bulk(conn, owner)
+    else:
+        schema = _extract_schema_from_inspector(engine, owner)
+    
+    if fingerprint is not None:
+        save_schema_snapshot(engine.url, fingerprint, schema, owner)
+    
+    return schema
+
+def _extract_schema_from_inspector(engine, owner: Optional[str] = None) -> Dict[str, Any]:
+    """Şemayı SQLAlchemy inspector ile tablo tablo çıkarır.
+    
+    Args:
+        engine: Kullanılacak engine
+        owner: Şema sahibi (None: bağlantının varsayılan şeması)
+    """
     inspector = inspect(engine)
     schema = {'tables': {}, 'foreign_keys': []}
     
-    with engine.connect() as conn:
+    with connect(engine) as conn:
         # Kullanıcının erişebildiği tabloları al
-        tables = inspector.get_table_names(schema=ORACLE_CONFIG["username"].upper())
+        tables = inspector.get_table_names(schema=owner)
         
         for table_name in tables:
             try:
                 # Sütun bilgilerini al
                 columns = []
-                primary_keys = inspector.get_pk_constraint(table_name, schema=ORACLE_CONFIG["username"].upper())
+                primary_keys = inspector.get_pk_constraint(table_name, schema=owner)
                 pk_columns = primary_keys.get('constrained_columns', [])
                 
                 # Sütun detaylarını al
-                columns_info = inspector.get_columns(table_name, schema=ORACLE_CONFIG["username"].upper())
+                columns_info = inspector.get_columns(table_name, schema=owner)
                 for col in columns_info:
                     columns.append({
                         'name': col['name'],
@@ -35,7 +88,7 @@ def extract_schema() -> Dict[str, Any]:
                     })
                 
                 # Foreign key bilgilerini al
-                fks = inspector.get_foreign_keys(table_name, schema=ORACLE_CONFIG["username"].upper())
+                fks = inspector.get_foreign_keys(table_name, schema=owner)
                 
                 schema['tables'][table_name] = {
                     'columns': columns,
@@ -58,15 +111,218 @@ def extract_schema() -> Dict[str, Any]:
     
     return schema
 
-def format_schema_for_prompt(schema: Dict[str, Any]) -> str:
-    """Şema bilgisini prompt için düzenlenmiş bir metne dönüştürür.
+def extract_schema_bulk(conn, owner: Optional[str] = None) -> Dict[str, Any]:
+    """Şemayı katalog görünümlerinden toplu sorgularla çıkarır.
+    
+    Tablo sayısından bağımsız olarak her metadata türü (sütunlar,
+    kısıtlar) için tek sorgu çalıştırılır.
     
     Args:
-        schema: extract_schema() fonksiyonundan dönen şema sözlüğü
+        conn: Açık SQLAlchemy bağlantısı
+        owner: Oracle şema sahibi (SQLite için kullanılmaz)
         
     Returns:
-        İnsan tarafından okunabilir şema metni
+        extract_schema() ile aynı yapıdaki şema sözlüğü
     """
+    dialect = conn.dialect.name
+    if dialect == "oracle":
+        return extract_oracle_schema_bulk(conn, owner)
+    if dialect == "sqlite":
+        return extract_sqlite_schema_bulk(conn)
+    raise ValueError(f"Toplu şema çıkarma desteklenmiyor: {dialect}")
+
+def _format_oracle_type(row) -> str:
+    """ALL_TAB_COLUMNS satırından okunabilir bir tip adı üretir."""
+    data_type = row['data_type']
+    if data_type in ('VARCHAR2', 'NVARCHAR2', 'CHAR', 'NCHAR'):
+        unit = " CHAR" if row['char_used'] == 'C' and data_type in ('VARCHAR2', 'CHAR') else ""
+        return f"{data_type}({row['char_length']}{unit})"
+    if data_type == 'NUMBER':
+        precision, scale = row['data_precision'], row['data_scale']
+        if precision is None and scale == 0:
+            return "INTEGER"
+        if precision is None:
+            return "NUMBER"
+        return f"NUMBER({precision}, {scale})" if scale else f"NUMBER({precision})"
+    if data_type in ('RAW', 'UROWID'):
+        return f"{data_type}({row['data_length']})"
+    return data_type
+
+def extract_oracle_schema_bulk(conn, owner: str) -> Dict[str, Any]:
+    """Oracle şemasını ALL_TAB_COLUMNS, ALL_CONSTRAINTS ve ALL_CONS_COLUMNS
+    görünümlerinden iki toplu sorguyla çıkarır.
+    
+    Tablo ve sütun adları SQLAlchemy inspector'ın yaptığı gibi dialect'in
+    normalize_name() kuralıyla dönüştürülür; böylece çıktı inspector
+    yoluyla aynıdır.
+    """
+    normalize = conn.dialect.normalize_name
+    schema = {'tables': {}, 'foreign_keys': []}
+    
+    # Sütun bilgileri
+    rows = conn.execute(text("""
+        SELECT c.table_name, c.column_name, c.data_type, c.data_length,
+               c.char_length, c.char_used, c.data_precision, c.data_scale,
+               c.nullable, c.data_default
+        FROM all_tab_columns c
+        JOIN all_tables t ON t.owner = c.owner AND t.table_name = c.table_name
+        WHERE c.owner = :owner
+          AND t.nested = 'NO' AND t.secondary = 'N' AND t.iot_name IS NULL
+        ORDER BY c.table_name, c.column_id
+    """), {'owner': owner}).mappings()
+    
+    for row in rows:
+        table_name = normalize(row['table_name'])
+        table = schema['tables'].setdefault(
+            table_name, {'columns': [], 'primary_key': [], 'foreign_keys': []}
+        )
+        default = row['data_default']
+        table['columns'].append({
+            'name': normalize(row['column_name']),
+            'type': _format_oracle_type(row),
+            'nullable': row['nullable'] == 'Y',
+            'default': default.strip() if isinstance(default, str) else default,
+            'primary_key': False
+        })
+    
+    # Primary key ve foreign key kısıtları
+    rows = conn.execute(text("""
+        SELECT c.table_name, c.constraint_name, c.constraint_type,
+               cc.column_name, r.owner AS r_owner, r.table_name AS r_table_name,
+               rc.column_name AS r_column_name
+        FROM all_constraints c
+        JOIN all_cons_columns cc
+          ON cc.owner = c.owner AND cc.constraint_name = c.constraint_name
+         AND cc.table_name = c.table_name
+        LEFT JOIN all_constraints r
+          ON r.owner = c.r_owner AND r.constraint_name = c.r_constraint_name
+        LEFT JOIN all_cons_columns rc
+          ON rc.owner = r.owner AND rc.constraint_name = r.constraint_name
+         AND rc.position = cc.position
+        WHERE c.owner = :owner AND c.constraint_type IN ('P', 'R')
+        ORDER BY c.table_name, c.constraint_name, cc.position
+    """), {'owner': owner}).mappings()
+    
+    fks_by_name = {}
+    for row in rows:
+        table_name = normalize(row['table_name'])
+        table = schema['tables'].get(table_name)
+        if table is None:
+            continue
+        column_name = normalize(row['column_name'])
+        
+        if row['constraint_type'] == 'P':
+            table['primary_key'].append(column_name)
+            for col in table['columns']:
+                if col['name'] == column_name:
+                    col['primary_key'] = True
+            continue
+        
+        key = (table_name, row['constraint_name'])
+        fk = fks_by_name.get(key)
+        if fk is None:
+            fk = {
+                'name': normalize(row['constraint_name']),
+                'constrained_columns': [],
+                'referred_schema': normalize(row['r_owner']) if row['r_owner'] != owner else None,
+                'referred_table': normalize(row['r_table_name']),
+                'referred_columns': [],
+                'options': {}
+            }
+            fks_by_name[key] = fk
+            table['foreign_keys'].append(fk)
+        fk['constrained_columns'].append(column_name)
+        fk['referred_columns'].append(normalize(row['r_column_name']))
+    
+    # Global foreign key listesine ekle
+    for (table_name, _), fk in fks_by_name.items():
+        schema['foreign_keys'].append({
+            'table': table_name,
+            'columns': fk['constrained_columns'],
+            'foreign_table': fk['referred_table'],
+            'foreign_columns': fk['referred_columns']
+        })
+    
+    return schema
+
+def extract_sqlite_schema_bulk(conn) -> Dict[str, Any]:
+    """SQLite şemasını pragma_table_info ve pragma_foreign_key_list tablo
+    değerli fonksiyonlarıyla, tablo başına sorgu atmadan çıkarır.
+    
+    Çıktı, metin tabanlı uygulamalardaki PRAGMA döngüsüyle aynı yapıdadır
+    ve her tablo için 'ddl' alanını da içerir.
+    """
+    schema = {'tables': {}, 'foreign_keys': []}
+    
+    # Tablolar, DDL'ler ve sütunlar tek sorguda
+    rows = conn.execute(text("""
+        SELECT m.name AS table_name, m.sql AS ddl, p.name, p.type,
+               p."notnull", p.dflt_value, p.pk
+        FROM sqlite_master AS m
+        JOIN pragma_table_info(m.name) AS p
+        WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+        ORDER BY m.name, p.cid
+    """)).mappings()
+    
+    for row in rows:
+        table = schema['tables'].setdefault(row['table_name'], {
+            'columns': [],
+            'primary_key': [],
+            'foreign_keys': [],
+            'ddl': row['ddl']
+        })
+        is_primary = bool(row['pk'])
+        table['columns'].append({
+            'name': row['name'],
+            'type': row['type'],
+            'nullable': not bool(row['notnull']),
+            'default': row['dflt_value'],
+            'primary_key': is_primary
+        })
+        if is_primary:
+            table['primary_key'].append(row['name'])
+    
+    # Foreign key'ler tek sorguda
+    rows = conn.execute(text("""
+        SELECT m.name AS table_name, f.id, f."table" AS referred_table,
+               f."from", f."to"
+        FROM sqlite_master AS m
+        JOIN pragma_foreign_key_list(m.name) AS f
+        WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+        ORDER BY m.name, f.id, f.seq
+    """)).mappings()
+    
+    fks_by_id = {}
+    for row in rows:
+        table = schema['tables'].get(row['table_name'])
+        if table is None:
+            continue
+        key = (row['table_name'], row['id'])
+        fk = fks_by_id.get(key)
+        if fk is None:
+            fk = {
+                'constrained_columns': [],
+                'referred_table': row['referred_table'],
+                'referred_columns': []
+            }
+            fks_by_id[key] = fk
+            table['foreign_keys'].append(fk)
+        fk['constrained_columns'].append(row['from'])
+        fk['referred_columns'].append(row['to'])
+    
+    # Genel foreign key listesine ekle
+    for (table_name, _), fk in fks_by_id.items():
+        schema['foreign_keys'].append({
+            'table': table_name,
+            'columns': fk['constrained_columns'],
+            'foreign_table': fk['referred_table'],
+            'foreign_columns': fk['referred_columns']
+        })
+    
+    return schema
+
+def _format_markdown(schema: Dict[str, Any]) -> str:
+    """Tablo başına bir başlık, sütun başına bir satır ve tablonun ilişkileri."""
     schema_text = []
     
     for table_name, table_info in schema['tables'].items():
@@ -102,3 +358,171 @@ def format_schema_for_prompt(schema: Dict[str, Any]) -> str:
         schema_text.append("\n".join(table_info_text))
     
     return "\n\n".join(schema_text)
+
+# Kısa tipler; ilk eşleşen önek kullanılır
+_TYPE_ABBREVIATIONS = {
+    "VARCHAR": "text", "VARCHAR2": "text", "NVARCHAR": "text", "NVARCHAR2": "text", "CHAR": "text",
+    "NCHAR": "text", "CHARACTER": "text", "TEXT": "text", "CLOB": "text", "NCLOB": "text", "STRING": "text",
+    "INT": "int", "INTEGER": "int", "BIGINT": "int", "SMALLINT": "int", "TINYINT": "int", "MEDIUMINT": "int",
+    "DECIMAL": "num", "NUMERIC": "num", "REAL": "num", "FLOAT": "num", "DOUBLE": "num",
+    "BINARY_FLOAT": "num", "BINARY_DOUBLE": "num", "MONEY": "num",
+    "TIMESTAMP": "ts", "DATETIME": "ts", "DATETIME2": "ts", "DATETIMEOFFSET": "ts", "DATE": "date",
+    # Oracle INTERVAL DAY TO SECOND / YEAR TO MONTH bir süredir, sayı değildir
+    "INTERVAL": "interval",
+    "BOOL": "bool", "BOOLEAN": "bool", "BIT": "bool",
+    "BLOB": "blob", "RAW": "blob", "BINARY": "blob", "VARBINARY": "blob",
+}
+
+def abbreviate_type(type_name: Optional[str]) -> str:
+    """Sütun tipini kısa bir ada çevirir (ör. VARCHAR2(40) → text, NUMBER(10) → int).
+    
+    Tipin adı (parantez ve ek niteleyiciler hariç ilk kelime) bütün olarak
+    eşleştirilir; INTERVAL gibi adlar INT'e düşmez. Oracle NUMBER tipi
+    ondalık basamağı yoksa int, varsa num olur. Tanınmayan tipler küçük
+    harfe çevrilip olduğu gibi bırakılır.
+    """
+    if not type_name:
+        return ""
+    upper = str(type_name).strip().upper()
+    base = re.match(r'[A-Z_][A-Z0-9_]*', upper)
+    base = base.group(0) if base else upper
+    if base == "NUMBER":
+        inner = upper[6:].strip("() ")
+        scale = inner.split(",")[1].strip() if "," in inner else "0"
+        return "int" if inner and scale == "0" else "num"
+    return _TYPE_ABBREVIATIONS.get(base, str(type_name).strip().lower())
+
+def _format_compact(schema: Dict[str, Any]) -> str:
+    """Tablo başına tek satır: Tablo(sütun:tip*, ...); ilişkiler sonda bir kez listelenir."""
+    abbreviate = SCHEMA_FORMAT_CONFIG.get("abbreviate_types", True)
+    lines = ["# Tablo(sütun:tip); * birincil anahtar, ! NOT NULL"]
+    edges = []
+    
+    for table_name, table_info in schema['tables'].items():
+        columns = []
+        for col in table_info['columns']:
+            col_type = abbreviate_type(col['type']) if abbreviate else str(col['type'] or "")
+            col_text = f"{col['name']}:{col_type}" if col_type else col['name']
+            if col['primary_key']:
+                col_text += "*"
+            elif not col['nullable']:
+                col_text += "!"
+            columns.append(col_text)
+        lines.append(f"{table_name}({','.join(columns)})")
+        
+        for fk in table_info.get('foreign_keys', []):
+            for column, referred in zip(fk['constrained_columns'], fk['referred_columns']):
+                edge = f"{table_name}.{column}={fk['referred_table']}.{referred}"
+                if edge not in edges:
+                    edges.append(edge)
+    
+    if edges:
+        lines.append("# İlişkiler")
+        lines.extend(edges)
+    return "\n".join(lines)
+
+def _build_ddl(table_name: str, table_info: Dict[str, Any]) -> str:
+    """Sözlükteki bilgilerden CREATE TABLE ifadesi oluşturur."""
+    parts = []
+    for col in table_info['columns']:
+        col_text = f"  {col['name']} {col['type'] or ''}".rstrip()
+        if not col['nullable'] and not col['primary_key']:
+            col_text += " NOT NULL"
+        if col['default'] is not None:
+            col_text += f" DEFAULT {col['default']}"
+        parts.append(col_text)
+    if table_info.get('primary_key'):
+        parts.append(f"  PRIMARY KEY ({', '.join(table_info['primary_key'])})")
+    for fk in table_info.get('foreign_keys', []):
+        parts.append(
+            f"  FOREIGN KEY ({', '.join(fk['constrained_columns'])}) "
+            f"REFERENCES {fk['referred_table']}({', '.join(fk['referred_columns'])})"
+        )
+    return f"CREATE TABLE {table_name} (\n" + ",\n".join(parts) + "\n)"
+
+def _format_ddl(schema: Dict[str, Any]) -> str:
+    """Tablo başına CREATE TABLE ifadesi; varsa veritabanındaki özgün DDL kullanılır."""
+    statements = []
+    for table_name, table_info in schema['tables'].items():
+        ddl = table_info.get('ddl') or _build_ddl(table_name, table_info)
+        statements.append(ddl.strip().rstrip(";") + ";")
+    return "\n\n".join(statements)
+
+SCHEMA_FORMATS = {
+    "markdown": _format_markdown,
+    "compact": _format_compact,
+    "ddl": _format_ddl,
+}
+
+def serialize_schema(schema: Dict[str, Any], fmt: Optional[str] = None) -> str:
+    """Şemayı verilen biçimde metne dönüştürür (önbelleksiz).
+    
+    Args:
+        schema: extract_schema() ile aynı yapıda şema sözlüğü
+        fmt: "markdown", "compact" veya "ddl" (varsayılan: SCHEMA_FORMAT_CONFIG)
+        
+    Returns:
+        Prompt'a eklenecek şema metni
+    """
+    fmt = fmt or SCHEMA_FORMAT_CONFIG.get("format", "markdown")
+    if fmt not in SCHEMA_FORMATS:
+        raise ValueError(f"Bilinmeyen şema biçimi: {fmt} (seçenekler: {', '.join(SCHEMA_FORMATS)})")
+    return SCHEMA_FORMATS[fmt](schema)
+
+def schema_fingerprint(schema: Dict[str, Any]) -> str:
+    """Şema içeriğinin parmak izi; tablo, sütun, tip ve ilişkiler değişince değişir."""
+    payload = json.dumps(schema.get('tables', {}), sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+# Şema nesnesi başına parmak izi ve (parmak izi, biçim, tablolar) başına metin
+_FINGERPRINTS: "OrderedDict[int, Tuple[Dict[str, Any], str]]" = OrderedDict()
+_SCHEMA_TEXTS: "OrderedDict[Tuple[str, str, Optional[Tuple[str, ...]]], str]" = OrderedDict()
+_FORMAT_LOCK = threading.Lock()
+
+def _cached_fingerprint(schema: Dict[str, Any]) -> str:
+    """Parmak izini şema nesnesi başına bir kez hesaplar."""
+    with _FORMAT_LOCK:
+        entry = _FINGERPRINTS.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            _FINGERPRINTS.move_to_end(id(schema))
+            return entry[1]
+    fingerprint = schema_fingerprint(schema)
+    with _FORMAT_LOCK:
+        _FINGERPRINTS[id(schema)] = (schema, fingerprint)
+        while len(_FINGERPRINTS) > 8:
+            _FINGERPRINTS.popitem(last=False)
+    return fingerprint
+
+def format_schema_for_prompt(schema: Dict[str, Any], tables: Optional[Iterable[str]] = None,
+                             fmt: Optional[str] = None) -> str:
+    """Şema bilgisini prompt için düzenlenmiş bir metne dönüştürür.
+    
+    Metin şemanın parmak izi, biçim ve seçilen tablolara göre önbellekte
+    tutulur; aynı şema ve tablo seçimi için yeniden oluşturulmaz.
+    
+    Args:
+        schema: extract_schema() fonksiyonundan dönen şema sözlüğü
+        tables: Sadece bu tablolar yazılır (varsayılan: tümü)
+        fmt: "markdown", "compact" veya "ddl" (varsayılan: SCHEMA_FORMAT_CONFIG)
+        
+    Returns:
+        Prompt'a eklenecek şema metni
+    """
+    fmt = fmt or SCHEMA_FORMAT_CONFIG.get("format", "markdown")
+    selected = tuple(tables) if tables is not None else None
+    key = (_cached_fingerprint(schema), fmt, selected)
+    with _FORMAT_LOCK:
+        schema_text = _SCHEMA_TEXTS.get(key)
+        if schema_text is not None:
+            _SCHEMA_TEXTS.move_to_end(key)
+            return schema_text
+    
+    if selected is not None:
+        schema = {'tables': {name: schema['tables'][name] for name in selected if name in schema['tables']}}
+    schema_text = serialize_schema(schema, fmt)
+    
+    with _FORMAT_LOCK:
+        _SCHEMA_TEXTS[key] = schema_text
+        while len(_SCHEMA_TEXTS) > SCHEMA_FORMAT_CONFIG.get("cache_size", 512):
+            _SCHEMA_TEXTS.popitem(last=False)
+    return schema_text
@@ -0,0 +1,127 @@
+"""
+Şema anlık görüntülerini (snapshot) diskte saklamak için modül.
+
+Çıkarılan şema sözlüğü, veritabanından ucuza okunabilen bir parmak iziyle
+(fingerprint) birlikte yerel bir JSON dosyasına yazılır. Parmak izi
+değişmediği sürece uygulama şemayı veritabanından yeniden çıkarmak yerine
+bu dosyadan yükler.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import URL
+
+from .config import SCHEMA_CACHE_CONFIG
+
+# Dosya biçimi değiştiğinde artırılır; eski sürümdeki dosyalar yok sayılır
+SNAPSHOT_VERSION = 1
+
+def get_schema_fingerprint(conn, owner: Optional[str] = None) -> Optional[str]:
+    """Şemada bir DDL değişikliği olup olmadığını gösteren parmak izini döndürür.
+
+    Oracle için ALL_OBJECTS içindeki en son LAST_DDL_TIME ve nesne sayısı,
+    SQLite için PRAGMA schema_version kullanılır.
+
+    Args:
+        conn: Açık SQLAlchemy bağlantısı
+        owner: Oracle şema sahibi (kullanıcı adı)
+
+    Returns:
+        Parmak izi metni; desteklenmeyen veritabanları için None
+    """
+    dialect = conn.dialect.name
+    if dialect == "oracle":
+        row = conn.execute(
+            text(
+                "SELECT TO_CHAR(MAX(LAST_DDL_TIME), 'YYYY-MM-DD HH24:MI:SS'), COUNT(*) "
+                "FROM ALL_OBJECTS "
+                "WHERE OWNER = :owner AND OBJECT_TYPE IN ('TABLE', 'VIEW')"
+            ),
+            {"owner": owner}
+        ).first()
+        return f"{row[0]}|{row[1]}"
+    if dialect == "sqlite":
+        return str(conn.execute(text("PRAGMA schema_version")).scalar())
+    return None
+
+def _snapshot_path(url: URL, owner: Optional[str] = None) -> str:
+    """Bağlantı URL'sine özgü snapshot dosyasının yolunu döndürür."""
+    key = f"{url.render_as_string(hide_password=True)}|{owner or ''}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SCHEMA_CACHE_CONFIG["path"], f"schema_{digest}.json")
+
+def load_schema_snapshot(url: URL, fingerprint: str,
+                         owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Parmak izi eşleşiyorsa diskteki şema snapshot'ını yükler.
+
+    Args:
+        url: Veritabanı bağlantı URL'si
+        fingerprint: get_schema_fingerprint() ile alınan güncel parmak izi
+        owner: Oracle şema sahibi
+
+    Returns:
+        Şema sözlüğü veya geçerli bir snapshot yoksa None
+    """
+    path = _snapshot_path(url, owner)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Şema önbelleği okunurken hata: {e}")
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    if snapshot.get("fingerprint") != fingerprint:
+        return None
+    return snapshot.get("schema")
+
+def save_schema_snapshot(url: URL, fingerprint: str, schema: Dict[str, Any],
+                         owner: Optional[str] = None) -> Optional[str]:
+    """Şema sözlüğünü parmak iziyle birlikte diske yazar.
+
+    Dosya önce geçici bir dosyaya yazılır ve ardından atomik olarak yerine
+    taşınır; böylece aynı anda başlayan süreçler yarım dosya okumaz.
+
+    Returns:
+        Yazılan dosyanın yolu veya hata durumunda None
+    """
+    path = _snapshot_path(url, owner)
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "url": url.render_as_string(hide_password=True),
+        "owner": owner,
+        "fingerprint": fingerprint,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "schema": schema
+    }
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        return path
+    except OSError as e:
+        print(f"Şema önbelleği yazılırken hata: {e}")
+        return None
+
+def clear_schema_snapshots():
+    """Tüm şema snapshot dosyalarını siler."""
+    cache_dir = SCHEMA_CACHE_CONFIG["path"]
+    if not os.path.isdir(cache_dir):
+        return
+    for filename in os.listdir(cache_dir):
+        if filename.startswith("schema_") and filename.endswith(".json"):
+            try:
+                os.remove(os.path.join(cache_dir, filename))
+            except Exception as e:
+                print(f"Dosya silinirken hata oluştu {filename}: {e}")
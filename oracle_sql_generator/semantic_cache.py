@@ -0,0 +1,326 @@
+"""
+Benzer sorular için anlamsal önbellek modülü.
+
+Farklı kelimelerle sorulan aynı soru ("müşterileri listele" ile "tüm
+müşterileri getir") için modeli yeniden çalıştırmamak amacıyla sorular
+yerel bir gömme (embedding) modeliyle vektöre çevrilir. Vektörler kompakt
+bir NumPy matrisinde tutulur ve kosinüs benzerliği eşiğin üstündeki en
+yakın kaydın SQL'i döndürülür.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .config import MODEL_CONFIG, SEMANTIC_CACHE_CONFIG
+from .retrieval import question_terms, turkish_casefold
+
+
+def question_literals(question: str) -> Tuple[str, ...]:
+    """Sorudaki sayıları ve özel isimleri döndürür.
+
+    Türkçede özel isimlere gelen ekler kesme işaretiyle ayrıldığı için
+    ("Almanya'daki") bu kelimeler özel isim kabul edilir. Benzer iki sorunun
+    aynı kabul edilmesi için bu değerlerin birebir aynı olması gerekir;
+    böylece "fiyatı 50'den yüksek" ile "fiyatı 100'den yüksek" karışmaz.
+    """
+    literals = set(re.findall(r"\d+(?:[.,]\d+)?", question))
+    for word in re.findall(r"([^\W\d_]+)'[^\W\d_]+", question):
+        literals.add(word.lower())
+    for quoted in re.findall(r"[\"“]([^\"”]+)[\"”]", question):
+        literals.add(quoted.strip().lower())
+    return tuple(sorted(literals))
+
+
+# Sorunun anlamını tersine çeviren kelimeler (turkish_casefold sonrası ASCII).
+# Her desen kelimenin başına uygulanır; eşleşen ilk desenin etiketi alınır.
+_POLARITY_PATTERNS = [
+    # Olumsuzluk: değil, hariç, -sız/-siz, olmayan, gönderilmemiş, satılmadı...
+    (re.compile(r"(degil|haric|disinda|yok|hic|olmadan)"), "olumsuz"),
+    (re.compile(r"\w{2,}(siz|suz)(lar|ler)?(i|u|in|un|dir)?$"), "olumsuz"),
+    (re.compile(r"\w*(mayan|meyen|mamis|memis|madi|medi|madan|meden)\w*$"), "olumsuz"),
+    (re.compile(r"\w*m(a|e)z(lar|ler)?$"), "olumsuz"),
+    # Sıralama yönü
+    (re.compile(r"(artan|yukselen)"), "artan"),
+    (re.compile(r"(azalan|dusen)"), "azalan"),
+    # Büyüklük: en yüksek / en düşük, en çok / en az, 50'den fazla / az
+    (re.compile(r"(yuksek|fazla|cok$|buyu|ust|uzer|pahali|max|maks)"), "yuksek"),
+    (re.compile(r"(dusuk|az$|azi|kucu|alt|ucuz|min$|minimum)"), "dusuk"),
+    # Zaman: önce / sonra, ilk / son, en eski / en yeni
+    (re.compile(r"(once|ilk|eski)"), "once"),
+    (re.compile(r"(sonra|son$|sondaki|yeni)"), "sonra"),
+]
+
+def question_polarity(question: str) -> Tuple[str, ...]:
+    """Sorudaki olumsuzluk ve yön (artan/azalan, yüksek/düşük, önce/sonra) işaretlerini sırasıyla döndürür.
+
+    Sözcüksel gömmede "stokta olmayan ürünler" ile "stokta olan ürünler"
+    çok benzer çıkar. question_literals gibi, iki sorunun aynı kabul
+    edilmesi için bu işaretlerin birebir aynı olması gerekir. Sıra korunur;
+    böylece "büyükten küçüğe" ile "küçükten büyüğe" de karışmaz.
+    """
+    markers: List[str] = []
+    for word in re.findall(r"[^\W\d_]+", turkish_casefold(question)):
+        for pattern, tag in _POLARITY_PATTERNS:
+            if pattern.match(word):
+                if not markers or markers[-1] != tag:
+                    markers.append(tag)
+                break
+    return tuple(markers)
+
+
+class LexicalEmbedder:
+    """Paket içi, harici model gerektirmeyen gömme.
+
+    Sorunun gövdelenmiş ve eş anlamlılarla genişletilmiş terimleri
+    (bkz. retrieval.question_terms) işaretli özellik karma (feature hashing)
+    ile sabit boyutlu bir vektöre yerleştirilir.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for term in question_terms(text):
+            digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dim] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class OllamaEmbedder:
+    """Ollama üzerinde çalışan yerel embedding modeliyle gömme."""
+
+    def __init__(self, model: str, base_url: str):
+        from langchain_ollama import OllamaEmbeddings
+        self._embeddings = OllamaEmbeddings(model=model, base_url=base_url)
+        self.dim = len(self._embeddings.embed_query("test"))
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self._embeddings.embed_query(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """Normalize edilmiş vektörler için tam (exact) kNN indeksi.
+
+    Vektörler önceden ayrılmış tek bir NumPy matrisinde tutulur ve
+    kapasite dolduğunda iki katına çıkarılır. max_entries'e ulaşıldığında
+    en eski kaydın yerine yazılır (halka tampon).
+    """
+
+    def __init__(self, dim: int, max_entries: int = 10000, dtype: str = "float32",
+                 initial_capacity: int = 1024):
+        self.dim = dim
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self._matrix = np.zeros((min(initial_capacity, max_entries), dim), dtype=self.dtype)
+        self._payloads: List[Any] = []
+        self._size = 0
+        self._next = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, vector: np.ndarray, payload: Any) -> int:
+        """Vektörü ekler ve yazıldığı satırın indeksini döndürür."""
+        if self._size < self.max_entries:
+            if self._size == len(self._matrix):
+                capacity = min(len(self._matrix) * 2, self.max_entries)
+                grown = np.zeros((capacity, self.dim), dtype=self.dtype)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            index = self._size
+            self._size += 1
+            self._payloads.append(payload)
+        else:
+            index = self._next
+            self._payloads[index] = payload
+        self._matrix[index] = vector
+        self._next = (index + 1) % self.max_entries
+        return index
+
+    def search(self, vector: np.ndarray, k: int = 1) -> List[Tuple[float, Any]]:
+        """En benzer k kaydı (benzerlik, içerik) çiftleri olarak döndürür."""
+        if self._size == 0:
+            return []
+        scores = self._matrix[:self._size] @ vector.astype(self.dtype)
+        k = min(k, self._size)
+        if k == 1:
+            best = [int(np.argmax(scores))]
+        else:
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+        return [(float(scores[i]), self._payloads[i]) for i in best]
+
+    def to_arrays(self) -> Tuple[np.ndarray, List[Any]]:
+        return self._matrix[:self._size].copy(), list(self._payloads)
+
+    @classmethod
+    def from_arrays(cls, matrix: np.ndarray, payloads: List[Any], max_entries: int,
+                    dtype: str = "float32") -> "VectorIndex":
+        index = cls(matrix.shape[1], max_entries, dtype, initial_capacity=max(len(payloads), 1))
+        for vector, payload in zip(matrix, payloads):
+            index.add(vector, payload)
+        return index
+
+
+class SemanticCache:
+    """Benzer sorular için SQL önbelleği.
+
+    Kayıtlar bir kapsam (scope) anahtarına göre ayrılır; kapsam, şema metni
+    ve model ayarlarından üretilir. Böylece farklı bir şema veya model için
+    üretilmiş SQL döndürülmez.
+    """
+
+    def __init__(self, embedder, threshold: float = 0.92, max_entries: int = 10000,
+                 dtype: str = "float32", path: Optional[str] = None, save_every: int = 20):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dtype = dtype
+        self.path = path
+        self.save_every = save_every
+
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0  # Benzer bulunup sayı/özel isim/olumsuzluk farkı yüzünden reddedilenler
+
+        if path and os.path.exists(path):
+            self.load()
+
+    def lookup(self, question: str, scope: str) -> Optional[str]:
+        """Eşiğin üstünde benzer bir soru varsa onun SQL'ini döndürür."""
+        index = self._indexes.get(scope)
+        if index is None or len(index) == 0:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        vector = self.embedder.embed(question)
+        with self._lock:
+            matches = index.search(vector, k=1)
+        if matches and matches[0][0] >= self.threshold:
+            payload = matches[0][1]
+            # Eski kayıtlarda işaretler saklanmamış olabilir
+            polarity = payload.get('polarity')
+            if polarity is None:
+                polarity = question_polarity(payload['question'])
+            if (tuple(payload['literals']) == question_literals(question)
+                    and tuple(polarity) == question_polarity(question)):
+                with self._lock:
+                    self.hits += 1
+                return payload['sql']
+            with self._lock:
+                self.rejected += 1
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def add(self, question: str, sql: str, scope: str):
+        """Soru ve SQL'ini önbelleğe ekler."""
+        vector = self.embedder.embed(question)
+        payload = {'question': question, 'sql': sql, 'literals': list(question_literals(question)),
+                   'polarity': list(question_polarity(question))}
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                index = VectorIndex(len(vector), self.max_entries, self.dtype)
+                self._indexes[scope] = index
+            index.add(vector, payload)
+            self._unsaved += 1
+            should_save = self.path and self._unsaved >= self.save_every
+        if should_save:
+            self.save()
+
+    def save(self):
+        """İndeksleri tek bir .npz dosyasına atomik olarak yazar."""
+        if not self.path:
+            return
+        with self._lock:
+            arrays = {}
+            meta = {'dim': None, 'embedder': type(self.embedder).__name__, 'scopes': {}}
+            for i, (scope, index) in enumerate(self._indexes.items()):
+                matrix, payloads = index.to_arrays()
+                arrays[f"vectors_{i}"] = matrix
+                meta['scopes'][scope] = {'array': f"vectors_{i}", 'payloads': payloads}
+                meta['dim'] = index.dim
+            self._unsaved = 0
+
+        arrays['meta'] = np.array(json.dumps(meta, ensure_ascii=False))
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".npz")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Anlamsal önbellek yazılırken hata: {e}")
+
+    def load(self):
+        """Diskteki indeksleri yükler; farklı bir gömme ile yazılmış dosya yok sayılır."""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('embedder') != type(self.embedder).__name__:
+                    return
+                if meta.get('dim') not in (None, getattr(self.embedder, 'dim', None)):
+                    return
+                for scope, info in meta['scopes'].items():
+                    self._indexes[scope] = VectorIndex.from_arrays(
+                        data[info['array']], info['payloads'], self.max_entries, self.dtype
+                    )
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Anlamsal önbellek okunurken hata: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'rejected': self.rejected,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': sum(len(index) for index in self._indexes.values())
+            }
+
+
+def build_semantic_cache(config: Optional[Dict[str, Any]] = None) -> Optional[SemanticCache]:
+    """SEMANTIC_CACHE_CONFIG ayarlarına göre anlamsal önbellek oluşturur.
+
+    Returns:
+        SemanticCache nesnesi veya önbellek kapalıysa None
+    """
+    config = config or SEMANTIC_CACHE_CONFIG
+    if not config.get("enabled", True):
+        return None
+
+    if config.get("embedder") == "ollama":
+        try:
+            embedder = OllamaEmbedder(config["embedding_model"], MODEL_CONFIG["base_url"])
+        except Exception as e:
+            print(f"Ollama embedding modeli yüklenemedi, paket içi gömme kullanılacak: {e}")
+            embedder = LexicalEmbedder()
+    else:
+        embedder = LexicalEmbedder()
+
+    return SemanticCache(
+        embedder,
+        threshold=config.get("threshold", 0.92),
+        max_entries=config.get("max_entries", 10000),
+        dtype=config.get("dtype", "float32"),
+        path=config.get("path"),
+        save_every=config.get("save_every", 20)
+    )
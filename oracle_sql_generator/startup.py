@@ -0,0 +1,209 @@
+"""
+Uygulamanın açılışını bloklamadan hazırlayan modül.
+
+Arayüz hemen ayağa kalkar; Ollama modelinin belleğe yüklenmesi ve
+veritabanı şemasının çıkarılması arka plan iş parçacıklarında yürür. Her
+bileşenin durumu (starting, loading, ready, failed) READINESS'ta tutulur ve
+/health, /health/ready uç noktalarından okunabilir. İstek, ihtiyaç duyduğu
+bileşen hazır değilse onu bekler.
+
+Model ısındırma bir üretim değildir: Ollama'ya boş prompt'lu bir
+/api/generate isteği gönderilir; model keep_alive süresi boyunca bellekte
+tutulur ve token üretilmez.
+"""
+import json
+import threading
+import time
+import urllib.request
+from typing import Any, Callable, Dict, Optional
+
+from .config import STARTUP_CONFIG
+
+STARTING = "starting"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+class Readiness:
+    """Arka planda hazırlanan bileşenlerin durumlarını tutar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._events: Dict[str, threading.Event] = {}
+        self.started = time.monotonic()
+
+    def register(self, name: str):
+        """Bileşeni 'starting' durumunda kaydeder (yeniden başlatmada sıfırlar)."""
+        with self._lock:
+            self._components[name] = {'state': STARTING, 'detail': "", 'seconds': None}
+            self._events[name] = threading.Event()
+
+    def set(self, name: str, state: str, detail: str = ""):
+        """Bileşenin durumunu günceller; hazır veya başarısızsa bekleyenleri uyandırır."""
+        with self._lock:
+            if name not in self._components:
+                self._components[name] = {'state': STARTING, 'detail': "", 'seconds': None}
+                self._events[name] = threading.Event()
+            component = self._components[name]
+            component['state'] = state
+            component['detail'] = detail
+            if state == LOADING:
+                component['loading_since'] = time.monotonic()
+            elif state in (READY, FAILED):
+                since = component.pop('loading_since', self.started)
+                component['seconds'] = time.monotonic() - since
+                self._events[name].set()
+
+    def state(self, name: str) -> Optional[str]:
+        with self._lock:
+            component = self._components.get(name)
+            return component['state'] if component else None
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """Bileşen (verilmezse tüm bileşenler) hazır mı."""
+        with self._lock:
+            if name is not None:
+                component = self._components.get(name)
+                return component is not None and component['state'] == READY
+            return all(c['state'] == READY for c in self._components.values())
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Bileşen hazır veya başarısız olana kadar bekler.
+
+        Kayıtlı olmayan bileşen beklenmez (hazır sayılır).
+
+        Returns:
+            Bileşen hazırsa True
+        """
+        with self._lock:
+            event = self._events.get(name)
+        if event is None:
+            return True
+        event.wait(timeout)
+        return self.is_ready(name)
+
+    @property
+    def status(self) -> str:
+        """Genel durum: ready, starting veya bir bileşen başarısızsa degraded."""
+        with self._lock:
+            states = [c['state'] for c in self._components.values()]
+        if any(state == FAILED for state in states):
+            return "degraded"
+        if all(state == READY for state in states):
+            return READY
+        return STARTING
+
+    def snapshot(self) -> Dict[str, Any]:
+        """/health yanıtı: genel durum, çalışma süresi ve bileşenlerin durumları."""
+        with self._lock:
+            components = {
+                name: {key: value for key, value in component.items() if key != 'loading_since'}
+                for name, component in self._components.items()
+            }
+        return {
+            'status': self.status,
+            'uptime_s': time.monotonic() - self.started,
+            'components': components,
+        }
+
+    def summary(self) -> str:
+        """Arayüzün durum satırında gösterilecek kısa açıklama."""
+        labels = {STARTING: "bekliyor", LOADING: "yükleniyor", READY: "hazır", FAILED: "hata"}
+        with self._lock:
+            parts = [
+                f"{name}: {labels.get(c['state'], c['state'])}" + (f" ({c['detail']})" if c['detail'] else "")
+                for name, c in self._components.items()
+            ]
+        return "Hazırlanıyor... " + ", ".join(parts) if self.status != READY else "Hazır"
+
+# Süreç genelinde paylaşılan hazırlık durumu
+READINESS = Readiness()
+
+def run_in_background(name: str, fn: Callable[[], Any],
+                      readiness: Optional[Readiness] = None) -> threading.Thread:
+    """fn()'i arka plan iş parçacığında çalıştırır ve durumunu readiness'a yazar.
+
+    Args:
+        name: Bileşen adı (ör. "model", "schema")
+        fn: Bileşeni hazırlayan fonksiyon; istisna yükseltirse bileşen 'failed' olur
+        readiness: Durumun yazılacağı nesne (varsayılan: READINESS)
+
+    Returns:
+        Başlatılan iş parçacığı
+    """
+    readiness = readiness or READINESS
+    readiness.register(name)
+
+    def target():
+        readiness.set(name, LOADING)
+        try:
+            fn()
+        except Exception as e:
+            print(f"{name} hazırlanırken hata oluştu: {e}")
+            readiness.set(name, FAILED, str(e))
+            return
+        readiness.set(name, READY)
+
+    thread = threading.Thread(target=target, name=f"warmup-{name}", daemon=True)
+    thread.start()
+    return thread
+
+def warm_up_ollama(base_url: str, model: str, keep_alive: Optional[str] = None,
+                   timeout: Optional[float] = None) -> float:
+    """Modeli Ollama sunucusunda belleğe yükler (token üretmeden).
+
+    Args:
+        base_url: Ollama sunucusunun adresi
+        model: Model adı
+        keep_alive: Modelin bellekte kalacağı süre (ör. "30m"), varsayılan: STARTUP_CONFIG
+        timeout: İsteğin süre sınırı (saniye), varsayılan: STARTUP_CONFIG
+
+    Returns:
+        Yüklemenin sürdüğü süre (saniye)
+    """
+    payload = {"model": model, "stream": False}
+    keep_alive = keep_alive if keep_alive is not None else STARTUP_CONFIG.get("keep_alive")
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    request = urllib.request.Request(
+        base_url.rstrip("/") + "/api/generate",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=timeout or STARTUP_CONFIG.get("warm_up_timeout")) as response:
+        response.read()
+    return time.perf_counter() - start
+
+def create_server(demo, readiness: Optional[Readiness] = None):
+    """Gradio arayüzünü /health ve /metrics uç noktalarıyla birlikte bir FastAPI uygulamasına bağlar.
+
+    /health süreç ayaktayken her zaman 200 döndürür (liveness);
+    /health/ready tüm bileşenler hazır olana kadar 503 döndürür (readiness);
+    /metrics aşama, model ve veritabanı histogramlarını Prometheus metin
+    biçiminde sunar.
+    """
+    import gradio as gr
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse, Response
+
+    from .telemetry import CONTENT_TYPE, render_metrics
+
+    readiness = readiness or READINESS
+    server = FastAPI()
+
+    @server.get("/health")
+    def health():
+        return JSONResponse(readiness.snapshot())
+
+    @server.get("/health/ready")
+    def health_ready():
+        snapshot = readiness.snapshot()
+        return JSONResponse(snapshot, status_code=200 if snapshot['status'] == READY else 503)
+
+    @server.get("/metrics")
+    def metrics():
+        return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+    return gr.mount_gradio_app(server, demo, path="/")
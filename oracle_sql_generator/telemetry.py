@@ -0,0 +1,389 @@
+"""
+İstek hattının ölçümleri ve izleri (tracing).
+
+Her isteğin aşama süreleri (şema → prompt → model → temizleme → çalıştırma →
+gösterim), modelin ilk token süresi ve prompt/yanıt token sayıları,
+veritabanında ifadenin çalıştırılması, satırların getirilmesi ve havuzda
+bağlantı bekleme süreleri histogramlarda toplanır. Ölçümler süreç içinde
+tutulur ve create_server()'ın eklediği /metrics uç noktasında Prometheus
+metin biçiminde sunulur; harici bir servis gerekmez.
+
+TELEMETRY_CONFIG["otel"] açıksa ve opentelemetry-api kuruluysa her span
+OpenTelemetry'ye de gönderilir; dışa aktarım (OTLP, Jaeger vb.)
+OpenTelemetry SDK'sının ayarlarıyla yapılır.
+
+Kullanım:
+    with span("render.csv", rows=len(df)):
+        ...
+    print(render_metrics())
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from .config import TELEMETRY_CONFIG
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+# /metrics yanıtının içerik türü (Prometheus metin biçimi 0.0.4)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+class _Metric:
+    """Etiketlere göre ayrılmış değerleri tutan metrik tabanı."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def label_values(self) -> List[Tuple[str, ...]]:
+        """Gözlem yapılmış etiket değeri kombinasyonları."""
+        with self._lock:
+            return sorted(self._values)
+
+    def render(self) -> List[str]:
+        """Metriği Prometheus metin biçiminde satırlar olarak döndürür."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, self._copy(value)) for key, value in self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(list(zip(self.labelnames, key)), value))
+        return lines
+
+    def _copy(self, value):
+        return value
+
+    def _samples(self, labels: List[Tuple[str, str]], value) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Yalnızca artan sayaç."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self, labels, value):
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+class Histogram(_Metric):
+    """Kova sınırları sabit histogram (Prometheus "le" kovaları)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float],
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        # Değer, kendisinden büyük veya eşit ilk kovaya yazılır (son eleman +Inf)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+    def snapshot(self, **labels) -> Dict[str, Any]:
+        """Gözlem sayısı, toplamı ve kümülatif kova sayıları."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            state = self._copy(state) if state is not None else [[0] * (len(self.buckets) + 1), 0.0, 0]
+        cumulative, running = [], 0
+        for count in state[0]:
+            running += count
+            cumulative.append(running)
+        return {'count': state[2], 'sum': state[1], 'buckets': list(zip(self.buckets + (float("inf"),), cumulative))}
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Kovalardan doğrusal ara değerlemeyle tahmini q. yüzdeliği (PromQL histogram_quantile gibi)."""
+        snapshot = self.snapshot(**labels)
+        if not snapshot['count']:
+            return None
+        rank = q * snapshot['count']
+        lower, previous = 0.0, 0
+        for bound, cumulative in snapshot['buckets']:
+            if cumulative >= rank:
+                if bound == float("inf"):
+                    return lower
+                in_bucket = cumulative - previous
+                return lower + (bound - lower) * ((rank - previous) / in_bucket if in_bucket else 0.0)
+            lower, previous = bound, cumulative
+        return lower
+
+    def _samples(self, labels, value):
+        lines, running = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), value[0]):
+            running += count
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(bound))])} {running}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(value[1])}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {value[2]}")
+        return lines
+
+class MetricsRegistry:
+    """Süreçteki metrikler; /metrics bunları tek metin olarak sunar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Metriği kaydeder; aynı adla kayıtlı bir metrik varsa onu döndürür."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float],
+                  labelnames: Sequence[str] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+# Süreç genelinde paylaşılan metrikler
+METRICS = MetricsRegistry()
+
+_PREFIX = TELEMETRY_CONFIG.get("prefix", "sqlchat")
+_DURATION_BUCKETS = TELEMETRY_CONFIG.get("duration_buckets", (0.01, 0.1, 1, 10))
+_TOKEN_BUCKETS = TELEMETRY_CONFIG.get("token_buckets", (64, 256, 1024, 4096))
+
+REQUEST_SECONDS = METRICS.histogram(
+    f"{_PREFIX}_request_duration_seconds", "Bir sorunun hattan geçiş süresi", _DURATION_BUCKETS
+)
+STAGE_SECONDS = METRICS.histogram(
+    f"{_PREFIX}_stage_duration_seconds",
+    "İstek başına aşama süresi; iç içe aşamaların süresi dıştakinden düşülür", _DURATION_BUCKETS, ("stage",)
+)
+SPAN_SECONDS = METRICS.histogram(
+    f"{_PREFIX}_span_duration_seconds", "İşlem (span) süresi", _DURATION_BUCKETS, ("span",)
+)
+SPAN_ERRORS = METRICS.counter(
+    f"{_PREFIX}_span_errors_total", "Hatayla biten işlem (span) sayısı", ("span",)
+)
+LLM_FIRST_TOKEN_SECONDS = METRICS.histogram(
+    f"{_PREFIX}_llm_time_to_first_token_seconds", "Model isteğinden ilk token'a kadar geçen süre", _DURATION_BUCKETS
+)
+LLM_TOKENS = METRICS.histogram(
+    f"{_PREFIX}_llm_tokens", "Üretim başına token sayısı (kind: prompt/completion)", _TOKEN_BUCKETS, ("kind",)
+)
+
+def enabled() -> bool:
+    return TELEMETRY_CONFIG.get("enabled", True)
+
+_TRACER = None
+
+def _tracer():
+    """OpenTelemetry açık ve kuruluysa tracer'ı, değilse None döndürür."""
+    global _TRACER
+    if otel_trace is None or not TELEMETRY_CONFIG.get("otel", False):
+        return None
+    if _TRACER is None:
+        _TRACER = otel_trace.get_tracer(TELEMETRY_CONFIG.get("service_name", "sqlchat"))
+    return _TRACER
+
+def _otel_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in attributes.items() if isinstance(value, (str, bool, int, float))}
+
+# Şu anki span (iç içe span'lerin süresi exclusive span'lerden düşülür)
+_CURRENT: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("sqlchat_span", default=None)
+
+class Span:
+    """Süresi ölçülen bir işlem.
+
+    exclusive=True ise histograma iç içe span'lerin süresi düşülerek yazılır;
+    örneğin "db.fetch" içindeki "db.execute" süresi satır getirmeye sayılmaz.
+    """
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None,
+                 exclusive: bool = False, parent: Optional["Span"] = None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.exclusive = exclusive
+        self.parent = parent
+        self.children = 0.0
+        self.duration: Optional[float] = None
+        self.started = time.perf_counter()
+        tracer = _tracer()
+        self.otel_span = tracer.start_span(name, attributes=_otel_attributes(self.attributes)) if tracer else None
+
+    def set(self, key: str, value: Any):
+        """Span'e bir öznitelik ekler (ör. token sayısı)."""
+        self.attributes[key] = value
+        if self.otel_span is not None and isinstance(value, (str, bool, int, float)):
+            self.otel_span.set_attribute(key, value)
+
+    def end(self, error: Optional[BaseException] = None) -> float:
+        """Span'i bitirir ve süresini kaydeder; ikinci çağrıda bir şey yapmaz."""
+        if self.duration is not None:
+            return self.duration
+        self.duration = time.perf_counter() - self.started
+        if self.parent is not None:
+            self.parent.children += self.duration
+        if enabled():
+            SPAN_SECONDS.observe(max(0.0, self.duration - self.children) if self.exclusive else self.duration,
+                                 span=self.name)
+            if error is not None:
+                SPAN_ERRORS.inc(span=self.name)
+        if self.otel_span is not None:
+            if error is not None:
+                self.otel_span.record_exception(error)
+                self.otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, str(error)))
+            self.otel_span.end()
+        return self.duration
+
+def start_span(name: str, **attributes) -> Span:
+    """Elle bitirilecek (end()) bir span başlatır.
+
+    Üreteçlerde (ör. model akışı) yield'ler arasında süren işlemler için
+    kullanılır; span şu anki span olarak işaretlenmez.
+    """
+    return Span(name, attributes, parent=_CURRENT.get())
+
+@contextmanager
+def span(name: str, exclusive: bool = False, **attributes):
+    """Bloğun süresini name span'i olarak kaydeder; blok hata verirse hata sayacı artar."""
+    current = Span(name, attributes, exclusive, parent=_CURRENT.get())
+    token = _CURRENT.set(current)
+    otel_context = otel_trace.use_span(current.otel_span, end_on_exit=False) if current.otel_span else None
+    try:
+        if otel_context is not None:
+            with otel_context:
+                yield current
+        else:
+            yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    else:
+        current.end()
+    finally:
+        _CURRENT.reset(token)
+
+def observe(name: str, seconds: float):
+    """Başka yerde ölçülmüş bir süreyi name span'i olarak kaydeder."""
+    if enabled():
+        SPAN_SECONDS.observe(seconds, span=name)
+
+def record_request(timings: Dict[str, float]):
+    """Bir isteğin aşama sürelerini (StageTimer.as_dict) kaydeder."""
+    if not enabled():
+        return
+    total = timings.get('total', 0.0)
+    REQUEST_SECONDS.observe(total)
+    for stage, seconds in timings.items():
+        if stage != 'total':
+            STAGE_SECONDS.observe(seconds, stage=stage)
+    tracer = _tracer()
+    if tracer is not None:
+        # İstek birden çok iş parçacığına yayıldığı için sonradan tek span olarak yazılır
+        end = time.time_ns()
+        request_span = tracer.start_span(
+            "sqlchat.request", start_time=end - int(total * 1e9),
+            attributes={f"stage.{stage}_ms": seconds * 1000 for stage, seconds in timings.items()}
+        )
+        request_span.end(end_time=end)
+
+def record_generation(first_token: Optional[float], prompt_tokens: Optional[int],
+                      completion_tokens: Optional[int]):
+    """Bir model üretiminin ilk token süresini ve token sayılarını kaydeder."""
+    if not enabled():
+        return
+    if first_token is not None:
+        LLM_FIRST_TOKEN_SECONDS.observe(first_token)
+    if prompt_tokens is not None:
+        LLM_TOKENS.observe(prompt_tokens, kind="prompt")
+    if completion_tokens is not None:
+        LLM_TOKENS.observe(completion_tokens, kind="completion")
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._telemetry_span = start_span("db.execute", dialect=conn.dialect.name)
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = getattr(context, "_telemetry_span", None)
+    if current is not None:
+        current.end()
+
+def _handle_error(exception_context):
+    current = getattr(exception_context.execution_context, "_telemetry_span", None)
+    if current is not None:
+        current.end(error=exception_context.original_exception)
+
+def instrument_engine(engine):
+    """Engine'de çalıştırılan ifadelerin süresini "db.execute" span'i olarak kaydeder."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def render_metrics() -> str:
+    """Tüm metrikleri Prometheus metin biçiminde döndürür."""
+    return METRICS.render()
+
+def describe_latency(quantile: float = 0.99) -> str:
+    """Aşama ve span süreleri için tahmini yüzdelik özeti (ör. "p99 model 1.2 s · ...")."""
+    parts = []
+    for metric, label in ((STAGE_SECONDS, "stage"), (SPAN_SECONDS, "span")):
+        for (name,) in metric.label_values():
+            value = metric.quantile(quantile, **{label: name})
+            if value is not None:
+                parts.append(f"{name} {value * 1000:.0f} ms")
+    return f"p{quantile * 100:g} " + " · ".join(parts)
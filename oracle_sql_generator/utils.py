@@ -1,24 +1,73 @@
 """
 Yardımcı fonksiyonlar için modül.
 """
+import re
 import tempfile
+import threading
 import os
-from typing import Optional, Union
+from typing import Dict, Optional, Union
 import pandas as pd
 
-def save_temp_csv(result: Union[pd.DataFrame, str]) -> Optional[str]:
-    """Sonuçları geçici bir CSV dosyasına kaydeder.
+from .telemetry import span
+
+class SessionFiles:
+    """Oturumların oluşturduğu geçici dosyaları izler.
+    
+    Eşzamanlı oturumlar birbirinin dosyasını ezmesin diye her dosya ayrı
+    adla oluşturulur. Oturumun aynı türden (ör. "result", "export") yeni
+    dosyası kaydedildiğinde öncekisi, oturum kapandığında tüm dosyaları
+    silinir. Oturumsuz (anahtarı None) dosyalar clear_temp_files() ile silinir.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, str]] = {}
+    
+    def register(self, key: Optional[str], path: str, kind: str = "result"):
+        """Dosyayı oturuma kaydeder; oturumun aynı türdeki önceki dosyasını siler."""
+        if key is None:
+            return
+        with self._lock:
+            files = self._files.setdefault(key, {})
+            previous = files.get(kind)
+            files[kind] = path
+        if previous is not None and previous != path:
+            _remove_file(previous)
+    
+    def release(self, key: Optional[str]):
+        """Oturumun tüm dosyalarını siler."""
+        with self._lock:
+            files = self._files.pop(key, {}) if key is not None else {}
+        for path in files.values():
+            _remove_file(path)
+
+# Süreç genelinde paylaşılan oturum dosyaları kaydı
+SESSION_FILES = SessionFiles()
+
+def _remove_file(path: str):
+    try:
+        if os.path.exists(path):
+            os.remove(path)
+    except Exception as e:
+        print(f"Dosya silinirken hata oluştu {path}: {e}")
+
+def save_temp_csv(result: Union[pd.DataFrame, str], session: Optional[str] = None) -> Optional[str]:
+    """Sonuçları bu isteğe ait yeni bir geçici CSV dosyasına kaydeder.
     
     Args:
         result: Kaydedilecek veri (DataFrame veya metin)
+        session: Dosyanın bağlı olduğu oturum (ör. Gradio session_hash); oturumun
+            önceki sonuç dosyası silinir
         
     Returns:
         Oluşturulan dosyanın yolu veya None
     """
     if isinstance(result, pd.DataFrame) and not result.empty:
-        temp_dir = tempfile.gettempdir()
-        temp_file = os.path.join(temp_dir, "oracle_query_result.csv")
-        result.to_csv(temp_file, index=False, encoding='utf-8-sig')
+        fd, temp_file = tempfile.mkstemp(prefix="oracle_query_result_", suffix=".csv")
+        os.close(fd)
+        with span("render.csv", rows=len(result)):
+            result.to_csv(temp_file, index=False, encoding='utf-8-sig')
+        SESSION_FILES.register(session, temp_file)
         return temp_file
     return None
 
@@ -26,12 +75,36 @@ def clear_temp_files():
     """Geçici dosyaları temizler."""
     temp_dir = tempfile.gettempdir()
     for filename in os.listdir(temp_dir):
-        if filename.startswith("oracle_query_result") and filename.endswith(".csv"):
+        # Dışa aktarım dosyaları (.csv, .csv.gz, .parquet) da aynı öneki kullanır
+        if filename.startswith("oracle_query_result") and filename.endswith((".csv", ".csv.gz", ".parquet")):
             try:
                 os.remove(os.path.join(temp_dir, filename))
             except Exception as e:
                 print(f"Dosya silinirken hata oluştu {filename}: {e}")
 
+def estimate_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısını hesaplar.
+    
+    Yerel modellerin tokenizer'ları Türkçe ve SQL metinlerde ortalama 3-4
+    karaktere bir token üretir; bütçe hesapları için bu tahmin yeterlidir.
+    """
+    if not text:
+        return 0
+    return max(1, round(len(text) / 3.5))
+
+def sql_skeleton(sql: str) -> str:
+    """Metin sabitlerini ve parantez içlerini atarak SQL'in dış iskeletini döndürür.
+    
+    Alt sorgulardaki veya metin içindeki anahtar kelimeleri (ör. iç sorgudaki
+    LIMIT) dış seviyedekilerden ayırmak için kullanılır.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'|\"[^\"]*\"", "''", sql)
+    previous = None
+    while previous != sql:
+        previous = sql
+        sql = re.sub(r'\([^()]*\)', '()', sql)
+    return sql
+
 def format_error_message(error: Exception) -> str:
     """Hata mesajını kullanıcı dostu bir formata dönüştürür."""
     error_msg = str(error)
@@ -0,0 +1,355 @@
+"""
+Üretilen SQL'i veritabanına göndermeden önce yerelde doğrulayan modül.
+
+Modelin çıktısı clean_sql_text ile yalnızca ilk SQL anahtar kelimesinden
+itibaren kesilir; sözdizimi bozuk, birden fazla ifade içeren veya şemada
+olmayan tablo/sütunlara başvuran SQL ancak veritabanında hata verir. Bu
+modül SQL'i sqlglot ile veritabanının lehçesinde (oracle, sqlite) ayrıştırır
+ve:
+
+- tek bir ifade olduğunu,
+- salt okunur kipte yalnızca sorgu (SELECT/UNION/WITH) olduğunu,
+- başvurulan her tablonun ve sütunun şema sözlüğünde bulunduğunu
+
+denetler. İstenirse SQL başka bir lehçeden (ör. modelin yazdığı Oracle
+SQL'i SQLite'a) çevrilir. Sonuçlar SQL metninin özetine göre önbelleğe
+alınır; doğrulama süreleri get_validation_stats() ile okunabilir.
+
+sqlglot kurulu değilse doğrulama atlanır ve SQL olduğu gibi çalıştırılır.
+"""
+import hashlib
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+try:
+    import sqlglot
+    from sqlglot import exp
+    from sqlglot.errors import SqlglotError
+    from sqlglot.optimizer.scope import Scope, traverse_scope
+except ImportError:
+    sqlglot = None
+
+from .config import VALIDATION_CONFIG
+
+# Şemada görünmeyen ama her sorguda kullanılabilen tablolar ve sözde sütunlar
+_BUILTIN_TABLES = {
+    "oracle": {"DUAL"},
+    "sqlite": {"SQLITE_MASTER", "SQLITE_SCHEMA", "SQLITE_SEQUENCE"},
+}
+_PSEUDO_COLUMNS = {
+    "oracle": {"ROWNUM", "ROWID", "LEVEL", "SYSDATE", "SYSTIMESTAMP", "USER", "UID",
+               "CURRENT_DATE", "CURRENT_TIMESTAMP"},
+    "sqlite": {"ROWID", "OID", "_ROWID_", "CURRENT_DATE", "CURRENT_TIME", "CURRENT_TIMESTAMP"},
+}
+
+class SQLValidationError(Exception):
+    """SQL yerel doğrulamadan geçemedi; veritabanına gönderilmedi."""
+
+    def __init__(self, result: "ValidationResult"):
+        super().__init__("SQL doğrulanamadı: " + "; ".join(result.errors))
+        self.result = result
+
+class ValidationResult:
+    """Bir SQL ifadesinin doğrulama sonucu."""
+
+    def __init__(self, sql: str, errors: Optional[List[str]] = None, statement_type: str = "",
+                 tables: Optional[List[str]] = None, transpiled_sql: Optional[str] = None,
+                 skipped: bool = False, seconds: float = 0.0):
+        self.sql = sql
+        self.errors = errors or []
+        self.statement_type = statement_type
+        self.tables = tables or []
+        self.transpiled_sql = transpiled_sql  # Lehçe çevrildiyse çalıştırılacak SQL
+        self.skipped = skipped                # sqlglot yok veya doğrulama kapalı
+        self.seconds = seconds
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def sql_to_run(self) -> str:
+        return self.transpiled_sql or self.sql
+
+    def summary(self) -> str:
+        """Durum satırında gösterilecek kısa açıklama."""
+        if self.ok:
+            return ""
+        return "⛔ SQL doğrulanamadı: " + "; ".join(self.errors)
+
+class _SchemaIndex:
+    """Şema sözlüğünün büyük harfe çevrilmiş tablo -> sütunlar eşlemesi."""
+
+    def __init__(self, schema: Optional[Dict[str, Any]]):
+        self.schema = schema  # id() yeniden kullanılmasın diye referans tutulur
+        self.columns: Dict[str, FrozenSet[str]] = {}
+        for table_name, table_info in ((schema or {}).get('tables') or {}).items():
+            self.columns[table_name.upper()] = frozenset(
+                col['name'].upper() for col in table_info.get('columns', [])
+            )
+        digest = hashlib.sha1()
+        for table_name in sorted(self.columns):
+            digest.update(table_name.encode("utf-8"))
+            digest.update(",".join(sorted(self.columns[table_name])).encode("utf-8"))
+        self.key = digest.hexdigest() if schema else ""
+
+_SCHEMA_INDEXES: "OrderedDict[int, _SchemaIndex]" = OrderedDict()
+_SCHEMA_LOCK = threading.Lock()
+
+def _schema_index(schema: Optional[Dict[str, Any]]) -> _SchemaIndex:
+    """Şema indeksini şema nesnesi başına bir kez oluşturur."""
+    with _SCHEMA_LOCK:
+        index = _SCHEMA_INDEXES.get(id(schema))
+        if index is not None and index.schema is schema:
+            _SCHEMA_INDEXES.move_to_end(id(schema))
+            return index
+    index = _SchemaIndex(schema)
+    with _SCHEMA_LOCK:
+        _SCHEMA_INDEXES[id(schema)] = index
+        while len(_SCHEMA_INDEXES) > 8:
+            _SCHEMA_INDEXES.popitem(last=False)
+    return index
+
+class ValidationStats:
+    """Doğrulama sayılarını ve gecikmelerini tutar."""
+
+    def __init__(self, max_entries: int = 1000):
+        self._lock = threading.Lock()
+        self.timings = deque(maxlen=max_entries)
+        self.validations = 0
+        self.rejected = 0
+        self.hits = 0
+
+    def record(self, result: ValidationResult, seconds: float, hit: bool):
+        with self._lock:
+            self.timings.append(seconds)
+            self.validations += 1
+            self.rejected += 0 if result.ok else 1
+            self.hits += 1 if hit else 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            timings = sorted(self.timings)
+            stats = {
+                'validations': self.validations,
+                'rejected': self.rejected,
+                'cache_hits': self.hits,
+                'mean_ms': statistics.fmean(timings) * 1000 if timings else 0.0,
+                'p50_ms': 0.0,
+                'p95_ms': 0.0,
+                'max_ms': timings[-1] * 1000 if timings else 0.0,
+            }
+        if timings:
+            stats['p50_ms'] = timings[len(timings) // 2] * 1000
+            stats['p95_ms'] = timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000
+        return stats
+
+VALIDATION_STATS = ValidationStats()
+
+class ValidationCache:
+    """SQL özeti, lehçe ve şemaya göre doğrulama sonuçlarını tutan LRU önbellek."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, ValidationResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[ValidationResult]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: Tuple, result: ValidationResult):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Süreç genelinde paylaşılan doğrulama önbelleği
+VALIDATION_CACHE = ValidationCache(VALIDATION_CONFIG.get("cache_size", 1024))
+
+def _statement_type(statement) -> str:
+    """İfadenin türünü (SELECT, INSERT, ...) döndürür."""
+    if isinstance(statement, exp.Command):
+        return str(statement.this).upper()
+    return statement.key.upper()
+
+def _write_operations(statement) -> List[str]:
+    """Salt okunur kipte izin verilmeyen işlemleri döndürür."""
+    if not isinstance(statement, exp.Query):
+        return [_statement_type(statement)]
+    writes = statement.find_all(exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Create,
+                                exp.Drop, exp.Alter, exp.Command)
+    operations = [_statement_type(node) for node in writes]
+    if statement.find(exp.Lock) is not None:
+        operations.append("FOR UPDATE")
+    return operations
+
+def _source_columns(source) -> Optional[Set[str]]:
+    """Bir kaynağın (tablo veya alt sorgu/CTE) sütunları; bilinmiyorsa None."""
+    if isinstance(source, Scope):
+        expression = source.expression
+        if isinstance(expression, exp.Query) and not expression.is_star:
+            return {name.upper() for name in expression.named_selects}
+    return None
+
+def _check_references(statement, index: _SchemaIndex, dialect: str) -> Tuple[List[str], List[str]]:
+    """Başvurulan tabloları ve sütunları şema indeksiyle karşılaştırır.
+
+    Returns:
+        (hatalar, başvurulan şema tabloları)
+    """
+    errors: List[str] = []
+    builtin_tables = _BUILTIN_TABLES.get(dialect, set())
+    pseudo_columns = _PSEUDO_COLUMNS.get(dialect, set())
+    cte_names = {cte.alias_or_name.upper() for cte in statement.find_all(exp.CTE)}
+
+    tables = []
+    for table in statement.find_all(exp.Table):
+        name = table.name.upper()
+        if not name or name in cte_names or name in builtin_tables:
+            continue
+        if name not in index.columns:
+            errors.append(f"Bilinmeyen tablo: {table.name}")
+        elif name not in tables:
+            tables.append(name)
+    if errors or not VALIDATION_CONFIG.get("check_columns", True):
+        return errors, tables
+
+    for scope in traverse_scope(statement):
+        aliases = {select.alias.upper() for select in scope.expression.selects if isinstance(select, exp.Alias)} \
+            if isinstance(scope.expression, exp.Select) else set()
+        for column in scope.columns:
+            name = column.name.upper()
+            if not name or name == "*" or (not column.table and name in pseudo_columns):
+                continue
+            error = _check_column(column, name, scope, index, aliases)
+            if error and error not in errors:
+                errors.append(error)
+    return errors, tables
+
+def _check_column(column, name: str, scope, index: _SchemaIndex, aliases: Set[str]) -> Optional[str]:
+    """Tek bir sütun başvurusunu kapsamdaki (ve dış kapsamlardaki) kaynaklarda arar."""
+    qualifier = column.table
+    current = scope
+    unknown_source = False
+    while current is not None:
+        sources = current.sources
+        if qualifier:
+            source = next((s for alias, s in sources.items() if alias.upper() == qualifier.upper()), None)
+            if source is not None:
+                columns = _table_columns(source, index)
+                if columns is None or name in columns:
+                    return None
+                return f"Bilinmeyen sütun: {qualifier}.{column.name}"
+        else:
+            for source in sources.values():
+                columns = _table_columns(source, index)
+                if columns is None:
+                    unknown_source = True
+                elif name in columns:
+                    return None
+        current = current.parent
+    if qualifier:
+        return f"Bilinmeyen tablo takma adı: {qualifier}"
+    # ORDER BY/GROUP BY'da SELECT takma adları kullanılabilir
+    if unknown_source or name in aliases:
+        return None
+    return f"Bilinmeyen sütun: {column.name}"
+
+def _table_columns(source, index: _SchemaIndex) -> Optional[Set[str]]:
+    if isinstance(source, exp.Table):
+        return index.columns.get(source.name.upper())
+    return _source_columns(source)
+
+def _validate(sql: str, index: _SchemaIndex, dialect: str, read_only: bool,
+              source_dialect: Optional[str]) -> ValidationResult:
+    """Önbelleğe bakmadan doğrulama yapar."""
+    try:
+        statements = [s for s in sqlglot.parse(sql, read=source_dialect or dialect) if s is not None]
+    except SqlglotError as e:
+        message = str(e).splitlines()[0] if str(e) else type(e).__name__
+        return ValidationResult(sql, [f"Sözdizimi hatası: {message}"])
+    if not statements:
+        return ValidationResult(sql, ["Boş SQL ifadesi."])
+    if len(statements) > 1:
+        return ValidationResult(sql, [f"Tek bir ifade bekleniyordu, {len(statements)} ifade bulundu."])
+
+    statement = statements[0]
+    statement_type = _statement_type(statement)
+    if isinstance(statement, exp.Command):
+        # sqlglot'un ayrıştıramayıp ham komut olarak bıraktığı ifade
+        return ValidationResult(sql, [f"Desteklenmeyen ifade: {statement_type}"], statement_type)
+    errors = []
+    if read_only:
+        operations = _write_operations(statement)
+        if operations:
+            errors.append("Salt okunur kipte izin verilmeyen işlem: " + ", ".join(dict.fromkeys(operations)))
+
+    tables = []
+    if not errors and index.columns:
+        try:
+            errors, tables = _check_references(statement, index, dialect)
+        except SqlglotError as e:
+            print(f"Sütun denetimi atlandı: {e}")
+
+    transpiled = None
+    if not errors and source_dialect and source_dialect != dialect:
+        try:
+            transpiled = statement.sql(dialect=dialect)
+        except SqlglotError as e:
+            errors.append(f"SQL {dialect} lehçesine çevrilemedi: {e}")
+    return ValidationResult(sql, errors, statement_type, tables, transpiled)
+
+def validate_sql(sql: str, schema: Optional[Dict[str, Any]] = None, dialect: str = "oracle",
+                 read_only: Optional[bool] = None, source_dialect: Optional[str] = None,
+                 config: Optional[Dict[str, Any]] = None) -> ValidationResult:
+    """SQL'i veritabanına göndermeden ayrıştırır ve şemaya göre denetler.
+
+    Args:
+        sql: Doğrulanacak SQL
+        schema: {'tables': ...} yapısındaki şema sözlüğü; None ise tablo
+            ve sütun denetimi yapılmaz
+        dialect: Veritabanının lehçesi (SQLAlchemy dialect adı: "oracle", "sqlite")
+        read_only: Yalnızca sorgulara izin ver (varsayılan: VALIDATION_CONFIG)
+        source_dialect: SQL'in yazıldığı lehçe; dialect'ten farklıysa SQL çevrilir
+            (varsayılan: VALIDATION_CONFIG)
+        config: Ayarlar (varsayılan: VALIDATION_CONFIG)
+
+    Returns:
+        ValidationResult nesnesi; çevrildiyse sql_to_run çevrilmiş SQL'dir
+    """
+    config = config or VALIDATION_CONFIG
+    if sqlglot is None or not config.get("enabled", True):
+        return ValidationResult(sql, skipped=True)
+    if read_only is None:
+        read_only = config.get("read_only", True)
+    if source_dialect is None:
+        source_dialect = config.get("source_dialect")
+
+    start = time.perf_counter()
+    sql = sql.strip().rstrip(";").rstrip()
+    index = _schema_index(schema)
+    key = (hashlib.sha1(sql.encode("utf-8")).hexdigest(), dialect, source_dialect, read_only, index.key)
+    result = VALIDATION_CACHE.get(key)
+    hit = result is not None
+    if result is None:
+        result = _validate(sql, index, dialect, read_only, source_dialect)
+        result.seconds = time.perf_counter() - start
+        VALIDATION_CACHE.put(key, result)
+    VALIDATION_STATS.record(result, time.perf_counter() - start, hit)
+    return result
+
+def get_validation_stats() -> Dict[str, Any]:
+    """Doğrulama sayılarını ve gecikme istatistiklerini (ms) döndürür."""
+    return VALIDATION_STATS.as_dict()
@@ -0,0 +1,47 @@
+"""
+İmleç parti boyu planı ve gidiş-dönüş istatistiklerinin testleri.
+
+Çalıştırma:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from oracle_sql_generator.fetch_tuning import FetchPlan, FetchStats, plan_fetch
+
+WIDE_SCHEMA = {'tables': {
+    'NOTLAR': {
+        'columns': [
+            {'name': 'ID', 'type': 'NUMBER(10)'},
+            {'name': 'METIN', 'type': 'VARCHAR2(4000)'},
+        ],
+        'foreign_keys': [],
+    }
+}}
+
+def test_plan_uses_only_the_given_schema():
+    sql = "SELECT * FROM NOTLAR"
+    wide = plan_fetch(sql, WIDE_SCHEMA)
+    unknown = plan_fetch(sql, None)
+    assert wide.row_width == 22 + 4000
+    assert unknown.row_width == 22
+    # Başka bir şemayla planlamak önceki çağrının sonucunu etkilemez
+    assert plan_fetch(sql, {'tables': {}}).row_width == 22
+    assert plan_fetch(sql, WIDE_SCHEMA).row_width == wide.row_width
+
+def test_estimated_round_trips_are_reported_separately():
+    stats = FetchStats()
+    plan = FetchPlan(arraysize=100, prefetchrows=100, row_width=22)
+    stats.record("SELECT 1 FROM DUAL", plan, rows=1000, seconds=0.1)
+    stats.record("SELECT 2 FROM DUAL", plan, rows=1000, seconds=0.1, measured_round_trips=4)
+    result = stats.as_dict()
+    assert result['estimated_round_trips'] == 2 * plan.round_trips(1000)
+    assert result['measured_queries'] == 1
+    assert result['round_trips'] == 4
+    assert result['rows_per_round_trip'] == 250.0
+    first, second = result['recent']
+    assert first['round_trips'] is None
+    assert first['estimated_round_trips'] == plan.round_trips(1000)
+    assert second['round_trips'] == 4
@@ -0,0 +1,50 @@
+"""
+Şema biçimlerindeki tip kısaltmalarının testleri.
+
+Çalıştırma:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from oracle_sql_generator.schema import abbreviate_type, serialize_schema
+
+@pytest.mark.parametrize("type_name, expected", [
+    ("INTERVAL DAY(2) TO SECOND(6)", "interval"),
+    ("INTERVAL YEAR(2) TO MONTH", "interval"),
+    ("INTEGER", "int"),
+    ("INT", "int"),
+    ("NUMBER(10)", "int"),
+    ("NUMBER(10,2)", "num"),
+    ("NUMBER", "num"),
+    ("VARCHAR2(40 BYTE)", "text"),
+    ("CHARACTER VARYING(20)", "text"),
+    ("TIMESTAMP(6) WITH TIME ZONE", "ts"),
+    ("DATE", "date"),
+    ("DOUBLE PRECISION", "num"),
+    ("BINARY_DOUBLE", "num"),
+    ("BOOLEAN", "bool"),
+    ("XMLTYPE", "xmltype"),
+    (None, ""),
+])
+def test_abbreviate_type(type_name, expected):
+    assert abbreviate_type(type_name) == expected
+
+def test_compact_format_keeps_interval_columns():
+    schema = {'tables': {
+        'IZINLER': {
+            'columns': [
+                {'name': 'ID', 'type': 'NUMBER(10)', 'nullable': False, 'primary_key': True},
+                {'name': 'SURE', 'type': 'INTERVAL DAY(2) TO SECOND(6)', 'nullable': True, 'primary_key': False},
+                {'name': 'DONEM', 'type': 'INTERVAL YEAR(2) TO MONTH', 'nullable': False, 'primary_key': False},
+            ],
+            'foreign_keys': [],
+        }
+    }}
+    text = serialize_schema(schema, "compact")
+    assert "IZINLER(ID:int*,SURE:interval,DONEM:interval!)" in text
+    assert "SURE:int" not in text.replace("SURE:interval", "")
@@ -1,244 +1,36 @@
-import re
 import gradio as gr
-import cx_Oracle
 import pandas as pd
-from sqlalchemy import create_engine, text, inspect
-from sqlalchemy.engine import URL
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_ollama.llms import OllamaLLM
 
-# Oracle bağlantı bilgileri
-ORACLE_CONFIG = {
-    "username": "kullanici_adi",
-    "password": "sifre",
-    "host": "localhost",
-    "port": "1521",
-    "service_name": "ORCL"
-}
+from oracle_sql_generator.llm import LLMHandler, build_model
+from oracle_sql_generator.pipeline import SQLPipeline, StageTimer
+from oracle_sql_generator.startup import create_server
+from oracle_sql_generator.utils import SESSION_FILES, save_temp_csv
 
-# SQLAlchemy bağlantı URL'si oluştur
-def get_oracle_url():
-    return URL.create(
-        "oracle+cx_oracle",
-        username=ORACLE_CONFIG["username"],
-        password=ORACLE_CONFIG["password"],
-        host=ORACLE_CONFIG["host"],
-        port=ORACLE_CONFIG["port"],
-        database=ORACLE_CONFIG["service_name"]
-    )
-
-# Oracle bağlantısı için engine oluştur
-def get_db_engine():
-    return create_engine(get_oracle_url())
-
-# Prompt şablonu
-template = """
-Sen bir Oracle SQL sorgu oluşturucususun. Veritabanı şeması ve kullanıcının Türkçe sorusu verildiğinde, Oracle uyumlu bir SQL sorgusu oluştur. 
-SADECE SQL ifadesini döndür, başka hiçbir şey yazma. Açıklama gerekmez.
-
-VERİTABANI ŞEMASI:
-{schema}
-
-ÖNEMLİ NOTLAR:
-1. Tablo isimlerini büyük harfle yazın (Oracle case-sensitive'dir).
-2. Alan isimlerini büyük harfle yazın.
-3. Tablolar arası ilişkileri doğru kurun (foreign key'leri kullanın).
-4. Sorgunun sonunda noktalı virgül (;) kullanmayın.
-5. Oracle SQL sözdizimine uygun yazın.
-6. Sütun isimlerinde özel karakter varsa çift tırnak içinde yazın.
-
-Kullanici sorusu: {query}
-
-SQL Sorgusu:
-"""
-
-# Modeli başlat
-try:
-    model = OllamaLLM(
-        model="gemma3:4b",
-        base_url="http://127.0.0.1:11434",
-        temperature=0.1,
-        top_p=0.9,
-        top_k=40,
-        num_ctx=2048,
-        num_thread=4,
-        request_timeout=30.0
-    )
-    model.invoke("test")  # Bağlantı testi
-except Exception as e:
-    print(f"Ollama bağlantı hatası: {e}")
-    print("Lütfen Ollama'nın çalıştığından emin olun: 'ollama serve'")
-    import sys
-    sys.exit(1)
-
-def extract_schema():
-    """Oracle veritabanı şemasını çıkarır."""
-    engine = get_db_engine()
-    inspector = inspect(engine)
-    schema = {'tables': {}, 'foreign_keys': []}
-    
-    with engine.connect() as conn:
-        # Kullanıcının erişebildiği tabloları al
-        tables = inspector.get_table_names(schema=ORACLE_CONFIG["username"].upper())
-        
-        for table_name in tables:
-            try:
-                # Sütun bilgilerini al
-                columns = []
-                primary_keys = inspector.get_pk_constraint(table_name, schema=ORACLE_CONFIG["username"].upper())
-                pk_columns = primary_keys.get('constrained_columns', [])
-                
-                # Sütun detaylarını al
-                columns_info = inspector.get_columns(table_name, schema=ORACLE_CONFIG["username"].upper())
-                for col in columns_info:
-                    columns.append({
-                        'name': col['name'],
-                        'type': str(col['type']),
-                        'nullable': col['nullable'],
-                        'default': col.get('default'),
-                        'primary_key': col['name'] in pk_columns
-                    })
-                
-                # Foreign key bilgilerini al
-                fks = inspector.get_foreign_keys(table_name, schema=ORACLE_CONFIG["username"].upper())
-                
-                schema['tables'][table_name] = {
-                    'columns': columns,
-                    'primary_key': pk_columns,
-                    'foreign_keys': fks
-                }
-                
-                # Global foreign key listesine ekle
-                for fk in fks:
-                    schema['foreign_keys'].append({
-                        'table': table_name,
-                        'columns': fk['constrained_columns'],
-                        'foreign_table': fk['referred_table'],
-                        'foreign_columns': fk['referred_columns']
-                    })
-                    
-            except Exception as e:
-                print(f"Tablo {table_name} işlenirken hata: {str(e)}")
-                continue
-    
-    return schema
-
-def format_schema_for_prompt(schema):
-    """Şema bilgisini prompt için düzenlenmiş bir metne dönüştürür"""
-    schema_text = []
-    
-    for table_name, table_info in schema['tables'].items():
-        table_header = f"\n### {table_name} Tablosu"
-        
-        # Sütun bilgileri
-        columns_info = []
-        for col in table_info['columns']:
-            col_info = f"- {col['name']}: {col['type']}"
-            if col['primary_key']:
-                col_info += " (PRIMARY KEY)"
-            if not col['nullable']:
-                col_info += " NOT NULL"
-            if col['default'] is not None:
-                col_info += f" DEFAULT {col['default']}"
-            columns_info.append(col_info)
-        
-        # Foreign key ilişkileri
-        fk_info = []
-        for fk in table_info.get('foreign_keys', []):
-            fk_info.append(
-                f"- {', '.join(fk['constrained_columns'])} → "
-                f"{fk['referred_table']}({', '.join(fk['referred_columns'])})"
-            )
-        
-        # Tüm bilgileri birleştir
-        table_info_text = [table_header]
-        table_info_text.extend(columns_info)
-        if fk_info:
-            table_info_text.append("\n  İlişkiler:")
-            table_info_text.extend(fk_info)
-        
-        schema_text.append("\n".join(table_info_text))
-    
-    return "\n\n".join(schema_text)
-
-def clean_text(text: str):
-    # Markdown kod bloklarını temizle
-    text = re.sub(r'```(?:sql)?\s*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\s*```$', '', text, flags=re.IGNORECASE)
-    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
-    text = text.strip()
-    
-    # Eğer hala SQL ifadesi içeriyorsa sadece SQL kısmını al
-    sql_match = re.search(r'(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|TRUNCATE).*', 
-                         text, re.DOTALL | re.IGNORECASE)
-    if sql_match:
-        text = sql_match.group(0)
-    
-    return text.strip()
+# Oracle bağlantı bilgileri ve Instant Client yolu oracle_sql_generator/config.py
+# (ORACLE_CONFIG) ve oracle_sql_generator/db.py içinde tutulur
 
-def to_sql_query(query, schema):
-    # Şema bilgisini formatla
-    formatted_schema = format_schema_for_prompt(schema)
-    
-    # Prompt'u oluştur
-    prompt = ChatPromptTemplate.from_template(template)
-    chain = prompt | model
-    
-    # Sorguyu çalıştır
-    response = chain.invoke({
-        "query": query, 
-        "schema": formatted_schema
-    }, config={"max_tokens": 500})
-    
-    return clean_text(response)
+# Modeli MODEL_CONFIG ayarlarıyla başlat (bağlantı kurulmaz; model arka planda belleğe yüklenir)
+model = build_model()
 
-def execute_query(sql):
-    """SQL sorgusunu çalıştır ve sonuçları döndür"""
-    try:
-        engine = get_db_engine()
-        with engine.connect() as conn:
-            # Sadece SELECT sorguları için pandas kullan
-            if sql.strip().upper().startswith('SELECT'):
-                df = pd.read_sql_query(text(sql), conn)
-                return df
-            else:
-                # DML işlemleri için
-                result = conn.execute(text(sql))
-                conn.commit()
-                return f"İşlem başarılı. Etkilenen satır sayısı: {result.rowcount}"
-    except Exception as e:
-        return f"Sorgu çalıştırılırken hata oluştu: {str(e)}"
-
-# Arayüz fonksiyonları
-def save_temp_csv(result):
-    """Sonuçları geçici bir CSV dosyasına kaydeder"""
-    import tempfile
-    import os
-    import pandas as pd
-    
-    if isinstance(result, pd.DataFrame):
-        # Pandas DataFrame ise doğrudan CSV'ye kaydet
-        temp_dir = tempfile.gettempdir()
-        temp_file = os.path.join(temp_dir, "oracle_query_result.csv")
-        result.to_csv(temp_file, index=False, encoding='utf-8-sig')
-        return temp_file
-    return None
+# Şema çıkarma, Oracle prompt şablonu, bağlantı havuzu, önbellekler ve
+# doğrulama ortak hattan gelir; şema ve model arka planda hazırlanır
+pipeline = SQLPipeline(llm_handler=LLMHandler(model=model), lazy=True)
 
-def generate_sql(query, show_schema):
+def generate_sql(query, show_schema, timer=None):
     """Kullanıcı sorusundan SQL oluştur"""
     try:
-        # Veritabanı şemasını al
-        schema = extract_schema()
+        # Şema açılışta arka planda bir kez çıkarılır; hazır değilse beklenir
+        prompt_schema = pipeline.prepare(query, timer)
         
         # Şemayı göster
-        schema_text = format_schema_for_prompt(schema) if show_schema else "Şema gösterilmiyor"
+        schema_text = pipeline.schema_text if show_schema else "Şema gösterilmiyor"
         
         # SQL sorgusunu oluştur
-        sql_query = to_sql_query(query, schema)
+        sql_query = pipeline.generate(query, prompt_schema, timer)
         
-        return sql_query, schema_text, "SQL sorgusu başarıyla oluşturuldu."
+        return sql_query, schema_text, "SQL sorgusu başarıyla oluşturuldu.", prompt_schema
     except Exception as e:
-        return "", f"Hata oluştu: {str(e)}", ""
+        return "", f"Hata oluştu: {str(e)}", "", None
 
 # Gradio arayüzünü oluştur
 with gr.Blocks(title="Metinden Oracle SQL Sorgu Oluşturucu") as demo:
@@ -284,48 +76,94 @@ with gr.Blocks(title="Metinden Oracle SQL Sorgu Oluşturucu") as demo:
             wrap=True
         )
     
+    # Sayfalama
+    page_state = gr.State(None)
+    with gr.Row():
+        prev_btn = gr.Button("◀ Önceki Sayfa")
+        page_info = gr.Markdown("")
+        next_btn = gr.Button("Sonraki Sayfa ▶")
+    
     # Dosya indirme bağlantısı
     download_btn = gr.File(label="Sonuçları İndir", visible=False)
     
-    def update_ui(query, show_schema, status_text):
+    def update_ui(query, show_schema, status_text, session=None):
         """Arayüzü günceller"""
         if not query.strip():
-            return "", "", "", None, False, status_text
+            return "", "", "", None, False, status_text, None, ""
         
-        sql, schema_text, status_msg = generate_sql(query, show_schema)
+        timer = StageTimer()
+        sql, schema_text, status_msg, prompt_schema = generate_sql(query, show_schema, timer)
+        if not sql:
+            timer.finish()
+            return sql, schema_text, "", None, False, status_msg, None, ""
         
-        # Sonuçları göster
-        if sql:
-            try:
-                result = execute_query(sql)
+        # Sorguyu çalıştır; hata verirse model düzeltir (REPAIR_CONFIG)
+        outcome = pipeline.execute(query, sql, prompt_schema, timer)
+        with timer.stage("render"):
+            result, page_state, page_text, download_file = outcome.status(), None, "", None
+            if outcome.ok and not isinstance(outcome.result, str):
+                page_state, page_text = outcome.result.state(), outcome.result.describe()
+                result = outcome.result.df
                 if isinstance(result, pd.DataFrame) and not result.empty:
-                    download_file = save_temp_csv(result)
-                    return sql, schema_text, result, download_file, True, status_msg
-                else:
-                    return sql, schema_text, result, None, False, status_msg
-            except Exception as e:
-                return sql, schema_text, f"Sorgu çalıştırılırken hata: {str(e)}", None, False, status_msg
-        else:
-            return sql, schema_text, "", None, False, status_msg
+                    download_file = save_temp_csv(result, session)
+            elif outcome.ok:
+                result = outcome.result
+        status_msg = f"{outcome.status()} {timer.finish()}"
+        return (outcome.sql, schema_text, result, download_file, download_file is not None, status_msg,
+                page_state, page_text)
+    
+    def change_page(page_state, step, session=None):
+        """Sonucun bir sonraki (step=1) veya önceki (step=-1) sayfasını getirir"""
+        if not page_state:
+            return gr.update(), gr.update(), page_state, ""
+        page = page_state['page'] + step
+        if page < 0 or (step > 0 and not page_state['has_more']):
+            return gr.update(), gr.update(), page_state, gr.update()
+        try:
+            result = pipeline.fetch_page(page_state['sql'], page, page_state['page_size'])
+        except Exception as e:
+            return f"Sorgu çalıştırılırken hata oluştu: {str(e)}", None, page_state, ""
+        return result.df, save_temp_csv(result.df, session), result.state(), result.describe()
     
     # Buton tıklandığında çalışacak fonksiyon
-    def on_click(query, show_schema):
-        return update_ui(query, show_schema, "Sorgu oluşturuluyor...")
+    def on_click(query, show_schema, request: gr.Request):
+        # CSV dosyası oturuma özeldir; eşzamanlı kullanıcılar birbirinin dosyasını ezmez
+        return update_ui(query, show_schema, "Sorgu oluşturuluyor...", request.session_hash)
     
     # Buton tıklandığında
     submit_event = submit_btn.click(
         fn=on_click,
         inputs=[query, show_schema],
-        outputs=[sql_output, schema_output, results, download_btn, gr.update(visible=True), status]
+        outputs=[sql_output, schema_output, results, download_btn, gr.update(visible=True), status,
+                 page_state, page_info]
     )
     
-    # Temizle butonu
-    def clear_all():
-        return "", "", "", None, False, ""
+    def previous_page(state, request: gr.Request):
+        return change_page(state, -1, request.session_hash)
+    
+    def next_page(state, request: gr.Request):
+        return change_page(state, 1, request.session_hash)
+    
+    prev_btn.click(
+        fn=previous_page,
+        inputs=[page_state],
+        outputs=[results, download_btn, page_state, page_info]
+    )
+    next_btn.click(
+        fn=next_page,
+        inputs=[page_state],
+        outputs=[results, download_btn, page_state, page_info]
+    )
+    
+    # Temizle butonu: oturumun CSV dosyaları da silinir
+    def clear_all(request: gr.Request):
+        SESSION_FILES.release(request.session_hash)
+        return "", "", "", None, False, "", None, ""
     
     clear_btn.click(
         fn=clear_all,
-        outputs=[query, sql_output, results, download_btn, gr.update(visible=False), status]
+        outputs=[query, sql_output, results, download_btn, gr.update(visible=False), status,
+                 page_state, page_info]
     )
     
     # Şema göster/gizle değiştiğinde
@@ -334,21 +172,15 @@ with gr.Blocks(title="Metinden Oracle SQL Sorgu Oluşturucu") as demo:
         inputs=[query, show_schema],
         outputs=[query, show_schema, schema_output, download_btn, gr.update(visible=False), status]
     )
+    
+    # Oturum kapanınca oturumun CSV dosyaları silinir
+    def release_session(request: gr.Request):
+        SESSION_FILES.release(request.session_hash)
+    
+    demo.unload(release_session)
 
 # Uygulamayı başlat
 if __name__ == "__main__":
-    # Oracle Instant Client yolu (gerekirse)
-    # cx_Oracle.init_oracle_client(lib_dir="path_to_oracle_instant_client")
-    
-    try:
-        # Bağlantı testi
-        engine = get_db_engine()
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1 FROM DUAL"))
-        print("Oracle veritabanına başarıyla bağlanıldı.")
-        
-        # Uygulamayı başlat
-        demo.launch()
-    except Exception as e:
-        print(f"Oracle veritabanına bağlanılamadı: {str(e)}")
-        print("Lütfen bağlantı bilgilerini kontrol edin ve Oracle Instant Client'ın kurulu olduğundan emin olun.")
+    # Uygulamayı başlat (/health ve /health/ready uç noktalarıyla)
+    import uvicorn
+    uvicorn.run(create_server(demo), host="127.0.0.1", port=7860, log_level="warning")
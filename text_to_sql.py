@@ -1,217 +1,127 @@
-import json
-import re
+import os
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import nullcontext
 
 # LangChain uyarılarını filtrele
 warnings.filterwarnings("ignore", category=UserWarning, module="langchain")
 
 import streamlit as st
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_ollama.llms import OllamaLLM
-from sqlalchemy import create_engine, inspect
 
-db_url = "sqlite:///Northwind_small.sqlite"
-
-template = """
-Sen bir SQL sorgu oluşturucususun. Veritabanı şeması ve kullanıcının Türkçe sorusu verildiğinde, SQLite uyumlu bir SQL sorgusu oluştur. 
-SADECE SQL ifadesini döndür, başka hiçbir şey yazma. Açıklama gerekmez.
-
-VERİTABANI ŞEMASI:
-{schema}
-
-ÖNEMLİ NOTLAR:
-1. Tablo isimlerini doğru yazmaya dikkat edin (büyük/küçük harf duyarlı olabilir).
-2. Alan isimlerini tam olarak verildiği gibi kullanın.
-3. Tablolar arası ilişkileri doğru kurun (foreign key'leri kullanın).
-4. Sorgunun sonunda noktalı virgül (;) kullanmayın.
-5. SQLite sözdizimine uygun yazın.
-6. Sütun isimlerinde boşluk veya özel karakter varsa köşeli parantez içinde yazın (örneğin: [Unit Price]).
+from oracle_sql_generator.cancellation import CancelToken, QueryCancelledError
+from oracle_sql_generator.config import EXPORT_CONFIG
+from oracle_sql_generator.db import get_db_engine
+from oracle_sql_generator.export import EXPORT_FORMATS, export_query
+from oracle_sql_generator.llm import LLMHandler, build_model
+from oracle_sql_generator.pagination import is_select
+from oracle_sql_generator.pipeline import SQLPipeline, StageTimer
+from oracle_sql_generator.startup import READINESS
 
-Kullanici sorusu: {query}
+db_url = "sqlite:///Northwind_small.sqlite"
 
-SQL Sorgusu:
-"""
+# Model ve ayarları MODEL_CONFIG'ten gelir (bağlantı kurulmaz; model arka planda belleğe yüklenir)
+model = build_model()
 
-try:
-    # Gemma3 4B modelini kullanıyoruz
-    model = OllamaLLM(
-        model="gemma3:4b",
-        base_url="http://127.0.0.1:11434",
-        temperature=0.1,     # Düşük sıcaklık daha tutarlı yanıtlar için
-        top_p=0.9,          # Daha hızlı yanıt için
-        top_k=40,           # Daha iyi çeşitlilik için
-        num_ctx=2048,       # Bağlam penceresi
-        num_thread=4,       # CPU thread sayısı
-        request_timeout=30.0 # Zaman aşımı
-    )
-    # Bağlantıyı test et
-    model.invoke("test")
-except Exception as e:
-    print(f"Ollama bağlantı hatası: {e}")
-    print("Lütfen Ollama'nın çalıştığından emin olun: 'ollama serve'")
-    import sys
-    sys.exit(1)
+# Şema çıkarma, SQLite prompt şablonu, yanıt/sonuç önbellekleri, doğrulama ve
+# onarım ortak hattan gelir. Hat süreç başına bir kez kurulur; şema ve model
+# arka planda hazırlanır, sayfa beklemeden çizilir
+@st.cache_resource
+def get_pipeline():
+    return SQLPipeline(get_db_engine(db_url), LLMHandler(model=model), lazy=True)
 
-# Veritabanı bağlantısını önbelleğe al
+# Sorgular bu havuzda çalışır; betik beklerken Streamlit'e kontrol verebilir
 @st.cache_resource
-def get_db_engine():
-    return create_engine(db_url)
+def get_query_executor():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="sorgu")
 
-@st.cache_data(ttl=3600)  # 1 saat süreyle önbellekte tut
-def extract_schema(db_url):
-    """Veritabanı şemasını detaylı bir şekilde çıkarır.
+def run_cancellable(fn, cancel, status, label):
+    """fn'i ayrı bir iş parçacığında çalıştırır ve sonucunu döndürür.
     
-    Returns:
-        dict: Tablo isimlerini anahtar, sütun bilgilerini değer olarak içeren sözlük.
-        Her sütun bilgisi, sütun adı, veri tipi ve nullable bilgisini içerir.
+    Sorgu beklenirken durum satırı güncellenir. İptal butonuna basılınca
+    Streamlit betiği yeniden çalıştırır ve bu döngüdeki ilk Streamlit
+    çağrısında eski çalıştırma sonlanır; bu durumda jeton iptal edilir ve
+    veritabanındaki ifade sürücü tarafında kesilir.
     """
-    engine = get_db_engine()
-    inspector = inspect(engine)
-    schema = {
-        'tables': {},
-        'foreign_keys': []
-    }
-
-    # SQLite için özel sorgu ile tablo bilgilerini al
-    with engine.connect() as conn:
-        from sqlalchemy import text
-        
-        # Tabloları al
-        tables = inspector.get_table_names()
-        
-        for table_name in tables:
-            # Sütun bilgilerini al
-            columns = []
-            primary_keys = []
-            
-            # SQLite'da sütun bilgilerini al
-            cursor = conn.execute(text(f'PRAGMA table_info("{table_name}")'))
-            for col in cursor.mappings().all():
-                is_primary = bool(col['pk'])
-                columns.append({
-                    'name': col['name'],
-                    'type': col['type'],
-                    'nullable': not bool(col['notnull']),
-                    'default': col['dflt_value'],
-                    'primary_key': is_primary
-                })
-                if is_primary:
-                    primary_keys.append(col['name'])
-            
-            # Foreign key bilgilerini al
-            fks = []
-            cursor = conn.execute(text(f'PRAGMA foreign_key_list("{table_name}")'))
-            for fk in cursor.mappings().all():
-                fk_info = {
-                    'constrained_columns': [fk['from']],
-                    'referred_table': fk['table'],
-                    'referred_columns': [fk['to']]
-                }
-                fks.append(fk_info)
-                
-                # Genel foreign key listesine ekle
-                schema['foreign_keys'].append({
-                    'table': table_name,
-                    'columns': [fk['from']],
-                    'foreign_table': fk['table'],
-                    'foreign_columns': [fk['to']]
-                })
-            
-            # Tablo DDL'sini al
-            cursor = conn.execute(
-                text("SELECT sql FROM sqlite_master WHERE type='table' AND name=:name"),
-                {'name': table_name}
-            )
-            ddl = cursor.first()
-            
-            schema['tables'][table_name] = {
-                'columns': columns,
-                'primary_key': primary_keys,
-                'foreign_keys': fks,
-                'ddl': ddl[0] if ddl else None
-            }
-    
-    return schema
-
-def format_schema_for_prompt(schema):
-    """Şema bilgisini prompt için düzenlenmiş bir metne dönüştürür"""
-    schema_text = []
+    future = get_query_executor().submit(fn)
+    start = time.perf_counter()
+    try:
+        while True:
+            try:
+                return future.result(timeout=0.25)
+            except FutureTimeoutError:
+                status.caption(f"{label} ({time.perf_counter() - start:.0f} sn)")
+    finally:
+        if not future.done():
+            cancel.cancel()
+        status.empty()
+
+def cancel_running_request():
+    """İptal butonu: süren SQL üretimini ve sorguyu durdurur."""
+    cancel = st.session_state.get('cancel_token')
+    if cancel is not None:
+        cancel.cancel()
+
+@st.fragment
+def export_section(sql, export_format):
+    """Son SELECT'in tamamını istek üzerine dosyaya aktarır ve indirme butonunu gösterir.
     
-    # Her tablo için bilgileri topla
-    for table_name, table_info in schema['tables'].items():
-        # Tablo başlığı
-        table_header = f"\n### {table_name} Tablosu"
-        
-        # Sütun bilgileri
-        columns_info = []
-        for col in table_info['columns']:
-            col_info = f"- {col['name']}: {col['type']}"
-            if col['primary_key']:
-                col_info += " (PRIMARY KEY)"
-            if not col['nullable']:
-                col_info += " NOT NULL"
-            if col['default'] is not None:
-                col_info += f" DEFAULT {col['default']}"
-            columns_info.append(col_info)
-        
-        # Foreign key ilişkileri
-        fk_info = []
-        for fk in table_info['foreign_keys']:
-            fk_info.append(
-                f"- {', '.join(fk['constrained_columns'])} → "
-                f"{fk['referred_table']}({', '.join(fk['referred_columns'])})"
+    Fragment içindeki butonlar sadece bu bölümü yeniden çalıştırır; ekrandaki
+    sonuç kaybolmaz ve sorgu yeniden çalıştırılmaz. Dosya sorgu parça parça
+    okunarak yazılır, ancak Streamlit'in indirme butonu dosyayı belleğe alır;
+    EXPORT_CONFIG["download_max_mb"]'den büyük dosyalar sadece diskte bırakılır.
+    """
+    key = (sql, export_format)
+    exported = st.session_state.get('export')
+    if st.button(f"Dışa Aktar ({export_format})"):
+        cancel = CancelToken()
+        st.session_state.cancel_token = cancel
+        try:
+            stats = run_cancellable(
+                lambda: export_query(sql, export_format, engine=pipeline.engine, cancel=cancel,
+                                     schema=pipeline.schema),
+                cancel, st.empty(), "Sonuçlar dışa aktarılıyor..."
             )
-        
-        # Tüm bilgileri birleştir
-        table_info = [table_header]
-        table_info.extend(columns_info)
-        if fk_info:
-            table_info.append("\n  İlişkiler:")
-            table_info.extend(fk_info)
-        
-        schema_text.append("\n".join(table_info))
-    
-    return "\n\n".join(schema_text)
-
-@st.cache_data(ttl=300)  # 5 dakika süreyle önbellekte tut
-def to_sql_query(query, schema):
-    # Şema bilgisini formatla
-    formatted_schema = format_schema_for_prompt(schema)
-    
-    # Prompt'u oluştur
-    prompt = ChatPromptTemplate.from_template(template)
-    chain = prompt | model
-    
-    # Sorguyu çalıştır
-    response = chain.invoke({
-        "query": query, 
-        "schema": formatted_schema
-    }, config={"max_tokens": 500})
-    
-    # Sonucu temizle ve döndür
-    return clean_text(response)
-
-def clean_text(text: str):
-    # Markdown kod bloklarını temizle
-    text = re.sub(r'```(?:sql)?\s*', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\s*```$', '', text, flags=re.IGNORECASE)
-    
-    # Diğer temizlik işlemleri
-    text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
-    text = text.strip()
-    
-    # Eğer hala SQL ifadesi içeriyorsa sadece SQL kısmını al
-    sql_match = re.search(r'(SELECT|INSERT|UPDATE|DELETE|CREATE|ALTER|DROP|TRUNCATE).*', text, re.DOTALL | re.IGNORECASE)
-    if sql_match:
-        text = sql_match.group(0)
+        except QueryCancelledError as e:
+            st.warning(str(e))
+            return
+        except Exception as e:
+            st.error(f"Sonuçlar dışa aktarılırken hata oluştu: {str(e)}")
+            return
+        # Önceki dışa aktarımın dosyası silinir
+        if exported is not None and os.path.exists(exported[1].path):
+            os.remove(exported[1].path)
+        exported = st.session_state.export = (key, stats)
+    if exported is None or exported[0] != key:
+        return
     
-    return text.strip()
-
-# Veritabanı şemasını al ve önbelleğe al
-schema = extract_schema(db_url)
-
-# Şema bilgilerini yazdır (debug için)
-print("Veritabanı şeması yüklendi. Tablolar:", list(schema['tables'].keys()))
+    stats = exported[1]
+    st.caption(stats.describe())
+    max_mb = EXPORT_CONFIG.get("download_max_mb")
+    if max_mb and stats.file_size_mb > max_mb:
+        st.info(f"Dosya tarayıcıdan indirilemeyecek kadar büyük ({stats.file_size_mb:,.0f} MB); "
+                f"sunucuda şurada: {stats.path}")
+        return
+    with open(stats.path, 'rb') as f:
+        st.download_button(
+            label=f"Sonuçları İndir ({export_format})",
+            data=f,
+            file_name='sorgu_sonuclari' + EXPORT_FORMATS[export_format],
+            mime='application/octet-stream',
+            on_click="ignore",
+        )
+
+def get_schema():
+    """Veritabanı şemasını döndürür; henüz yükleniyorsa hazır olmasını bekler."""
+    pipeline = get_pipeline()
+    if not pipeline.wait_for_schema():
+        st.error(f"Veritabanı şeması yüklenemedi: {pipeline.schema_error}")
+        st.stop()
+    return pipeline.schema
+
+pipeline = get_pipeline()
+if not READINESS.is_ready():
+    st.sidebar.caption(READINESS.summary())
 
 # Şema özetini göster (isteğe bağlı)
 if 'show_schema_summary' not in st.session_state:
@@ -222,7 +132,7 @@ if st.sidebar.button("Veritabanı Şemasını Göster"):
 
 if st.session_state.show_schema_summary:
     with st.sidebar.expander("📊 Veritabanı Şema Özeti", expanded=True):
-        for table_name, table_info in schema['tables'].items():
+        for table_name, table_info in get_schema()['tables'].items():
             st.subheader(f"📌 {table_name}")
             st.write("**Sütunlar:**")
             for col in table_info['columns']:
@@ -253,48 +163,81 @@ query = st.text_area(
     key="query_input"
 )
 
-# Sorguyu göndermek için buton
-submit_button = st.button("Sorguyu Çalıştır")
+# Sorguyu göndermek ve süren isteği iptal etmek için butonlar
+submit_col, cancel_col = st.columns([4, 1])
+submit_button = submit_col.button("Sorguyu Çalıştır")
+cancel_col.button("İptal", on_click=cancel_running_request)
+
+# İndirilecek dosyanın biçimi
+export_format = st.sidebar.selectbox(
+    "İndirme biçimi",
+    list(EXPORT_FORMATS),
+    index=list(EXPORT_FORMATS).index(EXPORT_CONFIG.get("format", "csv"))
+)
 
 if query and (submit_button or st.session_state.get('auto_submit', False)):
-    with st.spinner('SQL sorgusu oluşturuluyor...'):
-        sql = to_sql_query(query, schema)
+    # Bu isteğin iptal jetonu; İptal butonu buna ulaşır
+    cancel = CancelToken()
+    st.session_state.cancel_token = cancel
+    
+    # Aşama süreleri (şema, prompt, model, temizleme, çalıştırma, gösterim)
+    timer = StageTimer()
+    
+    # Arka planda yüklenen şema hazır değilse beklenir
+    with st.spinner(READINESS.summary()) if not READINESS.is_ready("schema") else nullcontext():
+        get_schema()
+        prompt_schema = pipeline.prepare(query, timer)
     
     st.subheader("Oluşturulan SQL Sorgusu:")
-    st.code(sql, language="sql")
+    sql_placeholder = st.empty()
+    status_placeholder = st.empty()
     
-    # SQL sorgusunu çalıştır ve sonuçları göster
+    # SQL'i model ürettikçe göster
+    sql = ""
     try:
-        import pandas as pd
-        from sqlalchemy import text
-        
-        engine = create_engine(db_url)
-        try:
-            # SQLAlchemy bağlantısını kullanarak sorguyu çalıştır
-            with engine.connect() as conn:
-                # Sorguyu çalıştır ve sonuçları DataFrame'e aktar
-                df = pd.read_sql_query(sql, conn)
-                
-                st.subheader("Sorgu Sonuçları:")
-                st.dataframe(df)
-                
-                # Sonuçları indirme bağlantısı ekle
-                csv = df.to_csv(index=False).encode('utf-8-sig')
-                st.download_button(
-                    label="Sonuçları İndir (CSV)",
-                    data=csv,
-                    file_name='sorgu_sonuclari.csv',
-                    mime='text/csv',
-                )
-                
-        except Exception as e:
-            st.error(f"Sorgu çalıştırılırken hata oluştu: {str(e)}")
+        with st.spinner('SQL sorgusu oluşturuluyor...'):
+            for sql in pipeline.generate_stream(query, prompt_schema, timer, cancel):
+                sql_placeholder.code(sql, language="sql")
+    except QueryCancelledError as e:
+        st.warning(str(e))
+        st.stop()
+    
+    # Sorgu ayrı bir iş parçacığında çalışır; İptal butonu onu keser. Bozuk
+    # veya şemada olmayan tablo/sütunlara başvuran SQL veritabanına
+    # gönderilmeden reddedilir, hata veren SQL modele düzelttirilir.
+    # SELECT'lerin ekranda gösterilen kısmı veritabanı tarafında sınırlanır;
+    # aynı sorgu tekrar geldiğinde sonuç önbellekten döner
+    outcome = run_cancellable(
+        lambda: pipeline.execute(query, sql, prompt_schema, timer, cancel, paged=False),
+        cancel, status_placeholder, "Sorgu çalıştırılıyor..."
+    )
+    if outcome.sql != sql:
+        sql_placeholder.code(outcome.sql, language="sql")
+    if outcome.repair:
+        st.info(outcome.repair)
+    
+    if isinstance(outcome.error, QueryCancelledError):
+        st.warning(outcome.status())
+    elif not outcome.ok:
+        st.error(outcome.status())
+        if outcome.error is not None:
             # Hata ayıklama için SQL sorgusunu da göster
             st.text("SQL Sorgusu:")
-            st.code(sql, language="sql")
-            
-    except Exception as e:
-        st.error(f"Sorgu çalıştırılırken hata oluştu: {str(e)}")
-
-
-
+            st.code(outcome.sql, language="sql")
+    else:
+        sql, df = outcome.sql, outcome.result
+        with timer.stage("render"):
+            if isinstance(df, str):
+                # DML ifadesi: etkilenen satır sayısı
+                st.success(df)
+            else:
+                st.subheader("Sorgu Sonuçları:")
+                st.dataframe(df)
+                if df.attrs.get('truncated'):
+                    st.info(f"İlk {len(df):,} satır gösteriliyor; tamamını dışa aktarabilirsiniz.")
+        st.caption(timer.finish())
+        
+        # Dışa aktarım sadece istenince yapılır; sonuç ekrandayken sorgu
+        # tekrar çalıştırılmaz
+        if is_select(sql):
+            export_section(sql, export_format)